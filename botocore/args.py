@@ -21,6 +21,7 @@ import logging
 import socket
 
 import botocore.exceptions
+import botocore.jsoncodec
 import botocore.serialize
 import botocore.utils
 from botocore.signers import RequestSigner
@@ -57,17 +58,19 @@ LEGACY_GLOBAL_STS_REGIONS = [
 
 class ClientArgsCreator(object):
     def __init__(self, event_emitter, user_agent, response_parser_factory,
-                 loader, exceptions_factory, config_store):
+                 loader, exceptions_factory, config_store,
+                 endpoint_creator_cls=None):
         self._event_emitter = event_emitter
         self._user_agent = user_agent
         self._response_parser_factory = response_parser_factory
         self._loader = loader
         self._exceptions_factory = exceptions_factory
         self._config_store = config_store
+        self._endpoint_creator_cls = endpoint_creator_cls
 
     def get_client_args(self, service_model, region_name, is_secure,
                         endpoint_url, verify, credentials, scoped_config,
-                        client_config, endpoint_bridge):
+                        client_config, endpoint_bridge, source_client=None):
         final_args = self.compute_client_args(
             service_model, client_config, endpoint_bridge, region_name,
             endpoint_url, is_secure, scoped_config)
@@ -80,6 +83,7 @@ class ClientArgsCreator(object):
         s3_config = final_args['s3_config']
         partition = endpoint_config['metadata'].get('partition', None)
         socket_options = final_args['socket_options']
+        json_codec = config_kwargs['json_codec']
 
         signing_region = endpoint_config['signing_region']
         endpoint_region_name = endpoint_config['region_name']
@@ -94,22 +98,45 @@ class ClientArgsCreator(object):
 
         config_kwargs['s3'] = s3_config
         new_config = Config(**config_kwargs)
-        endpoint_creator = EndpointCreator(event_emitter)
-
+        endpoint_creator_cls = self._endpoint_creator_cls
+        if endpoint_creator_cls is None:
+            endpoint_creator_cls = EndpointCreator
+        endpoint_creator = endpoint_creator_cls(event_emitter)
+
+        response_parser_factory = self._response_parser_factory
+        if json_codec is not None:
+            response_parser_factory = response_parser_factory.copy()
+            response_parser_factory.set_parser_defaults(
+                json_codec=json_codec)
+
+        endpoint_kwargs = {}
+        if source_client is not None and self._can_share_http_session(
+                source_client, endpoint_config['endpoint_url'], new_config,
+                socket_options):
+            endpoint_kwargs['http_session'] = \
+                source_client._endpoint.http_session
         endpoint = endpoint_creator.create_endpoint(
             service_model, region_name=endpoint_region_name,
             endpoint_url=endpoint_config['endpoint_url'], verify=verify,
-            response_parser_factory=self._response_parser_factory,
+            response_parser_factory=response_parser_factory,
             max_pool_connections=new_config.max_pool_connections,
+            idle_connection_timeout=new_config.idle_connection_timeout,
             proxies=new_config.proxies,
             timeout=(new_config.connect_timeout, new_config.read_timeout),
             socket_options=socket_options,
             client_cert=new_config.client_cert,
-            proxies_config=new_config.proxies_config)
+            proxies_config=new_config.proxies_config,
+            **endpoint_kwargs)
 
         serializer = botocore.serialize.create_serializer(
-            protocol, parameter_validation)
-        response_parser = botocore.parsers.create_parser(protocol)
+            protocol, parameter_validation,
+            compile_plans=bool(self._config_store.get_config_variable(
+                'compile_serializers')),
+            json_codec=json_codec)
+        if source_client is not None:
+            response_parser = source_client._response_parser
+        else:
+            response_parser = botocore.parsers.create_parser(protocol)
         return {
             'serializer': serializer,
             'endpoint': endpoint,
@@ -123,6 +150,23 @@ class ClientArgsCreator(object):
             'exceptions_factory': self._exceptions_factory
         }
 
+    def _can_share_http_session(self, source_client, endpoint_url,
+                                new_config, socket_options):
+        # The verify value is the same for clones, so only the endpoint,
+        # the socket options and the HTTP related config need to match.
+        if source_client._endpoint.host != endpoint_url:
+            return False
+        http_session = source_client._endpoint.http_session
+        if getattr(http_session, 'socket_options', None) != socket_options:
+            return False
+        source_config = source_client.meta.config
+        for name in ('connect_timeout', 'read_timeout',
+                     'max_pool_connections', 'idle_connection_timeout',
+                     'proxies', 'proxies_config', 'client_cert'):
+            if getattr(source_config, name) != getattr(new_config, name):
+                return False
+        return True
+
     def compute_client_args(self, service_model, client_config,
                             endpoint_bridge, region_name, endpoint_url,
                             is_secure, scoped_config):
@@ -170,6 +214,7 @@ class ClientArgsCreator(object):
                 connect_timeout=client_config.connect_timeout,
                 read_timeout=client_config.read_timeout,
                 max_pool_connections=client_config.max_pool_connections,
+                idle_connection_timeout=client_config.idle_connection_timeout,
                 proxies=client_config.proxies,
                 proxies_config=client_config.proxies_config,
                 retries=client_config.retries,
@@ -177,6 +222,7 @@ class ClientArgsCreator(object):
                 inject_host_prefix=client_config.inject_host_prefix,
             )
         self._compute_retry_config(config_kwargs)
+        self._compute_json_codec(config_kwargs, client_config)
         s3_config = self.compute_s3_config(client_config)
 
         is_s3_service = service_name in ['s3', 's3-control']
@@ -197,6 +243,16 @@ class ClientArgsCreator(object):
             'socket_options': self._compute_socket_options(scoped_config)
         }
 
+    def _compute_json_codec(self, config_kwargs, client_config):
+        json_codec = None
+        if client_config is not None:
+            json_codec = client_config.json_codec
+        if json_codec is None:
+            json_codec = self._config_store.get_config_variable('json_codec')
+        if json_codec is not None:
+            json_codec = botocore.jsoncodec.resolve_json_codec(json_codec)
+        config_kwargs['json_codec'] = json_codec
+
     def compute_s3_config(self, client_config):
         s3_configuration = self._config_store.get_config_variable('s3')
 
@@ -333,6 +389,9 @@ class ClientArgsCreator(object):
     def _compute_retry_config(self, config_kwargs):
         self._compute_retry_max_attempts(config_kwargs)
         self._compute_retry_mode(config_kwargs)
+        self._compute_retry_shared_state(config_kwargs)
+        self._compute_rate_limiter_scope(config_kwargs)
+        self._compute_retry_hedging_percentile(config_kwargs)
 
     def _compute_retry_max_attempts(self, config_kwargs):
         # There's a pre-existing max_attempts client config value that actually
@@ -380,6 +439,32 @@ class ClientArgsCreator(object):
             retry_mode = 'legacy'
         retries['mode'] = retry_mode
 
+    def _compute_retry_shared_state(self, config_kwargs):
+        retries = config_kwargs['retries']
+        if 'shared_state' in retries:
+            return
+        shared_state = self._config_store.get_config_variable(
+            'retry_shared_state')
+        if shared_state is not None:
+            retries['shared_state'] = shared_state
+
+    def _compute_rate_limiter_scope(self, config_kwargs):
+        retries = config_kwargs['retries']
+        if 'rate_limiter_scope' in retries:
+            return
+        scope = self._config_store.get_config_variable('rate_limiter_scope')
+        if scope is not None:
+            retries['rate_limiter_scope'] = scope
+
+    def _compute_retry_hedging_percentile(self, config_kwargs):
+        retries = config_kwargs['retries']
+        if 'hedging_percentile' in retries:
+            return
+        percentile = self._config_store.get_config_variable(
+            'retry_hedging_percentile')
+        if percentile is not None:
+            retries['hedging_percentile'] = percentile
+
     def _ensure_boolean(self, val):
         if isinstance(val, bool):
             return val
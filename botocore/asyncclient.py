@@ -0,0 +1,158 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import asyncio
+import logging
+from collections import deque
+
+from botocore.asyncendpoint import AsyncEndpointCreator
+from botocore.asyncpaginate import AsyncPaginator
+from botocore.asyncwaiter import AsyncWaiter
+from botocore.client import (
+    BaseClient, BaseClientMeta, ClientCreator, ExecuteManyResult,
+)
+from botocore.discovery import block_endpoint_discovery_required_operations
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBaseClient(BaseClient):
+    """Base class of the clients created by ``Session.create_async_client``.
+
+    The operation methods of an asyncio client are coroutines::
+
+        client = session.create_async_client('s3')
+        response = await client.get_object(Bucket=bucket, Key=key)
+        body = await response['Body'].read()
+        await client.close()
+
+    Requests are serialized, signed and parsed exactly as they are for
+    regular clients, and the same events are emitted.  Event handlers
+    are regular functions called from the event loop, so handlers that
+    block (such as refreshing credentials) block the loop while they run.
+    Requests are sent with a
+    ``botocore.asynchttpsession.AsyncHTTPSession`` and are retried with
+    ``asyncio.sleep`` between attempts.
+
+    Streaming response bodies are
+    ``botocore.response.AsyncStreamingBody`` objects.  Pages of
+    paginators and the results of ``meta.execute_many`` are iterated
+    with ``async for``, and the ``wait`` method of waiters and
+    ``meta.prewarm`` are coroutines.  ``meta`` is a
+    ``botocore.client.BaseClientMeta``, which has no ``submit`` method.
+    Event stream responses and endpoint discovery are not supported.
+
+    """
+    PAGINATOR_CLS = AsyncPaginator
+    WAITER_CLS = AsyncWaiter
+
+    def _get_meta_cls(self):
+        return BaseClientMeta
+
+    async def _call_api(self, operation_model, api_params, events=None):
+        if events is None:
+            events = self._get_dispatch_table(operation_model)
+        request_dict, request_context = self._prepare_api_call(
+            operation_model, api_params, events)
+        event_response = self._emit_before_call(
+            operation_model, request_dict, request_context, events)
+        if event_response is not None:
+            http, parsed_response = event_response
+        else:
+            http, parsed_response = await self._make_request(
+                operation_model, request_dict, request_context, events)
+        return self._handle_api_response(
+            operation_model, http, parsed_response, request_context, events)
+
+    async def _make_request(self, operation_model, request_dict,
+                            request_context, events=None):
+        try:
+            return await self._endpoint.make_request(
+                operation_model, request_dict)
+        except Exception as e:
+            if events is None:
+                events = self._get_dispatch_table(operation_model)
+            events.emit(
+                'after-call-error', exception=e, context=request_context)
+            raise
+
+    async def _iter_execute_many(self, operation_model, events,
+                                 params_iterable, max_concurrency, ordered):
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def call(index, params):
+            async with semaphore:
+                try:
+                    response = await self._call_api(
+                        operation_model, params, events)
+                except Exception as e:
+                    return ExecuteManyResult(index, params, None, e)
+            return ExecuteManyResult(index, params, response, None)
+
+        # Only a bounded number of calls are started ahead of the
+        # consumer, so large or lazy iterables are consumed incrementally.
+        max_pending = max_concurrency * 2
+        pending = deque() if ordered else set()
+        try:
+            for index, params in enumerate(params_iterable):
+                task = asyncio.ensure_future(call(index, params))
+                if ordered:
+                    pending.append(task)
+                else:
+                    pending.add(task)
+                if len(pending) >= max_pending:
+                    for result in await self._pop_completed(
+                            pending, ordered):
+                        yield result
+            while pending:
+                for result in await self._pop_completed(pending, ordered):
+                    yield result
+        finally:
+            # The consumer may stop iterating early.
+            for task in pending:
+                task.cancel()
+
+    async def _pop_completed(self, pending, ordered):
+        if ordered:
+            return [await pending.popleft()]
+        done, _ = await asyncio.wait(
+            pending, return_when=asyncio.FIRST_COMPLETED)
+        pending.difference_update(done)
+        return [task.result() for task in done]
+
+    async def close(self):
+        """Close the idle connections of the client."""
+        await self._endpoint.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+class AsyncClientCreator(ClientCreator):
+    """Creates asyncio client objects for a service."""
+    BASE_CLIENT_CLS = AsyncBaseClient
+    ENDPOINT_CREATOR_CLS = AsyncEndpointCreator
+
+    def _register_endpoint_discovery(self, client, endpoint_url, config):
+        # Endpoint discovery makes its own blocking calls to the client,
+        # so operations that require it are rejected instead.
+        if endpoint_url is not None:
+            return
+        if client.meta.service_model.endpoint_discovery_operation is None:
+            return
+        client.meta.events.register(
+            'before-parameter-build',
+            block_endpoint_discovery_required_operations)
@@ -0,0 +1,118 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import asyncio
+import logging
+
+from botocore.asynchttpsession import AsyncHTTPSession
+from botocore.endpoint import Endpoint, EndpointCreator
+from botocore.exceptions import HTTPClientError, SendDeferredError
+from botocore.response import AsyncStreamingBody
+from botocore.retries import scheduler
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEndpoint(Endpoint):
+    """An endpoint that makes requests with asyncio.
+
+    Requests are created, signed and parsed exactly as they are by
+    ``Endpoint``, and the same events are emitted.  Only sending requests
+    and waiting between retries is asynchronous, so ``make_request`` is a
+    coroutine.  Streaming response bodies are ``AsyncStreamingBody``
+    objects.
+
+    ``before-send`` handlers that would block until a request can be
+    sent, such as the client side rate limiter of the adaptive retry
+    mode, defer the request instead, and the endpoint waits for it with
+    ``asyncio.sleep``.
+
+    """
+    STREAMING_BODY_CLS = AsyncStreamingBody
+
+    async def make_request(self, operation_model, request_dict):
+        logger.debug("Making request for %s with params: %s",
+                     operation_model, request_dict)
+        return await self._send_request(request_dict, operation_model)
+
+    async def _send_request(self, request_dict, operation_model):
+        attempts = 1
+        context = request_dict['context']
+        context[scheduler.DEFER_SEND_CONTEXT_KEY] = True
+        request = self.create_request(request_dict, operation_model)
+        success_response, exception = await self._get_response(
+            request, operation_model, context)
+        while await self._needs_retry(attempts, operation_model,
+                                      request_dict, success_response,
+                                      exception):
+            attempts += 1
+            request.reset_stream()
+            request = self.create_request(request_dict, operation_model)
+            success_response, exception = await self._get_response(
+                request, operation_model, context)
+        return self._finish_request(attempts, success_response, exception)
+
+    async def _get_response(self, request, operation_model, context):
+        success_response, exception = await self._do_get_response(
+            request, operation_model, context)
+        self._emit_response_received(
+            success_response, exception, operation_model, context)
+        return success_response, exception
+
+    async def _do_get_response(self, request, operation_model, context=None):
+        try:
+            http_response = await self._wait_before_send(
+                request, operation_model, context)
+            if http_response is None:
+                http_response = await self._send(request)
+        except HTTPClientError as e:
+            return (None, e)
+        except Exception as e:
+            logger.debug("Exception received when sending HTTP request.",
+                         exc_info=True)
+            return (None, e)
+        return self._parse_response(
+            http_response, operation_model, context), None
+
+    async def _wait_before_send(self, request, operation_model, context):
+        while True:
+            try:
+                return self._emit_before_send(
+                    request, operation_model, context)
+            except SendDeferredError as e:
+                # The same request is sent once it can be.
+                await asyncio.sleep(e.kwargs['delay'])
+
+    async def _needs_retry(self, attempts, operation_model, request_dict,
+                           response=None, caught_exception=None):
+        retry_delay = self._get_retry_delay(
+            attempts, operation_model, request_dict, response,
+            caught_exception)
+        if retry_delay is None:
+            return False
+        logger.debug("Response received to retry, sleeping for "
+                     "%s seconds", retry_delay)
+        await asyncio.sleep(retry_delay)
+        return True
+
+    async def _send(self, request):
+        return await self.http_session.send(request)
+
+    async def close(self):
+        """Close the idle connections of the endpoint's HTTP session."""
+        await self.http_session.close()
+
+
+class AsyncEndpointCreator(EndpointCreator):
+    ENDPOINT_CLS = AsyncEndpoint
+    HTTP_SESSION_CLS = AsyncHTTPSession
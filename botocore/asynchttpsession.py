@@ -0,0 +1,517 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import asyncio
+import collections
+import logging
+import ssl
+import time
+
+import botocore.awsrequest
+from botocore.compat import urlparse
+from botocore.exceptions import (
+    BotoCoreError, ConnectionClosedError, EndpointConnectionError,
+    HTTPClientError, ReadTimeoutError, ConnectTimeoutError, SSLError,
+)
+from botocore.httpsession import (
+    DEFAULT_TIMEOUT, MAX_POOL_CONNECTIONS, get_cert_path,
+    get_shared_ssl_context,
+)
+
+logger = logging.getLogger(__name__)
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# How long to wait for a "100 Continue" response before sending the body
+# of a request anyway.  This matches botocore.awsrequest.AWSConnection.
+EXPECT_CONTINUE_TIMEOUT = 1
+READ_CHUNK_SIZE = 64 * 1024
+NO_BODY_METHODS = ('GET', 'HEAD', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT')
+
+
+class _Connection(object):
+    def __init__(self, key, reader, writer, loop):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.loop = loop
+        self.idle_since = None
+
+    def is_reusable(self, loop, idle_timeout=None):
+        # A pooled connection can't be used from a different event loop,
+        # and is useless if the server has closed it while it was idle.
+        if idle_timeout is not None and self.idle_since is not None and \
+                time.monotonic() - self.idle_since > idle_timeout:
+            return False
+        return (
+            self.loop is loop and not self.reader.at_eof() and
+            not self.writer.transport.is_closing()
+        )
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncRawResponse(object):
+    """The raw body of a response sent by an ``AsyncHTTPSession``.
+
+    The body is read with ``await read()``.  Once the body has been read
+    completely, the connection is returned to the connection pool of the
+    session.
+
+    """
+    def __init__(self, session, connection, url, read_timeout,
+                 content_length=None, chunked=False, reusable=True):
+        self._session = session
+        self._connection = connection
+        self._url = url
+        self._read_timeout = read_timeout
+        self._remaining = content_length
+        self._chunked = chunked
+        self._chunk_remaining = 0
+        self._reusable = reusable
+        self._content = None
+        self._done = False
+        if content_length == 0 and not chunked:
+            self._finish()
+
+    async def read(self, amt=None):
+        """Read at most amt bytes from the body.
+
+        If the amt argument is omitted, read all data.
+        """
+        if self._done:
+            return b''
+        try:
+            if amt is None:
+                return await self._read_all()
+            return await self._read(amt)
+        except asyncio.TimeoutError as e:
+            self.close()
+            raise ReadTimeoutError(endpoint_url=self._url, error=e)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self.close()
+            raise ConnectionClosedError(
+                error=e, endpoint_url=self._url)
+
+    async def load(self):
+        """Read the whole body so that it's available from ``stream()``."""
+        self._content = await self.read()
+
+    def stream(self):
+        # This is used by AWSResponse.content, which can only be used
+        # once the body has been loaded.
+        if self._content is None:
+            raise RuntimeError(
+                "The response body must be read with 'await read()'")
+        yield self._content
+
+    def close(self):
+        """Close the connection if the body has not been read completely."""
+        if not self._done:
+            self._done = True
+            self._connection.close()
+
+    async def _read_all(self):
+        if self._remaining is not None and not self._chunked:
+            data = await self._wait(
+                self._connection.reader.readexactly(self._remaining))
+            self._remaining = 0
+            self._finish()
+            return data
+        chunks = []
+        while True:
+            chunk = await self._read(READ_CHUNK_SIZE)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+    async def _read(self, amt):
+        if self._chunked:
+            return await self._read_chunked(amt)
+        reader = self._connection.reader
+        if self._remaining is None:
+            # The body is delimited by the server closing the connection.
+            data = await self._wait(reader.read(amt))
+            if not data:
+                self._finish()
+            return data
+        data = await self._wait(reader.read(min(amt, self._remaining)))
+        if not data:
+            raise asyncio.IncompleteReadError(data, self._remaining)
+        self._remaining -= len(data)
+        if not self._remaining:
+            self._finish()
+        return data
+
+    async def _read_chunked(self, amt):
+        reader = self._connection.reader
+        if not self._chunk_remaining:
+            line = await self._wait(reader.readuntil(b'\r\n'))
+            size = int(line.split(b';', 1)[0].strip(), 16)
+            if not size:
+                # Skip any trailers, which end with an empty line.
+                while line != b'\r\n':
+                    line = await self._wait(reader.readuntil(b'\r\n'))
+                self._finish()
+                return b''
+            self._chunk_remaining = size
+        data = await self._wait(
+            reader.read(min(amt, self._chunk_remaining)))
+        if not data:
+            raise asyncio.IncompleteReadError(data, self._chunk_remaining)
+        self._chunk_remaining -= len(data)
+        if not self._chunk_remaining:
+            await self._wait(reader.readexactly(2))
+        return data
+
+    def _wait(self, awaitable):
+        return asyncio.wait_for(awaitable, self._read_timeout)
+
+    def _finish(self):
+        self._done = True
+        if self._reusable:
+            self._session._release_connection(self._connection)
+        else:
+            self._connection.close()
+
+
+class AsyncHTTPSession(object):
+    """An HTTP client for asyncio that supports connection pooling.
+
+    This is the asyncio counterpart of
+    ``botocore.httpsession.URLLib3Session`` and takes the same arguments.
+    It speaks HTTP/1.1 over ``asyncio`` streams and keeps at most
+    ``max_pool_connections`` idle connections per host; the number of
+    concurrent requests is not limited.  Proxies are not supported.
+
+    """
+    def __init__(
+        self,
+        verify=True,
+        proxies=None,
+        timeout=None,
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        socket_options=None,
+        client_cert=None,
+        proxies_config=None,
+        idle_connection_timeout=None,
+    ):
+        if proxies:
+            raise ValueError("Proxies are not supported by AsyncHTTPSession")
+        self._verify = verify
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT
+        if isinstance(timeout, (int, float)):
+            timeout = (timeout, timeout)
+        self._connect_timeout, self._read_timeout = timeout
+
+        self._cert_file = None
+        self._key_file = None
+        if isinstance(client_cert, str):
+            self._cert_file = client_cert
+        elif isinstance(client_cert, tuple):
+            self._cert_file, self._key_file = client_cert
+
+        self._max_pool_connections = max_pool_connections
+        self._idle_connection_timeout = idle_connection_timeout
+        self._socket_options = socket_options
+        if socket_options is None:
+            self._socket_options = []
+        # Loading the certificates reads files, so it's done here rather
+        # than blocking the event loop when the first connection is made.
+        self._ssl_context = self._create_ssl_context()
+        self._pools = collections.defaultdict(collections.deque)
+
+    async def send(self, request):
+        """Send a prepared request and return an ``AWSResponse``.
+
+        Unless ``request.stream_output`` is set, the body of the response
+        is read before returning.  Otherwise its ``raw`` attribute is an
+        ``AsyncRawResponse`` that the body is read from.  Error responses
+        are always read completely.
+
+        """
+        try:
+            url = urlparse(request.url)
+            connection = await self._get_connection(url, request.url)
+            try:
+                response = await self._send_request(
+                    connection, url, request)
+            except BaseException:
+                connection.close()
+                raise
+            if response.status_code >= 300 or not request.stream_output:
+                await response.raw.load()
+            return response
+        except ssl.SSLError as e:
+            raise SSLError(endpoint_url=request.url, error=e)
+        except asyncio.TimeoutError as e:
+            raise ReadTimeoutError(endpoint_url=request.url, error=e)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            raise ConnectionClosedError(
+                error=e,
+                request=request,
+                endpoint_url=request.url
+            )
+        except (BotoCoreError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            message = 'Exception received when sending asyncio HTTP request'
+            logger.debug(message, exc_info=True)
+            raise HTTPClientError(error=e)
+
+    async def prewarm(self, url, connections=1):
+        """Open connections to the host of a url ahead of the requests.
+
+        This is the asyncio counterpart of
+        ``botocore.httpsession.URLLib3Session.prewarm``.  The connections,
+        including their TLS handshakes, are opened concurrently and added
+        to the pool of the host.  Idle connections that are already in
+        the pool count towards ``connections``, which is limited to
+        ``max_pool_connections``.  Connections that fail to open are
+        logged and skipped.
+
+        :rtype: int
+        :return: The number of connections that are ready in the pool.
+        """
+        parsed = urlparse(url)
+        count = min(connections, self._max_pool_connections)
+        results = await asyncio.gather(
+            *[self._get_connection(parsed, url) for _ in range(count)],
+            return_exceptions=True)
+        ready = 0
+        for result in results:
+            if isinstance(result, Exception):
+                logger.debug("Failed to open connection to %s", url,
+                             exc_info=result)
+                continue
+            self._release_connection(result)
+            ready += 1
+        return ready
+
+    async def close(self):
+        """Close all the idle connections of the session."""
+        for pool in self._pools.values():
+            while pool:
+                pool.pop().close()
+
+    def _create_ssl_context(self):
+        ca_certs = None
+        if self._verify:
+            ca_certs = get_cert_path(self._verify)
+        return get_shared_ssl_context(
+            ca_certs, self._cert_file, self._key_file,
+            check_hostname=bool(ca_certs))
+
+    async def _get_connection(self, url, endpoint_url):
+        scheme = url.scheme.lower()
+        key = (scheme, url.hostname, url.port or DEFAULT_PORTS[scheme])
+        loop = asyncio.get_event_loop()
+        pool = self._pools[key]
+        while pool:
+            connection = pool.pop()
+            if connection.is_reusable(loop, self._idle_connection_timeout):
+                return connection
+            connection.close()
+        return await self._new_connection(key, endpoint_url, loop)
+
+    async def _new_connection(self, key, endpoint_url, loop):
+        scheme, host, port = key
+        ssl_context = None
+        if scheme == 'https':
+            ssl_context = self._ssl_context
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl_context),
+                self._connect_timeout)
+        except asyncio.TimeoutError as e:
+            raise ConnectTimeoutError(endpoint_url=endpoint_url, error=e)
+        except ssl.SSLError as e:
+            raise SSLError(endpoint_url=endpoint_url, error=e)
+        except OSError as e:
+            raise EndpointConnectionError(endpoint_url=endpoint_url, error=e)
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            for option in self._socket_options:
+                sock.setsockopt(*option)
+        return _Connection(key, reader, writer, loop)
+
+    def _release_connection(self, connection):
+        pool = self._pools[connection.key]
+        if len(pool) < self._max_pool_connections:
+            connection.idle_since = time.monotonic()
+            pool.append(connection)
+        else:
+            connection.close()
+
+    async def _send_request(self, connection, url, request):
+        reader, writer = connection.reader, connection.writer
+        headers = request.headers
+        body = request.body
+        writer.write(self._get_request_head(url, request))
+        if body is None:
+            head = await self._read_response_head(reader)
+        else:
+            if self._get_header(headers, 'Expect') == '100-continue':
+                await self._drain(writer)
+                head = await self._wait_for_continue(reader)
+                if head is not None:
+                    # The server responded before the body was sent, so
+                    # the connection can't be used for another request.
+                    return self._create_response(
+                        connection, request, head, reusable=False)
+            chunked = self._get_header(
+                headers, 'Transfer-Encoding') == 'chunked'
+            await self._write_body(writer, body, chunked)
+            head = await self._read_response_head(reader)
+        return self._create_response(connection, request, head)
+
+    def _get_request_head(self, url, request):
+        target = url.path or '/'
+        if url.query:
+            target = target + '?' + url.query
+        lines = ['%s %s HTTP/1.1' % (request.method, target)]
+        headers = request.headers
+        if self._get_header(headers, 'Host') is None:
+            lines.append('Host: %s' % url.netloc)
+        if self._get_header(headers, 'Accept-Encoding') is None:
+            lines.append('Accept-Encoding: identity')
+        if self._get_header(headers, 'Content-Length') is None and \
+                self._get_header(headers, 'Transfer-Encoding') is None:
+            body = request.body
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            if isinstance(body, (bytes, bytearray)):
+                lines.append('Content-Length: %s' % len(body))
+            elif body is None and request.method not in NO_BODY_METHODS:
+                lines.append('Content-Length: 0')
+        head = '\r\n'.join(lines).encode('latin-1')
+        for name, value in headers.items():
+            if isinstance(value, str):
+                value = value.encode('latin-1')
+            head += b'\r\n' + name.encode('latin-1') + b': ' + value
+        return head + b'\r\n\r\n'
+
+    def _get_header(self, headers, name):
+        value = headers.get(name)
+        if isinstance(value, bytes):
+            value = value.decode('latin-1')
+        return value
+
+    async def _write_body(self, writer, body, chunked):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if isinstance(body, (bytes, bytearray)):
+            await self._write_chunk(writer, body, chunked)
+        elif hasattr(body, 'read'):
+            # Reading a file can block, so it's done in the loop's default
+            # executor rather than on the event loop itself.
+            loop = asyncio.get_event_loop()
+            while True:
+                chunk = await loop.run_in_executor(
+                    None, body.read, READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                await self._write_chunk(writer, chunk, chunked)
+        else:
+            for chunk in body:
+                await self._write_chunk(writer, chunk, chunked)
+        if chunked:
+            writer.write(b'0\r\n\r\n')
+        await self._drain(writer)
+
+    async def _write_chunk(self, writer, chunk, chunked):
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        if not chunk:
+            return
+        if chunked:
+            writer.write(b'%x\r\n' % len(chunk) + chunk + b'\r\n')
+        else:
+            writer.write(chunk)
+        await self._drain(writer)
+
+    def _drain(self, writer):
+        # A server that stops reading the request would otherwise block
+        # the send forever once the transport's buffer is full.
+        return asyncio.wait_for(writer.drain(), self._read_timeout)
+
+    async def _wait_for_continue(self, reader):
+        # Returns the head of the final response if the server responded
+        # with anything other than "100 Continue", None otherwise.
+        try:
+            head = await asyncio.wait_for(
+                self._read_head(reader), EXPECT_CONTINUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.debug("No response seen from server, continuing to "
+                         "send the response body.")
+            return None
+        if head[0] == 100:
+            logger.debug("100 Continue response seen, "
+                         "now sending request body.")
+            return None
+        logger.debug("Received a non 100 Continue response "
+                     "from the server, NOT sending request body.")
+        return head
+
+    async def _read_response_head(self, reader):
+        while True:
+            head = await asyncio.wait_for(
+                self._read_head(reader), self._read_timeout)
+            # Skip informational responses such as "100 Continue".
+            if not 100 <= head[0] < 200:
+                return head
+
+    async def _read_head(self, reader):
+        # The head is read with a single call so that waiting for it can
+        # be cancelled without losing any data.
+        data = await reader.readuntil(b'\r\n\r\n')
+        lines = data.decode('latin-1').split('\r\n')
+        version, status = lines[0].split(None, 2)[:2]
+        headers = botocore.awsrequest.HeadersDict()
+        name = None
+        for line in lines[1:]:
+            if not line:
+                continue
+            if line[0] in ' \t' and name is not None:
+                # An obsolete folded continuation of the previous header.
+                headers[name] += ' ' + line.strip()
+                continue
+            name, value = line.split(':', 1)
+            value = value.strip()
+            if name in headers:
+                headers[name] += ', ' + value
+            else:
+                headers[name] = value
+        return int(status), version, headers
+
+    def _create_response(self, connection, request, head, reusable=True):
+        status_code, version, headers = head
+        connection_header = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0' or connection_header == 'close':
+            reusable = False
+        content_length = None
+        chunked = False
+        if request.method == 'HEAD' or status_code in (204, 304):
+            content_length = 0
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunked = True
+        elif 'content-length' in headers:
+            content_length = int(headers['content-length'])
+        else:
+            # The body is delimited by the server closing the connection.
+            reusable = False
+        raw = AsyncRawResponse(
+            self, connection, request.url, self._read_timeout,
+            content_length=content_length, chunked=chunked,
+            reusable=reusable)
+        return botocore.awsrequest.AWSResponse(
+            request.url, status_code, headers, raw)
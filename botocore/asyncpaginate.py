@@ -0,0 +1,72 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import jmespath
+
+from botocore.paginate import PageIterator, Paginator
+
+
+class AsyncPageIterator(PageIterator):
+    """A page iterator for asyncio clients.
+
+    Pages are iterated with ``async for``, and ``search`` and
+    ``build_full_result`` are asynchronous::
+
+        paginator = client.get_paginator('list_objects')
+        async for page in paginator.paginate(Bucket=bucket):
+            ...
+
+    """
+    def __iter__(self):
+        raise TypeError(
+            "Pages of an asyncio client must be iterated with 'async for'")
+
+    async def __aiter__(self):
+        pages = self._paginate()
+        try:
+            current_kwargs = next(pages)
+            while True:
+                response = await self._make_request(current_kwargs)
+                yield pages.send(response)
+                current_kwargs = next(pages)
+        except StopIteration:
+            return
+
+    async def search(self, expression):
+        """Applies a JMESPath expression to a paginator
+
+        This is the asynchronous version of ``PageIterator.search`` and
+        is iterated with ``async for``.
+
+        :type expression: str
+        :param expression: JMESPath expression to apply to each page.
+
+        """
+        compiled = jmespath.compile(expression)
+        async for page in self:
+            results = compiled.search(page)
+            if isinstance(results, list):
+                for element in results:
+                    yield element
+            else:
+                # Yield result directly if it is not a list.
+                yield results
+
+    async def build_full_result(self):
+        complete_result = {}
+        async for response in self:
+            self._add_to_full_result(complete_result, response)
+        return self._finish_full_result(complete_result)
+
+
+class AsyncPaginator(Paginator):
+    PAGE_ITERATOR_CLS = AsyncPageIterator
@@ -0,0 +1,51 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import asyncio
+
+from botocore.exceptions import ClientError
+from botocore.waiter import Waiter
+
+
+class AsyncNormalizedOperationMethod(object):
+    def __init__(self, client_method):
+        self._client_method = client_method
+
+    async def __call__(self, **kwargs):
+        try:
+            return await self._client_method(**kwargs)
+        except ClientError as e:
+            return e.response
+
+
+class AsyncWaiter(Waiter):
+    """A waiter for asyncio clients.
+
+    ``wait`` is a coroutine that waits between attempts with
+    ``asyncio.sleep``.
+
+    """
+    OPERATION_METHOD_CLS = AsyncNormalizedOperationMethod
+
+    async def wait(self, **kwargs):
+        # pop the invocation specific config
+        config = kwargs.pop('WaiterConfig', {})
+        sleep_amount = config.get('Delay', self.config.delay)
+        responses = self._check_responses(config)
+        next(responses)
+        while True:
+            response = await self._operation_method(**kwargs)
+            try:
+                responses.send(response)
+            except StopIteration:
+                return
+            await asyncio.sleep(sleep_amount)
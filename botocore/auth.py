@@ -18,15 +18,20 @@ import functools
 from email.utils import formatdate
 from hashlib import sha1, sha256
 import hmac
+import io
 import logging
+import os
 from operator import itemgetter
+import threading
 import time
 
 from botocore.compat import (
     encodebytes, ensure_unicode, HTTPHeaders, json, parse_qs, quote,
-    six, unquote, urlsplit, urlunsplit, HAS_CRT
+    six, unquote, urlsplit, urlunsplit, HAS_CRT, OrderedDict
+)
+from botocore.exceptions import (
+    NoCredentialsError, UnknownChunkedPayloadLengthError
 )
-from botocore.exceptions import NoCredentialsError
 from botocore.utils import normalize_url_path, percent_encode_sequence
 
 # Imports for backwards compatibility
@@ -50,6 +55,9 @@ SIGNED_HEADERS_BLACKLIST = [
     'x-amzn-trace-id',
 ]
 UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+STREAMING_PAYLOAD = 'STREAMING-AWS4-HMAC-SHA256-PAYLOAD'
+# The size of the decoded data in each chunk of an aws-chunked body.
+STREAMING_PAYLOAD_CHUNK_SIZE = 64 * 1024
 
 
 def _host_from_url(url):
@@ -69,6 +77,61 @@ def _host_from_url(url):
     return host
 
 
+class _SigningKeyCache(object):
+    """A thread safe cache of SigV4 signing keys.
+
+    Deriving a signing key takes four HMACs over the date, region and
+    service of the request, all of which stay the same for a given set of
+    credentials for the whole day.  Keys are cached per secret key, date,
+    region and service.  Only keys for the most recent date are kept, so
+    the cache is emptied the first time a request is signed after
+    midnight UTC, and at most ``max_size`` keys are kept.
+
+    Secret keys are not retained by the cache.  Entries are keyed by an
+    HMAC of the secret key with a random key that is created for each
+    cache.
+    """
+    def __init__(self, max_size=64):
+        self._max_size = max_size
+        self._keys = OrderedDict()
+        self._date = None
+        self._lock = threading.Lock()
+        self._secret_digest_key = os.urandom(32)
+
+    def get_signing_key(self, secret_key, date, region_name, service_name,
+                        derive_key):
+        secret_digest = hmac.new(
+            self._secret_digest_key, secret_key.encode('utf-8'),
+            sha256).digest()
+        cache_key = (secret_digest, region_name, service_name)
+        with self._lock:
+            if date == self._date:
+                signing_key = self._keys.get(cache_key)
+                if signing_key is not None:
+                    return signing_key
+        signing_key = derive_key(secret_key, date, region_name, service_name)
+        with self._lock:
+            if self._date is None or date > self._date:
+                self._keys.clear()
+                self._date = date
+            elif date < self._date:
+                # A request signed just before midnight; don't let it
+                # evict keys for the current date.
+                return signing_key
+            self._keys[cache_key] = signing_key
+            while len(self._keys) > self._max_size:
+                self._keys.popitem(last=False)
+        return signing_key
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self._date = None
+
+
+_SIGNING_KEY_CACHE = _SigningKeyCache()
+
+
 def _get_body_as_dict(request):
     # For query services, request.data is form-encoded and is already a
     # dict, but for other services such as rest-json it could be a json
@@ -262,12 +325,18 @@ class SigV4Auth(BaseSigner):
         case, sorting them in alphabetical order and then joining
         them into a string, separated by newlines.
         """
+        # The values of each header are grouped in a single pass, rather
+        # than looking each header up again with get_all().
+        values = {}
+        for key, value in headers_to_sign.items():
+            if key in values:
+                values[key].append(self._header_value(value))
+            else:
+                values[key] = [self._header_value(value)]
         headers = []
-        sorted_header_names = sorted(set(headers_to_sign))
-        for key in sorted_header_names:
-            value = ','.join(self._header_value(v) for v in
-                             headers_to_sign.get_all(key))
-            headers.append('%s:%s' % (key, ensure_unicode(value)))
+        for key in sorted(values):
+            headers.append(
+                '%s:%s' % (key, ensure_unicode(','.join(values[key]))))
         return '\n'.join(headers)
 
     def _header_value(self, value):
@@ -317,14 +386,22 @@ class SigV4Auth(BaseSigner):
         # bit of metadata through the request context.
         return request.context.get('payload_signing_enabled', True)
 
-    def canonical_request(self, request):
+    def _get_canonical_headers(self, request):
+        # Returns the canonical headers and the signed headers of a request.
+        headers_to_sign = self.headers_to_sign(request)
+        return (self.canonical_headers(headers_to_sign),
+                self.signed_headers(headers_to_sign))
+
+    def canonical_request(self, request, canonical_headers=None):
         cr = [request.method.upper()]
         path = self._normalize_url_path(urlsplit(request.url).path)
         cr.append(path)
         cr.append(self.canonical_query_string(request))
-        headers_to_sign = self.headers_to_sign(request)
-        cr.append(self.canonical_headers(headers_to_sign) + '\n')
-        cr.append(self.signed_headers(headers_to_sign))
+        if canonical_headers is None:
+            canonical_headers = self._get_canonical_headers(request)
+        canonical_headers, signed_headers = canonical_headers
+        cr.append(canonical_headers + '\n')
+        cr.append(signed_headers)
         if 'X-Amz-Content-SHA256' in request.headers:
             body_checksum = request.headers['X-Amz-Content-SHA256']
         else:
@@ -365,23 +442,35 @@ class SigV4Auth(BaseSigner):
         return '\n'.join(sts)
 
     def signature(self, string_to_sign, request):
-        key = self.credentials.secret_key
-        k_date = self._sign(('AWS4' + key).encode('utf-8'),
-                            request.context['timestamp'][0:8])
-        k_region = self._sign(k_date, self._region_name)
-        k_service = self._sign(k_region, self._service_name)
-        k_signing = self._sign(k_service, 'aws4_request')
+        k_signing = self._signing_key(request)
         return self._sign(k_signing, string_to_sign, hex=True)
 
+    def _signing_key(self, request):
+        return _SIGNING_KEY_CACHE.get_signing_key(
+            self.credentials.secret_key, request.context['timestamp'][0:8],
+            self._region_name, self._service_name, self._derive_signing_key)
+
+    def _derive_signing_key(self, secret_key, date, region_name,
+                            service_name):
+        k_date = self._sign(('AWS4' + secret_key).encode('utf-8'), date)
+        k_region = self._sign(k_date, region_name)
+        k_service = self._sign(k_region, service_name)
+        return self._sign(k_service, 'aws4_request')
+
     def add_auth(self, request):
         if self.credentials is None:
             raise NoCredentialsError()
         datetime_now = datetime.datetime.utcnow()
         request.context['timestamp'] = datetime_now.strftime(SIGV4_TIMESTAMP)
         # This could be a retry.  Make sure the previous
-        # authorization header is removed first.
-        self._modify_request_before_signing(request)
-        canonical_request = self.canonical_request(request)
+        # authorization header is removed first.  Signers that already
+        # need the canonical headers to modify the request return them,
+        # so that they're only computed once per signature.
+        canonical_headers = self._modify_request_before_signing(request)
+        if canonical_headers is None:
+            canonical_headers = self._get_canonical_headers(request)
+        canonical_request = self.canonical_request(
+            request, canonical_headers)
         logger.debug("Calculating signature using v4 auth.")
         logger.debug('CanonicalRequest:\n%s', canonical_request)
         string_to_sign = self.string_to_sign(request, canonical_request)
@@ -389,12 +478,15 @@ class SigV4Auth(BaseSigner):
         signature = self.signature(string_to_sign, request)
         logger.debug('Signature:\n%s', signature)
 
-        self._inject_signature_to_request(request, signature)
+        self._inject_signature_to_request(
+            request, signature, canonical_headers[1])
 
-    def _inject_signature_to_request(self, request, signature):
+    def _inject_signature_to_request(self, request, signature,
+                                     signed_headers=None):
         auth_str = ['AWS4-HMAC-SHA256 Credential=%s' % self.scope(request)]
-        headers_to_sign = self.headers_to_sign(request)
-        auth_str.append('SignedHeaders=%s' % self.signed_headers(headers_to_sign))
+        if signed_headers is None:
+            _, signed_headers = self._get_canonical_headers(request)
+        auth_str.append('SignedHeaders=%s' % signed_headers)
         auth_str.append('Signature=%s' % signature)
         request.headers['Authorization'] = ', '.join(auth_str)
         return request
@@ -437,12 +529,35 @@ class S3SigV4Auth(SigV4Auth):
         if 'X-Amz-Content-SHA256' in request.headers:
             del request.headers['X-Amz-Content-SHA256']
 
-        request.headers['X-Amz-Content-SHA256'] = self.payload(request)
+        if isinstance(request.data, AWSChunkedBody):
+            # The request is being signed again, so start over from the
+            # original body.
+            self._remove_chunked_encoding(request)
+        decoded_length = self._get_chunked_payload_length(request)
+        if decoded_length is not None:
+            self._add_chunked_encoding_headers(request, decoded_length)
+            request.headers['X-Amz-Content-SHA256'] = STREAMING_PAYLOAD
+        else:
+            request.headers['X-Amz-Content-SHA256'] = self.payload(request)
+
+    def _inject_signature_to_request(self, request, signature,
+                                     signed_headers=None):
+        super(S3SigV4Auth, self)._inject_signature_to_request(
+            request, signature, signed_headers)
+        if request.headers.get('X-Amz-Content-SHA256') == STREAMING_PAYLOAD:
+            # The signature of the request is the seed signature that the
+            # signature of the first chunk is chained to.
+            request.data = AWSChunkedBody(
+                request.data,
+                int(request.headers['X-Amz-Decoded-Content-Length']),
+                self._signing_key(request),
+                request.context['timestamp'],
+                self.credential_scope(request),
+                signature,
+            )
+        return request
 
-    def _should_sha256_sign_payload(self, request):
-        # S3 allows optional body signing, so to minimize the performance
-        # impact, we opt to not SHA256 sign the body on streaming uploads,
-        # provided that we're on https.
+    def _get_s3_config(self, request):
         client_config = request.context.get('client_config')
         s3_config = getattr(client_config, 's3', None)
 
@@ -450,6 +565,68 @@ class S3SigV4Auth(SigV4Auth):
         # to None.
         if s3_config is None:
             s3_config = {}
+        return s3_config
+
+    def _get_chunked_payload_length(self, request):
+        # Chunked payload signing is opt in, and only applies to file-like
+        # bodies whose payload would otherwise be signed by reading the
+        # whole body up front.  Blob parameters are validated to be bytes
+        # or file-like, so other iterables are deliberately not handled.
+        # S3 needs the decoded length of the body in the signed
+        # X-Amz-Decoded-Content-Length header, so bodies of an unknown
+        # length can't be signed in chunks.
+        s3_config = self._get_s3_config(request)
+        if s3_config.get('chunked_payload_signing') is not True:
+            return None
+        body = request.data
+        if not hasattr(body, 'read'):
+            return None
+        if not self._should_sha256_sign_payload(request):
+            return None
+        if 'Content-Length' in request.headers:
+            return int(request.headers['Content-Length'])
+        try:
+            position = body.tell()
+            body.seek(0, 2)
+            end_position = body.tell()
+            body.seek(position)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            raise UnknownChunkedPayloadLengthError(body=body)
+        return end_position - position
+
+    def _add_chunked_encoding_headers(self, request, decoded_length):
+        content_encoding = request.headers.get('Content-Encoding')
+        if 'Content-Encoding' in request.headers:
+            del request.headers['Content-Encoding']
+        if content_encoding:
+            content_encoding = 'aws-chunked,%s' % content_encoding
+        else:
+            content_encoding = 'aws-chunked'
+        request.headers['Content-Encoding'] = content_encoding
+        if 'Content-Length' in request.headers:
+            del request.headers['Content-Length']
+        request.headers['Content-Length'] = str(
+            AWSChunkedBody.encoded_length(decoded_length))
+        request.headers['X-Amz-Decoded-Content-Length'] = str(decoded_length)
+
+    def _remove_chunked_encoding(self, request):
+        chunked_body = request.data
+        chunked_body.seek(0)
+        request.data = chunked_body.raw
+        content_encoding = request.headers['Content-Encoding']
+        del request.headers['Content-Encoding']
+        content_encoding = content_encoding[len('aws-chunked,'):]
+        if content_encoding:
+            request.headers['Content-Encoding'] = content_encoding
+        del request.headers['Content-Length']
+        request.headers['Content-Length'] = str(chunked_body.decoded_length)
+        del request.headers['X-Amz-Decoded-Content-Length']
+
+    def _should_sha256_sign_payload(self, request):
+        # S3 allows optional body signing, so to minimize the performance
+        # impact, we opt to not SHA256 sign the body on streaming uploads,
+        # provided that we're on https.
+        s3_config = self._get_s3_config(request)
 
         # The explicit configuration takes precedence over any implicit
         # configuration.
@@ -478,6 +655,125 @@ class S3SigV4Auth(SigV4Auth):
         return path
 
 
+class AWSChunkedBody(object):
+    """A request body that is signed in chunks as it is read.
+
+    This implements the ``STREAMING-AWS4-HMAC-SHA256-PAYLOAD`` mode of
+    SigV4.  Rather than hashing the whole body before the request is sent,
+    the body is read in chunks of ``chunk_size`` bytes as it is being
+    sent, and each chunk is sent in the ``aws-chunked`` encoding along
+    with a signature that is chained to the signature of the previous
+    chunk.  The first chunk is chained to the signature of the request
+    (the seed signature).
+
+    At most ``decoded_length`` bytes are read from ``raw``.  Seeking is
+    only supported back to the start of the body, and only if ``raw`` is
+    seekable.
+    """
+    _CHUNK_SIGNATURE_LENGTH = 64
+
+    def __init__(self, raw, decoded_length, signing_key, timestamp,
+                 credential_scope, seed_signature,
+                 chunk_size=STREAMING_PAYLOAD_CHUNK_SIZE):
+        self.raw = raw
+        self.decoded_length = decoded_length
+        self._signing_key = signing_key
+        self._timestamp = timestamp
+        self._credential_scope = credential_scope
+        self._seed_signature = seed_signature
+        self._chunk_size = chunk_size
+        self._start_position = None
+        if hasattr(raw, 'tell'):
+            try:
+                self._start_position = raw.tell()
+            except (OSError, io.UnsupportedOperation):
+                pass
+        self._reset()
+
+    def _reset(self):
+        self._remaining = self.decoded_length
+        self._previous_signature = self._seed_signature
+        self._buffer = b''
+        self._buffer_position = 0
+        self._position = 0
+        self._done = False
+
+    @classmethod
+    def encoded_length(cls, decoded_length,
+                       chunk_size=STREAMING_PAYLOAD_CHUNK_SIZE):
+        """Return the length of a body once it is aws-chunked encoded."""
+        full_chunks, last_chunk_size = divmod(decoded_length, chunk_size)
+        length = full_chunks * cls._encoded_chunk_length(chunk_size)
+        if last_chunk_size:
+            length += cls._encoded_chunk_length(last_chunk_size)
+        return length + cls._encoded_chunk_length(0)
+
+    @classmethod
+    def _encoded_chunk_length(cls, chunk_size):
+        # <hex size>;chunk-signature=<signature>\r\n<data>\r\n
+        return (len('%x' % chunk_size) + len(';chunk-signature=') +
+                cls._CHUNK_SIGNATURE_LENGTH + 2 + chunk_size + 2)
+
+    def read(self, amt=None):
+        while not self._done and (
+                amt is None or
+                len(self._buffer) - self._buffer_position < amt):
+            remainder = self._buffer[self._buffer_position:]
+            self._buffer = remainder + self._next_chunk()
+            self._buffer_position = 0
+        if amt is None:
+            end = len(self._buffer)
+        else:
+            end = self._buffer_position + amt
+        data = self._buffer[self._buffer_position:end]
+        self._buffer_position += len(data)
+        self._position += len(data)
+        return data
+
+    def _next_chunk(self):
+        data = self._read_raw(min(self._chunk_size, self._remaining))
+        self._remaining -= len(data)
+        if not data:
+            self._done = True
+        signature = self._sign_chunk(data)
+        header = '%x;chunk-signature=%s\r\n' % (len(data), signature)
+        return b''.join([header.encode('ascii'), data, b'\r\n'])
+
+    def _read_raw(self, size):
+        chunks = []
+        while size > 0:
+            chunk = self.raw.read(size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    def _sign_chunk(self, data):
+        string_to_sign = '\n'.join([
+            'AWS4-HMAC-SHA256-PAYLOAD',
+            self._timestamp,
+            self._credential_scope,
+            self._previous_signature,
+            EMPTY_SHA256_HASH,
+            sha256(data).hexdigest(),
+        ])
+        self._previous_signature = hmac.new(
+            self._signing_key, string_to_sign.encode('utf-8'),
+            sha256).hexdigest()
+        return self._previous_signature
+
+    def seek(self, offset, whence=0):
+        if offset != 0 or whence != 0 or self._start_position is None:
+            raise io.UnsupportedOperation(
+                'aws-chunked bodies can only be rewound to the start')
+        self.raw.seek(self._start_position)
+        self._reset()
+
+    def tell(self):
+        return self._position
+
+
 class SigV4QueryAuth(SigV4Auth):
     DEFAULT_EXPIRES = 3600
 
@@ -486,6 +782,10 @@ class SigV4QueryAuth(SigV4Auth):
         super(SigV4QueryAuth, self).__init__(credentials, service_name,
                                              region_name)
         self._expires = expires
+        # The encoded auth params only change with the timestamp and the
+        # signed headers, so they're reused when the same instance signs
+        # many urls, e.g. when generating presigned urls in bulk.
+        self._encoded_auth_params = (None, None)
 
     def _modify_request_before_signing(self, request):
         # We automatically set this header, so if it's the auto-set value we
@@ -500,17 +800,9 @@ class SigV4QueryAuth(SigV4Auth):
         # Note that we're not including X-Amz-Signature.
         # From the docs: "The Canonical Query String must include all the query
         # parameters from the preceding table except for X-Amz-Signature.
-        signed_headers = self.signed_headers(self.headers_to_sign(request))
-
-        auth_params = {
-            'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
-            'X-Amz-Credential': self.scope(request),
-            'X-Amz-Date': request.context['timestamp'],
-            'X-Amz-Expires': self._expires,
-            'X-Amz-SignedHeaders': signed_headers,
-        }
-        if self.credentials.token is not None:
-            auth_params['X-Amz-Security-Token'] = self.credentials.token
+        canonical_headers = self._get_canonical_headers(request)
+        encoded_auth_params = self._encode_auth_params(
+            request, canonical_headers[1])
         # Now parse the original query string to a dict, inject our new query
         # params, and serialize back to a query string.
         url_parts = urlsplit(request.url)
@@ -537,8 +829,7 @@ class SigV4QueryAuth(SigV4Auth):
             request.data = ''
         if query_dict:
             operation_params = percent_encode_sequence(query_dict) + '&'
-        new_query_string = (operation_params +
-                            percent_encode_sequence(auth_params))
+        new_query_string = operation_params + encoded_auth_params
         # url_parts is a tuple (and therefore immutable) so we need to create
         # a new url_parts with the new query string.
         # <part>   - <index>
@@ -550,8 +841,30 @@ class SigV4QueryAuth(SigV4Auth):
         p = url_parts
         new_url_parts = (p[0], p[1], p[2], new_query_string, p[4])
         request.url = urlunsplit(new_url_parts)
+        # The headers are not modified after this point, so the canonical
+        # headers are reused for the canonical request.
+        return canonical_headers
+
+    def _encode_auth_params(self, request, signed_headers):
+        cache_key = (request.context['timestamp'], signed_headers)
+        encoded = self._encoded_auth_params
+        if encoded[0] == cache_key:
+            return encoded[1]
+        auth_params = {
+            'X-Amz-Algorithm': 'AWS4-HMAC-SHA256',
+            'X-Amz-Credential': self.scope(request),
+            'X-Amz-Date': request.context['timestamp'],
+            'X-Amz-Expires': self._expires,
+            'X-Amz-SignedHeaders': signed_headers,
+        }
+        if self.credentials.token is not None:
+            auth_params['X-Amz-Security-Token'] = self.credentials.token
+        encoded_auth_params = percent_encode_sequence(auth_params)
+        self._encoded_auth_params = (cache_key, encoded_auth_params)
+        return encoded_auth_params
 
-    def _inject_signature_to_request(self, request, signature):
+    def _inject_signature_to_request(self, request, signature,
+                                     signed_headers=None):
         # Rather than calculating an "Authorization" header, for the query
         # param quth, we just append an 'X-Amz-Signature' param to the end
         # of the query string.
@@ -14,8 +14,10 @@
 import io
 import logging
 import functools
+import time
 
 import urllib3.util
+from urllib3.util.connection import is_connection_dropped
 from urllib3.connection import VerifiedHTTPSConnection
 from urllib3.connection import HTTPConnection
 from urllib3.connectionpool import HTTPConnectionPool
@@ -221,11 +223,79 @@ class AWSHTTPSConnection(AWSConnection, VerifiedHTTPSConnection):
     """ An HTTPSConnection that supports 100 Continue behavior. """
 
 
-class AWSHTTPConnectionPool(HTTPConnectionPool):
+class AWSConnectionPool(object):
+    """Mixin for connection pools that expires idle connections.
+
+    A connection that has been idle in the pool for longer than
+    ``idle_timeout`` seconds is closed instead of being reused, as the
+    server (or a load balancer or NAT in between) may have dropped it
+    without the client noticing.  The connection object stays in the
+    pool and opens a new connection the next time it is used.  The TLS
+    sessions of idle connections are saved when their SSL context
+    supports resuming them.
+    """
+    idle_timeout = None
+
+    def _get_conn(self, timeout=None):
+        conn = super(AWSConnectionPool, self)._get_conn(timeout)
+        if self._is_expired(conn, time.monotonic()):
+            logger.debug("Closing idle connection: %s", self.host)
+            conn.close()
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn.idle_since = time.monotonic()
+            self._save_tls_session(conn)
+        super(AWSConnectionPool, self)._put_conn(conn)
+
+    def _save_tls_session(self, conn):
+        # Contexts that resume TLS sessions save the session of a connection
+        # once it is idle, as TLS 1.3 session tickets arrive after the
+        # handshake.
+        sock = getattr(conn, 'sock', None)
+        ssl_context = getattr(conn, 'ssl_context', None)
+        save_session = getattr(ssl_context, 'save_session', None)
+        if sock is not None and save_session is not None:
+            save_session(sock)
+
+    def _is_expired(self, conn, now):
+        if self.idle_timeout is None or getattr(conn, 'sock', None) is None:
+            return False
+        idle_since = getattr(conn, 'idle_since', None)
+        return idle_since is not None and now - idle_since > self.idle_timeout
+
+    def evict_idle_connections(self):
+        """Close the idle connections that have expired or been dropped.
+
+        :returns: The number of connections that were closed.
+        """
+        queue = self.pool
+        if queue is None:
+            return 0
+        now = time.monotonic()
+        evicted = 0
+        # The connections are closed while holding the lock of the queue
+        # so that none of them can be taken from the pool and used in the
+        # meantime.
+        with queue.mutex:
+            for conn in queue.queue:
+                if getattr(conn, 'sock', None) is None:
+                    continue
+                if self._is_expired(conn, now) or is_connection_dropped(conn):
+                    conn.close()
+                    evicted += 1
+        if evicted:
+            logger.debug(
+                "Closed %s idle connection(s): %s", evicted, self.host)
+        return evicted
+
+
+class AWSHTTPConnectionPool(AWSConnectionPool, HTTPConnectionPool):
     ConnectionCls = AWSHTTPConnection
 
 
-class AWSHTTPSConnectionPool(HTTPSConnectionPool):
+class AWSHTTPSConnectionPool(AWSConnectionPool, HTTPSConnectionPool):
     ConnectionCls = AWSHTTPSConnection
 
 
@@ -391,9 +461,26 @@ class AWSRequestPreparer(object):
             body = None
 
         if isinstance(body, dict):
-            params = [self._to_utf8(item) for item in body.items()]
-            body = urlencode(params, doseq=True)
+            body = self._encode_params_body(original, body)
+
+        return body
 
+    def _encode_params_body(self, original, params):
+        # The body of a request is prepared once when it is signed and
+        # again when it is sent, and retries of the same request share
+        # its context.  The encoded body is kept in the context along
+        # with a copy of the params it was encoded from, so it is only
+        # encoded again when the params change (e.g. when a signer adds
+        # a timestamp to them).
+        context = getattr(original, 'context', None)
+        if context is not None:
+            cached = context.get('prepared_body')
+            if cached is not None and cached[0] == params:
+                return cached[1]
+        body = urlencode(
+            [self._to_utf8(item) for item in params.items()], doseq=True)
+        if context is not None:
+            context['prepared_body'] = (dict(params), body)
         return body
 
     def _determine_content_length(self, body):
@@ -476,7 +563,8 @@ class AWSRequest(object):
 
     @property
     def body(self):
-        body = self.prepare().body
+        # Only the body is needed, so skip preparing the url and headers.
+        body = self._request_preparer._prepare_body(self)
         if isinstance(body, six.text_type):
             body = body.encode('utf-8')
         return body
@@ -11,6 +11,11 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 import logging
+import threading
+import types
+import weakref
+from collections import OrderedDict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from botocore import waiter, xform_name
 from botocore.args import ClientArgsCreator
@@ -22,8 +27,9 @@ from botocore.exceptions import (
     DataNotFoundError, OperationNotPageableError, UnknownSignatureVersionError,
     InvalidEndpointDiscoveryConfigurationError
 )
-from botocore.hooks import first_non_none_response
-from botocore.model import ServiceModel
+from botocore.hooks import first_non_none_response, get_dispatch_table
+from botocore.loaders import Loader
+from botocore.model import OperationNotFoundError, ServiceModel
 from botocore.paginate import Paginator
 from botocore.utils import (
     CachedProperty, get_service_module_name, S3RegionRedirector,
@@ -31,12 +37,16 @@ from botocore.utils import (
     S3ControlArnParamHandler, S3ControlEndpointSetter,
 )
 from botocore.history import get_global_history_recorder
+from botocore.endpoint import submit_request
 from botocore.discovery import (
     EndpointDiscoveryHandler, EndpointDiscoveryManager,
     block_endpoint_discovery_required_operations
 )
 from botocore.retries import standard
 from botocore.retries import adaptive
+from botocore.retries import metrics
+from botocore.retries import shared
+from botocore.retries.scheduler import RetryFuture
 
 # Keep these imported.  There's pre-existing code that uses:
 # "from botocore.client import Config"
@@ -50,14 +60,134 @@ from botocore import UNSIGNED # noqa
 
 logger = logging.getLogger(__name__)
 history_recorder = get_global_history_recorder()
+SHARED_CLIENT_REGISTRY = None
+_SHARED_CLIENT_REGISTRY_LOCK = threading.Lock()
+
+ExecuteManyResult = namedtuple(
+    'ExecuteManyResult', ['index', 'params', 'response', 'exception'])
+
+
+class SharedClientRegistry(object):
+    """A process wide registry of service models and client classes.
+
+    Creating a client requires building a ``ServiceModel`` and a client
+    class for the service, both of which are relatively expensive.  This
+    registry allows ``ClientCreator`` instances from different sessions
+    to share them.
+
+    Service models are keyed by the service name and API version as well
+    as the configuration of the loader used to load them (its search
+    paths, extras types and model mode).  They are only shared for
+    ``botocore.loaders.Loader`` instances, any other loader always
+    builds a new service model.  Shared service models must be treated
+    as immutable.
+
+    Client classes are additionally keyed by the handlers registered for
+    the ``creating-client-class`` event of the service.  They are only
+    shared if all of these handlers are plain functions without closures,
+    as those are the only handlers that are guaranteed to be the same
+    objects across sessions.
+
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._service_models = {}
+        self._client_classes = {}
+
+    def get_service_model(self, loader, service_name, api_version, factory):
+        """Get a shared service model, creating it with ``factory``."""
+        key = self._service_model_key(loader, service_name, api_version)
+        if key is None:
+            return factory()
+        return self._get_or_create(self._service_models, key, factory)
+
+    def get_client_class(self, loader, service_name, api_version, handlers,
+                         factory, base_class=None):
+        """Get a shared client class, creating it with ``factory``.
+
+        :param handlers: The handlers for the ``creating-client-class``
+            event of the service, or ``None`` if they are not known.
+
+        :param base_class: The base class the client class is created
+            from, if it is not ``BaseClient``.
+
+        """
+        key = self._service_model_key(loader, service_name, api_version)
+        handlers_key = self._handlers_key(handlers)
+        if key is None or handlers_key is None:
+            return factory()
+        return self._get_or_create(
+            self._client_classes, key + (handlers_key, base_class), factory)
+
+    def invalidate(self, service_name=None):
+        """Remove entries from the registry.
+
+        :type service_name: str
+        :param service_name: Only remove the entries for this service.  If
+            not provided, the registry is cleared.
+
+        """
+        with self._lock:
+            if service_name is None:
+                self._service_models.clear()
+                self._client_classes.clear()
+                return
+            for cache in (self._service_models, self._client_classes):
+                for key in [k for k in cache if k[1] == service_name]:
+                    del cache[key]
+
+    def _get_or_create(self, cache, key, factory):
+        with self._lock:
+            value = cache.get(key)
+        if value is None:
+            # The factory is called without holding the lock.  If two
+            # threads race, both values are equivalent and the first one
+            # to be stored wins.
+            value = factory()
+            with self._lock:
+                value = cache.setdefault(key, value)
+        return value
+
+    def _service_model_key(self, loader, service_name, api_version):
+        if not isinstance(loader, Loader):
+            return None
+        loader_key = (
+            type(loader), type(loader.file_loader),
+            tuple(loader.search_paths), tuple(loader.extras_types),
+            loader.lazy_service_models,
+        )
+        return (loader_key, service_name, api_version)
+
+    def _handlers_key(self, handlers):
+        if handlers is None:
+            return None
+        for handler in handlers:
+            if not isinstance(handler, types.FunctionType) or \
+                    handler.__closure__ is not None:
+                return None
+        return tuple(handlers)
+
+
+def get_shared_client_registry():
+    global SHARED_CLIENT_REGISTRY
+    if SHARED_CLIENT_REGISTRY is None:
+        with _SHARED_CLIENT_REGISTRY_LOCK:
+            if SHARED_CLIENT_REGISTRY is None:
+                SHARED_CLIENT_REGISTRY = SharedClientRegistry()
+    return SHARED_CLIENT_REGISTRY
 
 
 class ClientCreator(object):
     """Creates client objects for a service."""
+    # The base class of the client classes and the class used to create
+    # their endpoints, which default to BaseClient and EndpointCreator.
+    BASE_CLIENT_CLS = None
+    ENDPOINT_CREATOR_CLS = None
+
     def __init__(self, loader, endpoint_resolver, user_agent, event_emitter,
                  retry_handler_factory, retry_config_translator,
                  response_parser_factory=None, exceptions_factory=None,
-                 config_store=None):
+                 config_store=None, shared_registry=None, monitor=None):
         self._loader = loader
         self._endpoint_resolver = endpoint_resolver
         self._user_agent = user_agent
@@ -71,6 +201,8 @@ class ClientCreator(object):
         # config and environment variables (and potentially more in the
         # future).
         self._config_store = config_store
+        self._shared_registry = shared_registry
+        self._monitor = monitor
 
     def create_client(self, service_name, region_name, is_secure=True,
                       endpoint_url=None, verify=None,
@@ -81,7 +213,57 @@ class ClientCreator(object):
             'choose-service-name', service_name=service_name)
         service_name = first_non_none_response(responses, default=service_name)
         service_model = self._load_service_model(service_name, api_version)
-        cls = self._create_client_class(service_name, service_model)
+        cls = self._get_client_class(service_name, service_model, api_version)
+        return self._create_client_from_class(
+            cls, service_model, region_name, is_secure, endpoint_url, verify,
+            credentials, scoped_config, client_config)
+
+    def clone_client(self, client, region_name=None, credentials=None,
+                     client_config=None):
+        """Create a copy of a client created by this client creator.
+
+        The copy reuses the service model, client class and response
+        parser of ``client``.  If the copy resolves to the same endpoint
+        with the same HTTP configuration and socket options, it also shares
+        the HTTP session, and therefore the connection pool, of ``client``.
+        The endpoint, config and retry settings of the copy are still
+        resolved as they are for a new client.
+
+        :param region_name: The region of the new client.  Defaults to the
+            region the original client was created with.
+
+        :param credentials: The credentials of the new client.  Defaults to
+            the credentials of the original client.
+
+        :param client_config: A config that is merged on top of the config
+            the original client was created with.
+
+        """
+        args = client._clone_args
+        if region_name is None:
+            region_name = args['region_name']
+        if credentials is None:
+            credentials = args['credentials']
+        if client_config is None:
+            client_config = args['client_config']
+        elif args['client_config'] is not None:
+            client_config = args['client_config'].merge(client_config)
+        return self._create_client_from_class(
+            type(client), client.meta.service_model, region_name,
+            args['is_secure'], args['endpoint_url'], args['verify'],
+            credentials, args['scoped_config'], client_config,
+            source_client=client)
+
+    def _create_client_from_class(self, cls, service_model, region_name,
+                                  is_secure, endpoint_url, verify,
+                                  credentials, scoped_config, client_config,
+                                  source_client=None):
+        clone_args = {
+            'region_name': region_name, 'is_secure': is_secure,
+            'endpoint_url': endpoint_url, 'verify': verify,
+            'credentials': credentials, 'scoped_config': scoped_config,
+            'client_config': client_config,
+        }
         region_name, client_config = self._normalize_fips_region(
             region_name, client_config)
         endpoint_bridge = ClientEndpointBridge(
@@ -90,8 +272,11 @@ class ClientCreator(object):
             config_store=self._config_store)
         client_args = self._get_client_args(
             service_model, region_name, is_secure, endpoint_url,
-            verify, credentials, scoped_config, client_config, endpoint_bridge)
+            verify, credentials, scoped_config, client_config, endpoint_bridge,
+            source_client)
         service_client = cls(**client_args)
+        service_client._client_creator = self
+        service_client._clone_args = clone_args
         self._register_retries(service_client)
         self._register_s3_events(
             service_client, endpoint_bridge, endpoint_url, client_config,
@@ -102,17 +287,30 @@ class ClientCreator(object):
         self._register_endpoint_discovery(
             service_client, endpoint_url, client_config
         )
+        if self._monitor is not None:
+            self._monitor.register(service_client.meta.events)
         return service_client
 
     def create_client_class(self, service_name, api_version=None):
         service_model = self._load_service_model(service_name, api_version)
-        return self._create_client_class(service_name, service_model)
+        return self._get_client_class(service_name, service_model, api_version)
+
+    def _get_client_class(self, service_name, service_model, api_version):
+        if self._shared_registry is None:
+            return self._create_client_class(service_name, service_model)
+        service_id = service_model.service_id.hyphenize()
+        handlers = self._event_emitter._get_handlers(
+            'creating-client-class.%s' % service_id)
+        return self._shared_registry.get_client_class(
+            self._loader, service_name, api_version, handlers,
+            lambda: self._create_client_class(service_name, service_model),
+            base_class=self.BASE_CLIENT_CLS)
 
     def _create_client_class(self, service_name, service_model):
         class_attributes = self._create_methods(service_model)
         py_name_to_operation_name = self._create_name_mapping(service_model)
         class_attributes['_PY_TO_OP_NAME'] = py_name_to_operation_name
-        bases = [BaseClient]
+        bases = [self.BASE_CLIENT_CLS or BaseClient]
         service_id = service_model.service_id.hyphenize()
         self._event_emitter.emit(
             'creating-client-class.%s' % service_id,
@@ -147,6 +345,13 @@ class ClientCreator(object):
         return region_name, client_config
 
     def _load_service_model(self, service_name, api_version=None):
+        if self._shared_registry is not None:
+            return self._shared_registry.get_service_model(
+                self._loader, service_name, api_version,
+                lambda: self._create_service_model(service_name, api_version))
+        return self._create_service_model(service_name, api_version)
+
+    def _create_service_model(self, service_name, api_version=None):
         json_model = self._loader.load_service_model(service_name, 'service-2',
                                                      api_version=api_version)
         service_model = ServiceModel(json_model, service_name=service_name)
@@ -155,8 +360,10 @@ class ClientCreator(object):
     def _register_retries(self, client):
         retry_mode = client.meta.config.retries['mode']
         if retry_mode == 'standard':
+            client.meta.retry_metrics = metrics.RetryMetrics()
             self._register_v2_standard_retries(client)
         elif retry_mode == 'adaptive':
+            client.meta.retry_metrics = metrics.RetryMetrics()
             self._register_v2_standard_retries(client)
             self._register_v2_adaptive_retries(client)
         elif retry_mode == 'legacy':
@@ -164,13 +371,33 @@ class ClientCreator(object):
 
     def _register_v2_standard_retries(self, client):
         max_attempts = client.meta.config.retries.get('total_max_attempts')
-        kwargs = {'client': client}
+        kwargs = {'client': client, 'metrics': client.meta.retry_metrics}
         if max_attempts is not None:
             kwargs['max_attempts'] = max_attempts
+        shared_state = self._get_retry_shared_state(client)
+        if shared_state is not None:
+            kwargs['shared_state'] = shared_state
+        hedging_percentile = client.meta.config.retries.get(
+            'hedging_percentile')
+        if hedging_percentile is not None:
+            kwargs['hedging_percentile'] = hedging_percentile
+            kwargs['hedging_operations'] = client.meta.config.retries.get(
+                'hedging_operations')
         standard.register_retry_handler(**kwargs)
 
     def _register_v2_adaptive_retries(self, client):
-        adaptive.register_retry_handler(client)
+        retries = client.meta.config.retries
+        adaptive.register_retry_handler(
+            client, shared_state=self._get_retry_shared_state(client),
+            scope=retries.get('rate_limiter_scope', adaptive.CLIENT_SCOPE),
+            resource_param=retries.get('rate_limiter_resource_param'),
+            metrics=client.meta.retry_metrics)
+
+    def _get_retry_shared_state(self, client):
+        spec = client.meta.config.retries.get('shared_state')
+        if spec is None:
+            return None
+        return shared.get_state_store(spec)
 
     def _register_legacy_retries(self, client):
         endpoint_prefix = client.meta.service_model.endpoint_prefix
@@ -352,14 +579,17 @@ class ClientCreator(object):
 
     def _get_client_args(self, service_model, region_name, is_secure,
                          endpoint_url, verify, credentials,
-                         scoped_config, client_config, endpoint_bridge):
+                         scoped_config, client_config, endpoint_bridge,
+                         source_client=None):
         args_creator = ClientArgsCreator(
             self._event_emitter, self._user_agent,
             self._response_parser_factory, self._loader,
-            self._exceptions_factory, config_store=self._config_store)
+            self._exceptions_factory, config_store=self._config_store,
+            endpoint_creator_cls=self.ENDPOINT_CREATOR_CLS)
         return args_creator.get_client_args(
             service_model, region_name, is_secure, endpoint_url,
-            verify, credentials, scoped_config, client_config, endpoint_bridge)
+            verify, credentials, scoped_config, client_config, endpoint_bridge,
+            source_client=source_client)
 
     def _create_methods(self, service_model):
         op_dict = {}
@@ -626,6 +856,8 @@ class BaseClient(object):
     # xform_name() does the ListObjects->list_objects conversion, but
     # we need the reverse mapping here.
     _PY_TO_OP_NAME = {}
+    PAGINATOR_CLS = Paginator
+    WAITER_CLS = waiter.Waiter
 
     def __init__(self, serializer, endpoint, response_parser,
                  event_emitter, request_signer, service_model, loader,
@@ -637,13 +869,21 @@ class BaseClient(object):
         self._cache = {}
         self._loader = loader
         self._client_config = client_config
-        self.meta = ClientMeta(event_emitter, self._client_config,
-                               endpoint.host, service_model,
-                               self._PY_TO_OP_NAME, partition)
+        meta_cls = self._get_meta_cls()
+        self.meta = meta_cls(event_emitter, self._client_config,
+                             endpoint.host, service_model,
+                             self._PY_TO_OP_NAME, partition, client=self)
         self._exceptions_factory = exceptions_factory
         self._exceptions = None
+        # These are set by the ClientCreator that created this client and
+        # are used to clone the client.
+        self._client_creator = None
+        self._clone_args = None
         self._register_handlers()
 
+    def _get_meta_cls(self):
+        return ClientMeta
+
     def __getattr__(self, item):
         event_name = 'getattr.%s.%s' % (
             self._service_model.service_id.hyphenize(), item
@@ -671,14 +911,71 @@ class BaseClient(object):
     def _service_model(self):
         return self.meta.service_model
 
+    def clone(self, region_name=None, credentials=None, config=None):
+        """Create a new client based on this client.
+
+        The new client reuses the service model, client class and response
+        parser of this client.  If the new client resolves to the same
+        endpoint with the same HTTP configuration, it also shares this
+        client's connection pool.  The endpoint, config and retry settings
+        are still resolved as they are for a new client, so cloning saves
+        the model loading, client class creation and HTTP session setup
+        of ``Session.create_client``.  This helps for example when the
+        same client is needed with many different credentials.
+
+        :type region_name: string
+        :param region_name: The region of the new client.  Defaults to the
+            region this client was created with.
+
+        :type credentials: botocore.credentials.Credentials
+        :param credentials: The credentials of the new client.  Defaults to
+            the credentials of this client.
+
+        :type config: botocore.config.Config
+        :param config: Advanced client configuration options.  These are
+            merged on top of the config this client was created with.
+
+        :rtype: botocore.client.BaseClient
+        :return: A new botocore client instance.
+
+        """
+        if self._client_creator is None:
+            raise ValueError(
+                "Only clients created from a session can be cloned.")
+        return self._client_creator.clone_client(
+            self, region_name=region_name, credentials=credentials,
+            client_config=config)
+
     def _make_api_call(self, operation_name, api_params):
         operation_model = self._service_model.operation_model(operation_name)
+        return self._call_api(operation_model, api_params)
+
+    def _call_api(self, operation_model, api_params, events=None):
+        if events is None:
+            events = self._get_dispatch_table(operation_model)
+        request_dict, request_context = self._prepare_api_call(
+            operation_model, api_params, events)
+        event_response = self._emit_before_call(
+            operation_model, request_dict, request_context, events)
+        if event_response is not None:
+            http, parsed_response = event_response
+        else:
+            http, parsed_response = self._make_request(
+                operation_model, request_dict, request_context, events)
+        return self._handle_api_response(
+            operation_model, http, parsed_response, request_context, events)
+
+    def _prepare_api_call(self, operation_model, api_params, events=None):
+        # Returns the request dict and the request context of a call.
+        operation_name = operation_model.name
         service_name = self._service_model.service_name
-        history_recorder.record('API_CALL', {
-            'service': service_name,
-            'operation': operation_name,
-            'params': api_params,
-        })
+        record_history = history_recorder.sample()
+        if record_history:
+            history_recorder.record('API_CALL', {
+                'service': service_name,
+                'operation': operation_name,
+                'params': api_params,
+            })
         if operation_model.deprecated:
             logger.debug('Warning: %s.%s() is deprecated',
                          service_name, operation_name)
@@ -687,55 +984,183 @@ class BaseClient(object):
             'client_config': self.meta.config,
             'has_streaming_input': operation_model.has_streaming_input,
             'auth_type': operation_model.auth_type,
+            'record_history': record_history,
         }
         request_dict = self._convert_to_request_dict(
-            api_params, operation_model, context=request_context)
-
-        service_id = self._service_model.service_id.hyphenize()
-        handler, event_response = self.meta.events.emit_until_response(
-            'before-call.{service_id}.{operation_name}'.format(
-                service_id=service_id,
-                operation_name=operation_name),
-            model=operation_model, params=request_dict,
+            api_params, operation_model, context=request_context,
+            events=events)
+        return request_dict, request_context
+
+    def _emit_before_call(self, operation_model, request_dict,
+                          request_context, events=None):
+        # Returns the (http, parsed) response provided by a before-call
+        # handler, if any.
+        if events is None:
+            events = self._get_dispatch_table(operation_model)
+        handler, event_response = events.emit_until_response(
+            'before-call', model=operation_model, params=request_dict,
             request_signer=self._request_signer, context=request_context)
-
-        if event_response is not None:
-            http, parsed_response = event_response
-        else:
-            http, parsed_response = self._make_request(
-                operation_model, request_dict, request_context)
-
-        self.meta.events.emit(
-            'after-call.{service_id}.{operation_name}'.format(
-                service_id=service_id,
-                operation_name=operation_name),
-            http_response=http, parsed=parsed_response,
+        return event_response
+
+    def _handle_api_response(self, operation_model, http, parsed_response,
+                             request_context, events=None):
+        # Returns the parsed response of a call, or raises its error.
+        if events is None:
+            events = self._get_dispatch_table(operation_model)
+        events.emit(
+            'after-call', http_response=http, parsed=parsed_response,
             model=operation_model, context=request_context
         )
 
         if http.status_code >= 300:
             error_code = parsed_response.get("Error", {}).get("Code")
             error_class = self.exceptions.from_code(error_code)
-            raise error_class(parsed_response, operation_name)
+            raise error_class(parsed_response, operation_model.name)
         else:
             return parsed_response
 
-    def _make_request(self, operation_model, request_dict, request_context):
+    def _make_request(self, operation_model, request_dict, request_context,
+                      events=None):
         try:
             return self._endpoint.make_request(operation_model, request_dict)
         except Exception as e:
-            self.meta.events.emit(
-                'after-call-error.{service_id}.{operation_name}'.format(
-                    service_id=self._service_model.service_id.hyphenize(),
-                    operation_name=operation_model.name),
-                exception=e, context=request_context
-            )
+            if events is None:
+                events = self._get_dispatch_table(operation_model)
+            events.emit(
+                'after-call-error', exception=e, context=request_context)
             raise
 
+    def _get_dispatch_table(self, operation_model):
+        return get_dispatch_table(
+            self.meta.events, self._service_model.service_id.hyphenize(),
+            operation_model.name)
+
+    def _prewarm(self, connections):
+        http_session = self._endpoint.http_session
+        if not hasattr(http_session, 'prewarm'):
+            raise NotImplementedError(
+                "%s does not support prewarming connections." %
+                type(http_session).__name__)
+        return http_session.prewarm(self._endpoint.host, connections)
+
+    def _execute_many(self, operation_name, params_iterable,
+                      max_concurrency=None, ordered=True):
+        try:
+            api_operation_name = self._PY_TO_OP_NAME[operation_name]
+        except KeyError:
+            raise OperationNotFoundError(operation_name)
+        if max_concurrency is None:
+            max_concurrency = self._client_config.max_pool_connections
+        if max_concurrency < 1:
+            raise ValueError(
+                "max_concurrency must be at least 1, got: %s"
+                % max_concurrency)
+        # The operation model and the dispatch table of its events are
+        # the same for every call of the batch.
+        operation_model = self._service_model.operation_model(
+            api_operation_name)
+        events = self._get_dispatch_table(operation_model)
+        return self._iter_execute_many(
+            operation_model, events, params_iterable, max_concurrency,
+            ordered)
+
+    def _iter_execute_many(self, operation_model, events, params_iterable,
+                           max_concurrency, ordered):
+        # Only a bounded number of calls are submitted ahead of the
+        # consumer, so large or lazy iterables are consumed incrementally.
+        # Calls waiting to be retried don't hold on to a thread.
+        max_pending = max_concurrency * 2
+        pending = OrderedDict()
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            for index, params in enumerate(params_iterable):
+                future = self._start_api_call(
+                    operation_model, params, executor, events=events)
+                pending[future] = (index, params)
+                if len(pending) >= max_pending:
+                    for result in self._pop_completed(pending, ordered):
+                        yield result
+            while pending:
+                for result in self._pop_completed(pending, ordered):
+                    yield result
+        finally:
+            # The consumer may stop iterating early.
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _pop_completed(self, pending, ordered):
+        if ordered:
+            done = [next(iter(pending))]
+        else:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        results = []
+        for future in done:
+            index, params = pending.pop(future)
+            exception = future.exception()
+            if exception is not None:
+                results.append(
+                    ExecuteManyResult(index, params, None, exception))
+            else:
+                results.append(
+                    ExecuteManyResult(index, params, future.result(), None))
+        return results
+
+    def _start_api_call(self, operation_model, api_params, executor,
+                        scheduler=None, events=None):
+        # The call is prepared on the executor as well, so validation and
+        # serialization run concurrently with the other calls.
+        future = RetryFuture()
+        try:
+            executor.submit(
+                self._submit_api_call, future, operation_model, api_params,
+                executor, scheduler, events)
+        except Exception as e:
+            future.set_running_or_notify_cancel()
+            future.set_exception(e)
+        return future
+
+    def _submit_api_call(self, future, operation_model, api_params,
+                         executor, scheduler, events):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            if events is None:
+                events = self._get_dispatch_table(operation_model)
+            request_dict, request_context = self._prepare_api_call(
+                operation_model, api_params, events)
+            event_response = self._emit_before_call(
+                operation_model, request_dict, request_context, events)
+            if event_response is not None:
+                http, parsed_response = event_response
+                future.set_result(self._handle_api_response(
+                    operation_model, http, parsed_response, request_context,
+                    events))
+                return
+        except Exception as e:
+            future.set_exception(e)
+            return
+
+        def handle_response(get_response):
+            try:
+                http, parsed_response = get_response()
+            except Exception as e:
+                events.emit(
+                    'after-call-error', exception=e, context=request_context)
+                raise
+            return self._handle_api_response(
+                operation_model, http, parsed_response, request_context,
+                events)
+
+        submit_request(
+            self._endpoint, operation_model, request_dict, executor,
+            scheduler=scheduler, response_handler=handle_response,
+            future=future)
+
     def _convert_to_request_dict(self, api_params, operation_model,
-                                 context=None):
+                                 context=None, events=None):
         api_params = self._emit_api_params(
-            api_params, operation_model, context)
+            api_params, operation_model, context, events)
         request_dict = self._serializer.serialize_to_request(
             api_params, operation_model)
         if not self._client_config.inject_host_prefix:
@@ -745,28 +1170,23 @@ class BaseClient(object):
                              context=context)
         return request_dict
 
-    def _emit_api_params(self, api_params, operation_model, context):
+    def _emit_api_params(self, api_params, operation_model, context,
+                         events=None):
         # Given the API params provided by the user and the operation_model
         # we can serialize the request to a request_dict.
-        operation_name = operation_model.name
+        if events is None:
+            events = self._get_dispatch_table(operation_model)
 
         # Emit an event that allows users to modify the parameters at the
         # beginning of the method. It allows handlers to modify existing
         # parameters or return a new set of parameters to use.
-        service_id = self._service_model.service_id.hyphenize()
-        responses = self.meta.events.emit(
-            'provide-client-params.{service_id}.{operation_name}'.format(
-                service_id=service_id,
-                operation_name=operation_name),
+        responses = events.emit(
+            'provide-client-params',
             params=api_params, model=operation_model, context=context)
         api_params = first_non_none_response(responses, default=api_params)
 
-        event_name = (
-            'before-parameter-build.{service_id}.{operation_name}')
-        self.meta.events.emit(
-            event_name.format(
-                service_id=service_id,
-                operation_name=operation_name),
+        events.emit(
+            'before-parameter-build',
             params=api_params, model=operation_model, context=context)
         return api_params
 
@@ -794,11 +1214,13 @@ class BaseClient(object):
         else:
             actual_operation_name = self._PY_TO_OP_NAME[operation_name]
 
+            paginator_cls = self.PAGINATOR_CLS
+
             # Create a new paginate method that will serve as a proxy to
             # the underlying Paginator.paginate method. This is needed to
             # attach a docstring to the method.
             def paginate(self, **kwargs):
-                return Paginator.paginate(self, **kwargs)
+                return paginator_cls.paginate(self, **kwargs)
 
             paginator_config = self._cache['page_config'][
                 actual_operation_name]
@@ -818,7 +1240,8 @@ class BaseClient(object):
 
             # Create the new paginator class
             documented_paginator_cls = type(
-                paginator_class_name, (Paginator,), {'paginate': paginate})
+                paginator_class_name, (paginator_cls,),
+                {'paginate': paginate})
 
             operation_model = self._service_model.operation_model(actual_operation_name)
             paginator = documented_paginator_cls(
@@ -887,7 +1310,7 @@ class BaseClient(object):
             raise ValueError("Waiter does not exist: %s" % waiter_name)
 
         return waiter.create_waiter_with_client(
-            mapping[waiter_name], model, self)
+            mapping[waiter_name], model, self, waiter_cls=self.WAITER_CLS)
 
     @CachedProperty
     def waiter_names(self):
@@ -911,7 +1334,7 @@ class BaseClient(object):
             self._service_model)
 
 
-class ClientMeta(object):
+class BaseClientMeta(object):
     """Holds additional client methods.
 
     This class holds additional information for clients.  It exists for
@@ -925,13 +1348,19 @@ class ClientMeta(object):
     """
 
     def __init__(self, events, client_config, endpoint_url, service_model,
-                 method_to_api_mapping, partition):
+                 method_to_api_mapping, partition, client=None):
         self.events = events
         self._client_config = client_config
         self._endpoint_url = endpoint_url
         self._service_model = service_model
         self._method_to_api_mapping = method_to_api_mapping
         self._partition = partition
+        self._client_ref = None
+        if client is not None:
+            self._client_ref = weakref.ref(client)
+        # The botocore.retries.metrics.RetryMetrics of the client, set when
+        # it uses the standard or adaptive retry mode.
+        self.retry_metrics = None
 
     @property
     def service_model(self):
@@ -957,6 +1386,139 @@ class ClientMeta(object):
     def partition(self):
         return self._partition
 
+    def execute_many(self, operation_name, params_iterable,
+                     max_concurrency=None, ordered=True):
+        """Make many independent calls to an operation concurrently.
+
+        The calls are made from a pool of threads and share the client's
+        connection pool, so they behave exactly like calling the
+        operation method once for each set of parameters, except that
+        calls waiting to be retried don't hold on to a thread (see
+        ``submit``).  The operation model and the handlers of its events
+        are looked up once for the whole batch, and each call is
+        validated, serialized, signed and sent on the pool.
+
+        Results are generated lazily, and ``params_iterable`` is only
+        consumed a few calls ahead of the results that have been
+        consumed.  If iteration stops early, calls that have not started
+        are cancelled.
+
+        For asyncio clients the calls are tasks on the event loop, and
+        the results are generated by an asynchronous generator that is
+        iterated with ``async for``.
+
+        :type operation_name: string
+        :param operation_name: The operation name.  This is the same name
+            as the method name on the client, for example ``get_item``.
+
+        :type params_iterable: iterable
+        :param params_iterable: An iterable of dictionaries, each holding
+            the parameters of one call.
+
+        :type max_concurrency: int
+        :param max_concurrency: The maximum number of calls in flight.
+            Defaults to the ``max_pool_connections`` of the client's
+            config.
+
+        :type ordered: bool
+        :param ordered: If ``True`` (the default) results are generated
+            in the order of ``params_iterable``.  Otherwise they are
+            generated as the calls complete.
+
+        :rtype: generator of botocore.client.ExecuteManyResult
+        :return: A result for each call, with the ``index`` and ``params``
+            of the call and either its ``response`` or the ``exception``
+            it raised.
+
+        """
+        return self._get_client('execute_many')._execute_many(
+            operation_name, params_iterable,
+            max_concurrency=max_concurrency, ordered=ordered)
+
+    def _get_client(self, method_name):
+        client = None
+        if self._client_ref is not None:
+            client = self._client_ref()
+        if client is None:
+            raise ValueError(
+                "%s requires the client this metadata belongs to."
+                % method_name)
+        return client
+
+    def prewarm(self, connections=1):
+        """Open connections to the endpoint ahead of the first requests.
+
+        The connections, including their TLS handshakes, are opened
+        concurrently by sending unsigned ``HEAD`` requests to the
+        endpoint url, and are left idle in the client's connection pool.
+        This avoids opening them one at a time when a burst of requests
+        is sent by a new client.  Only connections to the client's
+        endpoint url are opened; requests sent to other hosts, such as S3
+        virtual hosted style bucket urls, do not use them.  For asyncio
+        clients this is a coroutine, and the connections are opened
+        without sending any requests.
+
+        :type connections: int
+        :param connections: The number of idle connections to have in the
+            pool.  It is limited to the ``max_pool_connections`` of the
+            client's config.
+
+        :rtype: int
+        :return: The number of connections that are ready in the pool.
+
+        """
+        return self._get_client('prewarm')._prewarm(connections)
+
+
+class ClientMeta(BaseClientMeta):
+    """Holds additional client methods.
+
+    This adds ``submit`` to ``BaseClientMeta``.  Asyncio clients have a
+    ``BaseClientMeta``, since their calls are coroutines rather than
+    futures.
+
+    """
+
+    def submit(self, operation_name, params, executor, scheduler=None):
+        """Call an operation without blocking a thread between attempts.
+
+        The call is validated and serialized on ``executor``, and so is
+        each attempt to send it.  When an attempt needs
+        to be retried, or the client side rate limiter of the adaptive
+        retry mode has no capacity, the next attempt is scheduled after
+        the backoff instead of sleeping on a thread of the executor.
+
+        :type operation_name: string
+        :param operation_name: The operation name.  This is the same name
+            as the method name on the client, for example ``get_item``.
+
+        :type params: dict
+        :param params: The parameters of the call.
+
+        :type executor: concurrent.futures.Executor
+        :param executor: The executor that runs the attempts.
+
+        :param scheduler: An object whose ``call_later(delay, function)``
+            method calls ``function`` after ``delay`` seconds.  Defaults
+            to a ``botocore.retries.scheduler.RetryScheduler`` shared by
+            all clients.
+
+        :rtype: botocore.retries.scheduler.RetryFuture
+        :return: A future for the response of the call.  Its ``attempts``
+            and ``retry_after`` attributes report the attempts made so
+            far and the backoff of a pending retry.
+
+        """
+        client = self._get_client('submit')
+        try:
+            api_operation_name = self._method_to_api_mapping[operation_name]
+        except KeyError:
+            raise OperationNotFoundError(operation_name)
+        operation_model = self._service_model.operation_model(
+            api_operation_name)
+        return client._start_api_call(
+            operation_model, params, executor, scheduler=scheduler)
+
 
 def _get_configured_signature_version(service_name, client_config,
                                       scoped_config):
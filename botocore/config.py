@@ -18,6 +18,9 @@ from botocore.exceptions import InvalidS3AddressingStyleError
 from botocore.exceptions import InvalidRetryConfigurationError
 from botocore.exceptions import InvalidMaxRetryAttemptsError
 from botocore.exceptions import InvalidRetryModeError
+from botocore.exceptions import InvalidRateLimiterScopeError
+from botocore.exceptions import InvalidHedgingPercentileError
+from botocore.exceptions import InvalidIdleConnectionTimeoutError
 
 
 class Config(object):
@@ -57,6 +60,14 @@ class Config(object):
         keep in a connection pool.  If this value is not set, the default
         value of 10 is used.
 
+    :type idle_connection_timeout: float
+    :param idle_connection_timeout: The time in seconds after which a
+        connection that has been idle in the connection pool is closed
+        instead of being reused.  Idle connections are also checked in
+        the background and closed once they expire or the server closes
+        them.  The value must be greater than 0.  If this value is not
+        set, idle connections are kept until they are reused.
+
     :type proxies: dict
     :param proxies: A dictionary of proxy servers to use by protocol or
         endpoint, e.g.:
@@ -97,6 +108,16 @@ class Config(object):
           sign sigv4 payloads. By default, this is disabled for streaming
           uploads (UploadPart and PutObject).
 
+        * 'chunked_payload_signing' -- Refers to whether or not to sign
+          the payloads of streaming uploads in chunks as they are sent
+          (``STREAMING-AWS4-HMAC-SHA256-PAYLOAD``) instead of reading the
+          whole body to SHA256 sign it before it is sent. This only applies
+          to file-like bodies whose payload is signed; bytes bodies are
+          signed as before, and other iterables are not supported. S3
+          needs the length of the body up front, so the body must be
+          seekable or the ContentLength must be given. The value must be
+          a boolean. Defaults to False.
+
         * 'addressing_style' -- Refers to the style in which to address
           s3 endpoints. Values must be a string that equals:
 
@@ -149,6 +170,47 @@ class Config(object):
               * ``standard`` - The standardized set of retry rules.  This
                 will also default to 3 max attempts unless overridden.
               * ``adaptive`` - Retries with additional client side throttling.
+        * 'shared_state' -- A string naming a store that holds the retry
+          quota of the ``standard`` and ``adaptive`` modes, and the client
+          side rate limiter of the ``adaptive`` mode, so that every process
+          on the host using the same store shares them.  Valid values are:
+              * ``mmap:<directory>`` - Memory mapped files in the directory.
+              * ``unix:<socket path>`` - A
+                ``botocore.retries.shared.StateCoordinator`` listening on
+                the Unix domain socket.
+          If not provided, the value of the ``retry_shared_state`` config
+          variable is used, and if that is not set, each client keeps its
+          own retry state.
+        * 'rate_limiter_scope' -- A string representing which clients share
+          the client side rate limiter of the ``adaptive`` mode.  Valid
+          values are:
+              * ``client`` - Each client has its own rate limiter.  This is
+                the default.
+              * ``endpoint`` - Clients of the same service, region and
+                endpoint share a rate limiter, whichever session created
+                them.
+          If not provided, the value of the ``rate_limiter_scope`` config
+          variable is used.
+        * 'rate_limiter_resource_param' -- The name of an operation
+          parameter, such as ``TableName``, whose value partitions the
+          shared rate limiters of the ``endpoint`` scope, so that each
+          resource is rate limited separately.  Only the 1024 most
+          recently used rate limiters are kept per process, so this is
+          meant for parameters with a bounded number of values.
+        * 'hedging_percentile' -- A number between 0 and 100 that enables
+          hedged requests in the ``standard`` and ``adaptive`` modes.  When
+          an attempt has been outstanding for longer than this percentile
+          of the recent latencies of its operation, a duplicate attempt is
+          sent and the first successful response is used.  Each duplicate
+          is charged to the retry quota.  If not provided, the value of
+          the ``retry_hedging_percentile`` config variable is used, and
+          requests aren't hedged if neither is set.
+        * 'hedging_operations' -- A list of the names of the operations to
+          hedge, such as ``['GetItem', 'ReceiveMessage']``.  Defaults to
+          operations that only read, such as ``Get*``, ``List*`` and
+          ``Describe*`` operations and operations sent with the ``GET``
+          or ``HEAD`` methods.  Only operations that are safe to send
+          twice should be listed.
 
     :type client_cert: str, (str, str)
     :param client_cert: The path to a certificate for TLS client authentication.
@@ -181,6 +243,20 @@ class Config(object):
         endpoint resolution.
 
         Defaults to None.
+
+    :type json_codec: str or object
+    :param json_codec: The codec used to encode JSON request bodies and
+        decode JSON response bodies.
+
+        This can be the name of a codec in
+        ``botocore.jsoncodec.JSON_CODECS`` (``json``, ``orjson`` or
+        ``ujson``), or any object with ``dumps`` and ``loads`` methods
+        that encode to and decode from UTF-8 encoded bytes.  A
+        ``botocore.jsoncodec.JSONCodec`` can be used to build one from
+        existing ``dumps`` and ``loads`` functions.
+
+        Defaults to None, which uses the ``json_codec`` config variable,
+        falling back to the standard library's ``json`` module.
     """
     OPTION_DEFAULTS = OrderedDict([
         ('region_name', None),
@@ -191,6 +267,7 @@ class Config(object):
         ('read_timeout', DEFAULT_TIMEOUT),
         ('parameter_validation', True),
         ('max_pool_connections', MAX_POOL_CONNECTIONS),
+        ('idle_connection_timeout', None),
         ('proxies', None),
         ('proxies_config', None),
         ('s3', None),
@@ -200,6 +277,7 @@ class Config(object):
         ('endpoint_discovery_enabled', None),
         ('use_dualstack_endpoint', None),
         ('use_fips_endpoint', None),
+        ('json_codec', None),
     ])
 
     def __init__(self, *args, **kwargs):
@@ -219,6 +297,8 @@ class Config(object):
 
         self._validate_retry_configuration(self.retries)
 
+        self._validate_idle_connection_timeout(self.idle_connection_timeout)
+
     def _record_user_provided_options(self, args, kwargs):
         option_order = list(self.OPTION_DEFAULTS)
         user_provided_options = {}
@@ -259,10 +339,17 @@ class Config(object):
                 raise InvalidS3AddressingStyleError(
                     s3_addressing_style=addressing_style)
 
+    def _validate_idle_connection_timeout(self, timeout):
+        if timeout is not None and not timeout > 0:
+            raise InvalidIdleConnectionTimeoutError(provided_timeout=timeout)
+
     def _validate_retry_configuration(self, retries):
         if retries is not None:
             for key, value in retries.items():
-                if key not in ['max_attempts', 'mode', 'total_max_attempts']:
+                if key not in ['max_attempts', 'mode', 'total_max_attempts',
+                               'shared_state', 'rate_limiter_scope',
+                               'rate_limiter_resource_param',
+                               'hedging_percentile', 'hedging_operations']:
                     raise InvalidRetryConfigurationError(
                         retry_config_option=key)
                 if key == 'max_attempts' and value < 0:
@@ -280,6 +367,12 @@ class Config(object):
                     raise InvalidRetryModeError(
                         provided_retry_mode=value
                     )
+                if key == 'rate_limiter_scope' and value not in ['client',
+                                                                 'endpoint']:
+                    raise InvalidRateLimiterScopeError(provided_scope=value)
+                if key == 'hedging_percentile' and not 0 < value < 100:
+                    raise InvalidHedgingPercentileError(
+                        provided_percentile=value)
 
     def merge(self, other_config):
         """Merges the config object with another config object
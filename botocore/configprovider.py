@@ -51,6 +51,21 @@ BOTOCORE_DEFAUT_SESSION_VARIABLES = {
     'profile': (None, ['AWS_DEFAULT_PROFILE', 'AWS_PROFILE'], None, None),
     'region': ('region', 'AWS_DEFAULT_REGION', None, None),
     'data_path': ('data_path', 'AWS_DATA_PATH', None, None),
+    'data_cache_path': ('data_cache_path', 'AWS_DATA_CACHE_PATH', None, None),
+    'lazy_service_models': (
+        'lazy_service_models', 'AWS_LAZY_SERVICE_MODELS', False,
+        utils.ensure_boolean),
+    'share_client_models': (
+        'share_client_models', 'AWS_SHARE_CLIENT_MODELS', False,
+        utils.ensure_boolean),
+    'compile_serializers': (
+        'compile_serializers', 'AWS_COMPILE_SERIALIZERS', False,
+        utils.ensure_boolean),
+    'compile_parsers': (
+        'compile_parsers', 'AWS_COMPILE_PARSERS', False,
+        utils.ensure_boolean),
+    'xml_backend': ('xml_backend', 'AWS_XML_BACKEND', None, None),
+    'json_codec': ('json_codec', 'AWS_JSON_CODEC', None, None),
     'config_file': (None, 'AWS_CONFIG_FILE', '~/.aws/config', None),
     'ca_bundle': ('ca_bundle', 'AWS_CA_BUNDLE', None, None),
     'api_versions': ('api_versions', None, {}, None),
@@ -112,6 +127,13 @@ BOTOCORE_DEFAUT_SESSION_VARIABLES = {
     # We can't have a default here for v1 because we need to defer to
     # whatever the defaults are in _retry.json.
     'max_attempts': ('max_attempts', 'AWS_MAX_ATTEMPTS', None, int),
+    'retry_shared_state': (
+        'retry_shared_state', 'AWS_RETRY_SHARED_STATE', None, None),
+    'rate_limiter_scope': (
+        'rate_limiter_scope', 'AWS_RATE_LIMITER_SCOPE', None, None),
+    'retry_hedging_percentile': (
+        'retry_hedging_percentile', 'AWS_RETRY_HEDGING_PERCENTILE', None,
+        float),
 }
 # A mapping for the s3 specific configuration vars. These are the configuration
 # vars that typically go in the s3 section of the config file. This mapping
@@ -128,6 +150,9 @@ DEFAULT_S3_CONFIG_VARS = {
     'payload_signing_enabled': (
         ('s3', 'payload_signing_enabled'), None, None, utils.ensure_boolean
     ),
+    'chunked_payload_signing': (
+        ('s3', 'chunked_payload_signing'), None, None, utils.ensure_boolean
+    ),
     'use_arn_region': (
         ['s3_use_arn_region',
          ('s3', 'use_arn_region')],
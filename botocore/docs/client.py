@@ -22,7 +22,8 @@ from botocore.compat import OrderedDict
 
 
 def _allowlist_generate_presigned_url(method_name, service_name, **kwargs):
-    if method_name != 'generate_presigned_url':
+    if method_name not in ['generate_presigned_url',
+                           'generate_presigned_urls']:
         return None
     return service_name in ['s3']
 
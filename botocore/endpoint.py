@@ -13,19 +13,24 @@
 # language governing permissions and limitations under the License.
 
 import os
+import functools
 import logging
 import time
 import threading
+from concurrent.futures import FIRST_COMPLETED, wait
 
 from botocore.vendored import six
 
 from botocore.awsrequest import create_request_object
-from botocore.exceptions import HTTPClientError
+from botocore.exceptions import HTTPClientError, SendDeferredError
 from botocore.httpsession import URLLib3Session
 from botocore.utils import is_valid_endpoint_url, get_environ_proxies
-from botocore.hooks import first_non_none_response
+from botocore.hooks import first_non_none_response, get_dispatch_table
 from botocore.history import get_global_history_recorder
 from botocore.response import StreamingBody
+from botocore.retries import hedging
+from botocore.retries import scheduler as retry_scheduler
+from botocore.retries.scheduler import RetryFuture
 from botocore import parsers
 
 
@@ -35,7 +40,8 @@ DEFAULT_TIMEOUT = 60
 MAX_POOL_CONNECTIONS = 10
 
 
-def convert_to_response_dict(http_response, operation_model):
+def convert_to_response_dict(http_response, operation_model,
+                             streaming_body_cls=StreamingBody):
     """Convert an HTTP response object to a request dict.
 
     This converts the requests library's HTTP response object to
@@ -44,6 +50,9 @@ def convert_to_response_dict(http_response, operation_model):
     :type http_response: botocore.vendored.requests.model.Response
     :param http_response: The HTTP response from an AWS service request.
 
+    :param streaming_body_cls: The class used to wrap the raw stream of
+        a streaming response body.
+
     :rtype: dict
     :return: A response dictionary which will contain the following keys:
         * headers (dict)
@@ -64,12 +73,23 @@ def convert_to_response_dict(http_response, operation_model):
         response_dict['body'] = http_response.raw
     elif operation_model.has_streaming_output:
         length = response_dict['headers'].get('content-length')
-        response_dict['body'] = StreamingBody(http_response.raw, length)
+        response_dict['body'] = streaming_body_cls(http_response.raw, length)
     else:
         response_dict['body'] = http_response.content
     return response_dict
 
 
+def _should_record_history(context):
+    # Whether a call is recorded is sampled once per call and stored in
+    # its context.  Requests sent without a client call are recorded
+    # whenever the recorder is recording.
+    if not history_recorder.recording:
+        return False
+    if context is None:
+        return True
+    return context.get('record_history', True)
+
+
 class Endpoint(object):
     """
     Represents an endpoint for a particular service in a specific
@@ -80,6 +100,8 @@ class Endpoint(object):
     :ivar host: The fully qualified endpoint hostname.
     :ivar session: The session object.
     """
+    STREAMING_BODY_CLS = StreamingBody
+
     def __init__(self, host, endpoint_prefix, event_emitter,
                  response_parser_factory=None, http_session=None):
         self._endpoint_prefix = endpoint_prefix
@@ -108,12 +130,9 @@ class Endpoint(object):
                 operation_model.has_streaming_output,
                 operation_model.has_event_stream_output
             ])
-            service_id = operation_model.service_model.service_id.hyphenize()
-            event_name = 'request-created.{service_id}.{op_name}'.format(
-                service_id=service_id,
-                op_name=operation_model.name)
-            self._event_emitter.emit(event_name, request=request,
-                                     operation_name=operation_model.name)
+            self._get_dispatch_table(operation_model).emit(
+                'request-created', request=request,
+                operation_name=operation_model.name)
         prepared_request = self.prepare_request(request)
         return prepared_request
 
@@ -124,15 +143,18 @@ class Endpoint(object):
                 headers[key] = value.encode('utf-8')
 
     def prepare_request(self, request):
-        self._encode_headers(request.headers)
-        return request.prepare()
+        # The headers are encoded once they are prepared, rather than on
+        # the request, where setting a header appends it instead of
+        # replacing it.
+        prepared_request = request.prepare()
+        self._encode_headers(prepared_request.headers)
+        return prepared_request
 
     def _send_request(self, request_dict, operation_model):
         attempts = 1
         request = self.create_request(request_dict, operation_model)
-        context = request_dict['context']
-        success_response, exception = self._get_response(
-            request, operation_model, context)
+        success_response, exception = self._get_attempt_response(
+            request, request_dict, operation_model)
         while self._needs_retry(attempts, operation_model, request_dict,
                                 success_response, exception):
             attempts += 1
@@ -144,8 +166,87 @@ class Endpoint(object):
             # Create a new request when retried (including a new signature).
             request = self.create_request(
                 request_dict, operation_model)
-            success_response, exception = self._get_response(
-                request, operation_model, context)
+            success_response, exception = self._get_attempt_response(
+                request, request_dict, operation_model)
+        return self._finish_request(attempts, success_response, exception)
+
+    def _get_attempt_response(self, request, request_dict, operation_model):
+        context = request_dict['context']
+        hedge = context.get(hedging.HEDGE_CONTEXT_KEY)
+        if hedge is None:
+            return self._get_response(request, operation_model, context)
+        success_response, exception = self._get_hedged_response(
+            request, request_dict, operation_model, hedge)
+        self._emit_response_received(
+            success_response, exception, operation_model, context)
+        return success_response, exception
+
+    def _get_hedged_response(self, request, request_dict, operation_model,
+                             hedge):
+        # Sends the request from the hedge's executor, and sends a
+        # duplicate if it hasn't completed within the hedge's delay.
+        delay = hedge.delay
+        context = request_dict['context']
+        if delay is None:
+            return self._do_timed_get_response(
+                request, operation_model, context, hedge)
+        executor = hedge.executor
+        futures = [executor.submit(
+            self._do_timed_get_response, request, operation_model, context,
+            hedge)]
+        done, _ = wait(futures, timeout=delay)
+        if not done and hedge.acquire():
+            logger.debug("No response received after %s seconds, hedging "
+                         "request.", delay)
+            hedged_request = self.create_request(
+                request_dict, operation_model)
+            futures.append(executor.submit(
+                self._do_timed_get_response, hedged_request,
+                operation_model, context, hedge))
+        return self._get_first_successful_response(futures, operation_model)
+
+    def _do_timed_get_response(self, request, operation_model, context,
+                               hedge):
+        start = time.monotonic()
+        success_response, exception = self._do_get_response(
+            request, operation_model, context)
+        if exception is None:
+            hedge.record_latency(time.monotonic() - start)
+        return success_response, exception
+
+    def _get_first_successful_response(self, futures, operation_model):
+        # Returns the first successful response of the attempts, or the
+        # response of the first attempt if none of them succeeded.
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in futures:
+                if future not in done:
+                    continue
+                success_response, exception = future.result()
+                if exception is None and \
+                        success_response[0].status_code < 300:
+                    self._discard_attempts(
+                        futures, future, operation_model)
+                    return success_response, exception
+        return futures[0].result()
+
+    def _discard_attempts(self, futures, winner, operation_model):
+        def close_response(future):
+            success_response, _ = future.result()
+            if success_response is not None and \
+                    operation_model.has_streaming_output:
+                # The body of the response was never read, so its
+                # connection can't be reused.
+                success_response[0].raw.close()
+
+        for future in futures:
+            # Attempts that are already being sent can't be stopped, their
+            # responses are discarded once they complete.
+            if future is not winner and not future.cancel():
+                future.add_done_callback(close_response)
+
+    def _finish_request(self, attempts, success_response, exception):
         if success_response is not None and \
                 'ResponseMetadata' in success_response[1]:
             # We want to share num retries, not num attempts.
@@ -163,7 +264,18 @@ class Endpoint(object):
         # If an exception occurs then the success_response is None.
         # If no exception occurs then exception is None.
         success_response, exception = self._do_get_response(
-            request, operation_model)
+            request, operation_model, context)
+        self._emit_response_received(
+            success_response, exception, operation_model, context)
+        return success_response, exception
+
+    def _emit_response_received(self, success_response, exception,
+                                operation_model, context):
+        events = self._get_dispatch_table(operation_model)
+        if not events.has_handlers('response-received'):
+            # Avoid converting the response for an event nothing is
+            # listening to.
+            return
         kwargs_to_emit = {
             'response_dict': None,
             'parsed_response': None,
@@ -174,42 +286,54 @@ class Endpoint(object):
             http_response, parsed_response = success_response
             kwargs_to_emit['parsed_response'] = parsed_response
             kwargs_to_emit['response_dict'] = convert_to_response_dict(
-                http_response, operation_model)
-        service_id = operation_model.service_model.service_id.hyphenize()
-        self._event_emitter.emit(
-            'response-received.%s.%s' % (
-                service_id, operation_model.name), **kwargs_to_emit)
-        return success_response, exception
+                http_response, operation_model, self.STREAMING_BODY_CLS)
+        events.emit('response-received', **kwargs_to_emit)
 
-    def _do_get_response(self, request, operation_model):
+    def _do_get_response(self, request, operation_model, context=None):
         try:
-            logger.debug("Sending http request: %s", request)
-            history_recorder.record('HTTP_REQUEST', {
-                'method': request.method,
-                'headers': request.headers,
-                'streaming': operation_model.has_streaming_input,
-                'url': request.url,
-                'body': request.body
-            })
-            service_id = operation_model.service_model.service_id.hyphenize()
-            event_name = 'before-send.%s.%s' % (service_id, operation_model.name)
-            responses = self._event_emitter.emit(event_name, request=request)
-            http_response = first_non_none_response(responses)
+            http_response = self._emit_before_send(
+                request, operation_model, context)
             if http_response is None:
                 http_response = self._send(request)
+        except SendDeferredError:
+            # Nothing was sent, the request is sent again later.
+            raise
         except HTTPClientError as e:
             return (None, e)
         except Exception as e:
             logger.debug("Exception received when sending HTTP request.",
                          exc_info=True)
             return (None, e)
+        return self._parse_response(
+            http_response, operation_model, context), None
+
+    def _emit_before_send(self, request, operation_model, context=None):
+        # Returns the response provided by a before-send handler, if any.
+        logger.debug("Sending http request: %s", request)
+        if _should_record_history(context):
+            history_recorder.record('HTTP_REQUEST', {
+                'method': request.method,
+                'headers': request.headers,
+                'streaming': operation_model.has_streaming_input,
+                'url': request.url,
+                'body': request.body
+            })
+        responses = self._get_dispatch_table(operation_model).emit(
+            'before-send', request=request, context=context)
+        return first_non_none_response(responses)
+
+    def _parse_response(self, http_response, operation_model, context=None):
         # This returns the http_response and the parsed_data.
-        response_dict = convert_to_response_dict(http_response, operation_model)
+        response_dict = convert_to_response_dict(
+            http_response, operation_model, self.STREAMING_BODY_CLS)
 
-        http_response_record_dict = response_dict.copy()
-        http_response_record_dict['streaming'] = \
-            operation_model.has_streaming_output
-        history_recorder.record('HTTP_RESPONSE', http_response_record_dict)
+        record_history = _should_record_history(context)
+        if record_history:
+            http_response_record_dict = response_dict.copy()
+            http_response_record_dict['streaming'] = \
+                operation_model.has_streaming_output
+            history_recorder.record(
+                'HTTP_RESPONSE', http_response_record_dict)
 
         protocol = operation_model.metadata['protocol']
         parser = self._response_parser_factory.create_parser(protocol)
@@ -225,8 +349,9 @@ class Endpoint(object):
                 response_dict, parsed_response,
                 operation_model, parser,
             )
-        history_recorder.record('PARSED_RESPONSE', parsed_response)
-        return (http_response, parsed_response), None
+        if record_history:
+            history_recorder.record('PARSED_RESPONSE', parsed_response)
+        return http_response, parsed_response
 
     def _add_modeled_error_fields(
             self, response_dict, parsed_response,
@@ -245,30 +370,171 @@ class Endpoint(object):
 
     def _needs_retry(self, attempts, operation_model, request_dict,
                      response=None, caught_exception=None):
-        service_id = operation_model.service_model.service_id.hyphenize()
-        event_name = 'needs-retry.%s.%s' % (
-            service_id,
-            operation_model.name)
-        responses = self._event_emitter.emit(
-            event_name, response=response, endpoint=self,
+        retry_delay = self._get_retry_delay(
+            attempts, operation_model, request_dict, response,
+            caught_exception)
+        if retry_delay is None:
+            return False
+        # Request needs to be retried, and we need to sleep
+        # for the specified number of times.
+        logger.debug("Response received to retry, sleeping for "
+                     "%s seconds", retry_delay)
+        time.sleep(retry_delay)
+        return True
+
+    def _get_retry_delay(self, attempts, operation_model, request_dict,
+                         response, caught_exception):
+        # Returns the number of seconds to wait before retrying the
+        # request, or None if the request should not be retried.
+        responses = self._get_dispatch_table(operation_model).emit(
+            'needs-retry', response=response, endpoint=self,
             operation=operation_model, attempts=attempts,
             caught_exception=caught_exception, request_dict=request_dict)
-        handler_response = first_non_none_response(responses)
-        if handler_response is None:
-            return False
-        else:
-            # Request needs to be retried, and we need to sleep
-            # for the specified number of times.
-            logger.debug("Response received to retry, sleeping for "
-                         "%s seconds", handler_response)
-            time.sleep(handler_response)
-            return True
+        return first_non_none_response(responses)
+
+    def _get_dispatch_table(self, operation_model):
+        return get_dispatch_table(
+            self._event_emitter,
+            operation_model.service_model.service_id.hyphenize(),
+            operation_model.name)
 
     def _send(self, request):
         return self.http_session.send(request)
 
 
+def submit_request(endpoint, operation_model, request_dict, executor,
+                   scheduler=None, response_handler=None, future=None):
+    """Send a request with ``endpoint`` without blocking between attempts.
+
+    Each attempt is submitted to ``executor``.  When an attempt needs
+    to be retried, or a ``before-send`` handler such as the adaptive
+    rate limiter defers it with a ``SendDeferredError``, the next
+    attempt is scheduled with ``scheduler`` instead of sleeping.  The
+    scheduler defaults to the process wide
+    ``botocore.retries.scheduler.RetryScheduler``.
+
+    :param response_handler: An optional function called on the
+        executor once the request is complete.  It is called with a
+        function that returns the ``(http_response, parsed)`` tuple,
+        or raises the error of the request, and its return value
+        becomes the result of the future.
+
+    :type future: botocore.retries.scheduler.RetryFuture
+    :param future: An optional future to complete instead of a new one,
+        for example one that was handed out before the request was
+        prepared.
+
+    :rtype: botocore.retries.scheduler.RetryFuture
+    :return: A future for the ``(http_response, parsed)`` tuple that
+        ``Endpoint.make_request`` would return, unless a
+        ``response_handler`` is provided.
+
+    """
+    logger.debug("Submitting request for %s with params: %s",
+                 operation_model, request_dict)
+    if scheduler is None:
+        scheduler = retry_scheduler.get_retry_scheduler()
+    request_dict['context'][retry_scheduler.DEFER_SEND_CONTEXT_KEY] = True
+    scheduled_request = _ScheduledRequest(
+        endpoint, operation_model, request_dict, executor, scheduler,
+        response_handler, future)
+    return scheduled_request.start()
+
+
+class _ScheduledRequest(object):
+    # Drives the attempts of a request sent with submit_request.
+    def __init__(self, endpoint, operation_model, request_dict, executor,
+                 scheduler, response_handler=None, future=None):
+        if future is None:
+            future = RetryFuture()
+        self._endpoint = endpoint
+        self._operation_model = operation_model
+        self._request_dict = request_dict
+        self._executor = executor
+        self._scheduler = scheduler
+        self._response_handler = response_handler
+        self._future = future
+        self._request = None
+        self._previous_request = None
+
+    def start(self):
+        self._submit()
+        return self._future
+
+    def _submit(self):
+        self._future.retry_at = None
+        try:
+            self._executor.submit(self._attempt)
+        except Exception as e:
+            # The executor may have been shut down while an attempt was
+            # deferred.
+            self._set_exception(e)
+
+    def _defer(self, delay):
+        logger.debug("Deferring request attempt for %s seconds", delay)
+        self._future.retry_at = time.monotonic() + delay
+        self._scheduler.call_later(delay, self._submit)
+
+    def _attempt(self):
+        future = self._future
+        # The future may already be running when it was handed out before
+        # the request was prepared.
+        if not future.running() and \
+                not future.set_running_or_notify_cancel():
+            return
+        try:
+            self._send()
+        except Exception as e:
+            self._set_exception(e)
+
+    def _send(self):
+        endpoint = self._endpoint
+        future = self._future
+        if self._request is None:
+            if self._previous_request is not None:
+                # Reset any stream associated with the request so the
+                # entire body is sent again.
+                self._previous_request.reset_stream()
+            future.attempts += 1
+            self._request = endpoint.create_request(
+                self._request_dict, self._operation_model)
+        try:
+            success_response, exception = endpoint._get_response(
+                self._request, self._operation_model,
+                self._request_dict['context'])
+        except SendDeferredError as e:
+            # The same request is sent again once it can be.
+            self._defer(e.kwargs['delay'])
+            return
+        retry_delay = endpoint._get_retry_delay(
+            future.attempts, self._operation_model, self._request_dict,
+            success_response, exception)
+        if retry_delay is not None:
+            self._previous_request = self._request
+            self._request = None
+            self._defer(retry_delay)
+            return
+        get_response = functools.partial(
+            endpoint._finish_request, future.attempts, success_response,
+            exception)
+        if self._response_handler is not None:
+            future.set_result(self._response_handler(get_response))
+        else:
+            future.set_result(get_response())
+
+    def _set_exception(self, exception):
+        future = self._future
+        # The future must be running before its exception is set.
+        if not future.running() and \
+                not future.set_running_or_notify_cancel():
+            return
+        future.set_exception(exception)
+
+
 class EndpointCreator(object):
+    ENDPOINT_CLS = Endpoint
+    HTTP_SESSION_CLS = URLLib3Session
+
     def __init__(self, event_emitter):
         self._event_emitter = event_emitter
 
@@ -276,11 +542,13 @@ class EndpointCreator(object):
                         verify=None, response_parser_factory=None,
                         timeout=DEFAULT_TIMEOUT,
                         max_pool_connections=MAX_POOL_CONNECTIONS,
-                        http_session_cls=URLLib3Session,
+                        http_session_cls=None,
                         proxies=None,
                         socket_options=None,
                         client_cert=None,
-                        proxies_config=None):
+                        proxies_config=None,
+                        http_session=None,
+                        idle_connection_timeout=None):
         if not is_valid_endpoint_url(endpoint_url):
 
             raise ValueError("Invalid endpoint: %s" % endpoint_url)
@@ -288,18 +556,28 @@ class EndpointCreator(object):
             proxies = self._get_proxies(endpoint_url)
         endpoint_prefix = service_model.endpoint_prefix
 
-        logger.debug('Setting %s timeout as %s', endpoint_prefix, timeout)
-        http_session = http_session_cls(
-            timeout=timeout,
-            proxies=proxies,
-            verify=self._get_verify_value(verify),
-            max_pool_connections=max_pool_connections,
-            socket_options=socket_options,
-            client_cert=client_cert,
-            proxies_config=proxies_config
-        )
+        if http_session is None:
+            if http_session_cls is None:
+                http_session_cls = self.HTTP_SESSION_CLS
+            logger.debug('Setting %s timeout as %s', endpoint_prefix, timeout)
+            session_kwargs = {}
+            if idle_connection_timeout is not None:
+                # Only passed when set, so that custom session classes
+                # don't have to accept it.
+                session_kwargs['idle_connection_timeout'] = \
+                    idle_connection_timeout
+            http_session = http_session_cls(
+                timeout=timeout,
+                proxies=proxies,
+                verify=self._get_verify_value(verify),
+                max_pool_connections=max_pool_connections,
+                socket_options=socket_options,
+                client_cert=client_cert,
+                proxies_config=proxies_config,
+                **session_kwargs
+            )
 
-        return Endpoint(
+        return self.ENDPOINT_CLS(
             endpoint_url,
             endpoint_prefix=endpoint_prefix,
             event_emitter=self._event_emitter,
@@ -68,10 +68,15 @@ class ClientExceptionsFactory(object):
             to grab the various different modeled exceptions.
         """
         service_name = service_model.service_name
-        if service_name not in self._client_exceptions_cache:
+        client_exceptions = self._client_exceptions_cache.get(service_name)
+        if client_exceptions is None:
             client_exceptions = self._create_client_exceptions(service_model)
-            self._client_exceptions_cache[service_name] = client_exceptions
-        return self._client_exceptions_cache[service_name]
+            # Calls made from several threads may create the exceptions at
+            # the same time.  Only the first ones created are used, so
+            # that every thread catches the same classes.
+            client_exceptions = self._client_exceptions_cache.setdefault(
+                service_name, client_exceptions)
+        return client_exceptions
 
     def _create_client_exceptions(self, service_model):
         cls_props = {}
@@ -407,6 +407,17 @@ class UnseekableStreamError(BotoCoreError):
            'is not seekable.')
 
 
+class UnknownChunkedPayloadLengthError(BotoCoreError):
+    """The length of a body to sign in chunks could not be determined.
+
+    S3 requires the decoded length of an ``aws-chunked`` body up front, so
+    chunked payload signing needs a seekable body or a ContentLength.
+    """
+    fmt = ('Unable to sign the body {body} in chunks because its length '
+           'is unknown. Provide the ContentLength parameter or a seekable '
+           'body.')
+
+
 class WaiterError(BotoCoreError):
     """Waiter failed to reach desired state."""
     fmt = 'Waiter {name} failed: {reason}'
@@ -514,6 +525,14 @@ class InvalidS3AddressingStyleError(BotoCoreError):
     )
 
 
+class InvalidIdleConnectionTimeoutError(BotoCoreError):
+    """Error when an invalid idle connection timeout is specified"""
+    fmt = (
+        'Value provided to "idle_connection_timeout": {provided_timeout} '
+        'must be a number greater than 0.'
+    )
+
+
 class UnsupportedS3ArnError(BotoCoreError):
     """Error when S3 ARN provided to Bucket parameter is not supported"""
     fmt = (
@@ -599,6 +618,22 @@ class InvalidRetryModeError(InvalidRetryConfigurationError):
     )
 
 
+class InvalidRateLimiterScopeError(InvalidRetryConfigurationError):
+    """Error when an invalid rate limiter scope is specified"""
+    fmt = (
+        'Invalid value provided to "rate_limiter_scope": '
+        '"{provided_scope}" must be one of: "client", "endpoint"'
+    )
+
+
+class InvalidHedgingPercentileError(InvalidRetryConfigurationError):
+    """Error when an invalid hedging percentile is specified"""
+    fmt = (
+        'Value provided to "hedging_percentile": {provided_percentile} '
+        'must be a number greater than 0 and less than 100.'
+    )
+
+
 class InvalidS3UsEast1RegionalEndpointConfigError(BotoCoreError):
     """Error for invalid s3 us-east-1 regional endpoints configuration"""
     fmt = (
@@ -694,6 +729,20 @@ class CapacityNotAvailableError(BotoCoreError):
     )
 
 
+class SendDeferredError(BotoCoreError):
+    """Raised by a before-send handler to defer sending a request.
+
+    This is only raised for requests sent with
+    ``botocore.endpoint.submit_request`` or by an ``AsyncEndpoint``, which
+    send the request again after ``delay`` seconds instead of blocking
+    until it can be sent.
+
+    """
+    fmt = (
+        'Sending the request was deferred for {delay} seconds.'
+    )
+
+
 class InvalidProxiesConfigError(BotoCoreError):
     fmt = (
         'Invalid configuration value(s) provided for proxies_config.'
@@ -32,6 +32,7 @@ from botocore.docs.utils import AutoPopulatedParam
 from botocore.docs.utils import HideParamFromOperations
 from botocore.docs.utils import AppendParamDocumentation
 from botocore.signers import add_generate_presigned_url
+from botocore.signers import add_generate_presigned_urls
 from botocore.signers import add_generate_presigned_post
 from botocore.signers import add_generate_db_auth_token
 from botocore.exceptions import ParamValidationError
@@ -956,6 +957,7 @@ BUILTIN_HANDLERS = [
     ('before-parameter-build.s3.PutObject',
      convert_body_to_file_like_object, REGISTER_LAST),
     ('creating-client-class', add_generate_presigned_url),
+    ('creating-client-class', add_generate_presigned_urls),
     ('creating-client-class.s3', add_generate_presigned_post),
     ('creating-client-class.iot-data', check_openssl_supports_tls_version_1_2),
     ('creating-client-class.lex-runtime-v2', remove_lex_v2_start_conversation),
@@ -11,6 +11,9 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 import logging
+import queue
+import random
+import threading
 
 
 HISTORY_RECORDER = None
@@ -22,30 +25,138 @@ class BaseHistoryHandler(object):
         raise NotImplementedError('emit()')
 
 
+class QueuedHistoryHandler(BaseHistoryHandler):
+    """Emits records to another handler from a background thread.
+
+    Recording an event only puts it on a queue, so a slow handler (for
+    example one that writes to a database) does not slow down the API
+    calls being recorded.  If the queue is full, new records are dropped
+    rather than blocking the caller.
+
+    Payloads are queued as they are, not copied, so the handler may see
+    changes made to a payload after it was recorded, such as changes made
+    to a parsed response by the caller of the API.
+
+    :type handler: BaseHistoryHandler
+    :param handler: The handler the records are emitted to.
+
+    :type max_queue_size: int
+    :param max_queue_size: The maximum number of records waiting to be
+        emitted.
+
+    """
+    def __init__(self, handler, max_queue_size=1000):
+        self._handler = handler
+        self._queue = queue.Queue(max_queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped_records = 0
+
+    def emit(self, event_type, payload, source):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((event_type, payload, source))
+        except queue.Full:
+            self.dropped_records += 1
+
+    def flush(self):
+        """Block until every queued record has been emitted."""
+        self._queue.join()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run)
+                thread.daemon = True
+                thread.start()
+                self._thread = thread
+
+    def _run(self):
+        while True:
+            event_type, payload, source = self._queue.get()
+            try:
+                self._handler.emit(event_type, payload, source)
+            except Exception:
+                logger.debug("Exception raised in %s.", self._handler,
+                             exc_info=True)
+            finally:
+                self._queue.task_done()
+
+
 class HistoryRecorder(object):
     def __init__(self):
         self._enabled = False
         self._handlers = []
+        self._sample_rate = 1.0
+        self._recording = False
+
+    @property
+    def recording(self):
+        """Whether records are currently emitted to any handler.
+
+        This can be checked before building an expensive payload so
+        that nothing is built when recording is disabled.
+
+        """
+        return self._recording
+
+    def sample(self):
+        """Decide whether the records of an API call are recorded.
+
+        This is called once per API call, so that either all or none of
+        the records of a call are emitted.  The decision is stored in the
+        request context of the call, and checked together with
+        ``recording`` before a payload is built.
 
-    def enable(self):
+        :rtype: bool
+        :returns: Whether the records of the call should be recorded.
+
+        """
+        if not self._recording:
+            return False
+        return self._sample_rate >= 1 or random.random() < self._sample_rate
+
+    def enable(self, sample_rate=None):
+        """Enable recording.
+
+        :type sample_rate: float
+        :param sample_rate: The fraction of API calls, between 0 and 1,
+            whose records are emitted to the handlers.  Defaults to
+            recording every call.
+
+        """
+        if sample_rate is not None:
+            if not 0 <= sample_rate <= 1:
+                raise ValueError(
+                    "sample_rate must be between 0 and 1, got: %s"
+                    % sample_rate)
+            self._sample_rate = sample_rate
         self._enabled = True
+        self._update_recording()
 
     def disable(self):
         self._enabled = False
+        self._update_recording()
 
     def add_handler(self, handler):
         self._handlers.append(handler)
+        self._update_recording()
+
+    def _update_recording(self):
+        self._recording = self._enabled and bool(self._handlers)
 
     def record(self, event_type, payload, source='BOTOCORE'):
-        if self._enabled and self._handlers:
-            for handler in self._handlers:
-                try:
-                    handler.emit(event_type, payload, source)
-                except Exception:
-                    # Never let the process die because we had a failure in
-                    # a record collection handler.
-                    logger.debug("Exception raised in %s.", handler,
-                                 exc_info=True)
+        if not self._recording:
+            return
+        for handler in self._handlers:
+            try:
+                handler.emit(event_type, payload, source)
+            except Exception:
+                # Never let the process die because we had a failure in
+                # a record collection handler.
+                logger.debug("Exception raised in %s.", handler,
+                             exc_info=True)
 
 
 def get_global_history_recorder():
@@ -63,6 +63,128 @@ def first_non_none_response(responses, default=None):
     return default
 
 
+def get_dispatch_table(emitter, service_id, operation_name):
+    """Get the dispatch table of an operation's events.
+
+    Emitters that do not provide dispatch tables, such as emitters that
+    do not derive from ``BaseEventHooks``, are supported by forwarding
+    every event emitted through the table to the emitter.
+
+    :type service_id: str
+    :param service_id: The hyphenized service id of the operation.
+
+    :type operation_name: str
+    :param operation_name: The name of the operation, e.g. ``ListBuckets``.
+
+    :rtype: EventDispatchTable
+
+    """
+    table = None
+    if isinstance(emitter, BaseEventHooks):
+        table = emitter.get_dispatch_table(service_id, operation_name)
+    if not isinstance(table, EventDispatchTable):
+        table = EventDispatchTable(emitter, service_id, operation_name)
+    return table
+
+
+def _call_handlers(event_name, handlers, kwargs, stop_on_response=False):
+    kwargs['event_name'] = event_name
+    log_calls = logger.isEnabledFor(logging.DEBUG)
+    responses = []
+    for handler in handlers:
+        if log_calls:
+            logger.debug('Event %s: calling handler %s', event_name, handler)
+        response = handler(**kwargs)
+        responses.append((handler, response))
+        if stop_on_response and response is not None:
+            return responses
+    return responses
+
+
+class EventDispatchTable(object):
+    """The handlers of the events emitted for a single operation.
+
+    An operation's events are named ``<stage>.<service-id>.<operation>``,
+    for example ``before-send.s3.ListBuckets``.  The first time a stage is
+    used, the table formats and aliases its event name and resolves the
+    handlers of the event.  Emitting a stage afterwards calls the resolved
+    handlers directly, and stages with no handlers return immediately.
+    The resolved handlers are discarded whenever a handler is registered
+    or unregistered, so the table always calls the same handlers as
+    emitting the event with the emitter would.
+
+    Unless ``resolve_handlers`` is true, the table is not able to resolve
+    the handlers ahead of time and every event is forwarded to the
+    emitter.  Only emitters that invalidate the table when their handlers
+    change create tables that resolve their handlers.
+
+    """
+    def __init__(self, emitter, service_id, operation_name,
+                 resolve_handlers=False):
+        self._emitter = emitter
+        self._event_suffix = '.%s.%s' % (service_id, operation_name)
+        self._resolve_handlers = resolve_handlers
+        self._stages = {}
+
+    def has_handlers(self, stage):
+        """Check if emitting a stage may call any handlers.
+
+        This can be used to avoid building expensive arguments for
+        events nothing is listening to.
+
+        """
+        event = self._resolve(stage)
+        return event is None or bool(event[1])
+
+    def emit(self, stage, **kwargs):
+        """Emit the event of a stage, see ``HierarchicalEmitter.emit``."""
+        event = self._resolve(stage)
+        if event is None:
+            return self._emitter.emit(stage + self._event_suffix, **kwargs)
+        event_name, handlers = event
+        if not handlers:
+            return []
+        return _call_handlers(event_name, handlers, kwargs)
+
+    def emit_until_response(self, stage, **kwargs):
+        """Emit the event of a stage until the first non-``None`` response.
+
+        See ``HierarchicalEmitter.emit_until_response``.
+
+        """
+        event = self._resolve(stage)
+        if event is None:
+            return self._emitter.emit_until_response(
+                stage + self._event_suffix, **kwargs)
+        event_name, handlers = event
+        if not handlers:
+            return (None, None)
+        responses = _call_handlers(
+            event_name, handlers, kwargs, stop_on_response=True)
+        if responses:
+            return responses[-1]
+        return (None, None)
+
+    def _resolve(self, stage):
+        # Returns the (event_name, handlers) of a stage, or None if the
+        # emitter can't resolve its handlers.
+        stages = self._stages
+        try:
+            return stages[stage]
+        except KeyError:
+            pass
+        event = None
+        if self._resolve_handlers:
+            event = self._emitter._resolve_event(stage + self._event_suffix)
+        # Writing to the dict that was read from means handlers resolved
+        # while the table is being invalidated are simply discarded.
+        stages[stage] = event
+        return event
+
+    def _invalidate(self):
+        self._stages = {}
+
+
 class BaseEventHooks(object):
     def emit(self, event_name, **kwargs):
         """Call all handlers subscribed to an event.
@@ -142,6 +264,23 @@ class BaseEventHooks(object):
         """
         pass
 
+    def _get_handlers(self, event_name):
+        """Return the handlers that would be called for an event.
+
+        Emitters that are not able to determine their handlers without
+        emitting the event return ``None``.
+
+        """
+        return None
+
+    def get_dispatch_table(self, service_id, operation_name):
+        """Get the dispatch table of an operation's events.
+
+        :rtype: EventDispatchTable
+
+        """
+        return EventDispatchTable(self, service_id, operation_name)
+
     def _verify_is_callable(self, func):
         if not six.callable(func):
             raise ValueError("Event handler %s must be callable." % func)
@@ -173,6 +312,12 @@ class HierarchicalEmitter(BaseEventHooks):
         # This is used to ensure that unique_id's are only
         # registered once.
         self._unique_id_handlers = {}
+        self._unique_id_handlers_shared = False
+        # A cache of (service_id, operation_name, emitter) to the
+        # operation's dispatch table.  The emitter is the emitter that
+        # resolves the handlers of the table, which is this emitter or
+        # an emitter wrapping it.
+        self._dispatch_tables = {}
 
     def _emit(self, event_name, kwargs, stop_on_response=False):
         """
@@ -192,27 +337,46 @@ class HierarchicalEmitter(BaseEventHooks):
         :return: List of (handler, response) tuples from all processed
                  handlers.
         """
-        responses = []
         # Invoke the event handlers from most specific
         # to least specific, each time stripping off a dot.
-        handlers_to_call = self._lookup_cache.get(event_name)
-        if handlers_to_call is None:
-            handlers_to_call = self._handlers.prefix_search(event_name)
-            self._lookup_cache[event_name] = handlers_to_call
-        elif not handlers_to_call:
+        handlers_to_call = self._get_handlers(event_name)
+        if not handlers_to_call:
             # Short circuit and return an empty response is we have
             # no handlers to call.  This is the common case where
             # for the majority of signals, nothing is listening.
             return []
-        kwargs['event_name'] = event_name
-        responses = []
-        for handler in handlers_to_call:
-            logger.debug('Event %s: calling handler %s', event_name, handler)
-            response = handler(**kwargs)
-            responses.append((handler, response))
-            if stop_on_response and response is not None:
-                return responses
-        return responses
+        return _call_handlers(
+            event_name, handlers_to_call, kwargs, stop_on_response)
+
+    def _get_handlers(self, event_name):
+        handlers = self._lookup_cache.get(event_name)
+        if handlers is None:
+            handlers = tuple(self._handlers.prefix_search(event_name))
+            self._lookup_cache[event_name] = handlers
+        return handlers
+
+    def _resolve_event(self, event_name):
+        return event_name, self._get_handlers(event_name)
+
+    def get_dispatch_table(self, service_id, operation_name):
+        return self._get_dispatch_table(service_id, operation_name, self)
+
+    def _get_dispatch_table(self, service_id, operation_name, emitter):
+        key = (service_id, operation_name, emitter)
+        table = self._dispatch_tables.get(key)
+        if table is None:
+            table = EventDispatchTable(
+                emitter, service_id, operation_name, resolve_handlers=True)
+            self._dispatch_tables[key] = table
+        return table
+
+    def _invalidate_handlers(self):
+        # Super simple caching strategy for now, if we change the
+        # registrations clear the caches.  This has the opportunity for
+        # smarter invalidations.
+        self._lookup_cache = {}
+        for table in list(self._dispatch_tables.values()):
+            table._invalidate()
 
     def emit(self, event_name, **kwargs):
         """
@@ -264,6 +428,7 @@ class HierarchicalEmitter(BaseEventHooks):
     def _register_section(self, event_name, handler, unique_id,
                           unique_id_uses_count, section):
         if unique_id is not None:
+            self._own_unique_id_handlers()
             if unique_id in self._unique_id_handlers:
                 # We've already registered a handler using this unique_id
                 # so we don't need to register it again.
@@ -297,13 +462,12 @@ class HierarchicalEmitter(BaseEventHooks):
                 self._unique_id_handlers[unique_id] = unique_id_handler_item
         else:
             self._handlers.append_item(event_name, handler, section=section)
-        # Super simple caching strategy for now, if we change the registrations
-        # clear the cache.  This has the opportunity for smarter invalidations.
-        self._lookup_cache = {}
+        self._invalidate_handlers()
 
     def unregister(self, event_name, handler=None, unique_id=None,
                    unique_id_uses_count=False):
         if unique_id is not None:
+            self._own_unique_id_handlers()
             try:
                 count = self._unique_id_handlers[unique_id].get('count', None)
             except KeyError:
@@ -331,16 +495,27 @@ class HierarchicalEmitter(BaseEventHooks):
                 handler = self._unique_id_handlers.pop(unique_id)['handler']
         try:
             self._handlers.remove_item(event_name, handler)
-            self._lookup_cache = {}
+            self._invalidate_handlers()
         except ValueError:
             pass
 
+    def _own_unique_id_handlers(self):
+        # Copies share the unique id registrations until either of them
+        # modifies them.
+        if self._unique_id_handlers_shared:
+            self._unique_id_handlers = dict(
+                (unique_id, item.copy())
+                for unique_id, item in self._unique_id_handlers.items())
+            self._unique_id_handlers_shared = False
+
     def __copy__(self):
         new_instance = self.__class__()
         new_state = self.__dict__.copy()
         new_state['_handlers'] = copy.copy(self._handlers)
-        new_state['_unique_id_handlers'] = copy.copy(self._unique_id_handlers)
+        new_state['_dispatch_tables'] = {}
         new_instance.__dict__ = new_state
+        self._unique_id_handlers_shared = True
+        new_instance._unique_id_handlers_shared = True
         return new_instance
 
 
@@ -360,6 +535,20 @@ class EventAliaser(BaseEventHooks):
         aliased_event_name = self._alias_event_name(event_name)
         return self._emitter.emit_until_response(aliased_event_name, **kwargs)
 
+    def _get_handlers(self, event_name):
+        aliased_event_name = self._alias_event_name(event_name)
+        return self._emitter._get_handlers(aliased_event_name)
+
+    def _resolve_event(self, event_name):
+        aliased_event_name = self._alias_event_name(event_name)
+        return self._emitter._resolve_event(aliased_event_name)
+
+    def get_dispatch_table(self, service_id, operation_name):
+        get_table = getattr(self._emitter, '_get_dispatch_table', None)
+        if get_table is None:
+            return EventDispatchTable(self, service_id, operation_name)
+        return get_table(service_id, operation_name, self)
+
     def register(self, event_name, handler, unique_id=None,
                  unique_id_uses_count=False):
         aliased_event_name = self._alias_event_name(event_name)
@@ -436,10 +625,14 @@ class EventAliaser(BaseEventHooks):
                 return
 
     def __copy__(self):
-        return self.__class__(
+        copied = self.__class__(
             copy.copy(self._emitter),
             copy.copy(self._event_aliases)
         )
+        # Aliasing only depends on the aliases, so the copy can reuse the
+        # names that have already been aliased.
+        copied._alias_name_cache = self._alias_name_cache
+        return copied
 
 
 class _PrefixTrie(object):
@@ -463,6 +656,11 @@ class _PrefixTrie(object):
     Calling ``get_items('foo.bar.baz')`` will return [A + B + C], from
     most specific to least specific.
 
+    Copies of a trie share its nodes, so copying a trie is cheap no
+    matter how many items it holds.  Shared nodes are copied the first
+    time either trie modifies them, so a trie only ever pays for the
+    parts that differ from the trie it was copied from.
+
     """
     def __init__(self):
         # Each dictionary can be though of as a node, where a node
@@ -470,7 +668,23 @@ class _PrefixTrie(object):
         # to more nodes.  So 'foo.bar' would have a 'foo' node with
         # a 'bar' node as a child of foo.
         # {'foo': {'children': {'bar': {...}}}}.
-        self._root = {'chunk': None, 'children': {}, 'values': None}
+        # A node may only be modified in place by the trie that owns it.
+        self._owner = object()
+        self._root = self._new_node(None)
+
+    def _new_node(self, chunk):
+        return {'chunk': chunk, 'values': None, 'children': {},
+                'owner': self._owner}
+
+    def _own(self, node):
+        # Returns a version of the node this trie may modify in place.
+        if node['owner'] is self._owner:
+            return node
+        values = node['values']
+        if values is not None:
+            values = copy.copy(values)
+        return {'chunk': node['chunk'], 'values': values,
+                'children': node['children'].copy(), 'owner': self._owner}
 
     def append_item(self, key, value, section=_MIDDLE):
         """Add an item to a key.
@@ -479,14 +693,15 @@ class _PrefixTrie(object):
         value is appended to the list for the key.
         """
         key_parts = key.split('.')
-        current = self._root
+        current = self._root = self._own(self._root)
         for part in key_parts:
-            if part not in current['children']:
-                new_child = {'chunk': part, 'values': None, 'children': {}}
-                current['children'][part] = new_child
-                current = new_child
+            child = current['children'].get(part)
+            if child is None:
+                child = self._new_node(part)
             else:
-                current = current['children'][part]
+                child = self._own(child)
+            current['children'][part] = child
+            current = child
         if current['values'] is None:
             current['values'] = NodeList([], [], [])
         current['values'][section].append(value)
@@ -546,15 +761,18 @@ class _PrefixTrie(object):
 
         """
         key_parts = key.split('.')
-        current = self._root
+        current = self._root = self._own(self._root)
         self._remove_item(current, key_parts, value, index=0)
 
     def _remove_item(self, current_node, key_parts, value, index):
+        # current_node is always owned by this trie.
         if current_node is None:
             return
         elif index < len(key_parts):
             next_node = current_node['children'].get(key_parts[index])
             if next_node is not None:
+                next_node = self._own(next_node)
+                current_node['children'][key_parts[index]] = next_node
                 self._remove_item(next_node, key_parts, value, index + 1)
                 if index == len(key_parts) - 1:
                     node_list = next_node['values']
@@ -580,20 +798,8 @@ class _PrefixTrie(object):
         # to know that they'd normally need a deepcopy so we expose
         # __copy__ instead of __deepcopy__.
         new_copy = self.__class__()
-        copied_attrs = self._recursive_copy(self.__dict__)
-        new_copy.__dict__ = copied_attrs
+        new_copy._root = self._root
+        # All the nodes are now shared with the copy, so neither trie
+        # may modify them in place anymore.
+        self._owner = object()
         return new_copy
-
-    def _recursive_copy(self, node):
-        # We can't use copy.deepcopy because we actually only want to copy
-        # the structure of the trie, not the handlers themselves.
-        # Each node has a chunk, children, and values.
-        copied_node = {}
-        for key, value in node.items():
-            if isinstance(value, NodeList):
-                copied_node[key] = copy.copy(value)
-            elif isinstance(value, dict):
-                copied_node[key] = self._recursive_copy(value)
-            else:
-                copied_node[key] = value
-        return copied_node
@@ -2,8 +2,13 @@ import os.path
 import os
 import logging
 import socket
+import threading
+import time
+import weakref
 from base64 import b64encode
 import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from urllib3 import PoolManager, proxy_from_url, Timeout
 from urllib3.util.retry import Retry
@@ -62,17 +67,20 @@ def get_cert_path(verify):
 
 
 def create_urllib3_context(ssl_version=None, cert_reqs=None,
-                           options=None, ciphers=None):
+                           options=None, ciphers=None, context_cls=None):
     """ This function is a vendored version of the same function in urllib3
 
         We vendor this function to ensure that the SSL contexts we construct
-        always use the std lib SSLContext instead of pyopenssl.
+        always use the std lib SSLContext instead of pyopenssl.  A subclass
+        of it can be used with ``context_cls``.
     """
     # PROTOCOL_TLS is deprecated in Python 3.10
     if not ssl_version or ssl_version == PROTOCOL_TLS:
         ssl_version = PROTOCOL_TLS_CLIENT
 
-    context = SSLContext(ssl_version)
+    if context_cls is None:
+        context_cls = SSLContext
+    context = context_cls(ssl_version)
 
     context.set_ciphers(ciphers or DEFAULT_CIPHERS)
 
@@ -137,6 +145,120 @@ def create_urllib3_context(ssl_version=None, cert_reqs=None,
     return context
 
 
+class _SessionResumingSSLContext(SSLContext):
+    """An SSLContext that resumes the TLS sessions of earlier connections.
+
+    When a connection is opened to a host, the TLS session saved from an
+    earlier connection to the same host and port is offered to the
+    server, so the handshake can be abbreviated instead of repeating the
+    full key exchange and certificate verification.  Sessions are saved
+    with ``save_session`` once a connection is idle, since TLS 1.3
+    servers send their session tickets after the handshake.
+    """
+    MAX_SESSIONS = 128
+
+    def __init__(self, *args, **kwargs):
+        super(_SessionResumingSSLContext, self).__init__()
+        self._sessions = OrderedDict()
+        self._socket_keys = weakref.WeakKeyDictionary()
+        self._sessions_lock = threading.Lock()
+
+    def wrap_socket(self, sock, server_side=False,
+                    do_handshake_on_connect=True, suppress_ragged_eofs=True,
+                    server_hostname=None, session=None):
+        key = None
+        if not server_side:
+            key = self._get_session_key(sock, server_hostname)
+        if session is None and key is not None:
+            session = self._get_session(key)
+        ssl_sock = super(_SessionResumingSSLContext, self).wrap_socket(
+            sock, server_side=server_side,
+            do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs,
+            server_hostname=server_hostname, session=session)
+        if key is not None:
+            with self._sessions_lock:
+                self._socket_keys[ssl_sock] = key
+        return ssl_sock
+
+    def save_session(self, ssl_sock):
+        """Save the TLS session of a connection to resume it later.
+
+        This must not be called while the connection is in use by another
+        thread.
+        """
+        with self._sessions_lock:
+            key = self._socket_keys.get(ssl_sock)
+        if key is None:
+            return
+        session = ssl_sock.session
+        if session is None or not (session.has_ticket or session.id):
+            return
+        with self._sessions_lock:
+            self._sessions[key] = session
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+
+    def _get_session_key(self, sock, server_hostname):
+        try:
+            host, port = sock.getpeername()[:2]
+        except (OSError, ValueError, TypeError):
+            return None
+        return (server_hostname or host, port)
+
+    def _get_session(self, key):
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+        if session is not None and \
+                session.time + session.timeout <= time.time():
+            return None
+        return session
+
+
+_SHARED_SSL_CONTEXTS = {}
+_SHARED_SSL_CONTEXTS_LOCK = threading.Lock()
+
+
+def get_shared_ssl_context(ca_certs=None, cert_file=None, key_file=None,
+                           check_hostname=False):
+    """Get the process wide SSLContext for a set of certificates.
+
+    Contexts are created once per combination of arguments and shared by
+    the sessions that use them, so that the CA bundle and client
+    certificate are parsed once instead of by every new connection, and
+    so that TLS sessions are resumed across sessions.  A context verifies
+    certificates only when ``ca_certs`` is given.
+
+    :param ca_certs: The path to a CA bundle file or directory, or None
+        to not verify certificates.
+    :param cert_file: The path to a client certificate.
+    :param key_file: The path to the private key of the client
+        certificate.
+    :param check_hostname: Whether the context checks hostnames itself.
+
+    :raises IOError, ssl.SSLError: If a certificate can't be loaded.
+    """
+    key = (ca_certs, cert_file, key_file, check_hostname)
+    with _SHARED_SSL_CONTEXTS_LOCK:
+        context = _SHARED_SSL_CONTEXTS.get(key)
+        if context is None:
+            cert_reqs = ssl.CERT_REQUIRED if ca_certs else ssl.CERT_NONE
+            context = create_urllib3_context(
+                cert_reqs=cert_reqs, context_cls=_SessionResumingSSLContext)
+            if ca_certs:
+                if os.path.isdir(ca_certs):
+                    context.load_verify_locations(capath=ca_certs)
+                else:
+                    context.load_verify_locations(cafile=ca_certs)
+            if cert_file:
+                context.load_cert_chain(cert_file, key_file)
+            if check_hostname:
+                context.check_hostname = True
+            _SHARED_SSL_CONTEXTS[key] = context
+    return context
+
+
 def ensure_boolean(val):
     """Ensures a boolean value if a string or boolean is provided
 
@@ -226,6 +348,7 @@ class URLLib3Session(object):
         socket_options=None,
         client_cert=None,
         proxies_config=None,
+        idle_connection_timeout=None,
     ):
         self._verify = verify
         self._proxy_config = ProxyConfiguration(
@@ -252,9 +375,18 @@ class URLLib3Session(object):
         self._socket_options = socket_options
         if socket_options is None:
             self._socket_options = []
+        self._ssl_context = None
+        self._uses_shared_ssl_context = False
         self._proxy_managers = {}
         self._manager = PoolManager(**self._get_pool_manager_kwargs())
         self._manager.pool_classes_by_scheme = self._pool_classes_by_scheme
+        self._idle_connection_timeout = idle_connection_timeout
+        if idle_connection_timeout is not None:
+            _IDLE_CONNECTION_REAPER.register(self)
+
+    @property
+    def socket_options(self):
+        return self._socket_options
 
     @property
     def _proxies_kwargs(self):
@@ -272,7 +404,7 @@ class URLLib3Session(object):
             'strict': True,
             'timeout': self._timeout,
             'maxsize': self._max_pool_connections,
-            'ssl_context': self._get_ssl_context(),
+            'ssl_context': self._get_pool_ssl_context(),
             'socket_options': self._socket_options,
             'cert_file': self._cert_file,
             'key_file': self._key_file,
@@ -283,6 +415,29 @@ class URLLib3Session(object):
     def _get_ssl_context(self):
         return create_urllib3_context()
 
+    def _get_pool_ssl_context(self):
+        if self._ssl_context is not None:
+            return self._ssl_context
+        # Unless a subclass customizes its SSL context, the session uses
+        # a process wide context that has the certificates loaded.
+        if type(self)._get_ssl_context is URLLib3Session._get_ssl_context:
+            ca_certs = None
+            if self._verify:
+                ca_certs = get_cert_path(self._verify)
+            try:
+                self._ssl_context = get_shared_ssl_context(
+                    ca_certs, self._cert_file, self._key_file)
+                self._uses_shared_ssl_context = True
+            except (IOError, OSError, ssl.SSLError):
+                # Connections load the certificates themselves instead,
+                # which raises the error when a request is sent.
+                logger.debug(
+                    "Failed to load certificates into a shared SSL context",
+                    exc_info=True)
+        if self._ssl_context is None:
+            self._ssl_context = self._get_ssl_context()
+        return self._ssl_context
+
     def _get_proxy_manager(self, proxy_url):
         if proxy_url not in self._proxy_managers:
             proxy_headers = self._proxy_config.proxy_headers_for(proxy_url)
@@ -311,6 +466,12 @@ class URLLib3Session(object):
         else:
             conn.cert_reqs = 'CERT_NONE'
             conn.ca_certs = None
+        if self._uses_shared_ssl_context:
+            # The certificates are already loaded into the shared context,
+            # so the connections don't have to load them again.
+            conn.ca_certs = None
+            conn.cert_file = None
+            conn.key_file = None
 
     def _setup_proxy_ssl_context(self, proxies_settings):
         proxy_ca_bundle = proxies_settings.get('proxy_ca_bundle')
@@ -362,15 +523,109 @@ class URLLib3Session(object):
         else:
             return self._path_url(url)
 
+    def _get_connection_pool(self, url, proxy_url):
+        manager = self._get_connection_manager(url, proxy_url)
+        conn = manager.connection_from_url(url)
+        self._setup_ssl_cert(conn, url, self._verify)
+        conn.idle_timeout = self._idle_connection_timeout
+        return conn
+
+    def _requires_http_tunnel(self, url, proxy_url):
+        if proxy_url is None or not url.lower().startswith('https'):
+            return False
+        return not (
+            urlparse(proxy_url).scheme == 'https' and
+            self._proxy_config.settings.get('proxy_use_forwarding_for_https')
+        )
+
+    def prewarm(self, url, connections=1):
+        """Open connections to the host of a url ahead of the requests.
+
+        ``connections`` concurrent ``HEAD`` requests are sent to the url,
+        which opens the connections, including their TLS handshakes, and
+        leaves them idle in the connection pool of the host.  Idle
+        connections that are already in the pool are reused by the
+        requests, so they count towards ``connections``, which is limited
+        to ``max_pool_connections``.  Connections that fail to open are
+        logged and skipped.
+
+        :type url: str
+        :param url: A url of the host to open the connections to.
+
+        :type connections: int
+        :param connections: The number of idle connections to have in the
+            pool of the host.
+
+        :rtype: int
+        :return: The number of connections that are ready in the pool.
+        """
+        proxy_url = self._proxy_config.proxy_url_for(url)
+        pool = self._get_connection_pool(url, proxy_url)
+        request_target = self._get_request_target(url, proxy_url)
+        count = min(connections, self._max_pool_connections)
+        if count < 1:
+            return 0
+
+        def open_connection(_):
+            try:
+                return pool.urlopen(
+                    'HEAD', request_target, retries=Retry(False),
+                    assert_same_host=False, preload_content=False)
+            except Exception:
+                logger.debug(
+                    "Failed to open connection to %s", url, exc_info=True)
+                return None
+
+        # Every response holds on to its connection until it is released,
+        # so the requests are made over distinct connections.
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            responses = list(executor.map(open_connection, range(count)))
+        ready = 0
+        for response in responses:
+            if response is None:
+                continue
+            try:
+                response.read()
+            except Exception:
+                logger.debug(
+                    "Failed to read prewarm response from %s", url,
+                    exc_info=True)
+                continue
+            finally:
+                response.release_conn()
+            ready += 1
+        return ready
+
+    def evict_idle_connections(self):
+        """Close the idle connections that have expired or been dropped.
+
+        Idle connections are closed if they have been idle for longer than
+        ``idle_connection_timeout`` seconds, or if the server has closed
+        them.  This is done periodically in the background when
+        ``idle_connection_timeout`` is set.
+
+        :rtype: int
+        :return: The number of connections that were closed.
+        """
+        evicted = 0
+        managers = [self._manager] + list(self._proxy_managers.values())
+        for manager in managers:
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is not None:
+                    evicted += pool.evict_idle_connections()
+        return evicted
+
     def _chunked(self, headers):
-        return headers.get('Transfer-Encoding', '') == 'chunked'
+        transfer_encoding = headers.get('Transfer-Encoding', b'')
+        if isinstance(transfer_encoding, str):
+            transfer_encoding = transfer_encoding.encode('utf-8')
+        return transfer_encoding == b'chunked'
 
     def send(self, request):
         try:
             proxy_url = self._proxy_config.proxy_url_for(request.url)
-            manager = self._get_connection_manager(request.url, proxy_url)
-            conn = manager.connection_from_url(request.url)
-            self._setup_ssl_cert(conn, request.url, self._verify)
+            conn = self._get_connection_pool(request.url, proxy_url)
             if ensure_boolean(
                 os.environ.get('BOTO_EXPERIMENTAL__ADD_PROXY_HOST_HEADER', '')
             ):
@@ -428,3 +683,53 @@ class URLLib3Session(object):
             message = 'Exception received when sending urllib3 HTTP request'
             logger.debug(message, exc_info=True)
             raise HTTPClientError(error=e)
+
+
+class _IdleConnectionReaper(object):
+    """Evicts the idle connections of sessions in a background thread.
+
+    Sessions are held weakly, and the thread exits once none are left.
+    The sessions are checked twice per the shortest idle connection
+    timeout among them, but at most every ``MIN_INTERVAL`` seconds.
+    """
+    MIN_INTERVAL = 0.1
+
+    def __init__(self):
+        self._sessions = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, session):
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='botocore-idle-connection-reaper')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                timeouts = [
+                    session._idle_connection_timeout
+                    for session in self._sessions
+                ]
+                if not timeouts:
+                    self._thread = None
+                    return
+            time.sleep(max(min(timeouts) / 2.0, self.MIN_INTERVAL))
+            self._evict_idle_connections()
+
+    def _evict_idle_connections(self):
+        # This is a separate method so that no reference to a session
+        # outlives it while the thread sleeps.
+        for session in list(self._sessions):
+            try:
+                session.evict_idle_connections()
+            except Exception:
+                logger.debug(
+                    "Failed to evict idle connections", exc_info=True)
+
+
+_IDLE_CONNECTION_REAPER = _IdleConnectionReaper()
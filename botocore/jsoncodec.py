@@ -0,0 +1,100 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+"""JSON codecs used to encode and decode JSON request and response bodies.
+
+A codec has two methods: ``dumps``, which encodes a value to UTF-8
+encoded bytes, and ``loads``, which decodes a value from UTF-8 encoded
+bytes.  Decoding errors must be raised as a ``ValueError`` (or a
+subclass of it, such as ``json.JSONDecodeError``).
+
+"""
+from botocore.compat import json
+
+
+class StandardJSONCodec(object):
+    """JSON codec using the standard library's ``json`` module."""
+
+    def dumps(self, value):
+        return json.dumps(value).encode('utf-8')
+
+    def loads(self, data):
+        return json.loads(data.decode('utf-8'))
+
+
+class JSONCodec(object):
+    """JSON codec built from a pair of ``dumps`` and ``loads`` functions.
+
+    :param dumps: A callable that encodes a value to either ``str`` or
+        UTF-8 encoded ``bytes``.
+    :param loads: A callable that decodes a value from a ``str``, or
+        from UTF-8 encoded ``bytes`` if ``loads_bytes`` is True.
+    :param loads_bytes: Whether ``loads`` accepts UTF-8 encoded bytes.
+        If it does, response bodies are passed to it as is, which avoids
+        decoding a copy of every body to ``str`` first.
+
+    """
+    def __init__(self, dumps, loads, loads_bytes=False):
+        self._dumps = dumps
+        self._loads = loads
+        self._loads_bytes = loads_bytes
+
+    def dumps(self, value):
+        encoded = self._dumps(value)
+        if not isinstance(encoded, bytes):
+            encoded = encoded.encode('utf-8')
+        return encoded
+
+    def loads(self, data):
+        if not self._loads_bytes:
+            data = data.decode('utf-8')
+        return self._loads(data)
+
+
+def _create_orjson_codec():
+    import orjson
+    return JSONCodec(orjson.dumps, orjson.loads, loads_bytes=True)
+
+
+def _create_ujson_codec():
+    import ujson
+    return JSONCodec(ujson.dumps, ujson.loads, loads_bytes=True)
+
+
+JSON_CODECS = {
+    'json': StandardJSONCodec,
+    'orjson': _create_orjson_codec,
+    'ujson': _create_ujson_codec,
+}
+
+
+def create_json_codec(name):
+    """Create a JSON codec from its name in ``JSON_CODECS``.
+
+    The ``orjson`` and ``ujson`` codecs require the corresponding
+    package to be installed separately.
+
+    """
+    try:
+        factory = JSON_CODECS[name]
+    except KeyError:
+        raise ValueError(
+            "Unknown JSON codec %r, must be one of: %s" % (
+                name, ', '.join(sorted(JSON_CODECS))))
+    return factory()
+
+
+def resolve_json_codec(value):
+    """Return a JSON codec given either a codec or the name of one."""
+    if isinstance(value, str):
+        return create_json_codec(value)
+    return value
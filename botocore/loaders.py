@@ -100,13 +100,55 @@ applied to the model after it is loaded. Data in these files might represent
 information that doesn't quite fit in the original models, but is still needed
 for the sdk. For instance, additional operation parameters might be added here
 which don't represent the actual service api.
+
+
+The Data Cache
+==============
+
+Parsing the larger JSON models (EC2 for example) can take a significant
+amount of time.  Setting ``data_cache_path`` in the config file (or the
+``AWS_DATA_CACHE_PATH`` environment variable) to a directory makes the
+loader use a ``CachedJSONFileLoader``, which stores a pickled copy of
+every JSON file it loads in that directory.  Each cache entry is keyed
+by the full path, modification time and size of the JSON file as well
+as the botocore version, so a stale entry is never used.
+
+The cache can be populated ahead of time (for example when building a
+container image) by running::
+
+    python -m botocore.loaders /path/to/cache [service_name ...]
+
+Only point the cache at a directory that is writable by trusted users,
+as the cached files are unpickled when they are read.
+
+
+Lazy Service Models
+===================
+
+Most clients only ever use a handful of the operations and shapes defined
+in their service model.  Creating a ``Loader`` with
+``lazy_service_models=True`` (or setting ``lazy_service_models`` in the
+config file / ``AWS_LAZY_SERVICE_MODELS`` environment variable) stores the
+``operations`` and ``shapes`` of service models loaded through the data
+cache in a ``LazyModelMap``.  Each entry is kept in a compact serialized
+form and is only deserialized the first time it is accessed.  The compact
+form is what gets cached, so loading a service model from the cache does
+not build any of the operation or shape dictionaries.  Without a data
+cache the JSON has to be parsed in full anyway, and serializing every
+entry up front would cost more than it saves, so those models are
+returned as parsed.
 """
 import os
+import sys
+import hashlib
 import logging
+import pickle
+import tempfile
 
 from botocore import BOTOCORE_ROOT
+from botocore import __version__ as botocore_version
 from botocore.compat import json
-from botocore.compat import OrderedDict
+from botocore.compat import OrderedDict, MutableMapping
 from botocore.exceptions import DataNotFoundError, UnknownServiceError
 from botocore.utils import deep_merge
 
@@ -135,6 +177,111 @@ def instance_cache(func):
     return _wrapper
 
 
+class LazyModelMap(MutableMapping):
+    """A mapping of names to model data that is deserialized on access.
+
+    Values are stored pickled and are only unpickled (and then retained)
+    the first time they are looked up.  This is used for the
+    ``operations`` and ``shapes`` of lazily loaded service models.
+
+    In order to answer common queries without deserializing every value,
+    the names of the values that have one of the ``INDEXED_TRAITS`` set
+    to a truthy value are recorded when the map is created.
+
+    """
+    INDEXED_TRAITS = ('exception',)
+    PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, serialized, trait_index=None):
+        self._serialized = serialized
+        self._loaded = {}
+        if trait_index is None:
+            trait_index = {}
+        self._trait_index = trait_index
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        serialized = OrderedDict()
+        trait_index = dict((trait, set()) for trait in cls.INDEXED_TRAITS)
+        for name, value in mapping.items():
+            serialized[name] = pickle.dumps(value, cls.PICKLE_PROTOCOL)
+            cls._index_value(trait_index, name, value)
+        return cls(serialized, trait_index)
+
+    @staticmethod
+    def _index_value(trait_index, name, value):
+        for trait, names in trait_index.items():
+            if isinstance(value, dict) and value.get(trait):
+                names.add(name)
+            else:
+                names.discard(name)
+
+    def keys_with_trait(self, trait):
+        """Return the names of the values that have ``trait`` set.
+
+        :raises: KeyError if the trait is not one of ``INDEXED_TRAITS``.
+
+        """
+        return [name for name in self._serialized
+                if name in self._trait_index[trait]]
+
+    @property
+    def loaded_keys(self):
+        return list(self._loaded)
+
+    def __getitem__(self, key):
+        try:
+            return self._loaded[key]
+        except KeyError:
+            pass
+        value = pickle.loads(self._serialized[key])
+        self._loaded[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self._serialized:
+            self._serialized[key] = None
+        self._loaded[key] = value
+        self._index_value(self._trait_index, key, value)
+
+    def __delitem__(self, key):
+        del self._serialized[key]
+        self._loaded.pop(key, None)
+        self._index_value(self._trait_index, key, None)
+
+    def __iter__(self):
+        return iter(self._serialized)
+
+    def __len__(self):
+        return len(self._serialized)
+
+    def __contains__(self, key):
+        return key in self._serialized
+
+    def __reduce__(self):
+        serialized = OrderedDict()
+        for name, value in self._serialized.items():
+            if name in self._loaded:
+                value = pickle.dumps(self._loaded[name], self.PICKLE_PROTOCOL)
+            serialized[name] = value
+        return self.__class__, (serialized, self._trait_index)
+
+
+def compact_model(model):
+    """Convert the operations and shapes of a model to LazyModelMap objects.
+
+    The model is modified in place and returned.  Models that do not have
+    operations or shapes, and values that are already a ``LazyModelMap``,
+    are left untouched.
+
+    """
+    for key in ('operations', 'shapes'):
+        value = model.get(key)
+        if isinstance(value, dict):
+            model[key] = LazyModelMap.from_mapping(value)
+    return model
+
+
 class JSONFileLoader(object):
     """Loader JSON files.
 
@@ -176,7 +323,105 @@ class JSONFileLoader(object):
         return json.loads(payload, object_pairs_hook=OrderedDict)
 
 
-def create_loader(search_path_string=None):
+class CachedJSONFileLoader(JSONFileLoader):
+    """Load JSON files through an on disk cache of pre-parsed data.
+
+    The first time a JSON file is loaded its parsed contents are pickled
+    into ``cache_path``.  Subsequent loads of the same file, including
+    from other processes, read the pickled data instead of parsing the
+    JSON again.  A cache entry is only used if the path, modification time
+    and size of the JSON file as well as the botocore version match the
+    values recorded when the entry was written.
+
+    If ``lazy_models`` is True, service models are stored in the cache in
+    the compact form produced by ``compact_model``.
+
+    """
+    PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, cache_path, lazy_models=False):
+        self._cache_path = os.path.expanduser(cache_path)
+        self._lazy_models = lazy_models
+
+    @property
+    def cache_path(self):
+        return self._cache_path
+
+    def load_file(self, file_path):
+        """Attempt to load the file path.
+
+        :type file_path: str
+        :param file_path: The full path to the file to load without
+            the '.json' extension.
+
+        :return: The loaded data if it exists, otherwise None.
+
+        """
+        full_path = os.path.abspath(file_path + '.json')
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return
+        cache_key = self._cache_key(full_path, stat)
+        cache_filename = self._cache_filename(full_path)
+        data = self._load_cached(cache_filename, cache_key)
+        if data is not None:
+            return data
+        data = super(CachedJSONFileLoader, self).load_file(file_path)
+        if data is not None:
+            if self._lazy_models:
+                data = compact_model(data)
+            self._write_cached(cache_filename, cache_key, data)
+        return data
+
+    def _cache_key(self, full_path, stat):
+        return (full_path, stat.st_mtime_ns, stat.st_size, botocore_version,
+                self._lazy_models)
+
+    def _cache_filename(self, full_path):
+        digest = hashlib.sha256(full_path.encode('utf-8')).hexdigest()
+        if self._lazy_models:
+            digest += '.lazy'
+        return os.path.join(self._cache_path, digest + '.pickle')
+
+    def _load_cached(self, cache_filename, cache_key):
+        try:
+            with open(cache_filename, 'rb') as f:
+                cached_key, data = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug("Unable to read data cache file %s: %s",
+                         cache_filename, e)
+            return None
+        if cached_key != cache_key:
+            logger.debug("Ignoring stale data cache file: %s", cache_filename)
+            return None
+        logger.debug("Loading cached data file: %s", cache_filename)
+        return data
+
+    def _write_cached(self, cache_filename, cache_key, data):
+        # Write to a temporary file first and then move it into place so
+        # that concurrent readers never see a partially written file.
+        try:
+            os.makedirs(self._cache_path, exist_ok=True)
+            fd, temp_filename = tempfile.mkstemp(
+                dir=self._cache_path, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump((cache_key, data), f,
+                                protocol=self.PICKLE_PROTOCOL)
+                os.replace(temp_filename, cache_filename)
+            except BaseException:
+                os.remove(temp_filename)
+                raise
+        except (OSError, pickle.PicklingError) as e:
+            logger.debug("Unable to write data cache file %s: %s",
+                         cache_filename, e)
+
+
+def create_loader(search_path_string=None, data_cache_path=None,
+                  lazy_service_models=False):
     """Create a Loader class.
 
     This factory function creates a loader given a search string path.
@@ -187,17 +432,71 @@ def create_loader(search_path_string=None):
         which is typically ``:`` on POSIX platforms and ``;`` on
         windows.
 
+    :type data_cache_path: str
+    :param data_cache_path: The AWS_DATA_CACHE_PATH value.  If provided,
+        loaded JSON files are cached in this directory using a
+        ``CachedJSONFileLoader``.
+
+    :type lazy_service_models: bool
+    :param lazy_service_models: Whether the operations and shapes of
+        service models loaded through the data cache are only
+        deserialized when they are accessed.
+
     :return: A ``Loader`` instance.
 
     """
+    file_loader = None
+    if data_cache_path is not None:
+        file_loader = CachedJSONFileLoader(
+            data_cache_path, lazy_models=lazy_service_models)
     if search_path_string is None:
-        return Loader()
+        return Loader(file_loader=file_loader,
+                      lazy_service_models=lazy_service_models)
     paths = []
     extra_paths = search_path_string.split(os.pathsep)
     for path in extra_paths:
         path = os.path.expanduser(os.path.expandvars(path))
         paths.append(path)
-    return Loader(extra_search_paths=paths)
+    return Loader(extra_search_paths=paths, file_loader=file_loader,
+                  lazy_service_models=lazy_service_models)
+
+
+def warm_data_cache(data_cache_path, service_names=None,
+                    search_path_string=None, lazy_service_models=False):
+    """Populate a data cache with the models of the given services.
+
+    This loads the latest service model of each service, along with the
+    ``endpoints`` data, through a ``CachedJSONFileLoader`` so that later
+    loaders pointed at the same ``data_cache_path`` do not need to parse
+    any JSON.
+
+    :type data_cache_path: str
+    :param data_cache_path: The directory to store the cached data in.
+
+    :type service_names: list
+    :param service_names: The services to cache.  If not provided, all
+        available services are cached.
+
+    :type search_path_string: str
+    :param search_path_string: The AWS_DATA_PATH value to search for
+        models in, if any.
+
+    :type lazy_service_models: bool
+    :param lazy_service_models: Whether to cache the service models in
+        the form used by lazy service models.
+
+    :return: The list of service names that were cached.
+
+    """
+    loader = create_loader(search_path_string, data_cache_path,
+                           lazy_service_models)
+    loader.load_data('endpoints')
+    if service_names is None:
+        service_names = loader.list_available_services('service-2')
+    for service_name in service_names:
+        logger.debug("Caching data for service: %s", service_name)
+        loader.load_service_model(service_name, 'service-2')
+    return list(service_names)
 
 
 class Loader(object):
@@ -219,8 +518,9 @@ class Loader(object):
 
     def __init__(self, extra_search_paths=None, file_loader=None,
                  cache=None, include_default_search_paths=True,
-                 include_default_extras=True):
+                 include_default_extras=True, lazy_service_models=False):
         self._cache = {}
+        self._lazy_service_models = lazy_service_models
         if file_loader is None:
             file_loader = self.FILE_LOADER_CLASS()
         self.file_loader = file_loader
@@ -246,6 +546,10 @@ class Loader(object):
     def extras_types(self):
         return self._extras_types
 
+    @property
+    def lazy_service_models(self):
+        return self._lazy_service_models
+
     @instance_cache
     def list_available_services(self, type_name):
         """List all known services.
@@ -381,12 +685,16 @@ class Loader(object):
             api_version = self.determine_latest_version(
                 service_name, type_name)
         full_path = os.path.join(service_name, api_version, type_name)
-        model = self.load_data(full_path)
+        if self._lazy_service_models and type_name == 'service-2':
+            # The data is intentionally not stored in the load_data()
+            # cache so that the fully deserialized model is not retained.
+            model = self._load_data(full_path)
+        else:
+            model = self.load_data(full_path)
 
         # Load in all the extras
         extras_data = self._find_extras(service_name, type_name, api_version)
         self._extras_processor.process(model, extras_data)
-
         return model
 
     def _find_extras(self, service_name, type_name, api_version):
@@ -417,6 +725,9 @@ class Loader(object):
             a DataNotFoundError is raised.
 
         """
+        return self._load_data(name)
+
+    def _load_data(self, name):
         for possible_path in self._potential_locations(name):
             found = self.file_loader.load_file(possible_path)
             if found is not None:
@@ -460,3 +771,32 @@ class ExtrasProcessor(object):
         """Process a single extras model into a service model."""
         if 'merge' in extra_model:
             deep_merge(model, extra_model['merge'])
+
+
+def _main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='python -m botocore.loaders',
+        description='Populate the botocore data cache.')
+    parser.add_argument('data_cache_path',
+                        help='The directory to store the cached data in.')
+    parser.add_argument('service_names', nargs='*',
+                        help='The services to cache.  Defaults to all '
+                             'available services.')
+    parser.add_argument('--data-path', default=os.environ.get('AWS_DATA_PATH'),
+                        help='Additional model search paths.  Defaults to '
+                             'the AWS_DATA_PATH environment variable.')
+    parser.add_argument('--lazy', action='store_true',
+                        help='Cache service models for use with lazy '
+                             'service models.')
+    parsed = parser.parse_args(args)
+    cached = warm_data_cache(parsed.data_cache_path,
+                             parsed.service_names or None,
+                             parsed.data_path, parsed.lazy)
+    sys.stdout.write('Cached %s service models in %s\n' % (
+        len(cached), parsed.data_cache_path))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(_main())
@@ -301,7 +301,13 @@ class ServiceModel(object):
     @CachedProperty
     def error_shapes(self):
         error_shapes = []
-        for shape_name in self.shape_names:
+        shape_names = self.shape_names
+        shape_map = self._service_description.get('shapes', {})
+        if hasattr(shape_map, 'keys_with_trait'):
+            # Lazily loaded shapes keep an index of the exception shapes
+            # so that every shape does not need to be deserialized here.
+            shape_names = shape_map.keys_with_trait('exception')
+        for shape_name in shape_names:
             error_shape = self.shape_for(shape_name)
             if error_shape.metadata.get('exception', False):
                 error_shapes.append(error_shape)
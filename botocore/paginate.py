@@ -236,6 +236,21 @@ class PageIterator(object):
         return self._non_aggregate_part
 
     def __iter__(self):
+        pages = self._paginate()
+        try:
+            current_kwargs = next(pages)
+            while True:
+                yield pages.send(self._make_request(current_kwargs))
+                current_kwargs = next(pages)
+        except StopIteration:
+            return
+
+    def _paginate(self):
+        # Drives the pagination without making any requests, so that it
+        # can be shared with asyncio page iterators.  This yields the
+        # kwargs of each request to make, and must be sent the response
+        # to it.  The value returned by ``send()`` is the page to yield
+        # for that response.
         current_kwargs = self._op_kwargs
         previous_next_token = None
         next_token = dict((key, None) for key in self._input_token)
@@ -252,7 +267,7 @@ class PageIterator(object):
         starting_truncation = 0
         self._inject_starting_params(current_kwargs)
         while True:
-            response = self._make_request(current_kwargs)
+            response = yield current_kwargs
             parsed = self._extract_parsed_response(response)
             if first_request:
                 # The first request is handled differently.  We could
@@ -449,43 +464,49 @@ class PageIterator(object):
     def build_full_result(self):
         complete_result = {}
         for response in self:
-            page = response
-            # We want to try to catch operation object pagination
-            # and format correctly for those. They come in the form
-            # of a tuple of two elements: (http_response, parsed_responsed).
-            # We want the parsed_response as that is what the page iterator
-            # uses. We can remove it though once operation objects are removed.
-            if isinstance(response, tuple) and len(response) == 2:
-                page = response[1]
-            # We're incrementally building the full response page
-            # by page.  For each page in the response we need to
-            # inject the necessary components from the page
-            # into the complete_result.
-            for result_expression in self.result_keys:
-                # In order to incrementally update a result key
-                # we need to search the existing value from complete_result,
-                # then we need to search the _current_ page for the
-                # current result key value.  Then we append the current
-                # value onto the existing value, and re-set that value
-                # as the new value.
-                result_value = result_expression.search(page)
-                if result_value is None:
-                    continue
-                existing_value = result_expression.search(complete_result)
-                if existing_value is None:
-                    # Set the initial result
-                    set_value_from_jmespath(
-                        complete_result, result_expression.expression,
-                        result_value)
-                    continue
-                # Now both result_value and existing_value contain something
-                if isinstance(result_value, list):
-                    existing_value.extend(result_value)
-                elif isinstance(result_value, (int, float, six.string_types)):
-                    # Modify the existing result with the sum or concatenation
-                    set_value_from_jmespath(
-                        complete_result, result_expression.expression,
-                        existing_value + result_value)
+            self._add_to_full_result(complete_result, response)
+        return self._finish_full_result(complete_result)
+
+    def _add_to_full_result(self, complete_result, response):
+        page = response
+        # We want to try to catch operation object pagination
+        # and format correctly for those. They come in the form
+        # of a tuple of two elements: (http_response, parsed_responsed).
+        # We want the parsed_response as that is what the page iterator
+        # uses. We can remove it though once operation objects are removed.
+        if isinstance(response, tuple) and len(response) == 2:
+            page = response[1]
+        # We're incrementally building the full response page
+        # by page.  For each page in the response we need to
+        # inject the necessary components from the page
+        # into the complete_result.
+        for result_expression in self.result_keys:
+            # In order to incrementally update a result key
+            # we need to search the existing value from complete_result,
+            # then we need to search the _current_ page for the
+            # current result key value.  Then we append the current
+            # value onto the existing value, and re-set that value
+            # as the new value.
+            result_value = result_expression.search(page)
+            if result_value is None:
+                continue
+            existing_value = result_expression.search(complete_result)
+            if existing_value is None:
+                # Set the initial result
+                set_value_from_jmespath(
+                    complete_result, result_expression.expression,
+                    result_value)
+                continue
+            # Now both result_value and existing_value contain something
+            if isinstance(result_value, list):
+                existing_value.extend(result_value)
+            elif isinstance(result_value, (int, float, six.string_types)):
+                # Modify the existing result with the sum or concatenation
+                set_value_from_jmespath(
+                    complete_result, result_expression.expression,
+                    existing_value + result_value)
+
+    def _finish_full_result(self, complete_result):
         merge_dicts(complete_result, self.non_aggregate_part)
         if self.resume_token is not None:
             complete_result['NextToken'] = self.resume_token
@@ -113,6 +113,18 @@ Each call to ``parse()`` returns a dict has this form::
       }
     }
 
+Compiled Plans
+==============
+
+By default the parsers walk the output shape on every response,
+dispatching on ``shape.type_name`` for each node.  When a parser is
+created with ``compile_plans=True``, each shape is instead compiled the
+first time it is used into a decoder function with the member key names,
+locations, flattened handling and scalar converters already resolved.
+The members of a structure are compiled the first time that structure
+is parsed, which allows recursive shapes to be compiled.  The parsed
+output is identical in both modes.
+
 """
 import re
 import base64
@@ -121,6 +133,7 @@ import logging
 
 from botocore.compat import six, ETree, XMLParseError
 from botocore.eventstream import EventStream, NoInitialResponseError
+from botocore.jsoncodec import StandardJSONCodec
 
 from botocore.utils import parse_timestamp, merge_dicts, \
     is_json_value_header, lowercase_dict
@@ -133,6 +146,7 @@ DEFAULT_TIMESTAMP_PARSER = parse_timestamp
 class ResponseParserFactory(object):
     def __init__(self):
         self._defaults = {}
+        self._parsers = {}
 
     def set_parser_defaults(self, **kwargs):
         """Set default arguments when a parser instance is created.
@@ -142,19 +156,59 @@ class ResponseParserFactory(object):
 
             * timestamp_parser - A callable that can parse a timestamp string
             * blob_parser - A callable that can parse a blob type
+            * compile_plans - Whether to compile output shapes into cached
+              decoders instead of walking the shape on every response
+            * xml_backend - The XML backend used by the XML parsers, see
+              ``XML_BACKENDS``
+            * json_codec - The codec used by the JSON parsers to decode
+              response bodies, see ``botocore.jsoncodec``
+
+        If ``compile_plans`` is set, parsers are created once per protocol
+        and reused so that their compiled plans survive across responses.
 
         """
         self._defaults.update(kwargs)
+        self._parsers.clear()
+
+    def copy(self):
+        """Return a new factory with the same parser defaults."""
+        factory = self.__class__()
+        factory.set_parser_defaults(**self._defaults)
+        return factory
 
     def create_parser(self, protocol_name):
-        parser_cls = PROTOCOL_PARSERS[protocol_name]
-        return parser_cls(**self._defaults)
+        if not self._defaults.get('compile_plans'):
+            parser_cls = PROTOCOL_PARSERS[protocol_name]
+            return parser_cls(**self._defaults)
+        parser = self._parsers.get(protocol_name)
+        if parser is None:
+            parser_cls = PROTOCOL_PARSERS[protocol_name]
+            parser = parser_cls(**self._defaults)
+            self._parsers[protocol_name] = parser
+        return parser
 
 
 def create_parser(protocol):
     return ResponseParserFactory().create_parser(protocol)
 
 
+def _identity(value):
+    return value
+
+
+def _text_converter(convert):
+    # The compiled equivalent of the ``_text_content`` decorator below.
+    def convert_text_content(node_or_string):
+        if hasattr(node_or_string, 'text'):
+            text = node_or_string.text
+            if text is None:
+                text = ''
+        else:
+            text = node_or_string
+        return convert(text)
+    return convert_text_content
+
+
 def _text_content(func):
     # This decorator hides the difference between
     # an XML node with text or a plain string.  It's used
@@ -179,6 +233,414 @@ class ResponseParserError(Exception):
     pass
 
 
+class ElementTreeXMLBackend(object):
+    """XML backend using the standard library's ``xml.etree`` module.
+
+    An XML backend turns a response body into a stream of parser target
+    events (``start``, ``data``, ``end`` and ``close``).  With no target,
+    ``parse`` returns an ``xml.etree`` compatible root element.
+
+    """
+    # Whether the XML parsers should build parsed responses directly
+    # from the backend's events instead of from an element tree.
+    STREAMING = False
+
+    def parse(self, xml_string, target=None, encoding='utf-8'):
+        if target is None:
+            target = ETree.TreeBuilder()
+        parser = ETree.XMLParser(target=target, encoding=encoding)
+        parser.feed(xml_string)
+        return parser.close()
+
+
+class LxmlXMLBackend(object):
+    """XML backend using ``lxml``, which must be installed separately."""
+    STREAMING = False
+
+    def __init__(self):
+        from lxml import etree
+        self._etree = etree
+
+    def parse(self, xml_string, target=None, encoding='utf-8'):
+        parser = self._etree.XMLParser(
+            target=target, encoding=encoding, remove_comments=True,
+            remove_pis=True, resolve_entities=False, no_network=True,
+            huge_tree=True)
+        try:
+            parser.feed(xml_string)
+            return parser.close()
+        except self._etree.XMLSyntaxError as e:
+            raise XMLParseError(str(e))
+
+
+class StreamingXMLBackend(object):
+    """XML backend that avoids building an element tree for responses.
+
+    When a response body maps to an output structure, the XML parsers
+    feed the events from this backend to a target that builds the parsed
+    response directly, guided by the output shape.  Anything else, such
+    as an error response, is parsed into an element tree as usual.
+
+    :param backend: The XML backend that produces the events.  Defaults
+        to ``ElementTreeXMLBackend``.
+
+    """
+    STREAMING = True
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = ElementTreeXMLBackend()
+        self._backend = backend
+
+    def parse(self, xml_string, target=None, encoding='utf-8'):
+        return self._backend.parse(xml_string, target, encoding)
+
+
+XML_BACKENDS = {
+    'etree': ElementTreeXMLBackend,
+    'lxml': LxmlXMLBackend,
+    'streaming': StreamingXMLBackend,
+}
+
+
+def create_xml_backend(name):
+    """Create an XML backend from its name in ``XML_BACKENDS``."""
+    try:
+        return XML_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(
+            "Unknown XML backend %r, must be one of: %s" % (
+                name, ', '.join(sorted(XML_BACKENDS))))
+
+
+# The classes below are used to build parsed responses directly from the
+# events of a StreamingXMLBackend.  Plans are compiled once per shape and
+# create a frame for each element.  A frame is told about each child
+# element (``start_child``, which returns the child's frame, and
+# ``end_child``, which receives the child's parsed value), and ``finish``
+# returns the element's parsed value given its text.  Scalars have no
+# state of their own, so their plan doubles as their frame.
+
+class _SkipFrame(object):
+    # Ignores an element and everything in it.
+    def start_child(self, tag, attrib):
+        return self
+
+    def end_child(self, value):
+        pass
+
+    def finish(self, text):
+        return None
+
+
+_SKIP_FRAME = _SkipFrame()
+
+
+class _ScalarPlan(object):
+    def __init__(self, convert):
+        self.finish = convert
+
+    def new_frame(self, attrib):
+        return self
+
+    def start_child(self, tag, attrib):
+        return _SKIP_FRAME
+
+    def end_child(self, value):
+        pass
+
+
+class _StructurePlan(object):
+    def __init__(self, compile_members, shape):
+        self.shape = shape
+        self.is_tagged_union = shape.is_tagged_union
+        self._compile_members = compile_members
+        self._members = None
+        self._attributes = None
+
+    def new_frame(self, attrib):
+        if self._members is None:
+            self._members, self._attributes = self._compile_members(
+                self.shape)
+        return _StructureFrame(self, self._members, self._attributes, attrib)
+
+
+class _StructureFrame(object):
+    __slots__ = ('_plan', '_members', '_parsed', '_current', '_tags')
+
+    def __init__(self, plan, members, attributes, attrib):
+        self._plan = plan
+        self._members = members
+        self._parsed = {}
+        self._current = None
+        self._tags = {}
+        if attributes and attrib:
+            for member_name, location_name, namespace_re in attributes:
+                prefix = location_name.split(':')[0] + ':'
+                for key, value in attrib.items():
+                    if namespace_re.sub(prefix, key) == location_name:
+                        self._parsed[member_name] = value
+
+    def start_child(self, tag, attrib):
+        if self._plan.is_tagged_union:
+            self._tags[tag] = None
+        member = self._members.get(tag)
+        self._current = member
+        if member is None:
+            return _SKIP_FRAME
+        return member[1].new_frame(attrib)
+
+    def end_child(self, value):
+        member = self._current
+        if member is None:
+            return
+        member_name, _, accumulate = member
+        parsed = self._parsed
+        if accumulate is None:
+            # Repeated elements for a member that isn't a flattened list
+            # or map use the first element, the same as the tree parser.
+            if member_name not in parsed:
+                parsed[member_name] = value
+        elif accumulate is list:
+            parsed.setdefault(member_name, []).append(value)
+        else:
+            parsed.setdefault(member_name, {})[value[0]] = value[1]
+
+    def finish(self, text):
+        if self._plan.is_tagged_union:
+            shape = self._plan.shape
+            if len(self._tags) != 1:
+                error_msg = (
+                    "Invalid service response: %s must have one and only "
+                    "one member set."
+                )
+                raise ResponseParserError(error_msg % shape.name)
+            tag = list(self._tags)[0]
+            if tag not in shape.members:
+                msg = (
+                    "Received a tagged union response with member "
+                    "unknown to client: %s. Please upgrade SDK for full "
+                    "response support."
+                )
+                LOG.info(msg % tag)
+                return {'SDK_UNKNOWN_MEMBER': {'name': tag}}
+        return self._parsed
+
+
+class _ListPlan(object):
+    def __init__(self, member_plan):
+        self.member_plan = member_plan
+
+    def new_frame(self, attrib):
+        return _ListFrame(self.member_plan)
+
+
+class _ListFrame(object):
+    __slots__ = ('_member_plan', '_parsed')
+
+    def __init__(self, member_plan):
+        self._member_plan = member_plan
+        self._parsed = []
+
+    def start_child(self, tag, attrib):
+        return self._member_plan.new_frame(attrib)
+
+    def end_child(self, value):
+        self._parsed.append(value)
+
+    def finish(self, text):
+        return self._parsed
+
+
+class _MapEntryPlan(object):
+    def __init__(self, key_name, key_plan, value_name, value_plan):
+        self.plans = {key_name: (0, key_plan), value_name: (1, value_plan)}
+
+    def new_frame(self, attrib):
+        return _MapEntryFrame(self.plans)
+
+
+class _MapEntryFrame(object):
+    __slots__ = ('_plans', '_entry', '_current')
+
+    def __init__(self, plans):
+        self._plans = plans
+        self._entry = [None, None]
+        self._current = None
+
+    def start_child(self, tag, attrib):
+        plan = self._plans.get(tag)
+        if plan is None:
+            raise ResponseParserError("Unknown tag: %s" % tag)
+        self._current = plan[0]
+        return plan[1].new_frame(attrib)
+
+    def end_child(self, value):
+        self._entry[self._current] = value
+
+    def finish(self, text):
+        return self._entry
+
+
+class _MapPlan(object):
+    def __init__(self, entry_plan):
+        self.entry_plan = entry_plan
+
+    def new_frame(self, attrib):
+        return _MapFrame(self.entry_plan)
+
+
+class _MapFrame(object):
+    __slots__ = ('_entry_plan', '_parsed')
+
+    def __init__(self, entry_plan):
+        self._entry_plan = entry_plan
+        self._parsed = {}
+
+    def start_child(self, tag, attrib):
+        return self._entry_plan.new_frame(attrib)
+
+    def end_child(self, value):
+        self._parsed[value[0]] = value[1]
+
+    def finish(self, text):
+        return self._parsed
+
+
+class _ResponsePlan(object):
+    # The plan for the root element of a query response.  If
+    # ``wrapper_name`` is given, the root element contains the element
+    # for ``plan`` as a child with that name, otherwise the root element
+    # itself is parsed with ``plan``.  The root's child named
+    # ``metadata_name`` is kept for the response metadata.
+    def __init__(self, plan, wrapper_name, metadata_name):
+        self.plan = plan
+        self.wrapper_name = wrapper_name
+        self.metadata_name = metadata_name
+
+    def new_frame(self, attrib):
+        return _ResponseFrame(self, attrib)
+
+
+class _ResponseFrame(object):
+    __slots__ = ('_plan', '_result', '_parsed', '_metadata', '_current')
+
+    def __init__(self, plan, attrib):
+        self._plan = plan
+        self._result = None
+        self._parsed = None
+        self._metadata = None
+        self._current = None
+        if plan.wrapper_name is None:
+            self._result = plan.plan.new_frame(attrib)
+
+    def start_child(self, tag, attrib):
+        plan = self._plan
+        if tag == plan.metadata_name:
+            self._current = 'metadata'
+            return _MetadataFrame()
+        if plan.wrapper_name is None:
+            self._current = 'member'
+            return self._result.start_child(tag, attrib)
+        if tag == plan.wrapper_name:
+            self._current = 'result'
+            return plan.plan.new_frame(attrib)
+        self._current = None
+        return _SKIP_FRAME
+
+    def end_child(self, value):
+        if self._current == 'metadata':
+            self._metadata = value
+        elif self._current == 'member':
+            self._result.end_child(value)
+        elif self._current == 'result':
+            self._parsed = value
+
+    def finish(self, text):
+        if self._plan.wrapper_name is None:
+            return self._result.finish(text), self._metadata
+        return self._parsed, self._metadata
+
+
+def _text_or_none(text):
+    # Matches the ``text`` attribute of an element, which is None rather
+    # than an empty string for an empty element.
+    return text or None
+
+
+_TEXT_OR_NONE_PLAN = _ScalarPlan(_text_or_none)
+
+
+class _MetadataFrame(object):
+    # Keeps the text of an element and of each of its children.
+    __slots__ = ('_children', '_current')
+
+    def __init__(self):
+        self._children = {}
+        self._current = None
+
+    def start_child(self, tag, attrib):
+        self._current = tag
+        return _TEXT_OR_NONE_PLAN
+
+    def end_child(self, value):
+        self._children[self._current] = value
+
+    def finish(self, text):
+        if self._children:
+            # Only the text before the first child is the element's text,
+            # which is whitespace at best.
+            text = None
+        return _text_or_none(text), self._children
+
+
+class _DocumentFrame(object):
+    # The outermost frame, which receives the root element.
+    def __init__(self, root_plan):
+        self._root_plan = root_plan
+        self.value = None
+
+    def start_child(self, tag, attrib):
+        return self._root_plan.new_frame(attrib)
+
+    def end_child(self, value):
+        self.value = value
+
+
+class _XMLShapeTarget(object):
+    # An ElementTree parser target that builds the parsed value for
+    # ``root_plan`` from the element events.  Only the text since the
+    # last start tag is kept, which is all a scalar element contains.
+    def __init__(self, root_plan):
+        self._document = _DocumentFrame(root_plan)
+        self._stack = [self._document]
+        self._text = []
+        self._tag_names = {}
+
+    def start(self, tag, attrib):
+        try:
+            tag_name = self._tag_names[tag]
+        except KeyError:
+            # Strip the namespace, the same as
+            # BaseXMLResponseParser._node_tag.
+            tag_name = tag[tag.rfind('}') + 1:]
+            self._tag_names[tag] = tag_name
+        stack = self._stack
+        stack.append(stack[-1].start_child(tag_name, attrib))
+        self._text = []
+
+    def data(self, data):
+        self._text.append(data)
+
+    def end(self, tag):
+        stack = self._stack
+        frame = stack.pop()
+        stack[-1].end_child(frame.finish(''.join(self._text)))
+
+    def close(self):
+        return self._document.value
+
+
 class ResponseParser(object):
     """Base class for response parsing.
 
@@ -195,17 +657,27 @@ class ResponseParser(object):
     DEFAULT_ENCODING = 'utf-8'
     EVENT_STREAM_PARSER_CLS = None
 
-    def __init__(self, timestamp_parser=None, blob_parser=None):
+    def __init__(self, timestamp_parser=None, blob_parser=None,
+                 compile_plans=False, xml_backend=None, json_codec=None):
         if timestamp_parser is None:
             timestamp_parser = DEFAULT_TIMESTAMP_PARSER
         self._timestamp_parser = timestamp_parser
         if blob_parser is None:
             blob_parser = self._default_blob_parser
         self._blob_parser = blob_parser
+        self._compile_plans = compile_plans
+        self._plan_cache = {}
+        if xml_backend is None:
+            xml_backend = ElementTreeXMLBackend()
+        self._xml_backend = xml_backend
+        if json_codec is None:
+            json_codec = StandardJSONCodec()
+        self._json_codec = json_codec
         self._event_stream_parser = None
         if self.EVENT_STREAM_PARSER_CLS is not None:
             self._event_stream_parser = self.EVENT_STREAM_PARSER_CLS(
-                timestamp_parser, blob_parser)
+                timestamp_parser, blob_parser, compile_plans, xml_backend,
+                json_codec)
 
     def _default_blob_parser(self, value):
         # Blobs are always returned as bytes type (this matters on python3).
@@ -307,10 +779,58 @@ class ResponseParser(object):
             "%s._do_modeled_error_parse" % self.__class__.__name__)
 
     def _parse_shape(self, shape, node):
+        if self._compile_plans:
+            return self._get_compiled(shape)(node)
         handler = getattr(self, '_handle_%s' % shape.type_name,
                           self._default_handle)
         return handler(shape, node)
 
+    def _get_compiled(self, shape):
+        # Only top level shapes (output shapes, error shapes and their
+        # members) reach this method.  These are all cached on the model
+        # objects, so they can be used directly as cache keys.
+        return self._get_plan(shape, self._compile, shape)
+
+    def _get_plan(self, key, compiler, *args):
+        try:
+            return self._plan_cache[key]
+        except KeyError:
+            plan = compiler(*args)
+            self._plan_cache[key] = plan
+            return plan
+
+    def _compile(self, shape):
+        compiler = getattr(self, '_compile_%s' % shape.type_name,
+                           self._compile_default)
+        return compiler(shape)
+
+    def _compile_lazily(self, compiler, shape):
+        # Returns a function that returns ``compiler(shape)``, compiling it
+        # on the first call.  Structures use this for their members so
+        # that recursive shapes don't recurse forever at compile time.
+        compiled = []
+
+        def get_compiled():
+            if not compiled:
+                compiled.append(compiler(shape))
+            return compiled[0]
+        return get_compiled
+
+    # The _compile_* methods mirror the _handle_* methods.  Each returns a
+    # function that takes the raw node and returns the parsed value.
+
+    def _compile_list(self, shape):
+        parse_member = self._compile(shape.member)
+        if parse_member is _identity:
+            return list
+
+        def parse_list(node):
+            return [parse_member(item) for item in node]
+        return parse_list
+
+    def _compile_default(self, shape):
+        return _identity
+
     def _handle_list(self, shape, node):
         # Enough implementations share list serialization that it's moved
         # up here in the base class.
@@ -355,9 +875,13 @@ class ResponseParser(object):
 
 
 class BaseXMLResponseParser(ResponseParser):
-    def __init__(self, timestamp_parser=None, blob_parser=None):
+    def __init__(self, timestamp_parser=None, blob_parser=None,
+                 compile_plans=False, xml_backend=None, json_codec=None):
         super(BaseXMLResponseParser, self).__init__(timestamp_parser,
-                                                    blob_parser)
+                                                    blob_parser,
+                                                    compile_plans,
+                                                    xml_backend,
+                                                    json_codec)
         self._namespace_re = re.compile('{.*}')
 
     def _handle_map(self, shape, node):
@@ -472,18 +996,77 @@ class BaseXMLResponseParser(ResponseParser):
         return xml_dict
 
     def _parse_xml_string_to_dom(self, xml_string):
+        return self._parse_xml_string(xml_string)
+
+    def _parse_xml_string(self, xml_string, target=None):
         try:
-            parser = ETree.XMLParser(
-                target=ETree.TreeBuilder(),
-                encoding=self.DEFAULT_ENCODING)
-            parser.feed(xml_string)
-            root = parser.close()
+            return self._xml_backend.parse(
+                xml_string, target, self.DEFAULT_ENCODING)
         except XMLParseError as e:
             raise ResponseParserError(
                 "Unable to parse response (%s), "
                 "invalid XML received. Further retries may succeed:\n%s" %
                 (e, xml_string))
-        return root
+
+    def _can_stream(self, xml_string, shape):
+        # Whether the XML backend's events can be turned directly into
+        # the parsed value for ``shape``.  Modeled errors are left to the
+        # tree parser, since their root can vary.
+        return (
+            self._xml_backend.STREAMING and bool(xml_string) and
+            shape.type_name == 'structure' and
+            not shape.metadata.get('exception', False)
+        )
+
+    def _get_stream_plan(self, shape):
+        return self._get_plan(('stream', shape), self._compile_stream, shape)
+
+    def _compile_stream(self, shape):
+        type_name = shape.type_name
+        if type_name == 'structure':
+            return _StructurePlan(self._compile_stream_members, shape)
+        elif type_name == 'list':
+            return _ListPlan(self._compile_stream(shape.member))
+        elif type_name == 'map':
+            return _MapPlan(self._compile_stream_map_entry(shape))
+        return _ScalarPlan(self._compile(shape))
+
+    def _compile_stream_map_entry(self, shape):
+        return _MapEntryPlan(
+            shape.key.serialization.get('name') or 'key',
+            self._compile_stream(shape.key),
+            shape.value.serialization.get('name') or 'value',
+            self._compile_stream(shape.value),
+        )
+
+    def _compile_stream_members(self, shape):
+        # Returns the members of a structure keyed by their XML element
+        # name, and the members that are serialized as XML attributes.
+        # Flattened lists and maps are accumulated from each element with
+        # the member's name rather than parsed from a wrapper element.
+        members = {}
+        attributes = []
+        for member_name, member_shape in shape.members.items():
+            serialization = member_shape.serialization
+            if 'location' in serialization or \
+               serialization.get('eventheader'):
+                continue
+            if serialization.get('xmlAttribute'):
+                attributes.append(
+                    (member_name, serialization['name'], self._namespace_re))
+                continue
+            flattened = serialization.get('flattened')
+            if flattened and member_shape.type_name == 'list':
+                member = (member_name,
+                          self._compile_stream(member_shape.member), list)
+            elif flattened and member_shape.type_name == 'map':
+                member = (member_name,
+                          self._compile_stream_map_entry(member_shape), dict)
+            else:
+                member = (member_name,
+                          self._compile_stream(member_shape), None)
+            members[self._member_key_name(member_shape, member_name)] = member
+        return members, attributes
 
     def _replace_nodes(self, parsed):
         for key, value in parsed.items():
@@ -494,6 +1077,113 @@ class BaseXMLResponseParser(ResponseParser):
                 parsed[key] = value.text
         return parsed
 
+    def _compile_map(self, shape):
+        parse_key = self._compile(shape.key)
+        parse_value = self._compile(shape.value)
+        key_location_name = shape.key.serialization.get('name') or 'key'
+        value_location_name = shape.value.serialization.get('name') or 'value'
+        flattened = shape.serialization.get('flattened')
+        node_tag = self._node_tag
+
+        def parse_map(node):
+            parsed = {}
+            if flattened and not isinstance(node, list):
+                node = [node]
+            for keyval_node in node:
+                for single_pair in keyval_node:
+                    tag_name = node_tag(single_pair)
+                    if tag_name == key_location_name:
+                        key_name = parse_key(single_pair)
+                    elif tag_name == value_location_name:
+                        val_name = parse_value(single_pair)
+                    else:
+                        raise ResponseParserError(
+                            "Unknown tag: %s" % tag_name)
+                parsed[key_name] = val_name
+            return parsed
+        return parse_map
+
+    def _compile_list(self, shape):
+        parse_list = super(BaseXMLResponseParser, self)._compile_list(shape)
+        if not shape.serialization.get('flattened'):
+            return parse_list
+
+        def parse_flattened_list(node):
+            if not isinstance(node, list):
+                node = [node]
+            return parse_list(node)
+        return parse_flattened_list
+
+    def _compile_structure(self, shape):
+        get_members = self._compile_lazily(self._compile_members, shape)
+        is_exception = shape.metadata.get('exception', False)
+        is_tagged_union = shape.is_tagged_union
+        namespace_re = self._namespace_re
+
+        def parse_structure(node):
+            parsed = {}
+            if is_exception:
+                node = self._get_error_root(node)
+            xml_dict = self._build_name_to_xml_node(node)
+            if is_tagged_union and \
+                    self._has_unknown_tagged_union_member(shape, xml_dict):
+                tag = self._get_first_key(xml_dict)
+                return self._handle_unknown_tagged_union_member(tag)
+            for member_name, xml_name, parse_member, attribute_name in \
+                    get_members():
+                member_node = xml_dict.get(xml_name)
+                if member_node is not None:
+                    parsed[member_name] = parse_member(member_node)
+                elif attribute_name is not None:
+                    attribute_prefix = attribute_name.split(':')[0] + ':'
+                    for key, value in node.attrib.items():
+                        if namespace_re.sub(attribute_prefix, key) == \
+                                attribute_name:
+                            parsed[member_name] = value
+            return parsed
+        return parse_structure
+
+    def _compile_members(self, shape):
+        compiled_members = []
+        members = shape.members
+        for member_name in members:
+            member_shape = members[member_name]
+            if 'location' in member_shape.serialization or \
+               member_shape.serialization.get('eventheader'):
+                continue
+            attribute_name = None
+            if member_shape.serialization.get('xmlAttribute'):
+                attribute_name = member_shape.serialization['name']
+            compiled_members.append((
+                member_name,
+                self._member_key_name(member_shape, member_name),
+                self._compile(member_shape),
+                attribute_name,
+            ))
+        return compiled_members
+
+    def _compile_boolean(self, shape):
+        return _text_converter(lambda text: text == 'true')
+
+    def _compile_float(self, shape):
+        return _text_converter(float)
+
+    def _compile_timestamp(self, shape):
+        return _text_converter(self._timestamp_parser)
+
+    def _compile_integer(self, shape):
+        return _text_converter(int)
+
+    def _compile_string(self, shape):
+        return _text_converter(_identity)
+
+    def _compile_blob(self, shape):
+        return _text_converter(self._blob_parser)
+
+    _compile_character = _compile_string
+    _compile_double = _compile_float
+    _compile_long = _compile_integer
+
     @_text_content
     def _handle_boolean(self, shape, text):
         if text == 'true':
@@ -552,6 +1242,9 @@ class QueryParser(BaseXMLResponseParser):
 
     def _parse_body_as_xml(self, response, shape, inject_metadata=True):
         xml_contents = response['body']
+        if inject_metadata and shape is not None and \
+                self._can_stream(xml_contents, shape):
+            return self._stream_body_as_xml(xml_contents, shape)
         root = self._parse_xml_string_to_dom(xml_contents)
         parsed = {}
         if shape is not None:
@@ -565,6 +1258,30 @@ class QueryParser(BaseXMLResponseParser):
             self._inject_response_metadata(root, parsed)
         return parsed
 
+    def _stream_body_as_xml(self, xml_contents, shape):
+        root_plan = self._get_plan(
+            ('response', shape), self._compile_stream_response, shape)
+        parsed, metadata = self._parse_xml_string(
+            xml_contents, _XMLShapeTarget(root_plan))
+        if parsed is None:
+            # The result wrapper element is missing, which the tree
+            # parsers fail on in the same way.
+            raise KeyError(root_plan.wrapper_name)
+        if metadata is not None:
+            self._inject_streamed_response_metadata(metadata, parsed)
+        return parsed
+
+    def _compile_stream_response(self, shape):
+        return _ResponsePlan(
+            self._get_stream_plan(shape),
+            shape.serialization.get('resultWrapper'),
+            'ResponseMetadata')
+
+    def _inject_streamed_response_metadata(self, metadata, inject_into):
+        # ``metadata`` is the text of the response metadata element and a
+        # dict of the text of each of its children.
+        inject_into['ResponseMetadata'] = metadata[1]
+
     def _find_result_wrapped_shape(self, element_name, xml_root_node):
         mapping = self._build_name_to_xml_node(xml_root_node)
         return mapping[element_name]
@@ -581,6 +1298,15 @@ class QueryParser(BaseXMLResponseParser):
 
 class EC2QueryParser(QueryParser):
 
+    def _compile_stream_response(self, shape):
+        return _ResponsePlan(
+            self._get_stream_plan(shape),
+            shape.serialization.get('resultWrapper'),
+            'requestId')
+
+    def _inject_streamed_response_metadata(self, metadata, inject_into):
+        inject_into['ResponseMetadata'] = {'RequestId': metadata[0]}
+
     def _inject_response_metadata(self, node, inject_into):
         mapping = self._build_name_to_xml_node(node)
         child_node = mapping.get('requestId')
@@ -659,6 +1385,53 @@ class BaseJSONParser(ResponseParser):
     def _handle_timestamp(self, shape, value):
         return self._timestamp_parser(value)
 
+    def _compile_structure(self, shape):
+        if shape.is_document_type:
+            return _identity
+        get_members = self._compile_lazily(self._compile_members, shape)
+        is_tagged_union = shape.is_tagged_union
+
+        def parse_structure(value):
+            if value is None:
+                return None
+            if is_tagged_union and \
+                    self._has_unknown_tagged_union_member(shape, value):
+                tag = self._get_first_key(value)
+                return self._handle_unknown_tagged_union_member(tag)
+            final_parsed = {}
+            for member_name, json_name, parse_member in get_members():
+                raw_value = value.get(json_name)
+                if raw_value is not None:
+                    final_parsed[member_name] = parse_member(raw_value)
+            return final_parsed
+        return parse_structure
+
+    def _compile_members(self, shape):
+        members = shape.members
+        return [
+            (member_name,
+             members[member_name].serialization.get('name', member_name),
+             self._compile(members[member_name]))
+            for member_name in members
+        ]
+
+    def _compile_map(self, shape):
+        parse_key = self._compile(shape.key)
+        parse_value = self._compile(shape.value)
+
+        def parse_map(value):
+            parsed = {}
+            for key, value in value.items():
+                parsed[parse_key(key)] = parse_value(value)
+            return parsed
+        return parse_map
+
+    def _compile_blob(self, shape):
+        return self._blob_parser
+
+    def _compile_timestamp(self, shape):
+        return self._timestamp_parser
+
     def _do_error_parse(self, response, shape):
         body = self._parse_body_as_json(response['body'])
         error = {"Error": {"Message": '', "Code": ''}, "ResponseMetadata": {}}
@@ -694,14 +1467,12 @@ class BaseJSONParser(ResponseParser):
     def _parse_body_as_json(self, body_contents):
         if not body_contents:
             return {}
-        body = body_contents.decode(self.DEFAULT_ENCODING)
         try:
-            original_parsed = json.loads(body)
-            return original_parsed
+            return self._json_codec.loads(body_contents)
         except ValueError:
             # if the body cannot be parsed, include
             # the literal string as the message
-            return {'message': body}
+            return {'message': body_contents.decode(self.DEFAULT_ENCODING)}
 
 
 class BaseEventStreamParser(ResponseParser):
@@ -886,14 +1657,16 @@ class BaseRestParser(ResponseParser):
                     body = body.decode(self.DEFAULT_ENCODING)
                 final_parsed[payload_member_name] = body
             else:
-                original_parsed = self._initial_body_parse(response['body'])
-                final_parsed[payload_member_name] = self._parse_shape(
-                    body_shape, original_parsed)
+                final_parsed[payload_member_name] = self._parse_body(
+                    response['body'], body_shape)
         else:
-            original_parsed = self._initial_body_parse(response['body'])
-            body_parsed = self._parse_shape(shape, original_parsed)
+            body_parsed = self._parse_body(response['body'], shape)
             final_parsed.update(body_parsed)
 
+    def _parse_body(self, body_contents, shape):
+        original_parsed = self._initial_body_parse(body_contents)
+        return self._parse_shape(shape, original_parsed)
+
     def _parse_non_payload_attrs(self, response, shape,
                                  member_shapes, final_parsed):
         headers = response['headers']
@@ -948,6 +1721,26 @@ class BaseRestParser(ResponseParser):
             node = [e.strip() for e in node.split(',')]
         return super(BaseRestParser, self)._handle_list(shape, node)
 
+    def _compile_string(self, shape):
+        if not is_json_value_header(shape):
+            return _identity
+        encoding = self.DEFAULT_ENCODING
+
+        def parse_json_value_header(value):
+            return json.loads(base64.b64decode(value).decode(encoding))
+        return parse_json_value_header
+
+    def _compile_list(self, shape):
+        parse_list = super(BaseRestParser, self)._compile_list(shape)
+        if shape.serialization.get('location') != 'header':
+            return parse_list
+
+        def parse_header_list(node):
+            if not isinstance(node, list):
+                node = [e.strip() for e in node.split(',')]
+            return parse_list(node)
+        return parse_header_list
+
 
 class RestJSONParser(BaseRestParser, BaseJSONParser):
 
@@ -985,6 +1778,13 @@ class RestXMLParser(BaseRestParser, BaseXMLResponseParser):
             return ETree.Element('')
         return self._parse_xml_string_to_dom(xml_string)
 
+    def _parse_body(self, body_contents, shape):
+        if self._can_stream(body_contents, shape):
+            return self._parse_xml_string(
+                body_contents,
+                _XMLShapeTarget(self._get_stream_plan(shape)))
+        return super(RestXMLParser, self)._parse_body(body_contents, shape)
+
     def _do_error_parse(self, response, shape):
         # We're trying to be service agnostic here, but S3 does have a slightly
         # different response structure for its errors compared to other
@@ -1052,6 +1852,10 @@ class RestXMLParser(BaseRestParser, BaseXMLResponseParser):
         text = super(RestXMLParser, self)._handle_string(shape, text)
         return text
 
+    def _compile_string(self, shape):
+        return _text_converter(
+            super(RestXMLParser, self)._compile_string(shape))
+
 
 PROTOCOL_PARSERS = {
     'ec2': EC2QueryParser,
@@ -143,6 +143,75 @@ class StreamingBody(object):
         self._raw_stream.close()
 
 
+class AsyncStreamingBody(object):
+    """Wrapper class for an http response body of an asyncio client.
+
+    This is the asyncio counterpart of ``StreamingBody``, its methods are
+    coroutines and its iterators are asynchronous::
+
+        body = response['Body']
+        async for chunk in body:
+            ...
+
+    As with ``StreamingBody``, if the amount of bytes read does not match
+    the content length, an exception is raised.
+
+    """
+    _DEFAULT_CHUNK_SIZE = 1024
+
+    def __init__(self, raw_stream, content_length):
+        self._raw_stream = raw_stream
+        self._content_length = content_length
+        self._amount_read = 0
+
+    async def read(self, amt=None):
+        """Read at most amt bytes from the stream.
+
+        If the amt argument is omitted, read all data.
+        """
+        chunk = await self._raw_stream.read(amt)
+        self._amount_read += len(chunk)
+        if amt is None or (not chunk and amt > 0):
+            self._verify_content_length()
+        return chunk
+
+    def __aiter__(self):
+        """Return an iterator to yield 1k chunks from the raw stream."""
+        return self.iter_chunks(self._DEFAULT_CHUNK_SIZE)
+
+    async def iter_lines(self, chunk_size=1024, keepends=False):
+        """Return an iterator to yield lines from the raw stream."""
+        pending = b''
+        async for chunk in self.iter_chunks(chunk_size):
+            lines = (pending + chunk).splitlines(True)
+            for line in lines[:-1]:
+                yield line.splitlines(keepends)[0]
+            pending = lines[-1]
+        if pending:
+            yield pending.splitlines(keepends)[0]
+
+    async def iter_chunks(self, chunk_size=_DEFAULT_CHUNK_SIZE):
+        """Return an iterator to yield chunks of chunk_size bytes from the raw
+        stream.
+        """
+        while True:
+            current_chunk = await self.read(chunk_size)
+            if current_chunk == b"":
+                break
+            yield current_chunk
+
+    def _verify_content_length(self):
+        if self._content_length is not None and \
+                self._amount_read != int(self._content_length):
+            raise IncompleteReadError(
+                actual_bytes=self._amount_read,
+                expected_bytes=int(self._content_length))
+
+    def close(self):
+        """Close the underlying http response stream."""
+        self._raw_stream.close()
+
+
 def get_response(operation_model, http_response):
     protocol = operation_model.metadata['protocol']
     response_dict = {
@@ -1,38 +1,215 @@
 import math
 import logging
 import threading
+import time
 
+from botocore.compat import OrderedDict
+from botocore.exceptions import CapacityNotAvailableError
+from botocore.exceptions import SendDeferredError
 from botocore.retries import bucket
+from botocore.retries import scheduler
+from botocore.retries import shared
 from botocore.retries import throttling
 from botocore.retries import standard
 
 
 logger = logging.getLogger(__name__)
 
+CLIENT_SCOPE = 'client'
+ENDPOINT_SCOPE = 'endpoint'
+RATE_LIMITER_REGISTRY = None
+_RATE_LIMITER_REGISTRY_LOCK = threading.Lock()
 
-def register_retry_handler(client):
+
+def get_rate_limiter_registry():
+    global RATE_LIMITER_REGISTRY
+    if RATE_LIMITER_REGISTRY is None:
+        with _RATE_LIMITER_REGISTRY_LOCK:
+            if RATE_LIMITER_REGISTRY is None:
+                RATE_LIMITER_REGISTRY = RateLimiterRegistry()
+    return RATE_LIMITER_REGISTRY
+
+
+def register_retry_handler(client, shared_state=None, scope=CLIENT_SCOPE,
+                           resource_param=None, metrics=None):
+    if scope == ENDPOINT_SCOPE:
+        limiter = ScopedRateLimiter(
+            registry=get_rate_limiter_registry(),
+            service_name=client.meta.service_model.service_name,
+            region_name=client.meta.region_name,
+            endpoint_url=client.meta.endpoint_url,
+            resource_param=resource_param,
+            shared_state=shared_state,
+            metrics=metrics,
+        )
+        if resource_param is not None:
+            client.meta.events.register(
+                'before-parameter-build', limiter.on_building_parameters,
+            )
+        client.meta.events.register(
+            'before-send', limiter.on_sending_request,
+        )
+        client.meta.events.register(
+            'needs-retry', limiter.on_receiving_response,
+        )
+        return limiter
     clock = bucket.Clock()
+    throttling_detector = _create_throttling_detector()
+    if shared_state is not None:
+        limiter = SharedClientRateLimiter(
+            store=shared_state,
+            name=shared.get_record_name('rate-limiter', client),
+            throttling_detector=throttling_detector,
+            clock=clock,
+            metrics=metrics,
+        )
+    else:
+        limiter = _create_rate_limiter(
+            throttling_detector, clock, metrics=metrics)
+    client.meta.events.register(
+        'before-send', limiter.on_sending_request,
+    )
+    client.meta.events.register(
+        'needs-retry', limiter.on_receiving_response,
+    )
+    return limiter
+
+
+def _create_throttling_detector():
+    return standard.ThrottlingErrorDetector(
+        retry_event_adapter=standard.RetryEventAdapter(),
+    )
+
+
+def _create_rate_limiter(throttling_detector, clock, metrics=None):
     rate_adjustor = throttling.CubicCalculator(starting_max_rate=0,
                                                start_time=clock.current_time())
     token_bucket = bucket.TokenBucket(max_rate=1, clock=clock)
     rate_clocker = RateClocker(clock)
-    throttling_detector = standard.ThrottlingErrorDetector(
-        retry_event_adapter=standard.RetryEventAdapter(),
-    )
-    limiter = ClientRateLimiter(
+    return ClientRateLimiter(
         rate_adjustor=rate_adjustor,
         rate_clocker=rate_clocker,
         token_bucket=token_bucket,
         throttling_detector=throttling_detector,
         clock=clock,
+        metrics=metrics,
     )
-    client.meta.events.register(
-        'before-send', limiter.on_sending_request,
-    )
-    client.meta.events.register(
-        'needs-retry', limiter.on_receiving_response,
-    )
-    return limiter
+
+
+class RateLimiterRegistry(object):
+    """A process wide registry of client side rate limiters.
+
+    Clients of the same service, region and endpoint that use the
+    ``endpoint`` rate limiter scope share the rate limiter of the
+    registry, whichever session created them, so they learn a single
+    send rate and draw from a single token bucket.  Rate limiters can
+    be further partitioned by a resource, such as the name of a
+    DynamoDB table, so that throttling of one resource does not slow
+    down requests to the others.
+
+    At most ``max_size`` rate limiters are kept.  When a new one is
+    needed beyond that, the least recently used rate limiter is dropped,
+    and the next request to its resource starts over with a new one.
+
+    """
+    def __init__(self, clock=None, max_size=1024):
+        if clock is None:
+            clock = bucket.Clock()
+        self._clock = clock
+        self._max_size = max_size
+        self._throttling_detector = _create_throttling_detector()
+        self._rate_limiters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_rate_limiter(self, service_name, region_name, endpoint_url,
+                         resource=None, shared_state=None):
+        """Return the rate limiter for a service, region and endpoint.
+
+        :param resource: An optional key, such as a table name, used to
+            partition the rate limiters of the endpoint.
+
+        :param shared_state: An optional ``botocore.retries.shared``
+            store in which the rate limiter keeps its state, to share it
+            with other processes.
+
+        """
+        key = (service_name, region_name, endpoint_url, resource,
+               shared_state)
+        with self._lock:
+            rate_limiter = self._rate_limiters.get(key)
+            if rate_limiter is not None:
+                self._rate_limiters.move_to_end(key)
+                return rate_limiter
+            rate_limiter = self._create_rate_limiter(key)
+            self._rate_limiters[key] = rate_limiter
+            while len(self._rate_limiters) > self._max_size:
+                self._rate_limiters.popitem(last=False)
+        return rate_limiter
+
+    def _create_rate_limiter(self, key):
+        service_name, region_name, endpoint_url, resource, shared_state = key
+        if shared_state is None:
+            return _create_rate_limiter(
+                self._throttling_detector, self._clock)
+        name = shared.format_record_name(
+            'rate-limiter', service_name, region_name, endpoint_url,
+            resource)
+        return SharedClientRateLimiter(
+            store=shared_state,
+            name=name,
+            throttling_detector=self._throttling_detector,
+            clock=self._clock,
+        )
+
+
+class ScopedRateLimiter(object):
+    """Sends the requests of a client through a ``RateLimiterRegistry``.
+
+    When ``resource_param`` is provided, each request is rate limited
+    with the limiter of the value of that parameter, falling back to the
+    limiter of the endpoint when the parameter isn't provided.
+
+    """
+    _CONTEXT_KEY = 'rate_limiter_resource'
+
+    def __init__(self, registry, service_name, region_name, endpoint_url,
+                 resource_param=None, shared_state=None, metrics=None):
+        self._registry = registry
+        self._metrics = metrics
+        self._service_name = service_name
+        self._region_name = region_name
+        self._endpoint_url = endpoint_url
+        self._resource_param = resource_param
+        self._shared_state = shared_state
+
+    # Hooked up to before-parameter-build.
+    def on_building_parameters(self, params, context, **kwargs):
+        resource = params.get(self._resource_param)
+        if isinstance(resource, str):
+            context[self._CONTEXT_KEY] = resource
+
+    def on_sending_request(self, request, context=None, **kwargs):
+        self.get_rate_limiter(context).on_sending_request(
+            request=request, context=context)
+
+    # Hooked up to needs-retry.
+    def on_receiving_response(self, **kwargs):
+        request_dict = kwargs.get('request_dict') or {}
+        fill_rate = self.get_rate_limiter(
+            request_dict.get('context')).update_send_rate(**kwargs)
+        # The rate limiter may be shared with other clients, so the fill
+        # rates are recorded in the metrics of the client that received
+        # the response.
+        if fill_rate is not None and self._metrics is not None:
+            self._metrics.record_fill_rate(fill_rate, time.time())
+
+    def get_rate_limiter(self, context=None):
+        resource = None
+        if context is not None:
+            resource = context.get(self._CONTEXT_KEY)
+        return self._registry.get_rate_limiter(
+            self._service_name, self._region_name, self._endpoint_url,
+            resource=resource, shared_state=self._shared_state)
 
 
 class ClientRateLimiter(object):
@@ -40,21 +217,42 @@ class ClientRateLimiter(object):
     _MAX_RATE_ADJUST_SCALE = 2.0
 
     def __init__(self, rate_adjustor, rate_clocker, token_bucket,
-                 throttling_detector, clock):
+                 throttling_detector, clock, metrics=None):
         self._rate_adjustor = rate_adjustor
         self._rate_clocker = rate_clocker
         self._token_bucket = token_bucket
         self._throttling_detector = throttling_detector
         self._clock = clock
+        self._metrics = metrics
         self._enabled = False
         self._lock = threading.Lock()
 
-    def on_sending_request(self, request, **kwargs):
-        if self._enabled:
+    def on_sending_request(self, request, context=None, **kwargs):
+        if not self._enabled:
+            return
+        if not scheduler.is_send_deferrable(context):
             self._token_bucket.acquire()
+            return
+        try:
+            self._token_bucket.acquire(block=False)
+        except CapacityNotAvailableError as e:
+            raise SendDeferredError(delay=e.kwargs['retry_after'])
 
     # Hooked up to needs-retry.
     def on_receiving_response(self, **kwargs):
+        fill_rate = self.update_send_rate(**kwargs)
+        if fill_rate is not None and self._metrics is not None:
+            self._metrics.record_fill_rate(
+                fill_rate, self._clock.current_time())
+
+    def update_send_rate(self, **kwargs):
+        """Adjust the send rate to the response of an attempt.
+
+        This expects the kwargs of the needs-retry event.  The new fill
+        rate of the token bucket is returned, or ``None`` if requests
+        aren't rate limited yet.
+
+        """
         measured_rate = self._rate_clocker.record()
         timestamp = self._clock.current_time()
         with self._lock:
@@ -74,6 +272,9 @@ class ClientRateLimiter(object):
                 self._enabled = True
             self._token_bucket.max_rate = min(
                 new_rate, self._MAX_RATE_ADJUST_SCALE * measured_rate)
+            if not self._enabled:
+                return None
+            return self._token_bucket.max_rate
 
 
 class RateClocker(object):
@@ -113,3 +314,145 @@ class RateClocker(object):
     @property
     def measured_rate(self):
         return self._measured_rate
+
+
+class SharedClientRateLimiter(object):
+    """A ``ClientRateLimiter`` kept in a record of a shared state store.
+
+    The token bucket, the CUBIC parameters and the measured send rate of
+    the limiter all live in the one record, so the processes sharing it
+    learn a single send rate and draw their requests from a single
+    token bucket.  See ``botocore.retries.shared`` for the stores.
+
+    """
+    _MAX_RATE_ADJUST_SCALE = ClientRateLimiter._MAX_RATE_ADJUST_SCALE
+    _MIN_RATE = bucket.TokenBucket._MIN_RATE
+    _SMOOTHING = RateClocker._DEFAULT_SMOOTHING
+    _TIME_BUCKET_RANGE = RateClocker._TIME_BUCKET_RANGE
+
+    def __init__(self, store, name, throttling_detector, clock,
+                 metrics=None):
+        self._store = store
+        self._name = name
+        self._throttling_detector = throttling_detector
+        self._clock = clock
+        self._metrics = metrics
+        now = clock.current_time()
+        self._defaults = {
+            'enabled': 0.0,
+            'fill_rate': 1.0,
+            'max_capacity': 1.0,
+            'current_capacity': 0.0,
+            'last_timestamp': now,
+            'w_max': 0.0,
+            'last_fail': now,
+            'measured_rate': 0.0,
+            'request_count': 0.0,
+            'last_bucket': math.floor(now),
+        }
+
+    def on_sending_request(self, request, context=None, **kwargs):
+        while True:
+            sleep_amount = self._store.update(
+                self._name, self._defaults, self._acquire_token)
+            if sleep_amount is None:
+                return
+            if scheduler.is_send_deferrable(context):
+                raise SendDeferredError(delay=sleep_amount)
+            self._clock.sleep(sleep_amount)
+
+    def _acquire_token(self, state):
+        # Returns how long to wait for a token, or None once one was
+        # taken.
+        if not state['enabled']:
+            return None
+        self._refill(state, self._clock.current_time())
+        if state['current_capacity'] >= 1:
+            state['current_capacity'] -= 1
+            return None
+        return (1 - state['current_capacity']) / state['fill_rate']
+
+    # Hooked up to needs-retry.
+    def on_receiving_response(self, **kwargs):
+        fill_rate = self.update_send_rate(**kwargs)
+        if fill_rate is not None and self._metrics is not None:
+            self._metrics.record_fill_rate(
+                fill_rate, self._clock.current_time())
+
+    def update_send_rate(self, **kwargs):
+        """See ``ClientRateLimiter.update_send_rate``."""
+        is_throttling_error = self._throttling_detector.is_throttling_error(
+            **kwargs)
+        if not is_throttling_error:
+            return self._store.update(
+                self._name, self._defaults, self._success_received)
+        new_rate, measured_rate, capacity, fill_rate = self._store.update(
+            self._name, self._defaults, self._throttle_received)
+        logger.debug("Throttling response received, new send rate: %s "
+                     "measured rate: %s, token bucket capacity "
+                     "available: %s", new_rate, measured_rate, capacity)
+        return fill_rate
+
+    def _success_received(self, state):
+        timestamp = self._clock.current_time()
+        measured_rate = self._record_rate(state, timestamp)
+        new_rate = self._get_rate_adjustor(state).success_received(timestamp)
+        self._set_max_rate(
+            state,
+            min(new_rate, self._MAX_RATE_ADJUST_SCALE * measured_rate),
+            timestamp)
+        if not state['enabled']:
+            return None
+        return state['fill_rate']
+
+    def _throttle_received(self, state):
+        timestamp = self._clock.current_time()
+        measured_rate = self._record_rate(state, timestamp)
+        rate_adjustor = self._get_rate_adjustor(state)
+        if not state['enabled']:
+            rate_to_use = measured_rate
+        else:
+            rate_to_use = min(measured_rate, state['fill_rate'])
+        new_rate = rate_adjustor.error_received(rate_to_use, timestamp)
+        params = rate_adjustor.get_params_snapshot()
+        state['w_max'] = params.w_max
+        state['last_fail'] = params.last_fail
+        capacity = state['current_capacity']
+        state['enabled'] = 1.0
+        self._set_max_rate(
+            state,
+            min(new_rate, self._MAX_RATE_ADJUST_SCALE * measured_rate),
+            timestamp)
+        return new_rate, measured_rate, capacity, state['fill_rate']
+
+    def _get_rate_adjustor(self, state):
+        return throttling.CubicCalculator(
+            starting_max_rate=state['w_max'], start_time=state['last_fail'])
+
+    def _record_rate(self, state, timestamp):
+        scale = 1 / self._TIME_BUCKET_RANGE
+        time_bucket = math.floor(timestamp * scale) / scale
+        state['request_count'] += 1
+        if time_bucket > state['last_bucket']:
+            current_rate = state['request_count'] / float(
+                time_bucket - state['last_bucket'])
+            state['measured_rate'] = (
+                (current_rate * self._SMOOTHING) +
+                (state['measured_rate'] * (1 - self._SMOOTHING))
+            )
+            state['request_count'] = 0
+            state['last_bucket'] = time_bucket
+        return state['measured_rate']
+
+    def _refill(self, state, timestamp):
+        fill_amount = (timestamp - state['last_timestamp']) * state['fill_rate']
+        state['current_capacity'] = min(
+            state['max_capacity'], state['current_capacity'] + fill_amount)
+        state['last_timestamp'] = timestamp
+
+    def _set_max_rate(self, state, value, timestamp):
+        self._refill(state, timestamp)
+        state['fill_rate'] = max(value, self._MIN_RATE)
+        state['max_capacity'] = max(value, 1)
+        state['current_capacity'] = min(
+            state['current_capacity'], state['max_capacity'])
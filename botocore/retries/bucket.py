@@ -72,7 +72,9 @@ class TokenBucket(object):
         capacity to acquire the desired amount.
 
         If block is False, then this method will return True is capacity
-        was successfully acquired, False otherwise.
+        was successfully acquired.  Otherwise it raises a
+        CapacityNotAvailableError whose ``retry_after`` keyword argument
+        is the number of seconds until the capacity will be available.
 
         """
         with self._new_fill_rate_condition:
@@ -85,7 +87,8 @@ class TokenBucket(object):
             return True
         else:
             if not block:
-                raise CapacityNotAvailableError()
+                raise CapacityNotAvailableError(
+                    retry_after=self._sleep_amount(amount))
             # Not enough capacity.
             sleep_amount = self._sleep_amount(amount)
             while sleep_amount > 0:
@@ -0,0 +1,225 @@
+"""Hedged requests for idempotent operations.
+
+Retries only help once an attempt has failed.  For idempotent reads the
+latency of a call is often dominated by the occasional slow attempt, so
+when hedging is enabled a duplicate attempt is sent once the first one
+has been outstanding for longer than a percentile of the operation's
+recent latencies.  Whichever attempt succeeds first provides the
+response and the other is discarded.
+
+Every hedge is charged to the retry quota of the standard retry mode,
+so hedges stop being sent when the quota is exhausted, for example
+while the service is failing, and the extra load they add is bounded.
+
+The key classes are:
+
+    * ``LatencyTracker`` - Tracks the latencies of the recent attempts of
+    an operation and computes a percentile of them.
+    * ``HedgingPolicy`` - Decides which operations are hedged and when,
+    and charges hedges to the retry quota.  It is connected to the
+    ``before-call`` event and adds a ``Hedge`` to the request context of
+    calls that are hedged, which ``botocore.endpoint`` uses to send
+    each of their attempts.
+
+Hedging is enabled with the ``retry_hedging_percentile`` config
+variable (``AWS_RETRY_HEDGING_PERCENTILE``) or the
+``hedging_percentile`` key of the ``retries`` client config.
+
+"""
+import logging
+import math
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# The prefixes of operation names that are hedged when no operations
+# are configured.  These operations only read, so sending them twice is
+# safe.
+IDEMPOTENT_OPERATION_PREFIXES = (
+    'BatchGet', 'Describe', 'Get', 'Head', 'List', 'Query', 'Scan',
+)
+IDEMPOTENT_HTTP_METHODS = ('GET', 'HEAD')
+# The key of the Hedge in the request context of hedged calls.
+HEDGE_CONTEXT_KEY = 'hedge'
+
+
+def register_hedging_handler(client, retry_quota, percentile,
+                             operations=None, metrics=None):
+    policy = HedgingPolicy(
+        retry_quota=retry_quota,
+        percentile=percentile,
+        operations=operations,
+        max_workers=client.meta.config.max_pool_connections * 2,
+        metrics=metrics,
+    )
+    service_event_name = client.meta.service_model.service_id.hyphenize()
+    client.meta.events.register(
+        'before-call.%s' % service_event_name, policy.on_before_call,
+        unique_id='hedging-config-%s' % service_event_name
+    )
+    return policy
+
+
+class Hedge(object):
+    """Hedges the attempts of a call."""
+    def __init__(self, policy, tracker):
+        self._policy = policy
+        self._tracker = tracker
+
+    @property
+    def delay(self):
+        """The number of seconds to wait before hedging an attempt.
+
+        This is ``None`` if attempts aren't hedged because there aren't
+        enough latencies recorded for the operation yet.  The latency of
+        the attempt should be recorded either way.
+
+        """
+        return self._tracker.percentile(self._policy.percentile)
+
+    @property
+    def executor(self):
+        """The executor hedged attempts are sent from."""
+        return self._policy.get_executor()
+
+    def acquire(self):
+        """Charge a hedge to the retry quota.
+
+        Returns False, and the hedge must not be sent, if the retry quota
+        is exhausted.
+
+        """
+        return self._policy.acquire_hedge_quota()
+
+    def record_latency(self, latency):
+        self._tracker.record(latency)
+
+
+class HedgingPolicy(object):
+    """Decides which attempts are hedged.
+
+    :param retry_quota: The ``RetryQuota`` hedges are charged to.
+
+    :param percentile: The percentile, between 0 and 100, of the recent
+        latencies of an operation after which an attempt is hedged.
+
+    :param operations: The names of the operations to hedge, for example
+        ``['GetItem', 'ReceiveMessage']``.  Defaults to operations that
+        only read, as decided by ``is_idempotent``.
+
+    :param max_workers: The number of threads hedged attempts are sent
+        from.
+
+    :param metrics: An optional ``RetryMetrics`` that counts the hedges.
+
+    """
+    HEDGE_COST = 5
+
+    def __init__(self, retry_quota, percentile, operations=None,
+                 max_workers=20, window_size=None, min_samples=None,
+                 metrics=None):
+        self._retry_quota = retry_quota
+        self._metrics = metrics
+        self.percentile = percentile
+        self._operations = operations
+        self._max_workers = max_workers
+        self._tracker_kwargs = {}
+        if window_size is not None:
+            self._tracker_kwargs['window_size'] = window_size
+        if min_samples is not None:
+            self._tracker_kwargs['min_samples'] = min_samples
+        self._trackers = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def on_before_call(self, model, params, context, **kwargs):
+        """Connect as a handler to the before-call event."""
+        if self.is_hedged(model, params):
+            context[HEDGE_CONTEXT_KEY] = Hedge(
+                self, self._get_tracker(model.name))
+
+    def is_hedged(self, operation_model, request_dict):
+        if operation_model.has_event_stream_output:
+            return False
+        if hasattr(request_dict['body'], 'read'):
+            # A stream can't be sent by two attempts at once.
+            return False
+        if self._operations is not None:
+            return operation_model.name in self._operations
+        return self.is_idempotent(operation_model)
+
+    def is_idempotent(self, operation_model):
+        method = operation_model.http.get('method')
+        if method in IDEMPOTENT_HTTP_METHODS:
+            return True
+        return operation_model.name.startswith(IDEMPOTENT_OPERATION_PREFIXES)
+
+    def acquire_hedge_quota(self):
+        if self._retry_quota.acquire(self.HEDGE_COST):
+            if self._metrics is not None:
+                self._metrics.increment('hedges')
+            return True
+        logger.debug("Retry quota reached, not hedging request.")
+        return False
+
+    def get_executor(self):
+        with self._lock:
+            # The threads of the executor don't survive a fork.
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix='botocore-hedge')
+            return self._executor
+
+    def _get_tracker(self, operation_name):
+        tracker = self._trackers.get(operation_name)
+        if tracker is None:
+            with self._lock:
+                tracker = self._trackers.setdefault(
+                    operation_name, LatencyTracker(**self._tracker_kwargs))
+        return tracker
+
+
+class LatencyTracker(object):
+    """Tracks the latencies of the last ``window_size`` attempts.
+
+    Percentiles are only available once ``min_samples`` latencies have
+    been recorded.  They are computed from a sorted copy of the window
+    that is refreshed every ``window_size // 10`` records, so computing
+    one doesn't sort the window every time.
+
+    """
+    DEFAULT_WINDOW_SIZE = 200
+    DEFAULT_MIN_SAMPLES = 20
+
+    def __init__(self, window_size=DEFAULT_WINDOW_SIZE,
+                 min_samples=DEFAULT_MIN_SAMPLES):
+        self._latencies = deque(maxlen=window_size)
+        self._min_samples = min_samples
+        self._refresh_every = max(window_size // 10, 1)
+        self._unsorted_records = 0
+        self._sorted = []
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            self._unsorted_records += 1
+            if self._unsorted_records >= self._refresh_every or \
+                    len(self._sorted) < self._min_samples:
+                self._sorted = sorted(self._latencies)
+                self._unsorted_records = 0
+
+    def percentile(self, percentile):
+        """Return the latency at ``percentile``, or None."""
+        latencies = self._sorted
+        if len(latencies) < self._min_samples:
+            return None
+        # The nearest rank of the percentile.
+        rank = int(math.ceil(percentile / 100.0 * len(latencies)))
+        return latencies[min(max(rank, 1), len(latencies)) - 1]
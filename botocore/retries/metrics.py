@@ -0,0 +1,169 @@
+"""Metrics of the retries made by a client.
+
+The ``standard`` and ``adaptive`` retry modes record what they decided
+for each attempt of a client's calls in a ``RetryMetrics`` object,
+available as ``client.meta.retry_metrics``:
+
+    * Counters of the attempts, retries, throttling errors, hedged
+    attempts, and of the calls that stopped being retried because the
+    retry quota was exhausted or their max attempts were reached.
+    * A histogram of the number of attempts of each call.
+    * A histogram of the backoff delays before retries.
+    * The fill rate of the token bucket of the ``adaptive`` mode over
+    time, once it starts rate limiting.
+
+``RetryMetrics.snapshot()`` returns the metrics as a dict of plain
+values that can be serialized as JSON, so they can be inspected in
+process or exported to a monitoring system::
+
+    metrics = client.meta.retry_metrics.snapshot()
+    print(json.dumps(metrics['histograms']['attempts']))
+
+"""
+import bisect
+import threading
+from collections import deque
+
+
+class Histogram(object):
+    """Counts values into buckets with the given upper ``boundaries``.
+
+    A value belongs to the first bucket whose boundary is greater than or
+    equal to it.  Values above the last boundary are counted in a final
+    unbounded bucket.
+
+    """
+    def __init__(self, boundaries):
+        self._boundaries = list(boundaries)
+        self._counts = [0] * (len(self._boundaries) + 1)
+        self._count = 0
+        self._sum = 0
+        self._min = None
+        self._max = None
+
+    def record(self, value):
+        self._counts[bisect.bisect_left(self._boundaries, value)] += 1
+        self._count += 1
+        self._sum += value
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def snapshot(self):
+        buckets = [
+            {'le': boundary, 'count': count}
+            for boundary, count in zip(self._boundaries, self._counts)
+        ]
+        # None stands for infinity, which JSON can't represent.
+        buckets.append({'le': None, 'count': self._counts[-1]})
+        return {
+            'count': self._count,
+            'sum': self._sum,
+            'min': self._min,
+            'max': self._max,
+            'buckets': buckets,
+        }
+
+
+class RetryMetrics(object):
+    """Records the retry decisions made for the calls of a client.
+
+    All the methods are thread safe.
+
+    """
+    COUNTERS = (
+        'attempts', 'retries', 'throttles', 'hedges', 'quota_exhausted',
+        'max_attempts_reached',
+    )
+    ATTEMPTS_BOUNDARIES = (1, 2, 3, 4, 5, 10)
+    BACKOFF_BOUNDARIES = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+    MAX_FILL_RATE_SAMPLES = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._counters = dict((name, 0) for name in self.COUNTERS)
+        self._histograms = {
+            'attempts': Histogram(self.ATTEMPTS_BOUNDARIES),
+            'backoff': Histogram(self.BACKOFF_BOUNDARIES),
+        }
+        self._fill_rates = deque(maxlen=self.MAX_FILL_RATE_SAMPLES)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def record_attempt(self, context, retry_delay, throttled=False):
+        """Record the retry decision made for an attempt.
+
+        :type context: botocore.retries.standard.RetryContext
+        :param context: The context of the attempt.
+
+        :param retry_delay: The delay before the attempt is retried, or
+            ``None`` if it isn't retried, which completes its call.
+
+        :param throttled: Whether the attempt got a throttling error.
+
+        """
+        metadata = context.get_retry_metadata()
+        with self._lock:
+            counters = self._counters
+            counters['attempts'] += 1
+            if throttled:
+                counters['throttles'] += 1
+            if retry_delay is not None:
+                counters['retries'] += 1
+                self._histograms['backoff'].record(retry_delay)
+                return
+            if metadata.get('RetryQuotaReached'):
+                counters['quota_exhausted'] += 1
+            if metadata.get('MaxAttemptsReached'):
+                counters['max_attempts_reached'] += 1
+            self._histograms['attempts'].record(context.attempt_number)
+
+    def record_fill_rate(self, fill_rate, timestamp):
+        """Record the fill rate of the adaptive mode's token bucket.
+
+        A sample is only kept when the rate changed since the last one,
+        and only the last ``MAX_FILL_RATE_SAMPLES`` samples are kept.
+
+        """
+        with self._lock:
+            fill_rates = self._fill_rates
+            if not fill_rates or fill_rates[-1][1] != fill_rate:
+                fill_rates.append((timestamp, fill_rate))
+
+    def snapshot(self, reset=False):
+        """Return the metrics recorded so far.
+
+        :type reset: bool
+        :param reset: Whether to start recording from scratch, so each
+            snapshot only covers the calls made since the last one.
+
+        :rtype: dict
+        :return: A dict with these keys:
+
+            * ``counters`` - A dict of the counters in ``COUNTERS``.
+            * ``histograms`` - A dict of the ``attempts`` and ``backoff``
+              histograms, each with its ``count``, ``sum``, ``min``,
+              ``max`` and ``buckets``.  Each bucket has the count of the
+              values less than or equal to ``le`` and greater than the
+              previous bucket's ``le``.
+            * ``fill_rates`` - A list of ``[timestamp, fill_rate]`` pairs.
+
+        """
+        with self._lock:
+            snapshot = {
+                'counters': dict(self._counters),
+                'histograms': dict(
+                    (name, histogram.snapshot())
+                    for name, histogram in self._histograms.items()
+                ),
+                'fill_rates': [list(sample) for sample in self._fill_rates],
+            }
+            if reset:
+                self._reset()
+        return snapshot
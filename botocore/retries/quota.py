@@ -2,6 +2,7 @@
 
 
 """
+import functools
 import threading
 
 
@@ -55,3 +56,49 @@ class RetryQuota(object):
     @property
     def available_capacity(self):
         return self._available_capacity
+
+
+class SharedRetryQuota(RetryQuota):
+    """A ``RetryQuota`` kept in a record of a shared state store.
+
+    Every process using the record ``name`` of ``store`` draws from the
+    same capacity.  See ``botocore.retries.shared`` for the stores.
+
+    """
+    def __init__(self, store, name,
+                 initial_capacity=RetryQuota.INITIAL_CAPACITY):
+        super(SharedRetryQuota, self).__init__(initial_capacity)
+        self._store = store
+        self._name = name
+        self._defaults = {
+            'max_capacity': initial_capacity,
+            'available_capacity': initial_capacity,
+        }
+
+    def acquire(self, capacity_amount):
+        return self._store.update(
+            self._name, self._defaults,
+            functools.partial(self._acquire, capacity_amount))
+
+    def _acquire(self, capacity_amount, state):
+        if capacity_amount > state['available_capacity']:
+            return False
+        state['available_capacity'] -= capacity_amount
+        return True
+
+    def release(self, capacity_amount):
+        self._store.update(
+            self._name, self._defaults,
+            functools.partial(self._release, capacity_amount))
+
+    def _release(self, capacity_amount, state):
+        state['available_capacity'] += min(
+            state['max_capacity'] - state['available_capacity'],
+            capacity_amount
+        )
+
+    @property
+    def available_capacity(self):
+        return self._store.update(
+            self._name, self._defaults,
+            lambda state: state['available_capacity'])
@@ -0,0 +1,133 @@
+"""Scheduling of deferred request attempts.
+
+By default a request that needs to be retried sleeps on the calling
+thread until its backoff has passed, and the client side rate limiter of
+the adaptive retry mode blocks the calling thread until it has a token.
+When requests are driven by a pool of threads, those threads are pinned
+while they wait.
+
+``botocore.endpoint.submit_request`` instead hands each attempt to an
+executor and, when an attempt has to wait, defers the next one with a
+``RetryScheduler``.  The scheduler keeps the deferred attempts in a heap
+ordered by when they are due and submits them back to their executor
+from a single timer thread, so no thread waits on their behalf.  The
+progress of such a request is available from its ``RetryFuture``.
+
+"""
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_SCHEDULER = None
+_RETRY_SCHEDULER_LOCK = threading.Lock()
+# Set in the request context of requests sent by submit_request and by
+# AsyncEndpoint.
+DEFER_SEND_CONTEXT_KEY = 'defer_send'
+
+
+def get_retry_scheduler():
+    global RETRY_SCHEDULER
+    if RETRY_SCHEDULER is None:
+        with _RETRY_SCHEDULER_LOCK:
+            if RETRY_SCHEDULER is None:
+                RETRY_SCHEDULER = RetryScheduler()
+    return RETRY_SCHEDULER
+
+
+def is_send_deferrable(context):
+    """Whether a before-send handler may defer sending a request.
+
+    A handler that would otherwise block until the request can be sent
+    raises a ``SendDeferredError`` instead when this returns True.
+
+    """
+    return context is not None and context.get(DEFER_SEND_CONTEXT_KEY, False)
+
+
+class RetryFuture(Future):
+    """The future of a request whose attempts are scheduled.
+
+    :ivar attempts: The number of attempts started so far.
+
+    :ivar retry_at: The ``time.monotonic()`` time at which the next
+        attempt is due while the request is waiting for one, otherwise
+        ``None``.
+
+    """
+    def __init__(self):
+        super(RetryFuture, self).__init__()
+        self.attempts = 0
+        self.retry_at = None
+
+    @property
+    def retry_after(self):
+        """The number of seconds until the next attempt is due, or None."""
+        retry_at = self.retry_at
+        if retry_at is None:
+            return None
+        return max(retry_at - time.monotonic(), 0)
+
+
+class RetryScheduler(object):
+    """Calls functions after a delay from a single timer thread.
+
+    The functions are called on the timer thread, so they should only
+    hand work off, for example by submitting it to an executor.  Any
+    object with a compatible ``call_later`` method can be used in place
+    of this class to schedule attempts on another event loop.
+
+    """
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        # The timer thread doesn't survive a fork, so a forked child
+        # starts over with a new one.
+        self._pid = os.getpid()
+        self._timers = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def call_later(self, delay, function, *args):
+        """Call ``function(*args)`` after ``delay`` seconds."""
+        if self._pid != os.getpid():
+            self._reset()
+        due = time.monotonic() + delay
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='botocore-retry-scheduler')
+                self._thread.daemon = True
+                self._thread.start()
+            heapq.heappush(
+                self._timers, (due, next(self._counter), function, args))
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            function, args = self._next_timer()
+            try:
+                function(*args)
+            except Exception:
+                logger.debug('Error calling scheduled function %s',
+                             function, exc_info=True)
+
+    def _next_timer(self):
+        with self._condition:
+            while True:
+                if not self._timers:
+                    self._condition.wait()
+                    continue
+                delay = self._timers[0][0] - time.monotonic()
+                if delay <= 0:
+                    _, _, function, args = heapq.heappop(self._timers)
+                    return function, args
+                self._condition.wait(delay)
@@ -0,0 +1,393 @@
+"""Retry state shared between processes.
+
+The retry quota used by the standard retry mode and the client side
+rate limiter used by the adaptive retry mode normally keep their state
+in the client that owns them.  When many processes on the same host
+call the same service, each of them backs off independently and
+together they can keep exceeding the throttling limit.
+
+This module lets that state live in a store shared by every process on
+the host:
+
+    * ``MmapStateStore`` - Keeps each record in a small memory mapped
+    file in a directory, with ``fcntl.flock`` guarding updates.
+    * ``UnixSocketStateStore`` - Keeps the records in a
+    ``StateCoordinator`` process, reached through a Unix domain socket.
+    If the coordinator can't be reached, the state is kept in the
+    current process until it can.
+    * ``LocalStateStore`` - Keeps the records in the current process.
+
+A store holds named records of floats.  Every change to a record is
+made by passing a function to ``update()``, which applies it to the
+record atomically.  ``quota.SharedRetryQuota`` and
+``adaptive.SharedClientRateLimiter`` implement the same algorithms as
+``RetryQuota`` and ``ClientRateLimiter`` on top of a record.
+
+Shared state is enabled with the ``retry_shared_state`` config
+variable (``AWS_RETRY_SHARED_STATE``) or the ``shared_state`` key of
+the ``retries`` client config, in the form ``mmap:<directory>`` or
+``unix:<socket path>``.
+
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import socket
+import socketserver
+import struct
+import threading
+
+from botocore.exceptions import InvalidConfigError
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+_STATE_STORES = {}
+_STATE_STORES_LOCK = threading.Lock()
+
+
+def get_state_store(spec):
+    """Return the store for a ``retry_shared_state`` value.
+
+    Stores are created once per process, so every client configured with
+    the same value uses the same store.
+
+    """
+    with _STATE_STORES_LOCK:
+        store = _STATE_STORES.get(spec)
+        if store is None:
+            store = create_state_store(spec)
+            _STATE_STORES[spec] = store
+        return store
+
+
+def get_record_name(kind, client):
+    """Return the name of the ``kind`` record used by ``client``.
+
+    Clients of the same service, region and endpoint use the same record.
+
+    """
+    return format_record_name(
+        kind, client.meta.service_model.service_name,
+        client.meta.region_name, client.meta.endpoint_url,
+    )
+
+
+def format_record_name(kind, service_name, region_name, endpoint_url,
+                       resource=None):
+    parts = [kind, service_name, region_name, endpoint_url]
+    if resource is not None:
+        parts.append(resource)
+    return ':'.join('%s' % part for part in parts)
+
+
+def create_state_store(spec):
+    kind, _, location = spec.partition(':')
+    if kind == 'mmap' and location:
+        return MmapStateStore(location)
+    if kind == 'unix' and location:
+        return UnixSocketStateStore(location)
+    raise InvalidConfigError(
+        error_msg=(
+            'Invalid retry shared state "%s", must be one of '
+            '"mmap:<directory>" or "unix:<socket path>"' % spec
+        )
+    )
+
+
+class BaseStateStore(object):
+    def update(self, name, defaults, function):
+        """Change the record ``name`` with ``function``.
+
+        ``function`` is called with the record as a dict of floats, changes
+        it in place and returns the value to return from ``update``.  A
+        record that doesn't exist yet is created from ``defaults``, whose
+        keys are the fields of the record.  No other update of the record
+        is made while ``function`` runs, and its changes are saved unless
+        it raises an exception.  A store may call ``function`` more than
+        once, on a fresh copy of the record each time, so it must not have
+        side effects other than the changes to the record.
+
+        """
+        raise NotImplementedError('update')
+
+
+class LocalStateStore(BaseStateStore):
+    """Keeps records in the current process."""
+
+    def __init__(self):
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def update(self, name, defaults, function):
+        with self._lock:
+            record = self._records.get(name)
+            if record is None:
+                record = defaults
+            state = dict(record)
+            result = function(state)
+            self._records[name] = state
+            return result
+
+
+class MmapStateStore(BaseStateStore):
+    """Keeps records in memory mapped files in ``directory``.
+
+    Each record is a file of packed doubles, one for each field in sorted
+    order.  The file is filled in with the defaults when it is created.
+    Processes serialize their updates with ``fcntl.flock``, so this store
+    is only available on platforms that provide ``fcntl``.
+
+    """
+    def __init__(self, directory):
+        if fcntl is None:
+            raise InvalidConfigError(
+                error_msg='The "mmap" retry shared state requires fcntl, '
+                          'which is not available on this platform.'
+            )
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._reset()
+
+    def _reset(self):
+        # flock() locks belong to the open file, so a forked child must
+        # open the files again to be excluded from its parent.
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._records = {}
+
+    def update(self, name, defaults, function):
+        if self._pid != os.getpid():
+            self._reset()
+        fields = sorted(defaults)
+        record_format = '<%sd' % len(fields)
+        lock, fileno, mapped = self._get_record(
+            name, fields, record_format, defaults)
+        with lock:
+            fcntl.flock(fileno, fcntl.LOCK_EX)
+            try:
+                values = struct.unpack_from(record_format, mapped)
+                state = dict(zip(fields, values))
+                result = function(state)
+                struct.pack_into(
+                    record_format, mapped, 0,
+                    *[state[field] for field in fields])
+                return result
+            finally:
+                fcntl.flock(fileno, fcntl.LOCK_UN)
+
+    def _get_record(self, name, fields, record_format, defaults):
+        key = (name, tuple(fields))
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                record = (threading.Lock(),) + self._open_record(
+                    name, fields, record_format, defaults)
+                self._records[key] = record
+            return record
+
+    def _open_record(self, name, fields, record_format, defaults):
+        # The fields are part of the file name so a record whose layout
+        # changed between versions never maps a file of another size.
+        digest = hashlib.sha1(
+            ('%s|%s' % (name, ','.join(fields))).encode('utf-8')).hexdigest()
+        path = os.path.join(self._directory, 'retry-state-%s' % digest)
+        size = struct.calcsize(record_format)
+        fileno = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fileno, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fileno).st_size != size:
+                    os.ftruncate(fileno, size)
+                    os.pwrite(fileno, struct.pack(
+                        record_format,
+                        *[defaults[field] for field in fields]), 0)
+            finally:
+                fcntl.flock(fileno, fcntl.LOCK_UN)
+            mapped = mmap.mmap(fileno, size)
+        except Exception:
+            os.close(fileno)
+            raise
+        return fileno, mapped
+
+
+class UnixSocketStateStore(BaseStateStore):
+    """Keeps records in a ``StateCoordinator`` listening on ``path``.
+
+    The store remembers the last version of each record it saw.  An
+    update runs ``function`` on that version and sends the result to the
+    coordinator, which saves it only if the record hasn't changed since.
+    Otherwise the coordinator returns the current version of the record
+    and ``function`` is run again on it.  An update of a record that no
+    other process changed in the meantime is one round trip.
+
+    Updates of the same record are serialized within the process, while
+    updates of different records run concurrently on separate
+    connections.  When the coordinator can't be reached, updates use
+    records kept in the current process and the coordinator is tried
+    again on the next update.
+
+    """
+    def __init__(self, path, timeout=5):
+        self._path = path
+        self._timeout = timeout
+        self._fallback = LocalStateStore()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._record_locks = {}
+        self._versions = {}
+        self._connections = []
+
+    def update(self, name, defaults, function):
+        if self._pid != os.getpid():
+            self._reset()
+        with self._get_record_lock(name):
+            version, record = self._versions.get(name, (0, defaults))
+            while True:
+                state = dict(record)
+                result = function(state)
+                try:
+                    response = self._request({
+                        'op': 'update', 'name': name, 'defaults': defaults,
+                        'version': version, 'state': state,
+                    })
+                except (OSError, ValueError) as e:
+                    logger.debug(
+                        'Unable to reach retry state coordinator at %s, '
+                        'using local retry state: %s', self._path, e)
+                    self._versions.pop(name, None)
+                    return self._fallback.update(name, defaults, function)
+                version, record = response['version'], response['state']
+                self._versions[name] = (version, record)
+                if response['updated']:
+                    return result
+
+    def _get_record_lock(self, name):
+        with self._lock:
+            lock = self._record_locks.get(name)
+            if lock is None:
+                lock = threading.Lock()
+                self._record_locks[name] = lock
+            return lock
+
+    def _request(self, message):
+        connection = self._get_connection()
+        sock, reader = connection
+        try:
+            sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+            line = reader.readline()
+            if not line:
+                raise ConnectionError('Retry state coordinator closed the '
+                                      'connection')
+            response = json.loads(line.decode('utf-8'))
+        except Exception:
+            reader.close()
+            sock.close()
+            raise
+        with self._lock:
+            self._connections.append(connection)
+        return response
+
+    def _get_connection(self):
+        with self._lock:
+            if self._connections:
+                return self._connections.pop()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self._timeout)
+            sock.connect(self._path)
+        except Exception:
+            sock.close()
+            raise
+        return sock, sock.makefile('rb')
+
+
+class StateCoordinator(object):
+    """Serves records to ``UnixSocketStateStore`` clients.
+
+    The coordinator is meant to run in a process of its own::
+
+        coordinator = StateCoordinator('/run/botocore-retries.sock')
+        coordinator.serve_forever()
+
+    Each client connection is handled in its own thread.  Every record
+    has a version that increases with each saved update.
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self._records = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            os.unlink(path)
+        self._server = _CoordinatorServer(path, _CoordinatorHandler)
+        self._server.coordinator = self
+
+    def serve_forever(self, poll_interval=0.5):
+        self._server.serve_forever(poll_interval=poll_interval)
+
+    def shutdown(self):
+        self._server.shutdown()
+
+    def close(self):
+        self._server.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def update(self, name, defaults, version, state):
+        """Save ``state`` if the record is still at ``version``.
+
+        Returns the version and the state of the record after the update,
+        and whether ``state`` was saved.
+
+        """
+        with self._lock:
+            current_version, record = self._records.get(name, (0, None))
+            if record is None or set(record) != set(defaults):
+                record = dict(defaults)
+            updated = version == current_version and set(state) == set(record)
+            if updated:
+                current_version += 1
+                record = state
+            self._records[name] = (current_version, record)
+            return current_version, record, updated
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        try:
+            for line in self.rfile:
+                message = json.loads(line.decode('utf-8'))
+                if message['op'] != 'update':
+                    raise ValueError('Unknown operation: %s' % message['op'])
+                version, state, updated = coordinator.update(
+                    message['name'], message['defaults'],
+                    message['version'], message['state'])
+                self.wfile.write(json.dumps({
+                    'version': version, 'state': state, 'updated': updated,
+                }).encode('utf-8') + b'\n')
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug('Closing retry state connection: %s', e)
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _CoordinatorServer(socketserver.ThreadingMixIn,
+                             socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    def _CoordinatorServer(*args, **kwargs):
+        raise InvalidConfigError(
+            error_msg='The retry state coordinator requires Unix domain '
+                      'sockets, which are not available on this platform.'
+        )
@@ -28,7 +28,9 @@ import logging
 
 from botocore.exceptions import ConnectionError, HTTPClientError
 from botocore.exceptions import ReadTimeoutError, ConnectTimeoutError
+from botocore.retries import hedging
 from botocore.retries import quota
+from botocore.retries import shared
 from botocore.retries import special
 from botocore.retries.base import BaseRetryBackoff, BaseRetryableChecker
 
@@ -36,8 +38,19 @@ DEFAULT_MAX_ATTEMPTS = 3
 logger = logging.getLogger(__name__)
 
 
-def register_retry_handler(client, max_attempts=DEFAULT_MAX_ATTEMPTS):
-    retry_quota = RetryQuotaChecker(quota.RetryQuota())
+def register_retry_handler(client, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                           shared_state=None, hedging_percentile=None,
+                           hedging_operations=None, metrics=None):
+    if shared_state is not None:
+        quota_instance = quota.SharedRetryQuota(
+            shared_state, shared.get_record_name('retry-quota', client))
+    else:
+        quota_instance = quota.RetryQuota()
+    retry_quota = RetryQuotaChecker(quota_instance)
+    if hedging_percentile is not None:
+        hedging.register_hedging_handler(
+            client, quota_instance, hedging_percentile,
+            operations=hedging_operations, metrics=metrics)
 
     service_id = client.meta.service_model.service_id
     service_event_name = service_id.hyphenize()
@@ -51,6 +64,7 @@ def register_retry_handler(client, max_attempts=DEFAULT_MAX_ATTEMPTS):
         ),
         retry_event_adapter=RetryEventAdapter(),
         retry_quota=retry_quota,
+        metrics=metrics,
     )
 
     unique_id = 'retry-config-%s' % service_event_name
@@ -67,10 +81,15 @@ class RetryHandler(object):
     This class is intended to be hooked to botocore's event system
     as an event handler.
     """
-    def __init__(self, retry_policy, retry_event_adapter, retry_quota):
+    def __init__(self, retry_policy, retry_event_adapter, retry_quota,
+                 metrics=None):
         self._retry_policy = retry_policy
         self._retry_event_adapter = retry_event_adapter
         self._retry_quota = retry_quota
+        self._metrics = metrics
+        if metrics is not None:
+            self._throttling_detector = ThrottlingErrorDetector(
+                retry_event_adapter)
 
     def needs_retry(self, **kwargs):
         """Connect as a handler to the needs-retry event."""
@@ -88,6 +107,11 @@ class RetryHandler(object):
                              "not retrying request.")
         else:
             logger.debug("Not retrying request.")
+        if self._metrics is not None:
+            self._metrics.record_attempt(
+                context, retry_delay,
+                throttled=self._throttling_detector.is_throttling_context(
+                    context))
         self._retry_event_adapter.adapt_retry_response_from_context(
             context)
         return retry_delay
@@ -399,6 +423,9 @@ class ThrottlingErrorDetector(object):
     # This expects the kwargs from needs-retry to be passed through.
     def is_throttling_error(self, **kwargs):
         context = self._retry_event_adapter.create_retry_context(**kwargs)
+        return self.is_throttling_context(context)
+
+    def is_throttling_context(self, context):
         if self._fixed_error_code_detector.is_retryable(context):
             return True
         error_type = self._modeled_error_detector.detect_error_type(context)
@@ -36,6 +36,21 @@ Unicode
 The input to the serializers should be text (str/unicode), not bytes,
 with the exception of blob types.  Those are assumed to be binary,
 and if a str/unicode type is passed in, it will be encoded as utf-8.
+
+Compiled Plans
+--------------
+
+By default the serializers walk the input shape tree on every call,
+dispatching on ``shape.type_name`` for each value.  When a serializer
+is created with ``compile_plans=True``, each shape is instead compiled
+the first time it is used into a closure that has already resolved the
+type dispatch, serialized names, timestamp formats, flattening and (for
+the rest protocols) the location of every member.  Subsequent calls
+just execute the cached closures.  The output is identical in both modes.
+
+Structure members are compiled lazily, the first time a member is seen
+in user input.  This keeps the compile step proportional to the input
+actually sent and allows recursive shapes to be compiled.
 """
 import re
 import base64
@@ -51,6 +66,7 @@ from botocore.utils import percent_encode
 from botocore.utils import is_json_value_header
 from botocore.utils import conditionally_calculate_md5
 from botocore.utils import has_header
+from botocore.jsoncodec import StandardJSONCodec
 from botocore import validate
 
 
@@ -61,9 +77,11 @@ ISO8601 = '%Y-%m-%dT%H:%M:%SZ'
 ISO8601_MICRO = '%Y-%m-%dT%H:%M:%S.%fZ'
 
 
-def create_serializer(protocol_name, include_validation=True):
+def create_serializer(protocol_name, include_validation=True,
+                      compile_plans=False, json_codec=None):
     # TODO: Unknown protocols.
-    serializer = SERIALIZERS[protocol_name]()
+    serializer = SERIALIZERS[protocol_name](
+        compile_plans=compile_plans, json_codec=json_codec)
     if include_validation:
         validator = validate.ParamValidator()
         serializer = validate.ParamValidationDecorator(validator, serializer)
@@ -79,6 +97,13 @@ class Serializer(object):
     MAP_TYPE = dict
     DEFAULT_ENCODING = 'utf-8'
 
+    def __init__(self, compile_plans=False, json_codec=None):
+        self._compile_plans = compile_plans
+        self._plan_cache = {}
+        if json_codec is None:
+            json_codec = StandardJSONCodec()
+        self._json_codec = json_codec
+
     def serialize_to_request(self, parameters, operation_model):
         """Serialize parameters into an HTTP request.
 
@@ -157,11 +182,61 @@ class Serializer(object):
         final_value = converter(datetime_obj)
         return final_value
 
+    def _get_timestamp_converter(self, timestamp_format=None):
+        # Returns a function equivalent to ``_convert_timestamp_to_str``
+        # with the converter for ``timestamp_format`` already resolved.
+        if timestamp_format is None:
+            timestamp_format = self.TIMESTAMP_FORMAT
+        converter = getattr(
+            self, '_timestamp_%s' % timestamp_format.lower())
+
+        def convert_timestamp(value):
+            return converter(parse_to_aware_datetime(value))
+        return convert_timestamp
+
     def _get_serialized_name(self, shape, default_name):
         # Returns the serialized name for the shape if it exists.
         # Otherwise it will return the passed in default_name.
         return shape.serialization.get('name', default_name)
 
+    def _get_plan(self, key, compiler, *args):
+        # Returns the cached result of ``compiler(*args)`` for ``key``,
+        # compiling it on first use.
+        try:
+            return self._plan_cache[key]
+        except KeyError:
+            plan = compiler(*args)
+            self._plan_cache[key] = plan
+            return plan
+
+    def _get_compiled(self, shape):
+        # Top level shapes (input shapes and payload members) are cached
+        # on the model objects, so they can be used directly as keys.
+        return self._get_plan(shape, self._compile, shape)
+
+    def _compile(self, shape):
+        method = getattr(self, '_compile_type_%s' % shape.type_name,
+                         self._compile_default)
+        return method(shape)
+
+    def _compile_members(self, shape, compile_member):
+        # Returns a function that maps a member name to its compiled
+        # entry.  Entries are built by ``compile_member`` the first time
+        # a member name is looked up, which is what allows recursive
+        # structures to be compiled.  Unknown members raise a KeyError,
+        # the same as the uncompiled code path.
+        members = shape.members
+        compiled = {}
+
+        def get_member(key):
+            try:
+                return compiled[key]
+            except KeyError:
+                entry = compile_member(key, members[key])
+                compiled[key] = entry
+                return entry
+        return get_member
+
     def _get_base64(self, value):
         # Returns the base64-encoded version of value, handling
         # both strings and bytes. The returned value is a string
@@ -211,7 +286,10 @@ class QuerySerializer(Serializer):
         body_params['Action'] = operation_model.name
         body_params['Version'] = operation_model.metadata['apiVersion']
         if shape is not None:
-            self._serialize(body_params, parameters, shape)
+            if self._compile_plans:
+                self._get_compiled(shape)(body_params, parameters)
+            else:
+                self._serialize(body_params, parameters, shape)
         serialized['body'] = body_params
 
         host_prefix = self._expand_host_prefix(parameters, operation_model)
@@ -299,6 +377,100 @@ class QuerySerializer(Serializer):
     def _is_shape_flattened(self, shape):
         return shape.serialization.get('flattened')
 
+    # The _compile_type_* methods mirror the _serialize_type_* methods
+    # above.  Each returns a function taking (serialized, value, prefix).
+
+    def _compile_type_structure(self, shape):
+        def compile_member(key, member_shape):
+            return (self._get_serialized_name(member_shape, key),
+                    self._compile(member_shape))
+        get_member = self._compile_members(shape, compile_member)
+
+        def serialize_structure(serialized, value, prefix=''):
+            for key, member_value in value.items():
+                member_prefix, serialize_member = get_member(key)
+                if prefix:
+                    member_prefix = '%s.%s' % (prefix, member_prefix)
+                serialize_member(serialized, member_value, member_prefix)
+        return serialize_structure
+
+    def _compile_type_list(self, shape):
+        serialize_element = self._compile(shape.member)
+        replacement_name = None
+        if self._is_shape_flattened(shape):
+            list_suffix = None
+            if shape.member.serialization.get('name'):
+                replacement_name = self._get_serialized_name(
+                    shape.member, default_name='')
+        else:
+            list_suffix = '.' + shape.member.serialization.get(
+                'name', 'member')
+
+        def serialize_list(serialized, value, prefix=''):
+            if not value:
+                # The query protocol serializes empty lists.
+                serialized[prefix] = ''
+                return
+            if list_suffix is not None:
+                list_prefix = prefix + list_suffix
+            elif replacement_name is not None:
+                # Replace '.Original' with '.{name}'.
+                list_prefix = '.'.join(
+                    prefix.split('.')[:-1] + [replacement_name])
+            else:
+                list_prefix = prefix
+            for i, element in enumerate(value, 1):
+                serialize_element(
+                    serialized, element, '%s.%s' % (list_prefix, i))
+        return serialize_list
+
+    def _compile_type_map(self, shape):
+        flattened = self._is_shape_flattened(shape)
+        serialize_key = self._compile(shape.key)
+        serialize_value = self._compile(shape.value)
+        key_suffix = self._get_serialized_name(shape.key, default_name='key')
+        value_suffix = self._get_serialized_name(shape.value, 'value')
+
+        def serialize_map(serialized, value, prefix=''):
+            if flattened:
+                full_prefix = prefix
+            else:
+                full_prefix = '%s.entry' % prefix
+            for i, key in enumerate(value, 1):
+                entry_prefix = '%s.%s.' % (full_prefix, i)
+                serialize_key(serialized, key, entry_prefix + key_suffix)
+                serialize_value(
+                    serialized, value[key], entry_prefix + value_suffix)
+        return serialize_map
+
+    def _compile_type_blob(self, shape):
+        get_base64 = self._get_base64
+
+        def serialize_blob(serialized, value, prefix=''):
+            serialized[prefix] = get_base64(value)
+        return serialize_blob
+
+    def _compile_type_timestamp(self, shape):
+        convert_timestamp = self._get_timestamp_converter(
+            shape.serialization.get('timestampFormat'))
+
+        def serialize_timestamp(serialized, value, prefix=''):
+            serialized[prefix] = convert_timestamp(value)
+        return serialize_timestamp
+
+    def _compile_type_boolean(self, shape):
+        def serialize_boolean(serialized, value, prefix=''):
+            if value:
+                serialized[prefix] = 'true'
+            else:
+                serialized[prefix] = 'false'
+        return serialize_boolean
+
+    def _compile_default(self, shape):
+        def serialize_default(serialized, value, prefix=''):
+            serialized[prefix] = value
+        return serialize_default
+
 
 class EC2Serializer(QuerySerializer):
     """EC2 specific customizations to the query protocol serializers.
@@ -329,6 +501,14 @@ class EC2Serializer(QuerySerializer):
             element_shape = shape.member
             self._serialize(serialized, element, element_shape, element_prefix)
 
+    def _compile_type_list(self, shape):
+        serialize_element = self._compile(shape.member)
+
+        def serialize_list(serialized, value, prefix=''):
+            for i, element in enumerate(value, 1):
+                serialize_element(serialized, element, '%s.%s' % (prefix, i))
+        return serialize_list
+
 
 class JSONSerializer(Serializer):
     TIMESTAMP_FORMAT = 'unixtimestamp'
@@ -347,8 +527,11 @@ class JSONSerializer(Serializer):
         body = self.MAP_TYPE()
         input_shape = operation_model.input_shape
         if input_shape is not None:
-            self._serialize(body, parameters, input_shape)
-        serialized['body'] = json.dumps(body).encode(self.DEFAULT_ENCODING)
+            if self._compile_plans:
+                self._get_compiled(input_shape)(body, parameters)
+            else:
+                self._serialize(body, parameters, input_shape)
+        serialized['body'] = self._json_codec.dumps(body)
 
         host_prefix = self._expand_host_prefix(parameters, operation_model)
         if host_prefix is not None:
@@ -412,6 +595,72 @@ class JSONSerializer(Serializer):
     def _serialize_type_blob(self, serialized, value, shape, key):
         serialized[key] = self._get_base64(value)
 
+    # The _compile_type_* methods mirror the _serialize_type_* methods
+    # above.  Each returns a function taking (serialized, value, key).
+
+    def _compile_type_structure(self, shape):
+        if shape.is_document_type:
+            return self._compile_default(shape)
+        map_type = self.MAP_TYPE
+
+        def compile_member(key, member_shape):
+            return (member_shape.serialization.get('name', key),
+                    self._compile(member_shape))
+        get_member = self._compile_members(shape, compile_member)
+
+        def serialize_structure(serialized, value, key=None):
+            if key is not None:
+                new_serialized = map_type()
+                serialized[key] = new_serialized
+                serialized = new_serialized
+            for member_key, member_value in value.items():
+                member_key, serialize_member = get_member(member_key)
+                serialize_member(serialized, member_value, member_key)
+        return serialize_structure
+
+    def _compile_type_map(self, shape):
+        map_type = self.MAP_TYPE
+        serialize_value = self._compile(shape.value)
+
+        def serialize_map(serialized, value, key=None):
+            map_obj = map_type()
+            serialized[key] = map_obj
+            for sub_key, sub_value in value.items():
+                serialize_value(map_obj, sub_value, sub_key)
+        return serialize_map
+
+    def _compile_type_list(self, shape):
+        serialize_member = self._compile(shape.member)
+
+        def serialize_list(serialized, value, key=None):
+            list_obj = []
+            serialized[key] = list_obj
+            for list_item in value:
+                wrapper = {}
+                serialize_member(wrapper, list_item, "__current__")
+                list_obj.append(wrapper["__current__"])
+        return serialize_list
+
+    def _compile_type_timestamp(self, shape):
+        convert_timestamp = self._get_timestamp_converter(
+            shape.serialization.get('timestampFormat'))
+
+        def serialize_timestamp(serialized, value, key=None):
+            serialized[key] = convert_timestamp(value)
+        return serialize_timestamp
+
+    def _compile_type_blob(self, shape):
+        get_base64 = self._get_base64
+
+        def serialize_blob(serialized, value, key=None):
+            serialized[key] = get_base64(value)
+        return serialize_blob
+
+    def _compile_default(self, shape):
+        def serialize_default(serialized, value, key=None):
+            serialized[key] = value
+        return serialize_default
+
 
 class BaseRestSerializer(Serializer):
     """Base class for rest protocols.
@@ -455,15 +704,29 @@ class BaseRestSerializer(Serializer):
             'body_kwargs': self.MAP_TYPE(),
             'headers': self.MAP_TYPE(),
         }
-        for param_name, param_value in parameters.items():
-            if param_value is None:
-                # Don't serialize any parameter with a None value.
-                continue
-            self._partition_parameters(partitioned, param_name, param_value,
-                                       shape_members)
-        serialized['url_path'] = self._render_uri_template(
-            operation_model.http['requestUri'],
-            partitioned['uri_path_kwargs'])
+        if self._compile_plans:
+            partition = self._get_plan(
+                ('partition', shape), self._compile_partitioner, shape)
+            for param_name, param_value in parameters.items():
+                if param_value is None:
+                    continue
+                partition(partitioned, param_name, param_value)
+            uri_template = operation_model.http['requestUri']
+            render_uri = self._get_plan(
+                ('uri', uri_template), self._compile_uri_template,
+                uri_template)
+            serialized['url_path'] = render_uri(
+                partitioned['uri_path_kwargs'])
+        else:
+            for param_name, param_value in parameters.items():
+                if param_value is None:
+                    # Don't serialize any parameter with a None value.
+                    continue
+                self._partition_parameters(partitioned, param_name,
+                                           param_value, shape_members)
+            serialized['url_path'] = self._render_uri_template(
+                operation_model.http['requestUri'],
+                partitioned['uri_path_kwargs'])
         # Note that we lean on the http implementation to handle the case
         # where the requestUri path already has query parameters.
         # The bundled http client, requests, already supports this.
@@ -500,6 +763,25 @@ class BaseRestSerializer(Serializer):
                     params[template_param])
         return uri_template.format(**encoded_params)
 
+    def _compile_uri_template(self, uri_template):
+        # A label ending with '+' is greedy, see _render_uri_template.
+        template_params = [
+            (template_param, template_param.endswith('+'))
+            for template_param in re.findall(r'{(.*?)}', uri_template)
+        ]
+
+        def render_uri_template(params):
+            encoded_params = {}
+            for template_param, is_greedy in template_params:
+                if is_greedy:
+                    encoded_params[template_param] = percent_encode(
+                        params[template_param[:-1]], safe='/~')
+                else:
+                    encoded_params[template_param] = percent_encode(
+                        params[template_param])
+            return uri_template.format(**encoded_params)
+        return render_uri_template
+
     def _serialize_payload(self, partitioned, parameters,
                            serialized, shape, shape_members):
         # partitioned - The user input params partitioned by location.
@@ -604,6 +886,57 @@ class BaseRestSerializer(Serializer):
         else:
             partitioned['body_kwargs'][param_name] = param_value
 
+    def _compile_partitioner(self, shape):
+        # Returns a function equivalent to ``_partition_parameters`` with
+        # the location of each member resolved ahead of time.
+        get_member = self._compile_members(shape, self._compile_partition)
+
+        def partition(partitioned, param_name, param_value):
+            get_member(param_name)(partitioned, param_value)
+        return partition
+
+    def _compile_partition(self, param_name, member):
+        location = member.serialization.get('location')
+        key_name = member.serialization.get('name', param_name)
+        if location == 'uri':
+            def partition(partitioned, param_value):
+                partitioned['uri_path_kwargs'][key_name] = param_value
+        elif location == 'querystring':
+            convert_timestamp = None
+            if member.type_name == 'timestamp':
+                convert_timestamp = self._get_timestamp_converter(
+                    member.serialization.get(
+                        'timestampFormat',
+                        self.QUERY_STRING_TIMESTAMP_FORMAT))
+
+            def partition(partitioned, param_value):
+                query_string_kwargs = partitioned['query_string_kwargs']
+                if isinstance(param_value, dict):
+                    query_string_kwargs.update(param_value)
+                elif isinstance(param_value, bool):
+                    query_string_kwargs[key_name] = str(param_value).lower()
+                elif convert_timestamp is not None:
+                    query_string_kwargs[key_name] = convert_timestamp(
+                        param_value)
+                else:
+                    query_string_kwargs[key_name] = param_value
+        elif location == 'header':
+            convert_header_value = self._convert_header_value
+
+            def partition(partitioned, param_value):
+                value = convert_header_value(member, param_value)
+                partitioned['headers'][key_name] = str(value)
+        elif location == 'headers':
+            serialize_header_map = self._do_serialize_header_map
+
+            def partition(partitioned, param_value):
+                serialize_header_map(key_name, partitioned['headers'],
+                                     param_value)
+        else:
+            def partition(partitioned, param_value):
+                partitioned['body_kwargs'][param_name] = param_value
+        return partition
+
     def _do_serialize_header_map(self, header_prefix, headers, user_input):
         for key, val in user_input.items():
             full_key = header_prefix + key
@@ -662,8 +995,11 @@ class RestJSONSerializer(BaseRestSerializer, JSONSerializer):
 
     def _serialize_body_params(self, params, shape):
         serialized_body = self.MAP_TYPE()
-        self._serialize(serialized_body, params, shape)
-        return json.dumps(serialized_body).encode(self.DEFAULT_ENCODING)
+        if self._compile_plans:
+            self._get_compiled(shape)(serialized_body, params)
+        else:
+            self._serialize(serialized_body, params, shape)
+        return self._json_codec.dumps(serialized_body)
 
 
 class RestXMLSerializer(BaseRestSerializer):
@@ -672,7 +1008,10 @@ class RestXMLSerializer(BaseRestSerializer):
     def _serialize_body_params(self, params, shape):
         root_name = shape.serialization['name']
         pseudo_root = ElementTree.Element('')
-        self._serialize(shape, params, pseudo_root, root_name)
+        if self._compile_plans:
+            self._get_compiled(shape)(params, pseudo_root, root_name)
+        else:
+            self._serialize(shape, params, pseudo_root, root_name)
         real_root = list(pseudo_root)[0]
         return ElementTree.tostring(real_root, encoding=self.DEFAULT_ENCODING)
 
@@ -761,6 +1100,107 @@ class RestXMLSerializer(BaseRestSerializer):
         node = ElementTree.SubElement(xmlnode, name)
         node.text = six.text_type(params)
 
+    # The _compile_type_* methods mirror the _serialize_type_* methods
+    # above.  Each returns a function taking (params, xmlnode, name).
+
+    def _compile_type_structure(self, shape):
+        namespace_attribute = None
+        if 'xmlNamespace' in shape.serialization:
+            namespace_metadata = shape.serialization['xmlNamespace']
+            attribute_name = 'xmlns'
+            if namespace_metadata.get('prefix'):
+                attribute_name += ':%s' % namespace_metadata['prefix']
+            namespace_attribute = (attribute_name, namespace_metadata['uri'])
+
+        def compile_member(key, member_shape):
+            if member_shape.serialization.get('xmlAttribute'):
+                return (member_shape.serialization['name'], None)
+            return (member_shape.serialization.get('name', key),
+                    self._compile(member_shape))
+        get_member = self._compile_members(shape, compile_member)
+
+        def serialize_structure(params, xmlnode, name):
+            structure_node = ElementTree.SubElement(xmlnode, name)
+            if namespace_attribute is not None:
+                structure_node.attrib[namespace_attribute[0]] = \
+                    namespace_attribute[1]
+            for key, value in params.items():
+                member_name, serialize_member = get_member(key)
+                if value is None:
+                    # Don't serialize any param whose value is None.
+                    return
+                if serialize_member is None:
+                    # xmlAttribute members are serialized to an attribute
+                    # of the *current* node.
+                    structure_node.attrib[member_name] = value
+                    continue
+                serialize_member(value, structure_node, member_name)
+        return serialize_structure
+
+    def _compile_type_list(self, shape):
+        member_shape = shape.member
+        serialize_member = self._compile(member_shape)
+        flattened = shape.serialization.get('flattened')
+        element_name = member_shape.serialization.get('name', 'member')
+
+        def serialize_list(params, xmlnode, name):
+            if flattened:
+                list_element_name = name
+                list_node = xmlnode
+            else:
+                list_element_name = element_name
+                list_node = ElementTree.SubElement(xmlnode, name)
+            for item in params:
+                serialize_member(item, list_node, list_element_name)
+        return serialize_list
+
+    def _compile_type_map(self, shape):
+        serialize_key = self._compile(shape.key)
+        serialize_value = self._compile(shape.value)
+        key_name = self._get_serialized_name(shape.key, default_name='key')
+        val_name = self._get_serialized_name(shape.value,
+                                             default_name='value')
+
+        def serialize_map(params, xmlnode, name):
+            node = ElementTree.SubElement(xmlnode, name)
+            for key, value in params.items():
+                entry_node = ElementTree.SubElement(node, 'entry')
+                serialize_key(key, entry_node, key_name)
+                serialize_value(value, entry_node, val_name)
+        return serialize_map
+
+    def _compile_type_boolean(self, shape):
+        def serialize_boolean(params, xmlnode, name):
+            node = ElementTree.SubElement(xmlnode, name)
+            if params:
+                node.text = 'true'
+            else:
+                node.text = 'false'
+        return serialize_boolean
+
+    def _compile_type_blob(self, shape):
+        get_base64 = self._get_base64
+
+        def serialize_blob(params, xmlnode, name):
+            node = ElementTree.SubElement(xmlnode, name)
+            node.text = get_base64(params)
+        return serialize_blob
+
+    def _compile_type_timestamp(self, shape):
+        convert_timestamp = self._get_timestamp_converter(
+            shape.serialization.get('timestampFormat'))
+
+        def serialize_timestamp(params, xmlnode, name):
+            node = ElementTree.SubElement(xmlnode, name)
+            node.text = convert_timestamp(params)
+        return serialize_timestamp
+
+    def _compile_default(self, shape):
+        def serialize_default(params, xmlnode, name):
+            node = ElementTree.SubElement(xmlnode, name)
+            node.text = six.text_type(params)
+        return serialize_default
+
 
 SERIALIZERS = {
     'ec2': EC2Serializer,
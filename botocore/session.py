@@ -41,7 +41,7 @@ from botocore import handlers
 from botocore.hooks import HierarchicalEmitter, first_non_none_response
 from botocore.hooks import EventAliaser
 from botocore.loaders import create_loader
-from botocore.parsers import ResponseParserFactory
+from botocore.parsers import ResponseParserFactory, create_xml_backend
 from botocore.regions import EndpointResolver
 from botocore.model import ServiceModel
 from botocore import monitoring
@@ -153,7 +153,10 @@ class Session(object):
     def _register_data_loader(self):
         self._components.lazy_register_component(
             'data_loader',
-            lambda: create_loader(self.get_config_variable('data_path')))
+            lambda: create_loader(
+                self.get_config_variable('data_path'),
+                self.get_config_variable('data_cache_path'),
+                self.get_config_variable('lazy_service_models')))
 
     def _register_endpoint_resolver(self):
         def create_default_resolver():
@@ -791,6 +794,41 @@ class Session(object):
         :return: A botocore client instance
 
         """
+        return self._create_client(
+            botocore.client.ClientCreator, service_name, region_name,
+            api_version, use_ssl, verify, endpoint_url, aws_access_key_id,
+            aws_secret_access_key, aws_session_token, config)
+
+    def create_async_client(self, service_name, region_name=None,
+                            api_version=None, use_ssl=True, verify=None,
+                            endpoint_url=None, aws_access_key_id=None,
+                            aws_secret_access_key=None,
+                            aws_session_token=None, config=None):
+        """Create a botocore client for use with asyncio.
+
+        The operation methods of the client are coroutines, for example
+        ``await client.get_object(Bucket=bucket, Key=key)``.  The client
+        sends requests over its own asyncio connection pool.  Call
+        ``await client.close()`` when you are done with the client.  See
+        ``botocore.asyncclient.AsyncBaseClient`` for details.
+
+        This method takes the same arguments as ``create_client``.
+
+        :rtype: botocore.asyncclient.AsyncBaseClient
+        :return: A botocore asyncio client instance
+
+        """
+        # Imported here so that asyncio is only imported when it's used.
+        from botocore.asyncclient import AsyncClientCreator
+        return self._create_client(
+            AsyncClientCreator, service_name, region_name, api_version,
+            use_ssl, verify, endpoint_url, aws_access_key_id,
+            aws_secret_access_key, aws_session_token, config)
+
+    def _create_client(self, client_creator_cls, service_name, region_name,
+                       api_version, use_ssl, verify, endpoint_url,
+                       aws_access_key_id, aws_secret_access_key,
+                       aws_session_token, config):
         default_client_config = self.get_default_client_config()
         # If a config is provided and a default config is set, then
         # use the config resulting from merging the two.
@@ -816,6 +854,19 @@ class Session(object):
         event_emitter = self.get_component('event_emitter')
         response_parser_factory = self.get_component(
             'response_parser_factory')
+        parser_defaults = {}
+        if self.get_config_variable('compile_parsers'):
+            parser_defaults['compile_plans'] = True
+        xml_backend = self.get_config_variable('xml_backend')
+        if xml_backend is not None:
+            parser_defaults['xml_backend'] = create_xml_backend(xml_backend)
+        if parser_defaults:
+            # Compiled plans are kept by the factory that created the
+            # parser, so each client gets its own copy of the factory
+            # rather than accumulating plans for every model the session
+            # ever creates a client for.
+            response_parser_factory = response_parser_factory.copy()
+            response_parser_factory.set_parser_defaults(**parser_defaults)
         if config is not None and config.signature_version is UNSIGNED:
             credentials = None
         elif aws_access_key_id is not None and aws_secret_access_key is not None:
@@ -834,18 +885,19 @@ class Session(object):
         endpoint_resolver = self._get_internal_component('endpoint_resolver')
         exceptions_factory = self._get_internal_component('exceptions_factory')
         config_store = self.get_component('config_store')
-        client_creator = botocore.client.ClientCreator(
+        shared_registry = None
+        if self.get_config_variable('share_client_models'):
+            shared_registry = botocore.client.get_shared_client_registry()
+        monitor = self._get_internal_component('monitor')
+        client_creator = client_creator_cls(
             loader, endpoint_resolver, self.user_agent(), event_emitter,
             retryhandler, translate, response_parser_factory,
-            exceptions_factory, config_store)
+            exceptions_factory, config_store, shared_registry, monitor)
         client = client_creator.create_client(
             service_name=service_name, region_name=region_name,
             is_secure=use_ssl, endpoint_url=endpoint_url, verify=verify,
             credentials=credentials, scoped_config=self.get_scoped_config(),
             client_config=config, api_version=api_version)
-        monitor = self._get_internal_component('monitor')
-        if monitor is not None:
-            monitor.register(client.meta.events)
         return client
 
     def _resolve_region_name(self, region_name, config):
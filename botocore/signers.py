@@ -14,15 +14,21 @@ import datetime
 import weakref
 import json
 import base64
+import re
+import threading
+import uuid
 
 import botocore
 import botocore.auth
-from botocore.compat import six, OrderedDict
-from botocore.awsrequest import create_request_object, prepare_request_dict
+from botocore.compat import six, OrderedDict, urlsplit
+from botocore.awsrequest import (
+    AWSRequest, create_request_object, prepare_request_dict,
+)
 from botocore.exceptions import UnknownSignatureVersionError
 from botocore.exceptions import UnknownClientMethodError
 from botocore.exceptions import UnsupportedSignatureVersionError
-from botocore.utils import datetime2timestamp
+from botocore.hooks import get_dispatch_table
+from botocore.utils import datetime2timestamp, percent_encode
 
 # Keep these imported.  There's pre-existing code that uses them.
 from botocore.utils import fix_s3_host # noqa
@@ -120,6 +126,16 @@ class RequestSigner(object):
         :type signing_name: str
         :param signing_name: The name to use for the service when signing.
         """
+        auth = self._get_auth_for_request(
+            operation_name, request, region_name, signing_type, expires_in,
+            signing_name)
+        if auth is not None:
+            auth.add_auth(request)
+
+    def _get_auth_for_request(self, operation_name, request, region_name,
+                              signing_type, expires_in, signing_name):
+        # Everything ``sign`` does short of adding the auth to the request.
+        # Returns None if the request should not be signed.
         explicit_region_name = region_name
         if region_name is None:
             region_name = self._region_name
@@ -131,38 +147,35 @@ class RequestSigner(object):
             operation_name, signing_type, request.context)
 
         # Allow mutating request before signing
-        self._event_emitter.emit(
-            'before-sign.{0}.{1}'.format(
-                self._service_id.hyphenize(), operation_name),
-            request=request, signing_name=signing_name,
+        self._get_dispatch_table(operation_name).emit(
+            'before-sign', request=request, signing_name=signing_name,
             region_name=self._region_name,
             signature_version=signature_version, request_signer=self,
             operation_name=operation_name
         )
 
-        if signature_version != botocore.UNSIGNED:
-            kwargs = {
-                'signing_name': signing_name,
-                'region_name': region_name,
-                'signature_version': signature_version
-            }
-            if expires_in is not None:
-                kwargs['expires'] = expires_in
-            signing_context = request.context.get('signing', {})
-            if not explicit_region_name and signing_context.get('region'):
-                kwargs['region_name'] = signing_context['region']
-            if signing_context.get('signing_name'):
-                kwargs['signing_name'] = signing_context['signing_name']
-            try:
-                auth = self.get_auth_instance(**kwargs)
-            except UnknownSignatureVersionError as e:
-                if signing_type != 'standard':
-                    raise UnsupportedSignatureVersionError(
-                        signature_version=signature_version)
-                else:
-                    raise e
-
-            auth.add_auth(request)
+        if signature_version == botocore.UNSIGNED:
+            return None
+        kwargs = {
+            'signing_name': signing_name,
+            'region_name': region_name,
+            'signature_version': signature_version
+        }
+        if expires_in is not None:
+            kwargs['expires'] = expires_in
+        signing_context = request.context.get('signing', {})
+        if not explicit_region_name and signing_context.get('region'):
+            kwargs['region_name'] = signing_context['region']
+        if signing_context.get('signing_name'):
+            kwargs['signing_name'] = signing_context['signing_name']
+        try:
+            return self.get_auth_instance(**kwargs)
+        except UnknownSignatureVersionError as e:
+            if signing_type != 'standard':
+                raise UnsupportedSignatureVersionError(
+                    signature_version=signature_version)
+            else:
+                raise e
 
     def _choose_signer(self, operation_name, signing_type, context):
         """
@@ -185,10 +198,10 @@ class RequestSigner(object):
                 signature_version.endswith(suffix):
             signature_version += suffix
 
-        handler, response = self._event_emitter.emit_until_response(
-            'choose-signer.{0}.{1}'.format(
-                self._service_id.hyphenize(), operation_name),
-            signing_name=self._signing_name, region_name=self._region_name,
+        events = self._get_dispatch_table(operation_name)
+        handler, response = events.emit_until_response(
+            'choose-signer', signing_name=self._signing_name,
+            region_name=self._region_name,
             signature_version=signature_version, context=context)
 
         if response is not None:
@@ -201,6 +214,10 @@ class RequestSigner(object):
 
         return signature_version
 
+    def _get_dispatch_table(self, operation_name):
+        return get_dispatch_table(
+            self._event_emitter, self._service_id.hyphenize(), operation_name)
+
     def get_auth_instance(self, signing_name, region_name,
                           signature_version=None, **kwargs):
         """
@@ -278,6 +295,60 @@ class RequestSigner(object):
         request.prepare()
         return request.url
 
+    def _create_presigned_url_template(self, request_dict, operation_name,
+                                       placeholder, expires_in=3600):
+        """Creates a template for presigned urls that differ in one value
+
+        :type request_dict: dict
+        :param request_dict: The prepared request dictionary returned by
+            ``botocore.awsrequest.prepare_request_dict()``, where
+            ``placeholder`` stands in for the value that differs.
+
+        :returns: A ``_PresignedUrlTemplate``, or None if the placeholder
+            does not appear exactly once in the path of the request url.
+        """
+        request = create_request_object(request_dict)
+        auth = self._get_auth_for_request(
+            operation_name, request, None, 'presign-url', expires_in, None)
+        if request.url.count(placeholder) != 1 or \
+                placeholder not in urlsplit(request.url).path:
+            return None
+        return _PresignedUrlTemplate(request, auth, placeholder)
+
+
+class _PresignedUrlTemplate(object):
+    """A request that is ready to be presigned, apart from one url value.
+
+    The template is created by running a request through everything that
+    happens before it is signed, with a placeholder standing in for a
+    value in the url path.  Presigned urls are then generated by
+    substituting the encoded value for the placeholder and signing a copy
+    of the request with an auth instance shared by all the urls.
+    """
+    def __init__(self, request, auth, placeholder):
+        self._request = request
+        self._auth = auth
+        self._placeholder = placeholder
+        self._url_head, self._url_tail = request.url.split(placeholder)
+
+    def generate_presigned_url(self, encoded_value):
+        template = self._request
+        auth_path = template.auth_path
+        if auth_path is not None:
+            auth_path = auth_path.replace(self._placeholder, encoded_value)
+        request = AWSRequest(
+            method=template.method,
+            url=self._url_head + encoded_value + self._url_tail,
+            headers=template.headers,
+            data=template.data,
+            params=dict(template.params),
+            auth_path=auth_path,
+        )
+        request.context = dict(template.context)
+        if self._auth is not None:
+            self._auth.add_auth(request)
+        return request.url
+
 
 class CloudFrontSigner(object):
     '''A signer to create a signed CloudFront URL.
@@ -293,6 +364,14 @@ class CloudFrontSigner(object):
                 'SHA-1')  # CloudFront requires SHA-1 hash
         cf_signer = CloudFrontSigner(key_id, rsa_signer)
 
+    Or based on an RSA private key loaded with ``cryptography``::
+
+        from cryptography.hazmat.primitives import serialization
+        with open('private_key.pem', 'rb') as f:
+            private_key = serialization.load_pem_private_key(
+                f.read(), password=None)
+        cf_signer = CloudFrontSigner(key_id, private_key)
+
     To sign with a canned policy::
 
         signed_url = cf_signer.generate_signed_url(
@@ -301,7 +380,21 @@ class CloudFrontSigner(object):
     To sign with a custom policy::
 
         signed_url = cf_signer.generate_signed_url(url, policy=my_policy)
+
+    To sign many urls, or to create signed cookies instead of urls::
+
+        signed_urls = cf_signer.generate_presigned_urls(
+            urls, date_less_than=datetime(2015, 12, 1))
+        cookies = cf_signer.generate_signed_cookies(
+            resource, policy=my_policy)
+
+    Signatures of custom policies are cached, so urls and cookies that
+    share a policy, such as one for a wildcard resource, are only signed
+    once.  Canned policy signatures are also cached when the expiry is
+    rounded up with ``expiry_window``, so the same url signed repeatedly
+    within a window is only signed once.
     '''
+    SIGNATURE_CACHE_SIZE = 1024
 
     def __init__(self, key_id, rsa_signer):
         """Create a CloudFrontSigner.
@@ -314,11 +407,19 @@ class CloudFrontSigner(object):
                Its only input parameter will be the message to be signed,
                and its output will be the signed content as a binary string.
                The hash algorithm needed by CloudFront is SHA-1.
+               This can also be an RSA private key loaded with the
+               ``cryptography`` package, which is then used to sign
+               messages.
         """
         self.key_id = key_id
+        if not callable(rsa_signer):
+            rsa_signer = _create_private_key_signer(rsa_signer)
         self.rsa_signer = rsa_signer
+        self._signature_cache = OrderedDict()
+        self._signature_cache_lock = threading.Lock()
 
-    def generate_presigned_url(self, url, date_less_than=None, policy=None):
+    def generate_presigned_url(self, url, date_less_than=None, policy=None,
+                               expiry_window=None):
         """Creates a signed CloudFront URL based on given parameters.
 
         :type url: str
@@ -330,34 +431,142 @@ class CloudFrontSigner(object):
         :type policy: str
         :param policy: The custom policy, possibly built by self.build_policy()
 
+        :type expiry_window: int
+        :param expiry_window: Round ``date_less_than`` up to a multiple of
+            this many seconds since the epoch, so that urls signed within
+            the same window share their signature.
+
         :rtype: str
         :return: The signed URL.
         """
+        params = self._get_signed_params(
+            url, date_less_than, policy, expiry_window)
+        return self._build_url(
+            url, ['%s=%s' % (name, value) for name, value in params])
+
+    def generate_presigned_urls(self, urls, date_less_than=None, policy=None,
+                                expiry_window=None):
+        """Creates signed CloudFront URLs that share an expiry or policy.
+
+        With ``date_less_than``, each url is signed with its own canned
+        policy.  With ``policy``, the policy is signed once and its
+        signature is added to all of the urls.
+
+        :type urls: iterable
+        :param urls: The URLs of the protected objects
+
+        :type date_less_than: datetime
+        :param date_less_than: The URLs will expire after that date and time
+
+        :type policy: str
+        :param policy: The custom policy, possibly built by self.build_policy()
+
+        :type expiry_window: int
+        :param expiry_window: Round ``date_less_than`` up to a multiple of
+            this many seconds since the epoch.
+
+        :rtype: list
+        :return: The signed URLs, in the same order as ``urls``.
+        """
+        if policy is None:
+            return [
+                self.generate_presigned_url(
+                    url, date_less_than=date_less_than,
+                    expiry_window=expiry_window)
+                for url in urls
+            ]
+        params = self._get_signed_params(
+            None, date_less_than, policy, expiry_window)
+        extra_params = ['%s=%s' % (name, value) for name, value in params]
+        return [self._build_url(url, extra_params) for url in urls]
+
+    def generate_signed_cookies(self, resource, date_less_than=None,
+                                policy=None, expiry_window=None):
+        """Creates signed CloudFront cookies based on given parameters.
+
+        :type resource: str
+        :param resource: The URL of the protected object.  Only used with
+            ``date_less_than``, as a custom policy names its own resource.
+
+        :type date_less_than: datetime
+        :param date_less_than: The cookies will expire after that date and
+            time
+
+        :type policy: str
+        :param policy: The custom policy, possibly built by self.build_policy()
+
+        :type expiry_window: int
+        :param expiry_window: Round ``date_less_than`` up to a multiple of
+            this many seconds since the epoch.
+
+        :rtype: dict
+        :return: The names and values of the cookies to set, e.g.
+            ``CloudFront-Policy``, ``CloudFront-Signature`` and
+            ``CloudFront-Key-Pair-Id``.
+        """
+        params = self._get_signed_params(
+            resource, date_less_than, policy, expiry_window)
+        return dict(('CloudFront-%s' % name, value) for name, value in params)
+
+    def _get_signed_params(self, resource, date_less_than, policy,
+                           expiry_window):
         both_args_supplied = date_less_than is not None and policy is not None
         neither_arg_supplied = date_less_than is None and policy is None
         if both_args_supplied or neither_arg_supplied:
             e = 'Need to provide either date_less_than or policy, but not both'
             raise ValueError(e)
         if date_less_than is not None:
+            expires = int(datetime2timestamp(date_less_than))
+            if expiry_window is not None:
+                expires = -(-expires // expiry_window) * expiry_window
             # We still need to build a canned policy for signing purpose
-            policy = self.build_policy(url, date_less_than)
-        if isinstance(policy, six.text_type):
-            policy = policy.encode('utf8')
-        if date_less_than is not None:
-            params = ['Expires=%s' % int(datetime2timestamp(date_less_than))]
+            policy = self._build_canned_policy(resource, expires)
+            _, signature = self._sign_policy(
+                policy, cache=expiry_window is not None)
+            params = [('Expires', str(expires))]
         else:
-            params = ['Policy=%s' % self._url_b64encode(policy).decode('utf8')]
-        signature = self.rsa_signer(policy)
+            encoded_policy, signature = self._sign_policy(policy, cache=True)
+            params = [('Policy', encoded_policy)]
         params.extend([
-            'Signature=%s' % self._url_b64encode(signature).decode('utf8'),
-            'Key-Pair-Id=%s' % self.key_id,
+            ('Signature', signature),
+            ('Key-Pair-Id', self.key_id),
         ])
-        return self._build_url(url, params)
+        return params
+
+    def _sign_policy(self, policy, cache):
+        # Returns the url safe base64 encoded policy and signature.
+        if isinstance(policy, six.text_type):
+            policy = policy.encode('utf8')
+        if cache:
+            with self._signature_cache_lock:
+                signed_policy = self._signature_cache.get(policy)
+                if signed_policy is not None:
+                    self._signature_cache.move_to_end(policy)
+                    return signed_policy
+        signed_policy = (
+            self._url_b64encode(policy).decode('utf8'),
+            self._url_b64encode(self.rsa_signer(policy)).decode('utf8'),
+        )
+        if cache:
+            with self._signature_cache_lock:
+                self._signature_cache[policy] = signed_policy
+                while len(self._signature_cache) > self.SIGNATURE_CACHE_SIZE:
+                    self._signature_cache.popitem(last=False)
+        return signed_policy
 
     def _build_url(self, base_url, extra_params):
         separator = '&' if '?' in base_url else '?'
         return base_url + separator + '&'.join(extra_params)
 
+    def _build_canned_policy(self, resource, expires):
+        # The same policy as self.build_policy(resource, date_less_than),
+        # without building it from dicts.
+        return (
+            '{"Statement":[{"Resource":%s,'
+            '"Condition":{"DateLessThan":{"AWS:EpochTime":%d}}}]}' % (
+                json.dumps(resource), expires)
+        )
+
     def build_policy(self, resource, date_less_than,
                      date_greater_than=None, ip_address=None):
         """A helper to build policy.
@@ -406,6 +615,16 @@ class CloudFrontSigner(object):
             data).replace(b'+', b'-').replace(b'=', b'_').replace(b'/', b'~')
 
 
+def _create_private_key_signer(private_key):
+    # CloudFront requires RSA signatures with a SHA-1 hash.
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+
+    def rsa_signer(message):
+        return private_key.sign(message, padding.PKCS1v15(), hashes.SHA1())
+    return rsa_signer
+
+
 def add_generate_db_auth_token(class_attributes, **kwargs):
     class_attributes['generate_db_auth_token'] = generate_db_auth_token
 
@@ -541,6 +760,10 @@ def add_generate_presigned_url(class_attributes, **kwargs):
     class_attributes['generate_presigned_url'] = generate_presigned_url
 
 
+def add_generate_presigned_urls(class_attributes, **kwargs):
+    class_attributes['generate_presigned_urls'] = generate_presigned_urls
+
+
 def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600,
                            HttpMethod=None):
     """Generate a presigned url given a client, its method, and arguments
@@ -568,23 +791,138 @@ def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600,
         params = {}
     expires_in = ExpiresIn
     http_method = HttpMethod
+
+    request_signer = self._request_signer
+    operation_name, request_dict = _prepare_presigned_url_request_dict(
+        self, client_method, params, http_method)
+
+    # Generate the presigned url.
+    return request_signer.generate_presigned_url(
+        request_dict=request_dict, expires_in=expires_in,
+        operation_name=operation_name)
+
+
+def generate_presigned_urls(self, Requests, ExpiresIn=3600, HttpMethod=None):
+    """Generate presigned urls for many client method calls
+
+    This gives the same urls as calling ``generate_presigned_url`` for each
+    call, but calls that differ only in the value of a greedy url path
+    label, such as the ``Key`` of S3 object operations, share the work of
+    generating their urls.  The first such call is used to build a
+    template of the request, including its endpoint and signer, and each
+    url is then generated from the template by substituting the encoded
+    value and signing it.  Because of this, the parameter events of the
+    client method are emitted once per template rather than once per url,
+    and the value of the label is only checked for its type and length.
+
+    :type Requests: iterable
+    :param Requests: The ``(ClientMethod, Params)`` pairs to presign, where
+        ``Params`` are the parameters normally passed to ``ClientMethod``.
+
+    :type ExpiresIn: int
+    :param ExpiresIn: The number of seconds the presigned urls are valid
+        for. By default they expire in an hour (3600 seconds)
+
+    :type HttpMethod: string
+    :param HttpMethod: The http method to use on the generated urls. By
+        default, the http method is whatever is used in the method's model.
+
+    :returns: The presigned urls, in the same order as ``Requests``.
+    """
+    expires_in = ExpiresIn
+    http_method = HttpMethod
+    placeholder = 'botocore-presign-%s' % uuid.uuid4().hex
+    templates = {}
+    urls = []
+    for client_method, params in Requests:
+        if params is None:
+            params = {}
+        url = _generate_presigned_url_from_template(
+            self, templates, placeholder, client_method, params,
+            expires_in, http_method)
+        if url is None:
+            url = self.generate_presigned_url(
+                client_method, Params=params, ExpiresIn=expires_in,
+                HttpMethod=http_method)
+        urls.append(url)
+    return urls
+
+
+def _generate_presigned_url_from_template(client, templates, placeholder,
+                                          client_method, params, expires_in,
+                                          http_method):
+    # Returns None if the url can't be generated from a template.
+    try:
+        operation_name = client._PY_TO_OP_NAME[client_method]
+    except KeyError:
+        return None
+    operation_model = client.meta.service_model.operation_model(
+        operation_name)
+    member_name = _get_greedy_label_member(operation_model)
+    if member_name is None:
+        return None
+    value = params.get(member_name)
+    member_shape = operation_model.input_shape.members[member_name]
+    if not isinstance(value, six.string_types) or \
+            len(value) < member_shape.metadata.get('min', 0):
+        return None
+    template_key = (client_method, tuple(sorted(
+        item for item in params.items() if item[0] != member_name)))
+    try:
+        template = templates.get(template_key)
+    except TypeError:
+        # Some of the other params are unhashable.
+        return None
+    if template is None:
+        if template_key in templates:
+            return None
+        template_params = dict(params)
+        template_params[member_name] = placeholder
+        operation_name, request_dict = _prepare_presigned_url_request_dict(
+            client, client_method, template_params, http_method)
+        template = client._request_signer._create_presigned_url_template(
+            request_dict, operation_name, placeholder, expires_in)
+        templates[template_key] = template
+        if template is None:
+            return None
+    return template.generate_presigned_url(
+        percent_encode(value, safe='/~'))
+
+
+def _get_greedy_label_member(operation_model):
+    input_shape = operation_model.input_shape
+    if input_shape is None:
+        return None
+    labels = re.findall(
+        r'{([^}]*)\+}', operation_model.http.get('requestUri', ''))
+    if not labels:
+        return None
+    for member_name, member_shape in input_shape.members.items():
+        if member_shape.serialization.get('location') == 'uri' and \
+                member_shape.serialization.get('name', member_name) == \
+                labels[0]:
+            return member_name
+    return None
+
+
+def _prepare_presigned_url_request_dict(client, client_method, params,
+                                        http_method):
     context = {
         'is_presign_request': True,
-        'use_global_endpoint': _should_use_global_endpoint(self),
+        'use_global_endpoint': _should_use_global_endpoint(client),
     }
 
-    request_signer = self._request_signer
-    serializer = self._serializer
+    serializer = client._serializer
 
     try:
-        operation_name = self._PY_TO_OP_NAME[client_method]
+        operation_name = client._PY_TO_OP_NAME[client_method]
     except KeyError:
         raise UnknownClientMethodError(method_name=client_method)
 
-    operation_model = self.meta.service_model.operation_model(
+    operation_model = client.meta.service_model.operation_model(
         operation_name)
 
-    params = self._emit_api_params(params, operation_model, context)
+    params = client._emit_api_params(params, operation_model, context)
 
     # Create a request dict based on the params to serialize.
     request_dict = serializer.serialize_to_request(
@@ -596,12 +934,8 @@ def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600,
 
     # Prepare the request dict by including the client's endpoint url.
     prepare_request_dict(
-        request_dict, endpoint_url=self.meta.endpoint_url, context=context)
-
-    # Generate the presigned url.
-    return request_signer.generate_presigned_url(
-        request_dict=request_dict, expires_in=expires_in,
-        operation_name=operation_name)
+        request_dict, endpoint_url=client.meta.endpoint_url, context=context)
+    return operation_name, request_dict
 
 
 def add_generate_presigned_post(class_attributes, **kwargs):
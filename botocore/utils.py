@@ -33,7 +33,7 @@ import botocore.httpsession
 from botocore.compat import (
     json, quote, zip_longest, urlsplit, urlunsplit, OrderedDict,
     six, urlparse, get_tzinfo_options, get_md5, MD5_AVAILABLE,
-    HAS_CRT
+    HAS_CRT, MutableMapping
 )
 from botocore.vendored.six.moves.urllib.request import getproxies, proxy_bypass
 from botocore.exceptions import (
@@ -1283,7 +1283,7 @@ def deep_merge(base, extra):
     """
     for key in extra:
         # If the key represents a dict on both given dicts, merge the sub-dicts
-        if key in base and isinstance(base[key], dict)\
+        if key in base and isinstance(base[key], MutableMapping)\
                 and isinstance(extra[key], dict):
             deep_merge(base[key], extra[key])
             continue
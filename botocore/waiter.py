@@ -23,7 +23,8 @@ from . import xform_name
 logger = logging.getLogger(__name__)
 
 
-def create_waiter_with_client(waiter_name, waiter_model, client):
+def create_waiter_with_client(waiter_name, waiter_model, client,
+                              waiter_cls=None):
     """
 
     :type waiter_name: str
@@ -37,20 +38,26 @@ def create_waiter_with_client(waiter_name, waiter_model, client):
     :type client: botocore.client.BaseClient
     :param client: The botocore client associated with the service.
 
+    :type waiter_cls: type
+    :param waiter_cls: The class of the waiter.  Defaults to
+        ``botocore.waiter.Waiter``.
+
     :rtype: botocore.waiter.Waiter
     :return: The waiter object.
 
     """
+    if waiter_cls is None:
+        waiter_cls = Waiter
     single_waiter_config = waiter_model.get_waiter(waiter_name)
     operation_name = xform_name(single_waiter_config.operation)
-    operation_method = NormalizedOperationMethod(
+    operation_method = waiter_cls.OPERATION_METHOD_CLS(
         getattr(client, operation_name))
 
     # Create a new wait method that will serve as a proxy to the underlying
     # Waiter.wait method. This is needed to attach a docstring to the
     # method.
     def wait(self, **kwargs):
-        Waiter.wait(self, **kwargs)
+        return waiter_cls.wait(self, **kwargs)
 
     wait.__doc__ = WaiterDocstring(
         waiter_name=waiter_name,
@@ -67,7 +74,7 @@ def create_waiter_with_client(waiter_name, waiter_model, client):
 
     # Create the new waiter class
     documented_waiter_cls = type(
-        waiter_class_name, (Waiter,), {'wait': wait})
+        waiter_class_name, (waiter_cls,), {'wait': wait})
 
     # Return an instance of the new waiter class.
     return documented_waiter_cls(
@@ -285,6 +292,8 @@ class AcceptorConfig(object):
 
 
 class Waiter(object):
+    OPERATION_METHOD_CLS = NormalizedOperationMethod
+
     def __init__(self, name, config, operation_method):
         """
 
@@ -307,17 +316,32 @@ class Waiter(object):
         self.config = config
 
     def wait(self, **kwargs):
-        acceptors = list(self.config.acceptors)
-        current_state = 'waiting'
         # pop the invocation specific config
         config = kwargs.pop('WaiterConfig', {})
         sleep_amount = config.get('Delay', self.config.delay)
+        responses = self._check_responses(config)
+        next(responses)
+        while True:
+            response = self._operation_method(**kwargs)
+            try:
+                responses.send(response)
+            except StopIteration:
+                return
+            time.sleep(sleep_amount)
+
+    def _check_responses(self, config):
+        # Checks the response of each attempt against the acceptors
+        # without making any calls, so that it can be shared with asyncio
+        # waiters.  This must be sent the response of each attempt, stops
+        # once the waiter succeeds and raises a WaiterError if it fails.
+        acceptors = list(self.config.acceptors)
+        current_state = 'waiting'
         max_attempts = config.get('MaxAttempts', self.config.max_attempts)
         last_matched_acceptor = None
         num_attempts = 0
 
         while True:
-            response = self._operation_method(**kwargs)
+            response = yield
             num_attempts += 1
             for acceptor in acceptors:
                 if acceptor.matcher_func(response):
@@ -364,4 +388,3 @@ class Waiter(object):
                     reason=reason,
                     last_response=response,
                 )
-            time.sleep(sleep_amount)
@@ -22,8 +22,11 @@ import binascii
 import platform
 import select
 import datetime
+import socketserver
+import threading
 import unittest
 from contextlib import ContextDecorator
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest import mock
 from io import BytesIO
 from subprocess import Popen, PIPE
@@ -381,6 +384,56 @@ class RawResponse(BytesIO):
             contents = self.read()
 
 
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections.append(self.client_address)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class LocalHTTPServer(object):
+    """An HTTP/1.1 server on localhost that keeps connections alive.
+
+    Every HEAD request gets an empty 200 response, and the address of
+    every accepted connection is recorded in ``connections``.
+    """
+    def __init__(self):
+        self._server = _ThreadingHTTPServer(
+            ('127.0.0.1', 0), _KeepAliveHandler)
+        self._server.connections = []
+        self.url = 'http://127.0.0.1:%s/' % self._server.server_address[1]
+        self._thread = None
+
+    @property
+    def connections(self):
+        return self._server.connections
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
 class BaseHTTPStubber(object):
     def __init__(self, obj_with_event_emitter, strict=True):
         self.reset()
@@ -1,6 +1,17 @@
+import json
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import botocore
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+from botocore.credentials import Credentials
+from botocore.model import OperationNotFoundError
+from tests import (
+    create_session, mock, ClientHTTPStubber, LocalHTTPServer, RawResponse,
+)
 
 
 class TestCreateClients(unittest.TestCase):
@@ -18,3 +29,306 @@ class TestCreateClients(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, ('invalid region name')):
             self.session.create_client(
                 'cloudformation', region_name='invalid region name')
+
+
+class TestCloneClient(unittest.TestCase):
+    def setUp(self):
+        self.session = create_session()
+        self.client = self.session.create_client(
+            'dynamodb', region_name='us-west-2',
+            aws_access_key_id='foo', aws_secret_access_key='bar')
+
+    def test_clone_shares_model_and_connection_pool(self):
+        clone = self.client.clone()
+        self.assertIsNot(clone, self.client)
+        self.assertIs(type(clone), type(self.client))
+        self.assertIs(clone.meta.service_model, self.client.meta.service_model)
+        self.assertIs(clone._endpoint.http_session,
+                      self.client._endpoint.http_session)
+        self.assertIsNot(clone.meta.events, self.client.meta.events)
+
+    def test_clone_with_credentials(self):
+        clone = self.client.clone(credentials=Credentials('baz', 'qux'))
+        with ClientHTTPStubber(clone) as stubber:
+            stubber.add_response(body=b'{}')
+            clone.list_tables()
+        self.assertIn(b'Credential=baz/',
+                      stubber.requests[0].headers['Authorization'])
+        # The original client still uses its own credentials.
+        with ClientHTTPStubber(self.client) as stubber:
+            stubber.add_response(body=b'{}')
+            self.client.list_tables()
+        self.assertIn(b'Credential=foo/',
+                      stubber.requests[0].headers['Authorization'])
+
+    def test_clone_with_region_does_not_share_connection_pool(self):
+        clone = self.client.clone(region_name='us-east-1')
+        self.assertEqual(clone.meta.region_name, 'us-east-1')
+        self.assertEqual(
+            clone.meta.endpoint_url, 'https://dynamodb.us-east-1.amazonaws.com')
+        self.assertIsNot(clone._endpoint.http_session,
+                         self.client._endpoint.http_session)
+
+    def test_clone_with_other_socket_options_does_not_share_pool(self):
+        http_session = self.client._endpoint.http_session
+        with mock.patch.object(type(http_session), 'socket_options',
+                               new_callable=mock.PropertyMock,
+                               return_value=[]):
+            clone = self.client.clone()
+        self.assertIsNot(clone._endpoint.http_session, http_session)
+
+    def test_clone_with_config_is_merged(self):
+        client = self.session.create_client(
+            'dynamodb', region_name='us-west-2',
+            aws_access_key_id='foo', aws_secret_access_key='bar',
+            config=Config(user_agent_extra='extra'))
+        clone = client.clone(config=Config(read_timeout=10))
+        self.assertEqual(clone.meta.config.read_timeout, 10)
+        self.assertTrue(clone.meta.config.user_agent.endswith('extra'))
+        # The HTTP configuration changed so the pool can't be shared.
+        self.assertIsNot(clone._endpoint.http_session,
+                         client._endpoint.http_session)
+
+    def test_cannot_clone_client_not_created_by_session(self):
+        client = type(self.client)(**{
+            'serializer': None, 'endpoint': self.client._endpoint,
+            'response_parser': None, 'event_emitter': self.client.meta.events,
+            'request_signer': self.client._request_signer,
+            'service_model': self.client.meta.service_model, 'loader': None,
+            'client_config': self.client.meta.config, 'partition': 'aws',
+            'exceptions_factory': None})
+        with self.assertRaises(ValueError):
+            client.clone()
+
+
+class TestExecuteMany(unittest.TestCase):
+    def setUp(self):
+        self.session = create_session()
+        self.client = self.session.create_client(
+            'dynamodb', region_name='us-west-2',
+            aws_access_key_id='foo', aws_secret_access_key='bar')
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.client.meta.events.register('before-send', self.respond)
+
+    def respond(self, request, **kwargs):
+        # Echoes the requested table name back as the item, and fails
+        # requests for the table named "missing".
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        table_name = json.loads(request.body)['TableName']
+        if table_name.startswith('tbl'):
+            # Later requests complete first.
+            time.sleep(0.05 / (int(table_name[3:]) + 1))
+        with self.lock:
+            self.in_flight -= 1
+        if table_name == 'missing':
+            body = {'__type': 'ResourceNotFoundException', 'message': 'no'}
+            return AWSResponse(request.url, 400, {}, RawResponse(
+                json.dumps(body).encode('utf-8')))
+        body = {'Item': {'name': {'S': table_name}}}
+        return AWSResponse(request.url, 200, {}, RawResponse(
+            json.dumps(body).encode('utf-8')))
+
+    def get_item_params(self, table_names):
+        return [{'TableName': name, 'Key': {'id': {'S': '1'}}}
+                for name in table_names]
+
+    def test_operation_resolved_once_per_batch(self):
+        params = self.get_item_params(['foo', 'bar', 'baz'])
+        service_model = self.client.meta.service_model
+        with mock.patch.object(
+                service_model, 'operation_model',
+                wraps=service_model.operation_model) as operation_model:
+            results = list(self.client.meta.execute_many('get_item', params))
+        self.assertEqual([r.exception for r in results], [None] * 3)
+        self.assertEqual(operation_model.call_count, 1)
+
+    def test_dispatch_table_resolved_once_per_batch(self):
+        params = self.get_item_params(['foo', 'bar', 'baz'])
+        with mock.patch.object(
+                self.client, '_get_dispatch_table',
+                wraps=self.client._get_dispatch_table) as get_dispatch_table:
+            results = list(self.client.meta.execute_many('get_item', params))
+        self.assertEqual([r.exception for r in results], [None] * 3)
+        self.assertEqual(get_dispatch_table.call_count, 1)
+
+    def test_results_are_ordered(self):
+        params = self.get_item_params(['tbl%s' % i for i in range(10)])
+        results = list(self.client.meta.execute_many(
+            'get_item', params, max_concurrency=4))
+        self.assertEqual([r.index for r in results], list(range(10)))
+        self.assertEqual(
+            [r.response['Item']['name']['S'] for r in results],
+            ['tbl%s' % i for i in range(10)])
+        self.assertTrue(all(r.exception is None for r in results))
+        self.assertEqual(results[3].params, params[3])
+        self.assertLessEqual(self.max_in_flight, 4)
+        self.assertGreater(self.max_in_flight, 1)
+
+    def test_results_as_completed(self):
+        params = self.get_item_params(['tbl%s' % i for i in range(4)])
+        results = list(self.client.meta.execute_many(
+            'get_item', params, max_concurrency=4, ordered=False))
+        self.assertEqual(
+            sorted(r.index for r in results), [0, 1, 2, 3])
+        self.assertNotEqual([r.index for r in results], [0, 1, 2, 3])
+
+    def test_exceptions_are_per_item(self):
+        params = self.get_item_params(['tbl1', 'missing', 'tbl2'])
+        params.append({'TableName': 'tbl3'})
+        results = list(self.client.meta.execute_many('get_item', params))
+        self.assertEqual(results[0].response['Item']['name']['S'], 'tbl1')
+        self.assertIsNone(results[1].response)
+        self.assertIsInstance(
+            results[1].exception,
+            self.client.exceptions.ResourceNotFoundException)
+        self.assertEqual(results[2].response['Item']['name']['S'], 'tbl2')
+        self.assertIsInstance(
+            results[3].exception, botocore.exceptions.ParamValidationError)
+
+    def test_consumes_params_lazily(self):
+        consumed = []
+
+        def params():
+            for i in range(100):
+                consumed.append(i)
+                yield self.get_item_params(['tbl%s' % i])[0]
+
+        results = self.client.meta.execute_many(
+            'get_item', params(), max_concurrency=2)
+        self.assertEqual(next(results).index, 0)
+        results.close()
+        self.assertLess(len(consumed), 10)
+
+    def test_retries_do_not_sleep_on_threads(self):
+        responses = [
+            AWSResponse('https://dynamodb', 500, {}, RawResponse(b'{}')),
+        ]
+
+        def fail_once(request, **kwargs):
+            if responses:
+                return responses.pop()
+        self.client.meta.events.register_first('before-send', fail_once)
+        params = self.get_item_params(['flaky'])
+        with mock.patch('time.sleep') as sleep:
+            results = list(self.client.meta.execute_many('get_item', params))
+        self.assertEqual(
+            results[0].response['ResponseMetadata']['RetryAttempts'], 1)
+        self.assertFalse(sleep.called)
+
+    def test_unknown_operation(self):
+        with self.assertRaises(OperationNotFoundError):
+            self.client.meta.execute_many('get_items', [])
+
+    def test_invalid_max_concurrency(self):
+        with self.assertRaises(ValueError):
+            self.client.meta.execute_many('get_item', [], max_concurrency=0)
+
+
+class ImmediateScheduler(object):
+    def __init__(self):
+        self.delays = []
+
+    def call_later(self, delay, function, *args):
+        self.delays.append(delay)
+        function(*args)
+
+
+class TestSubmit(unittest.TestCase):
+    def setUp(self):
+        self.session = create_session()
+        self.client = self.session.create_client(
+            'dynamodb', region_name='us-west-2',
+            aws_access_key_id='foo', aws_secret_access_key='bar')
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+        self.scheduler = ImmediateScheduler()
+        self.http_stubber = ClientHTTPStubber(self.client)
+        self.http_stubber.start()
+        self.addCleanup(self.http_stubber.stop)
+
+    def submit(self, operation_name='list_tables', params=None):
+        return self.client.meta.submit(
+            operation_name, params or {}, self.executor,
+            scheduler=self.scheduler)
+
+    def test_submit_returns_future_of_response(self):
+        self.http_stubber.add_response(body=b'{"TableNames": ["foo"]}')
+        future = self.submit()
+        self.assertEqual(future.result()['TableNames'], ['foo'])
+        self.assertEqual(future.attempts, 1)
+        self.assertIsNone(future.retry_after)
+
+    def test_retries_are_scheduled(self):
+        self.http_stubber.add_response(status=500, body=b'{}')
+        self.http_stubber.add_response(body=b'{"TableNames": []}')
+        with mock.patch('time.sleep') as sleep:
+            response = self.submit().result()
+        self.assertEqual(response['ResponseMetadata']['RetryAttempts'], 1)
+        self.assertEqual(len(self.scheduler.delays), 1)
+        self.assertFalse(sleep.called)
+
+    def test_error_is_raised_from_future(self):
+        self.http_stubber.add_response(status=400, body=(
+            b'{"__type": "ResourceNotFoundException", "message": "no"}'))
+        future = self.submit('describe_table', {'TableName': 'foo'})
+        with self.assertRaises(
+                self.client.exceptions.ResourceNotFoundException):
+            future.result()
+
+    def test_invalid_params_are_raised_from_future(self):
+        future = self.submit('describe_table', {})
+        with self.assertRaises(botocore.exceptions.ParamValidationError):
+            future.result()
+
+    def test_call_is_prepared_on_executor(self):
+        threads = []
+        self.client.meta.events.register(
+            'before-parameter-build',
+            lambda **kwargs: threads.append(threading.current_thread()))
+        self.http_stubber.add_response(body=b'{"TableNames": []}')
+        self.submit().result()
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_unknown_operation(self):
+        with self.assertRaises(OperationNotFoundError):
+            self.submit('list_tabels')
+
+
+class TestPrewarm(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalHTTPServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.session = create_session()
+
+    def create_client(self, **kwargs):
+        return self.session.create_client(
+            'dynamodb', region_name='us-west-2',
+            endpoint_url=self.server.url,
+            aws_access_key_id='foo', aws_secret_access_key='bar', **kwargs)
+
+    def test_prewarm_opens_connections_to_endpoint(self):
+        client = self.create_client()
+        self.assertEqual(client.meta.prewarm(connections=3), 3)
+        # The idle connections are reused by the second call.
+        self.assertEqual(client.meta.prewarm(connections=3), 3)
+        self.assertEqual(len(self.server.connections), 3)
+
+    def test_prewarm_limited_by_max_pool_connections(self):
+        client = self.create_client(config=Config(max_pool_connections=2))
+        self.assertEqual(client.meta.prewarm(connections=5), 2)
+
+    def test_idle_connection_timeout_is_used_by_http_session(self):
+        with mock.patch('botocore.httpsession._IDLE_CONNECTION_REAPER'):
+            client = self.create_client(
+                config=Config(idle_connection_timeout=30))
+        http_session = client._endpoint.http_session
+        self.assertEqual(http_session._idle_connection_timeout, 30)
+        # Clones with a different timeout can't share the connections.
+        clone = client.clone(config=Config(idle_connection_timeout=10))
+        self.assertIsNot(clone._endpoint.http_session, http_session)
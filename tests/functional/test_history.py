@@ -1,4 +1,4 @@
-from tests import BaseSessionTest, ClientHTTPStubber
+from tests import mock, BaseSessionTest, ClientHTTPStubber
 from botocore.history import BaseHistoryHandler
 from botocore.history import get_global_history_recorder
 
@@ -144,3 +144,19 @@ class TestRecordStatementsInjections(BaseSessionTest):
             'HTTPStatusCode': 200,
             'RetryAttempts': 0
         })
+
+    def test_records_all_or_none_of_a_sampled_call(self):
+        history_recorder = get_global_history_recorder()
+        history_recorder.enable(sample_rate=0.5)
+        self.addCleanup(history_recorder.enable, sample_rate=1.0)
+        self.http_stubber.add_response(body=self.s3_response_body)
+        self.http_stubber.add_response(body=self.s3_response_body)
+        with mock.patch('random.random', side_effect=[0.7, 0.2]):
+            with self.http_stubber:
+                self.client.list_buckets()
+                self.client.list_buckets()
+
+        recorded_calls = self.recording_handler.recorded_calls
+        event_types = [call[0] for call in recorded_calls]
+        self.assertEqual(event_types, [
+            'API_CALL', 'HTTP_REQUEST', 'HTTP_RESPONSE', 'PARSED_RESPONSE'])
@@ -12,10 +12,17 @@
 # language governing permissions and limitations under the License.
 import contextlib
 import json
-from tests import BaseSessionTest, mock, ClientHTTPStubber
+import shutil
+import tempfile
+import threading
+from tests import BaseSessionTest, mock, ClientHTTPStubber, RawResponse
 
+import botocore.session
+from botocore.awsrequest import AWSResponse
 from botocore.exceptions import ClientError
 from botocore.config import Config
+from botocore.retries.adaptive import RateLimiterRegistry
+from botocore.retries.bucket import TokenBucket
 
 
 class BaseRetryTest(BaseSessionTest):
@@ -187,3 +194,239 @@ class TestRetriesV2(BaseRetryTest):
         self.assertTrue(
             e.exception.response['ResponseMetadata'].get('RetryQuotaReached')
         )
+
+
+class TestSharedRetryState(BaseRetryTest):
+    def setUp(self):
+        super(TestSharedRetryState, self).setUp()
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.session.set_config_variable(
+            'retry_shared_state', 'mmap:%s' % self.tempdir)
+
+    def create_client_with_retry_mode(self, service, retry_mode):
+        return self.session.create_client(
+            service, self.region, config=Config(retries={'mode': retry_mode}))
+
+    def test_clients_share_retry_quota(self):
+        first = self.create_client_with_retry_mode('dynamodb', 'standard')
+        second = self.create_client_with_retry_mode('dynamodb', 'standard')
+        for client in [first, second]:
+            for i in range(25):
+                with self.assert_will_retry_n_times(client, 2, status=502):
+                    client.list_tables()
+        with ClientHTTPStubber(first) as http_stubber:
+            http_stubber.add_response(status=502, body=b'{}')
+            with self.assertRaises(ClientError) as e:
+                first.list_tables()
+        self.assertTrue(
+            e.exception.response['ResponseMetadata'].get('RetryQuotaReached')
+        )
+
+    def test_clients_share_rate_limiter(self):
+        first = self.create_client_with_retry_mode('dynamodb', 'adaptive')
+        second = self.create_client_with_retry_mode('dynamodb', 'adaptive')
+        with ClientHTTPStubber(first) as http_stubber:
+            http_stubber.add_response(status=400, body=json.dumps({
+                '__type': 'ThrottlingException', 'message': 'Error'
+            }).encode())
+            http_stubber.add_response(status=200, body=b'{}')
+            first.list_tables()
+        with mock.patch('time.sleep') as sleep:
+            with ClientHTTPStubber(second) as http_stubber:
+                http_stubber.add_response(status=200, body=b'{}')
+                second.list_tables()
+        # The throttling error seen by the first client makes the second
+        # client wait for a token before sending.
+        self.assertTrue(sleep.called)
+
+
+class TestRateLimiterScope(BaseRetryTest):
+    def setUp(self):
+        super(TestRateLimiterScope, self).setUp()
+        registry = mock.patch(
+            'botocore.retries.adaptive.RATE_LIMITER_REGISTRY',
+            RateLimiterRegistry())
+        registry.start()
+        self.addCleanup(registry.stop)
+        # The token bucket is only used once its rate limiter has seen a
+        # throttling error.
+        acquire = mock.patch.object(TokenBucket, 'acquire', autospec=True)
+        self.acquire = acquire.start()
+        self.addCleanup(acquire.stop)
+
+    def create_client(self, session=None, **retries):
+        if session is None:
+            session = self.session
+        retries.update(mode='adaptive', rate_limiter_scope='endpoint')
+        return session.create_client(
+            'dynamodb', self.region, config=Config(retries=retries))
+
+    def throttle(self, client, **params):
+        with ClientHTTPStubber(client) as http_stubber:
+            http_stubber.add_response(status=400, body=json.dumps({
+                '__type': 'ThrottlingException', 'message': 'Error'
+            }).encode())
+            http_stubber.add_response(status=200, body=b'{}')
+            client.describe_table(**params)
+
+    def assert_waits_for_token(self, client, expected=True, **params):
+        self.acquire.reset_mock()
+        with ClientHTTPStubber(client) as http_stubber:
+            http_stubber.add_response(status=200, body=b'{}')
+            client.describe_table(**params)
+        self.assertEqual(self.acquire.called, expected)
+
+    def test_clients_share_rate_limiter(self):
+        first = self.create_client()
+        second = self.create_client(session=botocore.session.get_session())
+        self.throttle(first, TableName='foo')
+        self.assert_waits_for_token(second, TableName='foo')
+
+    def test_clients_do_not_share_rate_limiter_by_default(self):
+        config = Config(retries={'mode': 'adaptive'})
+        first = self.session.create_client(
+            'dynamodb', self.region, config=config)
+        second = self.session.create_client(
+            'dynamodb', self.region, config=config)
+        self.throttle(first, TableName='foo')
+        self.assert_waits_for_token(second, expected=False, TableName='foo')
+
+    def test_rate_limiters_are_partitioned_by_resource(self):
+        first = self.create_client(rate_limiter_resource_param='TableName')
+        second = self.create_client(rate_limiter_resource_param='TableName')
+        self.throttle(first, TableName='foo')
+        self.assert_waits_for_token(second, expected=False, TableName='bar')
+        self.assert_waits_for_token(second, TableName='foo')
+
+
+class TestHedging(BaseRetryTest):
+    def setUp(self):
+        super(TestHedging, self).setUp()
+        self.release_slow = threading.Event()
+        self.sent = []
+        self.slow_attempts = set()
+
+    def create_client(self, **retries):
+        retries.update(mode='standard', hedging_percentile=50)
+        client = self.session.create_client(
+            'dynamodb', self.region, config=Config(retries=retries))
+        client.meta.events.register('before-send', self.send)
+        self.addCleanup(self.release_slow.set)
+        return client
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        attempt = len(self.sent)
+        if attempt in self.slow_attempts:
+            self.release_slow.wait(5)
+        body = json.dumps({'Item': {'id': {'S': str(attempt)}}}).encode()
+        return AWSResponse(request.url, 200, {}, RawResponse(body))
+
+    def warm_up(self, client, **params):
+        # Hedging starts once enough latencies have been recorded.
+        for _ in range(20):
+            client.get_item(TableName='foo', Key={'id': {'S': 'a'}}, **params)
+
+    def test_slow_attempt_is_hedged(self):
+        client = self.create_client()
+        self.warm_up(client)
+        self.slow_attempts.add(21)
+        response = client.get_item(TableName='foo', Key={'id': {'S': 'a'}})
+        self.assertEqual(response['Item'], {'id': {'S': '22'}})
+        self.assertEqual(response['ResponseMetadata']['RetryAttempts'], 0)
+        self.assertEqual(len(self.sent), 22)
+
+    def test_writes_are_not_hedged(self):
+        client = self.create_client()
+        for _ in range(20):
+            client.put_item(TableName='foo', Item={'id': {'S': 'a'}})
+        self.slow_attempts.add(21)
+        threading.Timer(0.1, self.release_slow.set).start()
+        client.put_item(TableName='foo', Item={'id': {'S': 'a'}})
+        self.assertEqual(len(self.sent), 21)
+
+    def test_configured_operations_are_hedged(self):
+        client = self.create_client(hedging_operations=['PutItem'])
+        for _ in range(20):
+            client.put_item(TableName='foo', Item={'id': {'S': 'a'}})
+        self.slow_attempts.add(21)
+        client.put_item(TableName='foo', Item={'id': {'S': 'a'}})
+        self.assertEqual(len(self.sent), 22)
+
+    def test_hedges_are_limited_by_retry_quota(self):
+        client = self.create_client()
+        self.warm_up(client)
+        with mock.patch('botocore.retries.quota.RetryQuota.acquire',
+                        return_value=False):
+            self.slow_attempts.add(21)
+            threading.Timer(0.1, self.release_slow.set).start()
+            response = client.get_item(
+                TableName='foo', Key={'id': {'S': 'a'}})
+        self.assertEqual(response['Item'], {'id': {'S': '21'}})
+        self.assertEqual(len(self.sent), 21)
+
+    def test_hedging_disabled_by_default(self):
+        client = self.session.create_client(
+            'dynamodb', self.region,
+            config=Config(retries={'mode': 'standard'}))
+        client.meta.events.register('before-send', self.send)
+        client.get_item(TableName='foo', Key={'id': {'S': 'a'}})
+        self.assertEqual(len(self.sent), 1)
+
+
+class TestRetryMetrics(BaseRetryTest):
+    def create_client(self, mode='standard', **retries):
+        retries['mode'] = mode
+        return self.session.create_client(
+            'dynamodb', self.region, config=Config(retries=retries))
+
+    def test_records_retries(self):
+        client = self.create_client()
+        with ClientHTTPStubber(client) as http_stubber:
+            http_stubber.add_response(status=500, body=b'{}')
+            http_stubber.add_response(status=400, body=json.dumps({
+                '__type': 'ThrottlingException', 'message': 'Error'
+            }).encode())
+            http_stubber.add_response(status=200, body=b'{}')
+            client.list_tables()
+        snapshot = client.meta.retry_metrics.snapshot()
+        self.assertEqual(snapshot['counters']['attempts'], 3)
+        self.assertEqual(snapshot['counters']['retries'], 2)
+        self.assertEqual(snapshot['counters']['throttles'], 1)
+        self.assertEqual(snapshot['histograms']['attempts']['max'], 3)
+        self.assertEqual(snapshot['histograms']['backoff']['count'], 2)
+
+    def test_records_max_attempts_reached(self):
+        client = self.create_client(total_max_attempts=2)
+        with self.assert_will_retry_n_times(client, 1):
+            client.list_tables()
+        counters = client.meta.retry_metrics.snapshot()['counters']
+        self.assertEqual(counters['max_attempts_reached'], 1)
+
+    def test_records_fill_rate_in_adaptive_mode(self):
+        client = self.create_client(mode='adaptive')
+        with mock.patch.object(TokenBucket, 'acquire', autospec=True):
+            with ClientHTTPStubber(client) as http_stubber:
+                http_stubber.add_response(status=400, body=json.dumps({
+                    '__type': 'ThrottlingException', 'message': 'Error'
+                }).encode())
+                http_stubber.add_response(status=200, body=b'{}')
+                client.list_tables()
+        # The throttle enables rate limiting, so at least its new fill
+        # rate is recorded.
+        fill_rates = client.meta.retry_metrics.snapshot()['fill_rates']
+        self.assertGreaterEqual(len(fill_rates), 1)
+
+    def test_clients_have_separate_metrics(self):
+        client = self.create_client()
+        other_client = self.create_client()
+        with ClientHTTPStubber(client) as http_stubber:
+            http_stubber.add_response(status=200, body=b'{}')
+            client.list_tables()
+        snapshot = other_client.meta.retry_metrics.snapshot()
+        self.assertEqual(snapshot['counters']['attempts'], 0)
+
+    def test_no_metrics_in_legacy_mode(self):
+        client = self.create_client(mode='legacy')
+        self.assertIsNone(client.meta.retry_metrics)
@@ -11,7 +11,9 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 import base64
+import copy
 import datetime
+import io
 import re
 
 import pytest
@@ -30,6 +32,7 @@ from botocore.exceptions import (
     UnsupportedS3ConfigurationError,
     UnsupportedS3AccesspointConfigurationError,
     InvalidS3UsEast1RegionalEndpointConfigError,
+    UnknownClientMethodError,
 )
 from botocore.parsers import ResponseParserError
 from botocore import UNSIGNED
@@ -1333,6 +1336,31 @@ class TestS3SigV4(BaseS3OperationTest):
         self.assertNotEqual(sent_headers["x-amz-content-sha256"], unsigned)
         self.assertNotIn("content-md5", sent_headers)
 
+    def test_chunked_payload_signing(self):
+        config = Config(
+            signature_version="s3v4",
+            s3={"payload_signing_enabled": True, "chunked_payload_signing": True},
+        )
+        self.client = self.session.create_client("s3", self.region, config=config)
+        self.http_stubber = ClientHTTPStubber(self.client)
+        self.http_stubber.add_response()
+        with self.http_stubber:
+            self.client.put_object(
+                Bucket="foo", Key="bar", Body=io.BytesIO(b"baz"),
+                ContentEncoding="gzip",
+            )
+        sent_headers = self.get_sent_headers()
+        self.assertEqual(
+            sent_headers["x-amz-content-sha256"],
+            b"STREAMING-AWS4-HMAC-SHA256-PAYLOAD",
+        )
+        self.assertEqual(sent_headers["content-encoding"], b"aws-chunked,gzip")
+        self.assertEqual(sent_headers["x-amz-decoded-content-length"], b"3")
+        body = self.http_stubber.requests[0].body.read()
+        self.assertEqual(len(body), int(sent_headers["content-length"]))
+        self.assertTrue(body.startswith(b"3;chunk-signature="))
+        self.assertIn(b"\r\nbaz\r\n0;chunk-signature=", body)
+
 
 class TestCanSendIntegerHeaders(BaseSessionTest):
     def test_int_values_with_sigv4(self):
@@ -1826,6 +1854,94 @@ class TestGeneratePresigned(BaseS3OperationTest):
         )
         self.assert_is_v2_presigned_url(url)
 
+    def assert_bulk_presign_matches_presign(self, client, requests, **kwargs):
+        with FreezeTime(botocore.auth.datetime, date=DATE):
+            with mock.patch("botocore.auth.time.time", return_value=1638360000):
+                # Params are copied because generating a url can modify
+                # them, e.g. access point ARNs are replaced with their name.
+                expected = [
+                    client.generate_presigned_url(
+                        method, Params=copy.deepcopy(params),
+                        ExpiresIn=kwargs.get("ExpiresIn", 3600),
+                        HttpMethod=kwargs.get("HttpMethod"),
+                    )
+                    for method, params in requests
+                ]
+                urls = client.generate_presigned_urls(requests, **kwargs)
+        self.assertEqual(urls, expected)
+
+    def get_bulk_presign_requests(self):
+        accesspoint_arn = "arn:aws:s3:us-west-2:123456789012:accesspoint:myendpoint"
+        return [
+            ("get_object", {"Bucket": "mybucket", "Key": "mykey"}),
+            ("get_object", {"Bucket": "mybucket", "Key": "my key/ü?#~.txt"}),
+            ("get_object", {"Bucket": "mybucket", "Key": "foo/../bar"}),
+            ("get_object", {"Bucket": "my.bucket", "Key": "mykey"}),
+            ("get_object", {"Bucket": accesspoint_arn, "Key": "mykey"}),
+            (
+                "get_object",
+                {"Bucket": "mybucket", "Key": "a", "ResponseContentType": "b"},
+            ),
+            ("put_object", {"Bucket": "mybucket", "Key": "mykey"}),
+            ("head_object", {"Bucket": "mybucket", "Key": "otherkey"}),
+            ("list_objects", {"Bucket": "mybucket"}),
+            ("get_object", {"Bucket": "mybucket", "Key": "otherkey"}),
+        ]
+
+    def test_bulk_presign_sigv2(self):
+        config = Config(signature_version="s3")
+        client = self.session.create_client("s3", "us-west-2", config=config)
+        self.assert_bulk_presign_matches_presign(
+            client, self.get_bulk_presign_requests())
+
+    def test_bulk_presign_sigv4(self):
+        config = Config(signature_version="s3v4")
+        client = self.session.create_client("s3", "us-west-2", config=config)
+        self.assert_bulk_presign_matches_presign(
+            client, self.get_bulk_presign_requests(), ExpiresIn=60)
+
+    def test_bulk_presign_sigv4_with_token_and_http_method(self):
+        config = Config(
+            signature_version="s3v4", s3={"addressing_style": "path"})
+        client = self.session.create_client(
+            "s3", "us-west-2", config=config, aws_session_token="token")
+        self.assert_bulk_presign_matches_presign(
+            client, self.get_bulk_presign_requests(), HttpMethod="PUT")
+
+    def test_bulk_presign_unsigned(self):
+        config = Config(signature_version=botocore.UNSIGNED)
+        client = self.session.create_client("s3", self.region, config=config)
+        urls = client.generate_presigned_urls([
+            ("get_object", {"Bucket": "foo", "Key": "bar"}),
+            ("get_object", {"Bucket": "foo", "Key": "baz"}),
+        ])
+        self.assertEqual(urls, [
+            "https://foo.s3.amazonaws.com/bar",
+            "https://foo.s3.amazonaws.com/baz",
+        ])
+
+    def test_bulk_presign_builds_request_once_per_template(self):
+        param_events = []
+        self.client.meta.events.register(
+            "before-parameter-build.s3",
+            lambda params, **kwargs: param_events.append(params["Bucket"]))
+        self.client.generate_presigned_urls([
+            ("get_object", {"Bucket": "foo", "Key": "key1"}),
+            ("get_object", {"Bucket": "foo", "Key": "key2"}),
+            ("get_object", {"Bucket": "bar", "Key": "key1"}),
+            ("get_object", {"Bucket": "foo", "Key": "key3"}),
+        ])
+        self.assertEqual(param_events, ["foo", "bar"])
+
+    def test_bulk_presign_validates_params(self):
+        with self.assertRaises(ParamValidationError):
+            self.client.generate_presigned_urls([
+                ("get_object", {"Bucket": "foo", "Key": "key1"}),
+                ("get_object", {"Bucket": "foo", "Key": ""}),
+            ])
+        with self.assertRaises(UnknownClientMethodError):
+            self.client.generate_presigned_urls([("getobject", {})])
+
 
 CHECKSUM_TEST_CASES = [
     ("put_bucket_tagging", {"Bucket": "foo", "Tagging": {"TagSet": []}}),
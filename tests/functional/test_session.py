@@ -12,6 +12,7 @@
 # language governing permissions and limitations under the License.
 from tests import mock, unittest, temporary_file
 
+import botocore.client
 import botocore.session
 from botocore.exceptions import ProfileNotFound
 
@@ -102,3 +103,43 @@ class TestSession(unittest.TestCase):
         # still be using the service name when getting regions
         regions = self.session.get_available_regions('elasticloadbalancing')
         self.assertEqual(regions, [])
+
+
+class TestSharedClientModels(unittest.TestCase):
+    def setUp(self):
+        self.environ = {'AWS_SHARE_CLIENT_MODELS': 'true'}
+        self.env_patch = mock.patch('os.environ', self.environ)
+        self.env_patch.start()
+        botocore.client.get_shared_client_registry().invalidate()
+
+    def tearDown(self):
+        self.env_patch.stop()
+        botocore.client.get_shared_client_registry().invalidate()
+
+    def create_client(self, session):
+        return session.create_client(
+            'dynamodb', region_name='us-west-2',
+            aws_access_key_id='foo', aws_secret_access_key='bar')
+
+    def test_clients_share_model_and_class_across_sessions(self):
+        first = self.create_client(botocore.session.get_session())
+        second = self.create_client(botocore.session.get_session())
+        self.assertIs(first.meta.service_model, second.meta.service_model)
+        self.assertIs(type(first), type(second))
+
+    def test_custom_class_handlers_are_not_shared(self):
+        first_session = botocore.session.get_session()
+        second_session = botocore.session.get_session()
+        for session in (first_session, second_session):
+            session.register(
+                'creating-client-class.dynamodb', lambda **kwargs: None)
+        first = self.create_client(first_session)
+        second = self.create_client(second_session)
+        self.assertIsNot(type(first), type(second))
+        self.assertIs(first.meta.service_model, second.meta.service_model)
+
+    def test_sharing_is_opt_in(self):
+        del self.environ['AWS_SHARE_CLIENT_MODELS']
+        first = self.create_client(botocore.session.get_session())
+        second = self.create_client(botocore.session.get_session())
+        self.assertIsNot(first.meta.service_model, second.meta.service_model)
@@ -1,9 +1,14 @@
 from tests import mock
 from tests import unittest
 
+from botocore.exceptions import CapacityNotAvailableError
+from botocore.exceptions import SendDeferredError
 from botocore.retries import adaptive
 from botocore.retries import standard
 from botocore.retries import bucket
+from botocore.retries import metrics
+from botocore.retries import scheduler
+from botocore.retries import shared
 from botocore.retries import throttling
 
 
@@ -55,6 +60,28 @@ class TestClientRateLimiter(unittest.TestCase):
         rate_limiter.on_sending_request(request=mock.sentinel.request)
         self.assertFalse(self.token_bucket.acquire.called)
 
+    def test_records_fill_rate_once_enabled(self):
+        retry_metrics = metrics.RetryMetrics()
+        rate_limiter = adaptive.ClientRateLimiter(
+            rate_adjustor=self.rate_adjustor,
+            rate_clocker=self.rate_clocker,
+            token_bucket=self.token_bucket,
+            throttling_detector=self.throttling_detector,
+            clock=self.clock,
+            metrics=retry_metrics,
+        )
+        self.rate_clocker.record.return_value = 21
+        self.rate_adjustor.success_received.return_value = 30
+        self.throttling_detector.is_throttling_error.return_value = False
+        rate_limiter.on_receiving_response()
+        self.assertEqual(retry_metrics.snapshot()['fill_rates'], [])
+        self.throttling_detector.is_throttling_error.return_value = True
+        self.rate_adjustor.error_received.return_value = 17
+        self.timestamp_sequences.extend([1, 2])
+        rate_limiter.on_receiving_response()
+        self.assertEqual(
+            retry_metrics.snapshot()['fill_rates'], [[2, 17]])
+
     def test_token_bucket_enabled_on_throttling_error(self):
         rate_limiter = self.create_client_limiter()
         self.throttling_detector.is_throttling_error.return_value = True
@@ -67,6 +94,21 @@ class TestClientRateLimiter(unittest.TestCase):
         rate_limiter.on_sending_request(request=mock.sentinel.request)
         self.assertTrue(self.token_bucket.acquire.called)
 
+    def test_send_deferred_when_token_not_available(self):
+        rate_limiter = self.create_client_limiter()
+        self.throttling_detector.is_throttling_error.return_value = True
+        self.rate_clocker.record.return_value = 21
+        self.rate_adjustor.error_received.return_value = 17
+        rate_limiter.on_receiving_response()
+        self.token_bucket.acquire.side_effect = CapacityNotAvailableError(
+            retry_after=0.5)
+        context = {scheduler.DEFER_SEND_CONTEXT_KEY: True}
+        with self.assertRaises(SendDeferredError) as e:
+            rate_limiter.on_sending_request(
+                request=mock.sentinel.request, context=context)
+        self.assertEqual(e.exception.kwargs['delay'], 0.5)
+        self.token_bucket.acquire.assert_called_with(block=False)
+
     def test_max_rate_updated_on_success_response(self):
         rate_limiter = self.create_client_limiter()
         self.throttling_detector.is_throttling_error.return_value = False
@@ -170,3 +212,262 @@ class TestRateClocker(unittest.TestCase):
         # And our previous bucket will be:
         # 12 * 0.8 + 0.2 * 0
         self.assertEqual(self.rate_measure.measured_rate, 12 * 0.8)
+
+
+class SettableClock(bucket.Clock):
+    def __init__(self, now=0):
+        self.now = now
+        self.sleep_call_amounts = []
+
+    def sleep(self, amount):
+        self.sleep_call_amounts.append(amount)
+        self.now += amount
+
+    def current_time(self):
+        return self.now
+
+
+class TestSharedClientRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = SettableClock()
+        self.store = shared.LocalStateStore()
+        self.throttling_detector = mock.Mock(
+            spec=standard.ThrottlingErrorDetector)
+        self.throttling_detector.is_throttling_error.return_value = False
+
+    def create_client_limiter(self, name='limiter'):
+        return adaptive.SharedClientRateLimiter(
+            store=self.store,
+            name=name,
+            throttling_detector=self.throttling_detector,
+            clock=self.clock,
+        )
+
+    def get_state(self, limiter):
+        return self.store.update(
+            limiter._name, limiter._defaults, lambda state: state)
+
+    def test_can_register_shared_retry_handler(self):
+        client = mock.Mock()
+        limiter = adaptive.register_retry_handler(
+            client, shared_state=self.store)
+        self.assertIsInstance(limiter, adaptive.SharedClientRateLimiter)
+        self.assertEqual(
+            client.meta.events.register.call_args_list,
+            [mock.call('before-send', limiter.on_sending_request),
+             mock.call('needs-retry', limiter.on_receiving_response)]
+        )
+
+    def test_does_not_wait_until_throttled(self):
+        rate_limiter = self.create_client_limiter()
+        for _ in range(10):
+            rate_limiter.on_sending_request(request=mock.sentinel.request)
+        self.assertEqual(self.clock.sleep_call_amounts, [])
+
+    def test_waits_for_tokens_after_throttling_error(self):
+        rate_limiter = self.create_client_limiter()
+        self.throttling_detector.is_throttling_error.return_value = True
+        rate_limiter.on_receiving_response()
+        self.assertEqual(self.get_state(rate_limiter)['enabled'], 1)
+        rate_limiter.on_sending_request(request=mock.sentinel.request)
+        # The bucket starts out empty and fills at the minimum rate.
+        self.assertEqual(self.clock.sleep_call_amounts, [2.0])
+
+    def test_send_deferred_when_token_not_available(self):
+        rate_limiter = self.create_client_limiter()
+        self.throttling_detector.is_throttling_error.return_value = True
+        rate_limiter.on_receiving_response()
+        context = {scheduler.DEFER_SEND_CONTEXT_KEY: True}
+        with self.assertRaises(SendDeferredError) as e:
+            rate_limiter.on_sending_request(
+                request=mock.sentinel.request, context=context)
+        self.assertEqual(e.exception.kwargs['delay'], 2.0)
+        self.assertEqual(self.clock.sleep_call_amounts, [])
+
+    def test_records_fill_rate_once_enabled(self):
+        retry_metrics = metrics.RetryMetrics()
+        rate_limiter = adaptive.SharedClientRateLimiter(
+            store=self.store,
+            name='limiter',
+            throttling_detector=self.throttling_detector,
+            clock=self.clock,
+            metrics=retry_metrics,
+        )
+        rate_limiter.on_receiving_response()
+        self.assertEqual(retry_metrics.snapshot()['fill_rates'], [])
+        self.throttling_detector.is_throttling_error.return_value = True
+        rate_limiter.on_receiving_response()
+        self.assertEqual(
+            retry_metrics.snapshot()['fill_rates'],
+            [[self.clock.current_time(),
+              self.get_state(rate_limiter)['fill_rate']]])
+
+    def test_limiters_with_same_name_share_state(self):
+        rate_limiter = self.create_client_limiter()
+        other_limiter = self.create_client_limiter()
+        self.throttling_detector.is_throttling_error.return_value = True
+        rate_limiter.on_receiving_response()
+        other_limiter.on_sending_request(request=mock.sentinel.request)
+        self.assertEqual(len(self.clock.sleep_call_amounts), 1)
+        unrelated_limiter = self.create_client_limiter('other')
+        unrelated_limiter.on_sending_request(request=mock.sentinel.request)
+        self.assertEqual(len(self.clock.sleep_call_amounts), 1)
+
+    def test_matches_client_rate_limiter(self):
+        rate_limiter = adaptive._create_rate_limiter(
+            self.throttling_detector, self.clock)
+        shared_limiter = self.create_client_limiter()
+        throttled_at = {2.0, 2.2, 4.1, 7.3}
+        for i in range(1, 100):
+            self.clock.now = i * 0.1
+            self.throttling_detector.is_throttling_error.return_value = (
+                round(self.clock.now, 1) in throttled_at)
+            rate_limiter.on_receiving_response()
+            shared_limiter.on_receiving_response()
+            state = self.get_state(shared_limiter)
+            self.assertAlmostEqual(
+                state['fill_rate'], rate_limiter._token_bucket.max_rate)
+            self.assertAlmostEqual(
+                state['measured_rate'],
+                rate_limiter._rate_clocker.measured_rate)
+            self.assertEqual(state['enabled'], rate_limiter._enabled)
+
+
+class TestRateLimiterRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = adaptive.RateLimiterRegistry(clock=SettableClock())
+
+    def get_rate_limiter(self, **kwargs):
+        return self.registry.get_rate_limiter(
+            'dynamodb', 'us-west-2', 'https://dynamodb', **kwargs)
+
+    def test_rate_limiters_are_shared(self):
+        rate_limiter = self.get_rate_limiter()
+        self.assertIsInstance(rate_limiter, adaptive.ClientRateLimiter)
+        self.assertIs(rate_limiter, self.get_rate_limiter())
+
+    def test_rate_limiters_are_partitioned_by_region(self):
+        self.assertIsNot(
+            self.get_rate_limiter(),
+            self.registry.get_rate_limiter(
+                'dynamodb', 'us-east-1', 'https://dynamodb'))
+
+    def test_rate_limiters_are_partitioned_by_resource(self):
+        rate_limiter = self.get_rate_limiter(resource='foo')
+        self.assertIs(rate_limiter, self.get_rate_limiter(resource='foo'))
+        self.assertIsNot(rate_limiter, self.get_rate_limiter(resource='bar'))
+        self.assertIsNot(rate_limiter, self.get_rate_limiter())
+
+    def test_rate_limiter_with_shared_state(self):
+        store = shared.LocalStateStore()
+        rate_limiter = self.get_rate_limiter(
+            resource='foo', shared_state=store)
+        self.assertIsInstance(rate_limiter, adaptive.SharedClientRateLimiter)
+        self.assertEqual(
+            rate_limiter._name,
+            'rate-limiter:dynamodb:us-west-2:https://dynamodb:foo')
+        self.assertIsNot(rate_limiter, self.get_rate_limiter(resource='foo'))
+
+    def test_least_recently_used_rate_limiter_is_dropped(self):
+        self.registry = adaptive.RateLimiterRegistry(
+            clock=SettableClock(), max_size=2)
+        foo = self.get_rate_limiter(resource='foo')
+        bar = self.get_rate_limiter(resource='bar')
+        self.assertIs(foo, self.get_rate_limiter(resource='foo'))
+        self.get_rate_limiter(resource='baz')
+        self.assertIs(foo, self.get_rate_limiter(resource='foo'))
+        self.assertIsNot(bar, self.get_rate_limiter(resource='bar'))
+
+    def test_registry_is_created_once(self):
+        with mock.patch('botocore.retries.adaptive.RATE_LIMITER_REGISTRY',
+                        None):
+            registry = adaptive.get_rate_limiter_registry()
+            self.assertIsInstance(registry, adaptive.RateLimiterRegistry)
+            self.assertIs(registry, adaptive.get_rate_limiter_registry())
+
+
+class TestScopedRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.registry = mock.Mock(spec=adaptive.RateLimiterRegistry)
+        self.rate_limiter = self.registry.get_rate_limiter.return_value
+        self.scoped_limiter = adaptive.ScopedRateLimiter(
+            registry=self.registry,
+            service_name='dynamodb',
+            region_name='us-west-2',
+            endpoint_url='https://dynamodb',
+            resource_param='TableName',
+        )
+
+    def assert_rate_limiter_used(self, resource):
+        self.registry.get_rate_limiter.assert_called_with(
+            'dynamodb', 'us-west-2', 'https://dynamodb',
+            resource=resource, shared_state=None)
+
+    def test_can_register_scoped_retry_handler(self):
+        client = mock.Mock()
+        limiter = adaptive.register_retry_handler(
+            client, scope='endpoint', resource_param='TableName')
+        self.assertIsInstance(limiter, adaptive.ScopedRateLimiter)
+        self.assertEqual(
+            client.meta.events.register.call_args_list,
+            [mock.call('before-parameter-build',
+                       limiter.on_building_parameters),
+             mock.call('before-send', limiter.on_sending_request),
+             mock.call('needs-retry', limiter.on_receiving_response)]
+        )
+
+    def test_clients_share_registered_rate_limiter(self):
+        registry = adaptive.RateLimiterRegistry()
+        limiters = []
+        with mock.patch('botocore.retries.adaptive.RATE_LIMITER_REGISTRY',
+                        registry):
+            for _ in range(2):
+                client = mock.Mock()
+                client.meta.service_model.service_name = 'dynamodb'
+                client.meta.region_name = 'us-west-2'
+                client.meta.endpoint_url = 'https://dynamodb'
+                limiters.append(adaptive.register_retry_handler(
+                    client, scope='endpoint'))
+        self.assertIs(
+            limiters[0].get_rate_limiter(), limiters[1].get_rate_limiter())
+
+    def test_sends_through_rate_limiter_of_resource(self):
+        context = {}
+        self.scoped_limiter.on_building_parameters(
+            params={'TableName': 'foo'}, context=context)
+        self.scoped_limiter.on_sending_request(
+            request=mock.sentinel.request, context=context)
+        self.assert_rate_limiter_used('foo')
+        self.rate_limiter.on_sending_request.assert_called_with(
+            request=mock.sentinel.request, context=context)
+
+    def test_receives_through_rate_limiter_of_resource(self):
+        context = {}
+        self.scoped_limiter.on_building_parameters(
+            params={'TableName': 'foo'}, context=context)
+        request_dict = {'context': context}
+        self.scoped_limiter.on_receiving_response(request_dict=request_dict)
+        self.assert_rate_limiter_used('foo')
+        self.rate_limiter.update_send_rate.assert_called_with(
+            request_dict=request_dict)
+
+    def test_records_fill_rate_in_client_metrics(self):
+        retry_metrics = metrics.RetryMetrics()
+        scoped_limiter = adaptive.ScopedRateLimiter(
+            registry=self.registry, service_name='dynamodb',
+            region_name='us-west-2', endpoint_url='https://dynamodb',
+            metrics=retry_metrics)
+        self.rate_limiter.update_send_rate.return_value = None
+        scoped_limiter.on_receiving_response(request_dict={'context': {}})
+        self.assertEqual(retry_metrics.snapshot()['fill_rates'], [])
+        self.rate_limiter.update_send_rate.return_value = 5
+        scoped_limiter.on_receiving_response(request_dict={'context': {}})
+        [[_, fill_rate]] = retry_metrics.snapshot()['fill_rates']
+        self.assertEqual(fill_rate, 5)
+
+    def test_uses_endpoint_rate_limiter_without_resource(self):
+        context = {}
+        self.scoped_limiter.on_building_parameters(params={}, context=context)
+        self.scoped_limiter.on_sending_request(
+            request=mock.sentinel.request, context=context)
+        self.assert_rate_limiter_used(None)
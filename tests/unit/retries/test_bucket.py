@@ -72,6 +72,15 @@ class TestTokenBucket(unittest.TestCase):
         with self.assertRaises(CapacityNotAvailableError):
             token_bucket.acquire(100, block=False)
 
+    def test_acquire_failure_includes_time_until_available(self):
+        self.timestamp_sequences.append(1)
+        token_bucket = self.create_token_bucket(max_rate=10)
+        with self.assertRaises(CapacityNotAvailableError) as e:
+            token_bucket.acquire(100, block=False)
+        # 10 tokens were filled in the first second, and the other 90
+        # take 9 seconds at 10 tokens per second.
+        self.assertEqual(e.exception.kwargs['retry_after'], 9)
+
     def test_can_retrieve_at_max_send_rate(self):
         self.timestamp_sequences.extend([
             # Request a new token every 100ms (10 TPS) for 2 seconds.
@@ -0,0 +1,146 @@
+import io
+
+from tests import mock
+from tests import unittest
+
+from botocore.retries import hedging
+from botocore.retries import metrics
+from botocore.retries import quota
+
+
+def operation_model(name='GetItem', method='POST', event_stream=False):
+    model = mock.Mock()
+    model.name = name
+    model.http = {'method': method}
+    model.has_event_stream_output = event_stream
+    return model
+
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_no_percentile_until_min_samples(self):
+        tracker = hedging.LatencyTracker(window_size=100, min_samples=3)
+        tracker.record(1)
+        tracker.record(2)
+        self.assertIsNone(tracker.percentile(50))
+        tracker.record(3)
+        self.assertEqual(tracker.percentile(50), 2)
+
+    def test_computes_nearest_rank_percentile(self):
+        tracker = hedging.LatencyTracker(window_size=100, min_samples=100)
+        for latency in range(100, 0, -1):
+            tracker.record(latency)
+        self.assertEqual(tracker.percentile(95), 95)
+        self.assertEqual(tracker.percentile(99.5), 100)
+        self.assertEqual(tracker.percentile(0.1), 1)
+
+    def test_only_recent_latencies_are_tracked(self):
+        tracker = hedging.LatencyTracker(window_size=10, min_samples=1)
+        for _ in range(10):
+            tracker.record(1)
+        for _ in range(10):
+            tracker.record(5)
+        self.assertEqual(tracker.percentile(50), 5)
+
+    def test_percentile_is_refreshed_periodically(self):
+        # The window is sorted on every record until it has min_samples,
+        # and every 10 records after that.
+        tracker = hedging.LatencyTracker(window_size=100, min_samples=100)
+        for _ in range(100):
+            tracker.record(1)
+        for _ in range(9):
+            tracker.record(10)
+        self.assertEqual(tracker.percentile(95), 1)
+        tracker.record(10)
+        self.assertEqual(tracker.percentile(95), 10)
+
+
+class TestHedgingPolicy(unittest.TestCase):
+    def setUp(self):
+        self.quota = quota.RetryQuota(initial_capacity=10)
+        self.policy = hedging.HedgingPolicy(
+            retry_quota=self.quota, percentile=90, min_samples=2)
+        self.addCleanup(self.shutdown_executor)
+
+    def shutdown_executor(self):
+        if self.policy._executor is not None:
+            self.policy._executor.shutdown()
+
+    def is_hedged(self, model, body=b''):
+        return self.policy.is_hedged(model, {'body': body})
+
+    def test_read_operations_are_hedged(self):
+        for name in ['GetItem', 'BatchGetItem', 'DescribeTable',
+                     'ListTables', 'Query', 'Scan', 'HeadObject']:
+            self.assertTrue(self.is_hedged(operation_model(name)), name)
+
+    def test_get_requests_are_hedged(self):
+        self.assertTrue(self.is_hedged(
+            operation_model('SelectThings', method='GET')))
+
+    def test_writes_are_not_hedged(self):
+        for name in ['PutItem', 'DeleteItem', 'ReceiveMessage']:
+            self.assertFalse(self.is_hedged(operation_model(name)), name)
+
+    def test_configured_operations_are_hedged(self):
+        policy = hedging.HedgingPolicy(
+            retry_quota=self.quota, percentile=90,
+            operations=['ReceiveMessage'])
+        self.assertTrue(policy.is_hedged(
+            operation_model('ReceiveMessage'), {'body': b''}))
+        self.assertFalse(policy.is_hedged(
+            operation_model('GetItem'), {'body': b''}))
+
+    def test_streaming_bodies_are_not_hedged(self):
+        self.assertFalse(self.is_hedged(
+            operation_model(), body=io.BytesIO(b'foo')))
+
+    def test_event_streams_are_not_hedged(self):
+        self.assertFalse(self.is_hedged(operation_model(event_stream=True)))
+
+    def test_adds_hedge_to_context(self):
+        context = {}
+        self.policy.on_before_call(
+            model=operation_model(), params={'body': b''}, context=context)
+        hedge = context[hedging.HEDGE_CONTEXT_KEY]
+        self.assertIsNone(hedge.delay)
+        hedge.record_latency(1)
+        hedge.record_latency(2)
+        self.assertEqual(hedge.delay, 2)
+
+    def test_does_not_add_hedge_for_other_operations(self):
+        context = {}
+        self.policy.on_before_call(
+            model=operation_model('PutItem'), params={'body': b''},
+            context=context)
+        self.assertEqual(context, {})
+
+    def test_operations_have_separate_latencies(self):
+        first, second = {}, {}
+        self.policy.on_before_call(
+            model=operation_model('GetItem'), params={'body': b''},
+            context=first)
+        self.policy.on_before_call(
+            model=operation_model('Query'), params={'body': b''},
+            context=second)
+        for _ in range(2):
+            first[hedging.HEDGE_CONTEXT_KEY].record_latency(1)
+        self.assertIsNone(second[hedging.HEDGE_CONTEXT_KEY].delay)
+
+    def test_hedges_are_charged_to_retry_quota(self):
+        hedge = hedging.Hedge(self.policy, hedging.LatencyTracker())
+        self.assertTrue(hedge.acquire())
+        self.assertTrue(hedge.acquire())
+        self.assertEqual(self.quota.available_capacity, 0)
+        self.assertFalse(hedge.acquire())
+
+    def test_hedges_are_counted_in_metrics(self):
+        retry_metrics = metrics.RetryMetrics()
+        policy = hedging.HedgingPolicy(
+            retry_quota=self.quota, percentile=90, metrics=retry_metrics)
+        hedge = hedging.Hedge(policy, hedging.LatencyTracker())
+        for _ in range(3):
+            hedge.acquire()
+        self.assertEqual(retry_metrics.snapshot()['counters']['hedges'], 2)
+
+    def test_executor_is_reused(self):
+        self.assertIs(self.policy.get_executor(), self.policy.get_executor())
@@ -0,0 +1,104 @@
+import json
+
+from tests import unittest
+
+from botocore.retries import metrics
+from botocore.retries import standard
+
+
+class TestHistogram(unittest.TestCase):
+    def test_counts_values_into_buckets(self):
+        histogram = metrics.Histogram([1, 5])
+        for value in [0.5, 1, 2, 5, 7]:
+            histogram.record(value)
+        self.assertEqual(histogram.snapshot(), {
+            'count': 5,
+            'sum': 15.5,
+            'min': 0.5,
+            'max': 7,
+            'buckets': [
+                {'le': 1, 'count': 2},
+                {'le': 5, 'count': 2},
+                {'le': None, 'count': 1},
+            ],
+        })
+
+    def test_empty_histogram(self):
+        snapshot = metrics.Histogram([1]).snapshot()
+        self.assertEqual(snapshot['count'], 0)
+        self.assertIsNone(snapshot['min'])
+        self.assertIsNone(snapshot['max'])
+
+
+class TestRetryMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = metrics.RetryMetrics()
+
+    def record(self, attempt_number, retry_delay=None, throttled=False,
+               **retry_metadata):
+        context = standard.RetryContext(attempt_number=attempt_number)
+        context.add_retry_metadata(**retry_metadata)
+        self.metrics.record_attempt(context, retry_delay, throttled=throttled)
+
+    def test_counters_start_at_zero(self):
+        self.assertEqual(
+            self.metrics.snapshot()['counters'],
+            dict((name, 0) for name in metrics.RetryMetrics.COUNTERS))
+
+    def test_records_retries(self):
+        self.record(1, retry_delay=0.2, throttled=True)
+        self.record(2, retry_delay=1.5)
+        self.record(3)
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['counters']['attempts'], 3)
+        self.assertEqual(snapshot['counters']['retries'], 2)
+        self.assertEqual(snapshot['counters']['throttles'], 1)
+        self.assertEqual(snapshot['histograms']['backoff']['count'], 2)
+        self.assertEqual(snapshot['histograms']['backoff']['sum'], 1.7)
+        attempts = snapshot['histograms']['attempts']
+        self.assertEqual(attempts['count'], 1)
+        self.assertEqual(attempts['max'], 3)
+
+    def test_records_why_retries_stopped(self):
+        self.record(2, RetryQuotaReached=True)
+        self.record(3, MaxAttemptsReached=True)
+        counters = self.metrics.snapshot()['counters']
+        self.assertEqual(counters['quota_exhausted'], 1)
+        self.assertEqual(counters['max_attempts_reached'], 1)
+
+    def test_increment(self):
+        self.metrics.increment('hedges')
+        self.metrics.increment('hedges', 2)
+        self.assertEqual(self.metrics.snapshot()['counters']['hedges'], 3)
+
+    def test_records_fill_rate_changes(self):
+        self.metrics.record_fill_rate(1, timestamp=10)
+        self.metrics.record_fill_rate(1, timestamp=11)
+        self.metrics.record_fill_rate(2.5, timestamp=12)
+        self.assertEqual(
+            self.metrics.snapshot()['fill_rates'], [[10, 1], [12, 2.5]])
+
+    def test_keeps_recent_fill_rates(self):
+        max_samples = metrics.RetryMetrics.MAX_FILL_RATE_SAMPLES
+        for i in range(max_samples + 1):
+            self.metrics.record_fill_rate(i, timestamp=i)
+        fill_rates = self.metrics.snapshot()['fill_rates']
+        self.assertEqual(len(fill_rates), max_samples)
+        self.assertEqual(fill_rates[0], [1, 1])
+
+    def test_snapshot_can_reset(self):
+        self.record(1)
+        self.metrics.record_fill_rate(1, timestamp=10)
+        self.assertEqual(
+            self.metrics.snapshot(reset=True)['counters']['attempts'], 1)
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['counters']['attempts'], 0)
+        self.assertEqual(snapshot['histograms']['attempts']['count'], 0)
+        self.assertEqual(snapshot['fill_rates'], [])
+
+    def test_snapshot_can_be_serialized(self):
+        self.record(1, retry_delay=0.5)
+        self.record(2)
+        self.metrics.record_fill_rate(1, timestamp=10)
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(json.loads(json.dumps(snapshot)), snapshot)
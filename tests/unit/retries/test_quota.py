@@ -2,6 +2,7 @@ from tests import unittest
 
 
 from botocore.retries import quota
+from botocore.retries import shared
 
 
 class TestRetryQuota(unittest.TestCase):
@@ -33,3 +34,22 @@ class TestRetryQuota(unittest.TestCase):
         self.assertEqual(self.retry_quota.available_capacity, 1)
         self.assertFalse(self.retry_quota.acquire(10))
         self.assertEqual(self.retry_quota.available_capacity, 1)
+
+
+class TestSharedRetryQuota(TestRetryQuota):
+    def setUp(self):
+        self.store = shared.LocalStateStore()
+        self.retry_quota = quota.SharedRetryQuota(self.store, 'quota', 50)
+
+    def test_quotas_with_same_name_share_capacity(self):
+        other_quota = quota.SharedRetryQuota(self.store, 'quota', 50)
+        self.assertTrue(self.retry_quota.acquire(30))
+        self.assertFalse(other_quota.acquire(30))
+        self.assertEqual(other_quota.available_capacity, 20)
+        other_quota.release(30)
+        self.assertEqual(self.retry_quota.available_capacity, 50)
+
+    def test_quotas_with_different_names_are_separate(self):
+        other_quota = quota.SharedRetryQuota(self.store, 'other', 50)
+        self.assertTrue(self.retry_quota.acquire(30))
+        self.assertTrue(other_quota.acquire(30))
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from tests import mock
+from tests import unittest
+
+from botocore.retries import scheduler
+
+
+class TestRetryScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = scheduler.RetryScheduler()
+        self.calls = []
+        self.done = threading.Event()
+
+    def record(self, name, last=False):
+        self.calls.append(name)
+        if last:
+            self.done.set()
+
+    def test_calls_functions_in_due_order(self):
+        self.scheduler.call_later(0.05, self.record, 'second', True)
+        self.scheduler.call_later(0, self.record, 'first')
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(self.calls, ['first', 'second'])
+
+    def test_calls_function_after_delay(self):
+        start = time.monotonic()
+        self.scheduler.call_later(0.05, self.record, 'call', True)
+        self.assertTrue(self.done.wait(5))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_errors_do_not_stop_scheduler(self):
+        failing = mock.Mock(side_effect=ValueError())
+        self.scheduler.call_later(0, failing)
+        self.scheduler.call_later(0, self.record, 'call', True)
+        self.assertTrue(self.done.wait(5))
+        self.assertTrue(failing.called)
+
+    def test_get_retry_scheduler_is_shared(self):
+        self.assertIs(
+            scheduler.get_retry_scheduler(), scheduler.get_retry_scheduler())
+
+    def test_get_retry_scheduler_creates_one_scheduler(self):
+        schedulers = []
+        with mock.patch('botocore.retries.scheduler.RETRY_SCHEDULER', None):
+            threads = [
+                threading.Thread(target=lambda: schedulers.append(
+                    scheduler.get_retry_scheduler()))
+                for _ in range(10)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(schedulers), 10)
+        self.assertEqual(len(set(map(id, schedulers))), 1)
+
+
+class TestRetryFuture(unittest.TestCase):
+    def test_retry_after(self):
+        future = scheduler.RetryFuture()
+        self.assertIsNone(future.retry_after)
+        future.retry_at = time.monotonic() + 10
+        self.assertGreater(future.retry_after, 9)
+        self.assertLessEqual(future.retry_after, 10)
+        future.retry_at = time.monotonic() - 1
+        self.assertEqual(future.retry_after, 0)
+
+    def test_is_send_deferrable(self):
+        self.assertFalse(scheduler.is_send_deferrable(None))
+        self.assertFalse(scheduler.is_send_deferrable({}))
+        self.assertTrue(scheduler.is_send_deferrable(
+            {scheduler.DEFER_SEND_CONTEXT_KEY: True}))
@@ -0,0 +1,228 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+
+from tests import mock
+from tests import unittest
+
+from botocore.exceptions import InvalidConfigError
+from botocore.retries import shared
+
+
+def set_field(field, value):
+    def update(state):
+        state[field] = value
+    return update
+
+
+def increment(store, name, times):
+    def add_one(state):
+        state['count'] += 1
+
+    for _ in range(times):
+        store.update(name, {'count': 0}, add_one)
+
+
+class BaseStateStoreTest(object):
+    def create_store(self):
+        raise NotImplementedError('create_store')
+
+    def setUp(self):
+        self.store = self.create_store()
+
+    def get_state(self, name, defaults):
+        return self.store.update(name, defaults, lambda state: state)
+
+    def test_record_starts_with_defaults(self):
+        self.assertEqual(
+            self.get_state('record', {'a': 1, 'b': 2.5}),
+            {'a': 1, 'b': 2.5})
+
+    def test_changes_are_saved(self):
+        self.store.update('record', {'a': 1}, set_field('a', 3))
+        self.assertEqual(self.get_state('record', {'a': 1}), {'a': 3})
+
+    def test_returns_result_of_function(self):
+        result = self.store.update(
+            'record', {'a': 1}, lambda state: state['a'] + 1)
+        self.assertEqual(result, 2)
+
+    def test_changes_are_discarded_on_error(self):
+        def fail(state):
+            state['a'] = 3
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            self.store.update('record', {'a': 1}, fail)
+        self.assertEqual(self.get_state('record', {'a': 1}), {'a': 1})
+
+    def test_records_are_separate(self):
+        self.store.update('record', {'a': 1}, set_field('a', 3))
+        self.assertEqual(self.get_state('other', {'a': 1}), {'a': 1})
+
+    def test_updates_are_atomic_across_threads(self):
+        threads = [
+            threading.Thread(target=increment, args=(self.store, 'n', 200))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.get_state('n', {'count': 0}), {'count': 800})
+
+
+class BaseCrossProcessStateStoreTest(BaseStateStoreTest):
+    def test_updates_are_atomic_across_processes(self):
+        # Use the store in the parent first so that the children inherit
+        # its open files and connections.
+        increment(self.store, 'n', 1)
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=increment, args=(self.store, 'n', 100))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        increment(self.store, 'n', 100)
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.get_state('n', {'count': 0}), {'count': 501})
+
+
+class TestLocalStateStore(BaseStateStoreTest, unittest.TestCase):
+    def create_store(self):
+        return shared.LocalStateStore()
+
+
+@unittest.skipIf(shared.fcntl is None, 'fcntl is not available')
+class TestMmapStateStore(BaseCrossProcessStateStoreTest, unittest.TestCase):
+    def create_store(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        return shared.MmapStateStore(os.path.join(self.tempdir, 'state'))
+
+    def test_stores_share_records_through_files(self):
+        other_store = shared.MmapStateStore(self.store._directory)
+        self.store.update('record', {'a': 1}, set_field('a', 3))
+        self.assertEqual(
+            other_store.update('record', {'a': 1}, lambda state: state),
+            {'a': 3})
+
+    def test_records_with_different_fields_are_separate(self):
+        self.store.update('record', {'a': 1}, set_field('a', 3))
+        self.assertEqual(
+            self.get_state('record', {'a': 1, 'b': 2}), {'a': 1, 'b': 2})
+
+
+@unittest.skipIf(not hasattr(shared.socket, 'AF_UNIX'),
+                 'Unix domain sockets are not available')
+class TestUnixSocketStateStore(BaseCrossProcessStateStoreTest,
+                               unittest.TestCase):
+    def create_store(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.socket_path = os.path.join(self.tempdir, 'state.sock')
+        self.coordinator = shared.StateCoordinator(self.socket_path)
+        thread = threading.Thread(
+            target=self.coordinator.serve_forever, args=(0.01,))
+        thread.start()
+        self.addCleanup(self.coordinator.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(self.coordinator.shutdown)
+        return shared.UnixSocketStateStore(self.socket_path)
+
+    def test_stores_share_records_through_coordinator(self):
+        other_store = shared.UnixSocketStateStore(self.socket_path)
+        self.store.update('record', {'a': 1}, set_field('a', 3))
+        self.assertEqual(
+            other_store.update('record', {'a': 1}, lambda state: state),
+            {'a': 3})
+
+    def test_update_is_one_request(self):
+        self.store.update('record', {'a': 1}, set_field('a', 3))
+        with mock.patch.object(
+                self.store, '_request', wraps=self.store._request) as request:
+            self.store.update('record', {'a': 1}, set_field('a', 4))
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(self.get_state('record', {'a': 1}), {'a': 4})
+
+    def test_update_is_retried_when_record_changed(self):
+        other_store = shared.UnixSocketStateStore(self.socket_path)
+        increment(self.store, 'n', 1)
+        increment(other_store, 'n', 1)
+        states = []
+
+        def add_one(state):
+            states.append(dict(state))
+            state['count'] += 1
+
+        self.store.update('n', {'count': 0}, add_one)
+        # The first attempt used the outdated record this store last saw.
+        self.assertEqual(states, [{'count': 1}, {'count': 2}])
+        self.assertEqual(self.get_state('n', {'count': 0}), {'count': 3})
+
+    def test_different_records_are_updated_concurrently(self):
+        updating = threading.Event()
+        release = threading.Event()
+
+        def wait(state):
+            updating.set()
+            release.wait(5)
+
+        thread = threading.Thread(
+            target=self.store.update, args=('slow', {'a': 1}, wait))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        self.assertTrue(updating.wait(5))
+        self.store.update('record', {'a': 1}, set_field('a', 3))
+        self.assertEqual(self.get_state('record', {'a': 1}), {'a': 3})
+
+    def test_uses_local_state_without_coordinator(self):
+        store = shared.UnixSocketStateStore(
+            os.path.join(self.tempdir, 'missing.sock'))
+        store.update('record', {'a': 1}, set_field('a', 3))
+        self.assertEqual(
+            store.update('record', {'a': 1}, lambda state: state), {'a': 3})
+
+
+class TestGetStateStore(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        stores = mock.patch.dict(shared._STATE_STORES, clear=True)
+        stores.start()
+        self.addCleanup(stores.stop)
+
+    def test_creates_unix_socket_store(self):
+        store = shared.get_state_store('unix:/tmp/retries.sock')
+        self.assertIsInstance(store, shared.UnixSocketStateStore)
+
+    @unittest.skipIf(shared.fcntl is None, 'fcntl is not available')
+    def test_creates_mmap_store(self):
+        store = shared.get_state_store('mmap:%s' % self.tempdir)
+        self.assertIsInstance(store, shared.MmapStateStore)
+
+    def test_stores_are_reused(self):
+        self.assertIs(
+            shared.get_state_store('unix:/tmp/retries.sock'),
+            shared.get_state_store('unix:/tmp/retries.sock'))
+
+    def test_rejects_unknown_store(self):
+        for spec in ['redis://localhost', 'mmap:', 'unix']:
+            with self.assertRaises(InvalidConfigError):
+                shared.get_state_store(spec)
+
+    def test_record_name_includes_service_region_and_endpoint(self):
+        client = mock.Mock()
+        client.meta.service_model.service_name = 'dynamodb'
+        client.meta.region_name = 'us-west-2'
+        client.meta.endpoint_url = 'https://dynamodb.us-west-2.amazonaws.com'
+        self.assertEqual(
+            shared.get_record_name('retry-quota', client),
+            'retry-quota:dynamodb:us-west-2:'
+            'https://dynamodb.us-west-2.amazonaws.com')
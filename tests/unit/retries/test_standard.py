@@ -3,6 +3,7 @@ import pytest
 from tests import mock
 from tests import unittest
 
+from botocore.retries import metrics
 from botocore.retries import standard
 from botocore.retries import quota
 from botocore import model
@@ -318,6 +319,35 @@ class TestRetryHandler(unittest.TestCase):
 
         self.assertIsNone(self.retry_handler.needs_retry(fake_kwargs='foo'))
 
+    def test_records_retry_decisions_in_metrics(self):
+        retry_metrics = metrics.RetryMetrics()
+        retry_handler = standard.RetryHandler(
+            retry_policy=self.retry_policy,
+            retry_event_adapter=self.retry_event_adapter,
+            retry_quota=self.retry_quota,
+            metrics=retry_metrics,
+        )
+        context = standard.RetryContext(
+            attempt_number=1,
+            parsed_response={'Error': {'Code': 'Throttling'}})
+        self.retry_event_adapter.create_retry_context.return_value = context
+        self.retry_policy.should_retry.return_value = True
+        self.retry_quota.acquire_retry_quota.return_value = True
+        self.retry_policy.compute_retry_delay.return_value = 0.5
+        retry_handler.needs_retry()
+
+        context = standard.RetryContext(attempt_number=2, parsed_response={})
+        self.retry_event_adapter.create_retry_context.return_value = context
+        self.retry_policy.should_retry.return_value = False
+        retry_handler.needs_retry()
+
+        snapshot = retry_metrics.snapshot()
+        self.assertEqual(snapshot['counters']['attempts'], 2)
+        self.assertEqual(snapshot['counters']['retries'], 1)
+        self.assertEqual(snapshot['counters']['throttles'], 1)
+        self.assertEqual(snapshot['histograms']['backoff']['sum'], 0.5)
+        self.assertEqual(snapshot['histograms']['attempts']['sum'], 2)
+
     def test_retry_handler_adds_retry_metadata_to_response(self):
         self.retry_event_adapter.create_retry_context.return_value = \
             mock.sentinel.retry_context
@@ -22,8 +22,11 @@ from botocore import exceptions
 from botocore.client import ClientEndpointBridge
 from botocore.config import Config
 from botocore.configprovider import ConfigValueStore
+from botocore.compat import json
 from botocore.hooks import HierarchicalEmitter
+from botocore.jsoncodec import JSONCodec, StandardJSONCodec
 from botocore.model import ServiceModel
+from botocore.parsers import ResponseParserFactory
 
 
 class TestCreateClientArgs(unittest.TestCase):
@@ -90,6 +93,7 @@ class TestCreateClientArgs(unittest.TestCase):
             'timeout': (60, 60),
             'verify': True,
             'max_pool_connections': 10,
+            'idle_connection_timeout': None,
             'proxies': None,
             'proxies_config': None,
             'socket_options': self.default_socket_options,
@@ -136,6 +140,12 @@ class TestCreateClientArgs(unittest.TestCase):
             self.call_get_client_args(client_config=config)
             self.assert_create_endpoint_call(m, max_pool_connections=20)
 
+    def test_idle_timeout_from_client_config_forwarded_to_endpoint(self):
+        config = botocore.config.Config(idle_connection_timeout=30)
+        with mock.patch('botocore.args.EndpointCreator') as m:
+            self.call_get_client_args(client_config=config)
+            self.assert_create_endpoint_call(m, idle_connection_timeout=30)
+
     def test_proxies_from_client_config_forwarded_to_endpoint_creator(self):
         proxies = {'http': 'http://foo.bar:1234',
                    'https': 'https://foo.bar:4321'}
@@ -415,3 +425,54 @@ class TestCreateClientArgs(unittest.TestCase):
             client_config=Config(retries={'mode': 'standard'})
         )['client_config']
         self.assertEqual(config.retries['mode'], 'standard')
+
+    def test_retry_shared_state_set_on_config_store(self):
+        self.config_store.set_config_variable(
+            'retry_shared_state', 'mmap:/tmp/retries')
+        config = self.call_get_client_args()['client_config']
+        self.assertEqual(config.retries['shared_state'], 'mmap:/tmp/retries')
+
+    def test_retry_shared_state_unset_by_default(self):
+        config = self.call_get_client_args()['client_config']
+        self.assertNotIn('shared_state', config.retries)
+
+    def test_retry_hedging_percentile_set_on_config_store(self):
+        self.config_store.set_config_variable('retry_hedging_percentile', 95)
+        config = self.call_get_client_args()['client_config']
+        self.assertEqual(config.retries['hedging_percentile'], 95)
+
+    def test_client_config_hedging_percentile_overrides_config_store(self):
+        self.config_store.set_config_variable('retry_hedging_percentile', 95)
+        config = self.call_get_client_args(
+            client_config=Config(retries={'hedging_percentile': 99})
+        )['client_config']
+        self.assertEqual(config.retries['hedging_percentile'], 99)
+
+    def test_json_codec_defaults_to_none(self):
+        config = self.call_get_client_args()['client_config']
+        self.assertIsNone(config.json_codec)
+
+    def test_json_codec_set_on_config_store(self):
+        self.config_store.set_config_variable('json_codec', 'json')
+        self.args_create = args.ClientArgsCreator(
+            self.event_emitter, None, ResponseParserFactory(), None, None,
+            self.config_store)
+        config = self.call_get_client_args()['client_config']
+        self.assertIsInstance(config.json_codec, StandardJSONCodec)
+
+    def test_json_codec_client_config_beats_config_store(self):
+        self.config_store.set_config_variable('json_codec', 'json')
+        codec = JSONCodec(json.dumps, json.loads)
+        self.args_create = args.ClientArgsCreator(
+            self.event_emitter, None, ResponseParserFactory(), None, None,
+            self.config_store)
+        client_args = self.call_get_client_args(
+            client_config=Config(json_codec=codec))
+        self.assertIs(client_args['client_config'].json_codec, codec)
+        serializer = client_args['serializer']._serializer
+        self.assertIs(serializer._json_codec, codec)
+
+    def test_invalid_json_codec(self):
+        with self.assertRaises(ValueError):
+            self.call_get_client_args(
+                client_config=Config(json_codec='not-a-codec'))
@@ -0,0 +1,287 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import asyncio
+
+from tests import mock, unittest, create_session, ClientHTTPStubber
+
+from botocore.asyncclient import AsyncBaseClient
+from botocore.asynchttpsession import AsyncHTTPSession
+from botocore.awsrequest import AWSResponse
+from botocore.client import (
+    BaseClient, BaseClientMeta, SharedClientRegistry,
+)
+from botocore.discovery import EndpointDiscoveryRequired
+from botocore.exceptions import (
+    ClientError, SendDeferredError, WaiterError,
+)
+from botocore.response import AsyncStreamingBody
+from botocore.retries import scheduler
+from botocore.stub import Stubber
+
+
+class FakeAsyncRaw(object):
+    def __init__(self, body):
+        self._body = body
+
+    async def read(self, amt=None):
+        if amt is None:
+            amt = len(self._body)
+        chunk, self._body = self._body[:amt], self._body[amt:]
+        return chunk
+
+    def close(self):
+        pass
+
+
+class TestAsyncClient(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.session = create_session()
+        self.client = self.create_client('dynamodb')
+        self.http_stubber = ClientHTTPStubber(self.client)
+        self.http_stubber.start()
+        self.sleep = mock.Mock()
+        sleep_patch = mock.patch('asyncio.sleep', self.fake_sleep)
+        sleep_patch.start()
+        self.addCleanup(sleep_patch.stop)
+
+    async def fake_sleep(self, delay):
+        self.sleep(delay)
+
+    def create_client(self, service_name, **kwargs):
+        return self.session.create_async_client(
+            service_name, 'us-west-2', aws_access_key_id='foo',
+            aws_secret_access_key='bar', **kwargs)
+
+    def run_async(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    def test_creates_async_client(self):
+        self.assertIsInstance(self.client, AsyncBaseClient)
+        self.assertIsInstance(
+            self.client._endpoint.http_session, AsyncHTTPSession)
+
+    def test_operations_are_coroutines(self):
+        self.http_stubber.add_response(body=b'{"TableNames": ["foo"]}')
+        response = self.run_async(self.client.list_tables())
+        self.assertEqual(response['TableNames'], ['foo'])
+        self.assertEqual(response['ResponseMetadata']['RetryAttempts'], 0)
+        self.assertIn(
+            'Authorization', self.http_stubber.requests[0].headers)
+
+    def test_retries_with_asyncio_sleep(self):
+        self.http_stubber.add_response(status=500, body=b'{}')
+        self.http_stubber.add_response(body=b'{"TableNames": []}')
+        with mock.patch('time.sleep') as time_sleep:
+            response = self.run_async(self.client.list_tables())
+        self.assertEqual(response['ResponseMetadata']['RetryAttempts'], 1)
+        self.assertEqual(self.sleep.call_count, 1)
+        self.assertFalse(time_sleep.called)
+
+    def test_deferred_sends_wait_with_asyncio_sleep(self):
+        # The adaptive rate limiter defers sends instead of blocking the
+        # event loop thread until it has a token.
+        delays = [0.5]
+
+        def defer_send(context, **kwargs):
+            self.assertTrue(scheduler.is_send_deferrable(context))
+            if delays:
+                raise SendDeferredError(delay=delays.pop())
+
+        self.client.meta.events.register_first('before-send', defer_send)
+        self.http_stubber.add_response(body=b'{"TableNames": []}')
+        response = self.run_async(self.client.list_tables())
+        self.assertEqual(response['ResponseMetadata']['RetryAttempts'], 0)
+        self.sleep.assert_called_once_with(0.5)
+        self.assertEqual(len(self.http_stubber.requests), 1)
+
+    def test_raises_client_error(self):
+        self.http_stubber.add_response(status=400, body=(
+            b'{"__type": "ResourceNotFoundException", "message": "Nope"}'))
+        with self.assertRaises(ClientError) as context:
+            self.run_async(self.client.describe_table(TableName='foo'))
+        self.assertEqual(
+            context.exception.response['Error']['Code'],
+            'ResourceNotFoundException')
+
+    def test_works_with_stubber(self):
+        with Stubber(self.client) as stubber:
+            stubber.add_response('list_tables', {'TableNames': ['foo']})
+            response = self.run_async(self.client.list_tables())
+        self.assertEqual(response['TableNames'], ['foo'])
+
+    def test_streaming_body_is_async(self):
+        client = self.create_client('s3')
+
+        async def send(request):
+            return AWSResponse(
+                request.url, 200, {'Content-Length': '6'},
+                FakeAsyncRaw(b'foobar'))
+
+        async def get_body():
+            with mock.patch.object(
+                    client._endpoint.http_session, 'send', send):
+                response = await client.get_object(Bucket='foo', Key='bar')
+            body = response['Body']
+            self.assertIsInstance(body, AsyncStreamingBody)
+            return [chunk async for chunk in body.iter_chunks(4)]
+
+        self.assertEqual(self.run_async(get_body()), [b'foob', b'ar'])
+
+    def test_close(self):
+        closed = []
+
+        async def close():
+            closed.append(True)
+
+        http_session = self.client._endpoint.http_session
+        with mock.patch.object(http_session, 'close', close):
+            self.run_async(self.client.close())
+        self.assertEqual(closed, [True])
+
+    def test_clone_is_async(self):
+        clone = self.client.clone(region_name='us-east-1')
+        self.assertIsInstance(clone, AsyncBaseClient)
+
+    def test_paginate(self):
+        self.http_stubber.add_response(
+            body=b'{"TableNames": ["foo"], "LastEvaluatedTableName": "foo"}')
+        self.http_stubber.add_response(body=b'{"TableNames": ["bar"]}')
+        paginator = self.client.get_paginator('list_tables')
+
+        async def paginate():
+            return [page async for page in paginator.paginate()]
+
+        pages = self.run_async(paginate())
+        self.assertEqual(
+            [page['TableNames'] for page in pages], [['foo'], ['bar']])
+        self.assertEqual(len(self.http_stubber.requests), 2)
+        self.assertIn(
+            b'"ExclusiveStartTableName": "foo"',
+            self.http_stubber.requests[1].body)
+
+    def test_paginator_search_and_full_result(self):
+        for _ in range(2):
+            self.http_stubber.add_response(body=(
+                b'{"TableNames": ["foo"], "LastEvaluatedTableName": "foo"}'))
+            self.http_stubber.add_response(body=b'{"TableNames": ["bar"]}')
+        paginator = self.client.get_paginator('list_tables')
+
+        async def search():
+            return [name async for name in
+                    paginator.paginate().search('TableNames')]
+
+        self.assertEqual(self.run_async(search()), ['foo', 'bar'])
+        result = self.run_async(paginator.paginate().build_full_result())
+        self.assertEqual(result, {'TableNames': ['foo', 'bar']})
+
+    def test_pages_are_not_iterable(self):
+        paginator = self.client.get_paginator('list_tables')
+        with self.assertRaises(TypeError):
+            list(paginator.paginate())
+
+    def test_waiter(self):
+        self.http_stubber.add_response(status=400, body=(
+            b'{"__type": "ResourceNotFoundException", "message": "Nope"}'))
+        self.http_stubber.add_response(
+            body=b'{"Table": {"TableStatus": "ACTIVE"}}')
+        waiter = self.client.get_waiter('table_exists')
+        with mock.patch('time.sleep') as time_sleep:
+            self.run_async(waiter.wait(
+                TableName='foo', WaiterConfig={'Delay': 5}))
+        self.assertEqual(len(self.http_stubber.requests), 2)
+        self.sleep.assert_called_once_with(5)
+        self.assertFalse(time_sleep.called)
+
+    def test_waiter_failure(self):
+        self.http_stubber.add_response(status=400, body=(
+            b'{"__type": "ResourceNotFoundException", "message": "Nope"}'))
+        waiter = self.client.get_waiter('table_exists')
+        with self.assertRaises(WaiterError):
+            self.run_async(waiter.wait(
+                TableName='foo', WaiterConfig={'MaxAttempts': 1}))
+
+    def test_execute_many(self):
+        self.http_stubber.add_response(body=b'{"TableNames": ["foo"]}')
+        self.http_stubber.add_response(status=400, body=(
+            b'{"__type": "ResourceNotFoundException", "message": "Nope"}'))
+
+        async def execute_many():
+            return [result async for result in self.client.meta.execute_many(
+                'list_tables', [{}, {'Limit': 1}], max_concurrency=1)]
+
+        results = self.run_async(execute_many())
+        self.assertEqual([r.index for r in results], [0, 1])
+        self.assertEqual(results[0].response['TableNames'], ['foo'])
+        self.assertIsNone(results[0].exception)
+        self.assertIsInstance(results[1].exception, ClientError)
+
+    def test_execute_many_limits_concurrency(self):
+        in_flight = []
+        max_in_flight = []
+
+        async def send(request):
+            in_flight.append(request)
+            max_in_flight.append(len(in_flight))
+            # asyncio.sleep is patched, so yield to the loop with a future.
+            waiter = self.loop.create_future()
+            self.loop.call_soon(waiter.set_result, None)
+            await waiter
+            in_flight.remove(request)
+            return AWSResponse(
+                request.url, 200, {}, FakeAsyncRaw(b'{"TableNames": []}'))
+
+        async def execute_many():
+            with mock.patch.object(
+                    self.client._endpoint.http_session, 'send', send):
+                return [
+                    result async for result in self.client.meta.execute_many(
+                        'list_tables', [{}] * 10, max_concurrency=3,
+                        ordered=False)]
+
+        self.http_stubber.stop()
+        results = self.run_async(execute_many())
+        self.assertEqual(
+            sorted(r.index for r in results), list(range(10)))
+        self.assertEqual(max(max_in_flight), 3)
+
+    def test_prewarm_is_a_coroutine(self):
+        async def prewarm(url, connections):
+            return connections
+
+        http_session = self.client._endpoint.http_session
+        with mock.patch.object(http_session, 'prewarm', prewarm):
+            ready = self.run_async(self.client.meta.prewarm(connections=2))
+        self.assertEqual(ready, 2)
+
+    def test_meta_has_no_submit(self):
+        self.assertIsInstance(self.client.meta, BaseClientMeta)
+        self.assertFalse(hasattr(self.client.meta, 'submit'))
+
+    def test_blocks_endpoint_discovery_required_operations(self):
+        client = self.create_client('timestream-write')
+        with self.assertRaises(EndpointDiscoveryRequired):
+            self.run_async(client.list_databases())
+
+    def test_shared_client_classes_are_distinct(self):
+        self.session.set_config_variable('share_client_models', True)
+        registry = SharedClientRegistry()
+        with mock.patch('botocore.client.get_shared_client_registry',
+                        return_value=registry):
+            sync_client = self.session.create_client(
+                'dynamodb', 'us-west-2')
+            async_client = self.create_client('dynamodb')
+        self.assertNotIsInstance(sync_client, AsyncBaseClient)
+        self.assertIsInstance(async_client, AsyncBaseClient)
+        self.assertIsInstance(async_client, BaseClient)
@@ -0,0 +1,314 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import asyncio
+import io
+import threading
+
+from tests import unittest
+
+from botocore.asynchttpsession import AsyncHTTPSession
+from botocore.awsrequest import AWSRequest
+from botocore.exceptions import (
+    ConnectionClosedError, EndpointConnectionError, ReadTimeoutError,
+)
+
+
+class FakeServer(object):
+    """An HTTP server that sends canned responses, one per request."""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.connections = 0
+        self._handlers = []
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle, '127.0.0.1', 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = 'http://127.0.0.1:%s' % port
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        for handler, writer in self._handlers:
+            writer.close()
+        await asyncio.gather(*[handler for handler, _ in self._handlers])
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._handlers.append((asyncio.current_task(), writer))
+        try:
+            while self.responses:
+                head = await reader.readuntil(b'\r\n\r\n')
+                lines = head.decode('latin-1').split('\r\n')
+                headers = dict(
+                    line.lower().split(': ', 1) for line in lines[1:] if line)
+                if headers.get('expect') == '100-continue':
+                    response = self.responses.pop(0)
+                    if response is not None:
+                        writer.write(response)
+                        self.requests.append((lines[0], headers, None))
+                        continue
+                    writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+                body = await reader.readexactly(
+                    int(headers.get('content-length', 0)))
+                self.requests.append((lines[0], headers, body))
+                writer.write(self.responses.pop(0))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class StalledServer(FakeServer):
+    """An HTTP server that never reads the requests sent to it."""
+    async def stop(self):
+        self._stopped.set()
+        await super(StalledServer, self).stop()
+
+    async def _handle(self, reader, writer):
+        self._stopped = asyncio.Event()
+        self._handlers.append((asyncio.current_task(), writer))
+        await self._stopped.wait()
+
+
+def response(body=b'', status='200 OK', headers=None):
+    if headers is None:
+        headers = ['Content-Length: %s' % len(body)]
+    head = ['HTTP/1.1 %s' % status] + headers
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+
+class TestAsyncHTTPSession(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def run_with_server(self, responses, func, server_cls=FakeServer,
+                        **session_kwargs):
+        server = server_cls(responses)
+        session = AsyncHTTPSession(**session_kwargs)
+
+        async def run():
+            await server.start()
+            try:
+                return await func(session, server)
+            finally:
+                await session.close()
+                await server.stop()
+        return self.loop.run_until_complete(run()), server
+
+    def request(self, url, method='GET', body=None, headers=None,
+                stream_output=False):
+        request = AWSRequest(
+            method=method, url=url, data=body, headers=headers).prepare()
+        request.stream_output = stream_output
+        return request
+
+    def test_send_request(self):
+        async def send(session, server):
+            return await session.send(self.request(
+                server.url + '/foo?a=b', method='POST', body=b'data'))
+        http_response, server = self.run_with_server(
+            [response(b'hello', headers=[
+                'Content-Length: 5', 'X-Foo: a', 'x-foo: b'])], send)
+        self.assertEqual(http_response.status_code, 200)
+        self.assertEqual(http_response.content, b'hello')
+        self.assertEqual(http_response.headers['X-Foo'], 'a, b')
+        request_line, headers, body = server.requests[0]
+        self.assertEqual(request_line, 'POST /foo?a=b HTTP/1.1')
+        self.assertEqual(headers['host'], server.url[len('http://'):])
+        self.assertEqual(body, b'data')
+
+    def test_reuses_connections(self):
+        async def send(session, server):
+            for _ in range(3):
+                http_response = await session.send(self.request(server.url))
+            return http_response
+        http_response, server = self.run_with_server(
+            [response(b'a')] * 3, send)
+        self.assertEqual(http_response.content, b'a')
+        self.assertEqual(server.connections, 1)
+
+    def test_does_not_reuse_closed_connections(self):
+        async def send(session, server):
+            for _ in range(2):
+                await session.send(self.request(server.url))
+        _, server = self.run_with_server(
+            [response(b'a', headers=[
+                'Content-Length: 1', 'Connection: close'])] * 2, send)
+        self.assertEqual(server.connections, 2)
+
+    def test_does_not_reuse_expired_connections(self):
+        async def send(session, server):
+            await session.send(self.request(server.url))
+            for pool in session._pools.values():
+                for connection in pool:
+                    connection.idle_since -= 31
+            await session.send(self.request(server.url))
+        _, server = self.run_with_server(
+            [response(b'a')] * 2, send, idle_connection_timeout=30)
+        self.assertEqual(server.connections, 2)
+
+    def test_limits_idle_connections(self):
+        async def send(session, server):
+            await asyncio.gather(*[
+                session.send(self.request(server.url)) for _ in range(3)])
+            return sum(len(pool) for pool in session._pools.values())
+        idle, server = self.run_with_server(
+            [response(b'a')] * 3, send, max_pool_connections=1)
+        self.assertEqual(server.connections, 3)
+        self.assertEqual(idle, 1)
+
+    def test_reads_chunked_response(self):
+        body = b'3\r\nabc\r\n2;ext=1\r\nde\r\n0\r\nX-Trailer: 1\r\n\r\n'
+
+        async def send(session, server):
+            return await session.send(self.request(server.url))
+        http_response, _ = self.run_with_server(
+            [response(body, headers=['Transfer-Encoding: chunked'])], send)
+        self.assertEqual(http_response.content, b'abcde')
+
+    def test_streams_response(self):
+        async def send(session, server):
+            http_response = await session.send(
+                self.request(server.url, stream_output=True))
+            chunks = []
+            while True:
+                chunk = await http_response.raw.read(2)
+                if not chunk:
+                    return chunks
+                chunks.append(chunk)
+        chunks, _ = self.run_with_server([response(b'abcde')], send)
+        self.assertEqual(chunks, [b'ab', b'cd', b'e'])
+
+    def test_error_responses_are_read_when_streaming(self):
+        async def send(session, server):
+            return await session.send(
+                self.request(server.url, stream_output=True))
+        http_response, _ = self.run_with_server(
+            [response(b'error', status='500 Internal Server Error')], send)
+        self.assertEqual(http_response.content, b'error')
+
+    def test_head_response_has_no_body(self):
+        async def send(session, server):
+            for _ in range(2):
+                http_response = await session.send(
+                    self.request(server.url, method='HEAD'))
+            return http_response
+        http_response, server = self.run_with_server(
+            [response(headers=['Content-Length: 10'])] * 2, send)
+        self.assertEqual(http_response.content, b'')
+        self.assertEqual(server.connections, 1)
+
+    def test_sends_file_like_body(self):
+        async def send(session, server):
+            return await session.send(self.request(
+                server.url, method='PUT', body=io.BytesIO(b'data')))
+        _, server = self.run_with_server([response()], send)
+        self.assertEqual(server.requests[0][2], b'data')
+
+    def test_reads_file_like_body_in_executor(self):
+        threads = []
+
+        class Body(io.BytesIO):
+            def read(self, *args):
+                threads.append(threading.current_thread())
+                return super(Body, self).read(*args)
+
+        async def send(session, server):
+            return await session.send(self.request(
+                server.url, method='PUT', body=Body(b'data'),
+                headers={'Content-Length': '4'}))
+        _, server = self.run_with_server([response()], send)
+        self.assertEqual(server.requests[0][2], b'data')
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_write_timeout(self):
+        async def send(session, server):
+            # Writing the body blocks once the socket buffers are full.
+            return await session.send(self.request(
+                server.url, method='PUT', body=b'a' * (64 * 1024 * 1024)))
+        with self.assertRaises(ReadTimeoutError):
+            self.run_with_server(
+                [], send, server_cls=StalledServer, timeout=(1, 0.1))
+
+    def test_expect_100_continue(self):
+        async def send(session, server):
+            return await session.send(self.request(
+                server.url, method='PUT', body=b'data',
+                headers={'Expect': '100-continue'}))
+        http_response, server = self.run_with_server(
+            [None, response(b'ok')], send)
+        self.assertEqual(http_response.content, b'ok')
+        self.assertEqual(server.requests[0][2], b'data')
+
+    def test_expect_100_continue_with_error_response(self):
+        async def send(session, server):
+            return await session.send(self.request(
+                server.url, method='PUT', body=b'data',
+                headers={'Expect': '100-continue'}))
+        http_response, server = self.run_with_server(
+            [response(b'denied', status='403 Forbidden')], send)
+        self.assertEqual(http_response.status_code, 403)
+        self.assertEqual(http_response.content, b'denied')
+        self.assertIsNone(server.requests[0][2])
+
+    def test_read_timeout(self):
+        async def send(session, server):
+            return await session.send(self.request(server.url))
+        with self.assertRaises(ReadTimeoutError):
+            # The second response keeps the server waiting for another
+            # request instead of closing the connection.
+            self.run_with_server(
+                [b'HTTP/1.1 200 OK\r\n', response()], send,
+                timeout=(1, 0.01))
+
+    def test_connection_closed(self):
+        async def send(session, server):
+            return await session.send(self.request(server.url))
+        with self.assertRaises(ConnectionClosedError):
+            self.run_with_server([response(b'abc')[:-1]], send)
+
+    def test_connection_refused(self):
+        async def send(session, server):
+            url = server.url
+            await server.stop()
+            return await session.send(self.request(url))
+        with self.assertRaises(EndpointConnectionError):
+            self.run_with_server([], send)
+
+    def test_prewarm(self):
+        async def prewarm(session, server):
+            ready = await session.prewarm(server.url, connections=3)
+            await session.send(self.request(server.url))
+            return ready, sum(len(pool) for pool in session._pools.values())
+        (ready, idle), server = self.run_with_server(
+            [response(b'a')], prewarm, max_pool_connections=2)
+        self.assertEqual(ready, 2)
+        self.assertEqual(idle, 2)
+        self.assertEqual(server.connections, 2)
+
+    def test_prewarm_skips_failed_connections(self):
+        async def prewarm(session, server):
+            url = server.url
+            await server.stop()
+            return await session.prewarm(url, connections=2)
+        ready, _ = self.run_with_server([], prewarm)
+        self.assertEqual(ready, 0)
+
+    def test_proxies_are_not_supported(self):
+        with self.assertRaises(ValueError):
+            AsyncHTTPSession(proxies={'https': 'http://proxy'})
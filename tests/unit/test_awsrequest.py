@@ -25,6 +25,7 @@ from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 from botocore.exceptions import UnseekableStreamError
 from botocore.awsrequest import AWSRequest, AWSResponse
 from botocore.awsrequest import AWSHTTPConnection, AWSHTTPSConnection, HeadersDict
+from botocore.awsrequest import AWSHTTPConnectionPool
 from botocore.awsrequest import prepare_request_dict, create_request_object
 from botocore.compat import file_type, six
 
@@ -149,6 +150,28 @@ class TestAWSRequest(unittest.TestCase):
         prepared_request = request.prepare()
         self.assertEqual(prepared_request.body, expected_body)
 
+    def test_dict_body_is_encoded_once_per_context(self):
+        body = {'dead': 'beef'}
+        request = AWSRequest(url='http://example.com/', data=body)
+        with mock.patch('botocore.awsrequest.urlencode',
+                        return_value='dead=beef') as encode:
+            self.assertEqual(request.body, b'dead=beef')
+            retried_request = AWSRequest(url='http://example.com/', data=body)
+            retried_request.context = request.context
+            self.assertEqual(retried_request.prepare().body, 'dead=beef')
+        self.assertEqual(encode.call_count, 1)
+
+    def test_dict_body_is_encoded_again_when_changed(self):
+        body = {'dead': 'beef'}
+        request = AWSRequest(url='http://example.com/', data=body)
+        self.assertEqual(request.body, b'dead=beef')
+        body['foo'] = 'bar'
+        self.assertEqual(request.prepare().body, 'dead=beef&foo=bar')
+
+    def test_handlers_can_set_attributes_on_prepared_request(self):
+        self.prepared_request.foo = 'bar'
+        self.assertEqual(self.prepared_request.foo, 'bar')
+
     def test_can_prepare_empty_body(self):
         request = AWSRequest(url='http://example.com/', data=b'')
         prepared_request = request.prepare()
@@ -559,6 +582,64 @@ class TestAWSHTTPConnectionPool(unittest.TestCase):
         self.assertIsNot(https_connection_class, AWSHTTPSConnection)
 
 
+class TestAWSConnectionPoolIdleTimeout(unittest.TestCase):
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(5)
+        self.addCleanup(self.server.close)
+        self.pool = AWSHTTPConnectionPool(
+            '127.0.0.1', self.server.getsockname()[1])
+        self.pool.idle_timeout = 10
+        self.addCleanup(self.pool.close)
+        self.time = mock.Mock(return_value=100)
+        time_patch = mock.patch('time.monotonic', self.time)
+        time_patch.start()
+        self.addCleanup(time_patch.stop)
+
+    def put_connected_conn(self):
+        conn = self.pool._get_conn()
+        conn.connect()
+        self.pool._put_conn(conn)
+        return conn
+
+    def test_reuses_connection_before_timeout(self):
+        conn = self.put_connected_conn()
+        self.time.return_value = 110
+        self.assertIs(self.pool._get_conn(), conn)
+        self.assertIsNotNone(conn.sock)
+
+    def test_closes_connection_after_timeout(self):
+        conn = self.put_connected_conn()
+        self.time.return_value = 110.5
+        self.assertIs(self.pool._get_conn(), conn)
+        self.assertIsNone(conn.sock)
+
+    def test_no_timeout_by_default(self):
+        self.pool.idle_timeout = None
+        conn = self.put_connected_conn()
+        self.time.return_value = 1000
+        self.assertIs(self.pool._get_conn(), conn)
+        self.assertIsNotNone(conn.sock)
+
+    def test_evict_expired_connections(self):
+        conn = self.put_connected_conn()
+        self.assertEqual(self.pool.evict_idle_connections(), 0)
+        self.time.return_value = 110.5
+        self.assertEqual(self.pool.evict_idle_connections(), 1)
+        self.assertIsNone(conn.sock)
+        # The connection stays in the pool and is reopened when used.
+        self.assertIs(self.pool._get_conn(), conn)
+
+    def test_evict_dropped_connections(self):
+        self.pool.idle_timeout = None
+        conn = self.put_connected_conn()
+        server_conn, _ = self.server.accept()
+        server_conn.close()
+        self.assertEqual(self.pool.evict_idle_connections(), 1)
+        self.assertIsNone(conn.sock)
+
+
 class TestPrepareRequestDict(unittest.TestCase):
     def setUp(self):
         self.user_agent = 'botocore/1.0'
@@ -10,7 +10,10 @@
 # distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
+import threading
+
 import botocore.config
+import botocore.loaders
 from tests import mock
 from tests import unittest
 
@@ -29,6 +32,9 @@ from botocore.exceptions import UnknownSignatureVersionError
 from botocore.exceptions import InvalidRetryConfigurationError
 from botocore.exceptions import InvalidMaxRetryAttemptsError
 from botocore.exceptions import InvalidRetryModeError
+from botocore.exceptions import InvalidRateLimiterScopeError
+from botocore.exceptions import InvalidHedgingPercentileError
+from botocore.exceptions import InvalidIdleConnectionTimeoutError
 from botocore.errorfactory import ClientExceptionsFactory
 from botocore.stub import Stubber
 from botocore import exceptions
@@ -1646,6 +1652,24 @@ class TestConfig(unittest.TestCase):
         with self.assertRaises(InvalidRetryModeError):
             botocore.config.Config(retries={'mode': 'turbo-mode'})
 
+    def test_validates_rate_limiter_scope(self):
+        with self.assertRaises(InvalidRateLimiterScopeError):
+            botocore.config.Config(
+                retries={'mode': 'adaptive', 'rate_limiter_scope': 'table'})
+
+    def test_validates_hedging_percentile(self):
+        for percentile in [0, 100, -5]:
+            with self.assertRaises(InvalidHedgingPercentileError):
+                botocore.config.Config(
+                    retries={'hedging_percentile': percentile})
+
+    def test_validates_idle_connection_timeout(self):
+        for timeout in [0, -1]:
+            with self.assertRaises(InvalidIdleConnectionTimeoutError):
+                botocore.config.Config(idle_connection_timeout=timeout)
+        config = botocore.config.Config(idle_connection_timeout=0.5)
+        self.assertEqual(config.idle_connection_timeout, 0.5)
+
 
 class TestClientEndpointBridge(unittest.TestCase):
     def setUp(self):
@@ -2003,3 +2027,120 @@ class TestClientEndpointBridge(unittest.TestCase):
             use_dualstack_endpoint=True,
             use_fips_endpoint=True,
         )
+
+
+def _module_level_handler(**kwargs):
+    pass
+
+
+class TestSharedClientRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = client.SharedClientRegistry()
+        self.loader = botocore.loaders.Loader(
+            extra_search_paths=['foo'], include_default_search_paths=False)
+        self.factory = mock.Mock(side_effect=lambda: object())
+
+    def test_service_model_shared_for_same_loader_config(self):
+        other_loader = botocore.loaders.Loader(
+            extra_search_paths=['foo'], include_default_search_paths=False)
+        first = self.registry.get_service_model(
+            self.loader, 'myservice', None, self.factory)
+        second = self.registry.get_service_model(
+            other_loader, 'myservice', None, self.factory)
+        self.assertIs(first, second)
+        self.assertEqual(self.factory.call_count, 1)
+
+    def test_service_model_not_shared_for_different_search_paths(self):
+        other_loader = botocore.loaders.Loader(
+            extra_search_paths=['bar'], include_default_search_paths=False)
+        first = self.registry.get_service_model(
+            self.loader, 'myservice', None, self.factory)
+        second = self.registry.get_service_model(
+            other_loader, 'myservice', None, self.factory)
+        self.assertIsNot(first, second)
+
+    def test_service_model_keyed_by_api_version(self):
+        first = self.registry.get_service_model(
+            self.loader, 'myservice', '2014-01-01', self.factory)
+        second = self.registry.get_service_model(
+            self.loader, 'myservice', '2015-01-01', self.factory)
+        self.assertIsNot(first, second)
+
+    def test_unknown_loader_is_never_shared(self):
+        loader = mock.Mock()
+        first = self.registry.get_service_model(
+            loader, 'myservice', None, self.factory)
+        second = self.registry.get_service_model(
+            loader, 'myservice', None, self.factory)
+        self.assertIsNot(first, second)
+
+    def test_client_class_shared_for_module_level_handlers(self):
+        handlers = (_module_level_handler,)
+        first = self.registry.get_client_class(
+            self.loader, 'myservice', None, handlers, self.factory)
+        second = self.registry.get_client_class(
+            self.loader, 'myservice', None, handlers, self.factory)
+        self.assertIs(first, second)
+
+    def test_client_class_keyed_by_handlers(self):
+        first = self.registry.get_client_class(
+            self.loader, 'myservice', None, (), self.factory)
+        second = self.registry.get_client_class(
+            self.loader, 'myservice', None, (_module_level_handler,),
+            self.factory)
+        self.assertIsNot(first, second)
+
+    def test_client_class_not_shared_with_closure_handlers(self):
+        def handler(**kwargs):
+            return handlers
+
+        handlers = (handler,)
+        first = self.registry.get_client_class(
+            self.loader, 'myservice', None, handlers, self.factory)
+        second = self.registry.get_client_class(
+            self.loader, 'myservice', None, handlers, self.factory)
+        self.assertIsNot(first, second)
+
+    def test_client_class_not_shared_with_unknown_handlers(self):
+        first = self.registry.get_client_class(
+            self.loader, 'myservice', None, None, self.factory)
+        second = self.registry.get_client_class(
+            self.loader, 'myservice', None, None, self.factory)
+        self.assertIsNot(first, second)
+
+    def test_invalidate_service(self):
+        first = self.registry.get_service_model(
+            self.loader, 'myservice', None, self.factory)
+        other = self.registry.get_service_model(
+            self.loader, 'otherservice', None, self.factory)
+        self.registry.invalidate('myservice')
+        self.assertIsNot(first, self.registry.get_service_model(
+            self.loader, 'myservice', None, self.factory))
+        self.assertIs(other, self.registry.get_service_model(
+            self.loader, 'otherservice', None, self.factory))
+
+    def test_invalidate_all(self):
+        first = self.registry.get_service_model(
+            self.loader, 'myservice', None, self.factory)
+        self.registry.invalidate()
+        self.assertIsNot(first, self.registry.get_service_model(
+            self.loader, 'myservice', None, self.factory))
+
+    def test_get_shared_client_registry_is_process_wide(self):
+        self.assertIs(client.get_shared_client_registry(),
+                      client.get_shared_client_registry())
+
+    def test_get_shared_client_registry_creates_one_registry(self):
+        registries = []
+        with mock.patch('botocore.client.SHARED_CLIENT_REGISTRY', None):
+            threads = [
+                threading.Thread(target=lambda: registries.append(
+                    client.get_shared_client_registry()))
+                for _ in range(10)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(registries), 10)
+        self.assertEqual(len(set(map(id, registries))), 1)
@@ -11,14 +11,19 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from tests import mock
 from tests import unittest
 
 from botocore.compat import six
 from botocore.endpoint import Endpoint, DEFAULT_TIMEOUT
-from botocore.endpoint import EndpointCreator
-from botocore.exceptions import HTTPClientError
+from botocore.endpoint import EndpointCreator, submit_request
+from botocore.exceptions import HTTPClientError, SendDeferredError
+from botocore.retries import hedging
+from botocore.retries import scheduler as retry_scheduler
+from botocore.retries.scheduler import RetryFuture
 from botocore.httpsession import URLLib3Session
 from botocore.model import OperationModel, ServiceId
 from botocore.model import ServiceModel, StructureShape
@@ -122,6 +127,48 @@ class TestEndpointFeatures(TestEndpointBase):
         request = prepare.call_args[0][0]
         self.assertEqual(request.context['signing']['region'], 'us-west-2')
 
+    def test_before_send_is_emitted_with_context(self):
+        r = request_dict()
+        r['context'] = {'foo': 'bar'}
+        self.endpoint.make_request(self.op, r)
+        before_send = [
+            call for call in self.event_emitter.emit.call_args_list
+            if call[0][0].startswith('before-send')
+        ]
+        self.assertEqual(before_send[0][1]['context'], {'foo': 'bar'})
+
+    def test_prepared_headers_are_encoded(self):
+        r = request_dict()
+        r['headers'] = {'X-Foo': u'\u30c6\u30b9\u30c8', 'X-Bar': b'bar'}
+        self.endpoint.make_request(self.op, r)
+        prepared_request = self.http_session.send.call_args[0][0]
+        self.assertEqual(
+            list(prepared_request.headers.items()),
+            [('X-Foo', u'\u30c6\u30b9\u30c8'.encode('utf-8')),
+             ('X-Bar', b'bar'), ('Content-Length', b'0')])
+
+    def test_does_not_record_history_when_not_recording(self):
+        with mock.patch('botocore.endpoint.history_recorder') as recorder:
+            recorder.recording = False
+            self.endpoint.make_request(self.op, request_dict())
+        self.assertFalse(recorder.record.called)
+
+    def test_records_history_when_recording(self):
+        with mock.patch('botocore.endpoint.history_recorder') as recorder:
+            recorder.recording = True
+            self.endpoint.make_request(self.op, request_dict())
+        events = [c[0][0] for c in recorder.record.call_args_list]
+        self.assertEqual(
+            events, ['HTTP_REQUEST', 'HTTP_RESPONSE', 'PARSED_RESPONSE'])
+
+    def test_does_not_record_history_of_calls_not_sampled(self):
+        r = request_dict()
+        r['context']['record_history'] = False
+        with mock.patch('botocore.endpoint.history_recorder') as recorder:
+            recorder.recording = True
+            self.endpoint.make_request(self.op, r)
+        self.assertFalse(recorder.record.called)
+
     def test_parses_modeled_exception_fields(self):
         # Setup the service model to have exceptions to generate the mapping
         self.service_model = mock.Mock(spec=ServiceModel)
@@ -379,3 +426,246 @@ class TestEndpointCreator(unittest.TestCase):
             http_session_cls=self.mock_session, socket_options=socket_options)
         session_args = self.mock_session.call_args[1]
         self.assertEqual(session_args.get('socket_options'), socket_options)
+
+
+class ImmediateExecutor(object):
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, function, *args):
+        self.submitted += 1
+        function(*args)
+
+
+class RecordingScheduler(object):
+    def __init__(self):
+        self.delays = []
+
+    def call_later(self, delay, function, *args):
+        self.delays.append(delay)
+        function(*args)
+
+
+class TestSubmitRequest(TestEndpointBase):
+    def setUp(self):
+        super(TestSubmitRequest, self).setUp()
+        self.executor = ImmediateExecutor()
+        self.scheduler = RecordingScheduler()
+
+    def submit_request(self, request=None, **kwargs):
+        if request is None:
+            request = request_dict()
+        return submit_request(
+            self.endpoint, self.op, request, self.executor,
+            scheduler=self.scheduler, **kwargs)
+
+    def test_submit_request(self):
+        future = self.submit_request()
+        http_response, _ = future.result()
+        self.assertEqual(http_response.status_code, 200)
+        self.assertEqual(future.attempts, 1)
+        self.assertEqual(self.scheduler.delays, [])
+        self.assertTrue(self.http_session.send.called)
+
+    def test_request_context_allows_deferred_sends(self):
+        request = request_dict()
+        self.submit_request(request)
+        self.assertTrue(
+            request['context'][retry_scheduler.DEFER_SEND_CONTEXT_KEY])
+
+    def test_retries_are_scheduled(self):
+        self.event_emitter.emit.side_effect = self.get_emitter_responses(
+            num_retries=2, sleep_time=3)
+        with mock.patch('time.sleep') as sleep:
+            future = self.submit_request()
+            future.result()
+        self.assertFalse(sleep.called)
+        self.assertEqual(self.scheduler.delays, [3, 3])
+        self.assertEqual(future.attempts, 3)
+        self.assertEqual(self.executor.submitted, 3)
+        self.assertIsNone(future.retry_after)
+
+    def test_stream_is_reset_before_retry(self):
+        self.event_emitter.emit.side_effect = self.get_emitter_responses(
+            num_retries=1)
+        body = RecordStreamResets('foobar')
+        request = request_dict()
+        request['body'] = body
+        self.submit_request(request).result()
+        # 1 seek for the reset and 4 (2 per creation) for content-length
+        self.assertEqual(body.total_resets, 5)
+
+    def test_deferred_send_is_rescheduled(self):
+        request = request_dict()
+        deferred = []
+
+        def emit(event_name, **kwargs):
+            if event_name.startswith('before-send') and not deferred:
+                deferred.append(kwargs['request'])
+                raise SendDeferredError(delay=0.5)
+            if event_name.startswith('before-send'):
+                # The request isn't created again.
+                self.assertIs(kwargs['request'], deferred[0])
+            return []
+        self.event_emitter.emit.side_effect = emit
+        future = self.submit_request(request)
+        future.result()
+        self.assertEqual(self.scheduler.delays, [0.5])
+        self.assertEqual(future.attempts, 1)
+        self.assertEqual(self.http_session.send.call_count, 1)
+
+    def test_error_is_set_on_future(self):
+        self.http_session.send.side_effect = HTTPClientError(error='wrapped')
+        future = self.submit_request()
+        with self.assertRaises(HTTPClientError):
+            future.result()
+
+    def test_response_handler(self):
+        def handle_response(get_response):
+            http_response, _ = get_response()
+            return http_response.status_code
+        future = self.submit_request(response_handler=handle_response)
+        self.assertEqual(future.result(), 200)
+
+    def test_executor_errors_are_set_on_future(self):
+        self.executor.submit = mock.Mock(side_effect=RuntimeError('shutdown'))
+        future = self.submit_request()
+        with self.assertRaises(RuntimeError):
+            future.result()
+
+    def test_cancelled_request_is_not_sent(self):
+        submitted = []
+        self.executor.submit = lambda function: submitted.append(function)
+        future = self.submit_request()
+        self.assertTrue(future.cancel())
+        submitted[0]()
+        self.assertFalse(self.http_session.send.called)
+
+    def test_completes_running_future(self):
+        future = RetryFuture()
+        future.set_running_or_notify_cancel()
+        self.assertIs(self.submit_request(future=future), future)
+        http_response, _ = future.result()
+        self.assertEqual(http_response.status_code, 200)
+        self.assertEqual(future.attempts, 1)
+
+
+class FakeHedge(object):
+    def __init__(self, delay, quota_available=True):
+        self.delay = delay
+        self.quota_available = quota_available
+        self.acquired = 0
+        self.latencies = []
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def acquire(self):
+        self.acquired += 1
+        return self.quota_available
+
+    def record_latency(self, latency):
+        self.latencies.append(latency)
+
+
+class TestHedgedRequests(TestEndpointBase):
+    def setUp(self):
+        super(TestHedgedRequests, self).setUp()
+        self.release_first = threading.Event()
+        self.sent = []
+
+    def make_hedged_request(self, hedge):
+        self.addCleanup(hedge.executor.shutdown)
+        self.addCleanup(self.release_first.set)
+        request = request_dict()
+        request['context'][hedging.HEDGE_CONTEXT_KEY] = hedge
+        return self.endpoint.make_request(self.op, request)
+
+    def response(self, status_code=200):
+        return mock.Mock(status_code=status_code, headers={}, content=b'{}')
+
+    def send_slow_first(self, *responses):
+        responses = list(responses)
+
+        def send(request):
+            self.sent.append(request)
+            response = responses.pop(0)
+            if len(self.sent) == 1:
+                self.release_first.wait(5)
+            return response
+        self.http_session.send.side_effect = send
+
+    def test_hedge_is_sent_after_delay(self):
+        first, second = self.response(), self.response()
+        self.send_slow_first(first, second)
+        hedge = FakeHedge(delay=0.01)
+        http_response, _ = self.make_hedged_request(hedge)
+        self.assertIs(http_response, second)
+        self.assertEqual(hedge.acquired, 1)
+        # Each attempt is signed separately.
+        self.assertIsNot(self.sent[0], self.sent[1])
+
+    def test_no_hedge_when_response_is_fast(self):
+        self.release_first.set()
+        hedge = FakeHedge(delay=5)
+        http_response, _ = self.make_hedged_request(hedge)
+        self.assertEqual(http_response.status_code, 200)
+        self.assertEqual(hedge.acquired, 0)
+        self.assertEqual(self.http_session.send.call_count, 1)
+        self.assertEqual(len(hedge.latencies), 1)
+
+    def test_no_hedge_without_retry_quota(self):
+        first = self.response()
+        self.send_slow_first(first)
+        hedge = FakeHedge(delay=0.01, quota_available=False)
+        threading.Timer(0.05, self.release_first.set).start()
+        http_response, _ = self.make_hedged_request(hedge)
+        self.assertIs(http_response, first)
+        self.assertEqual(self.http_session.send.call_count, 1)
+
+    def test_waits_for_success_after_failed_hedge(self):
+        first, second = self.response(), self.response(status_code=500)
+
+        def send(request):
+            self.sent.append(request)
+            if len(self.sent) == 1:
+                self.release_first.wait(5)
+                return first
+            # The first attempt completes once the hedge failed.
+            self.release_first.set()
+            return second
+        self.http_session.send.side_effect = send
+        http_response, _ = self.make_hedged_request(FakeHedge(delay=0.01))
+        self.assertIs(http_response, first)
+
+    def test_returns_first_attempt_when_all_fail(self):
+        first = self.response(status_code=503)
+        second = self.response(status_code=500)
+        self.send_slow_first(first, second)
+        threading.Timer(0.05, self.release_first.set).start()
+        http_response, _ = self.make_hedged_request(FakeHedge(delay=0.01))
+        self.assertIs(http_response, first)
+
+    def test_streaming_response_of_loser_is_closed(self):
+        self.op.has_streaming_output = True
+        first, second = self.response(), self.response()
+        self.send_slow_first(first, second)
+        hedge = FakeHedge(delay=0.01)
+        self.make_hedged_request(hedge)
+        self.release_first.set()
+        hedge.executor.shutdown(wait=True)
+        first.raw.close.assert_called_with()
+        self.assertFalse(second.raw.close.called)
+
+    def test_records_latency_before_hedging(self):
+        hedge = FakeHedge(delay=None)
+        self.make_hedged_request(hedge)
+        self.assertEqual(len(hedge.latencies), 1)
+        self.assertEqual(hedge.acquired, 0)
+
+    def test_response_received_is_emitted_once(self):
+        self.send_slow_first(self.response(), self.response())
+        self.make_hedged_request(FakeHedge(delay=0.01))
+        events = [
+            event for event in self.get_events_emitted(self.event_emitter)
+            if event.startswith('response-received')
+        ]
+        self.assertEqual(len(events), 1)
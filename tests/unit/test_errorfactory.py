@@ -96,6 +96,32 @@ class TestClientExceptionsFactory(unittest.TestCase):
             self.service_model)
         self.assertEqual(exceptions.__class__.__name__, 'MyServiceExceptions')
 
+    def test_exceptions_are_cached(self):
+        self.assertIs(
+            self.exceptions_factory.create_client_exceptions(
+                self.service_model),
+            self.exceptions_factory.create_client_exceptions(
+                self.service_model))
+
+    def test_concurrently_created_exceptions_use_first_cached(self):
+        create = self.exceptions_factory._create_client_exceptions
+        first = []
+
+        def create_while_other_thread_creates(service_model):
+            if not first:
+                # Another thread finishes creating the exceptions while
+                # this one is creating them.
+                first.append(create(service_model))
+                self.exceptions_factory._client_exceptions_cache[
+                    service_model.service_name] = first[0]
+            return create(service_model)
+
+        self.exceptions_factory._create_client_exceptions = \
+            create_while_other_thread_creates
+        exceptions = self.exceptions_factory.create_client_exceptions(
+            self.service_model)
+        self.assertIs(exceptions, first[0])
+
     def test_creates_modeled_exception(self):
         exceptions = self.exceptions_factory.create_client_exceptions(
             self.service_model)
@@ -3,6 +3,7 @@ from tests import unittest
 
 from botocore.history import HistoryRecorder
 from botocore.history import BaseHistoryHandler
+from botocore.history import QueuedHistoryHandler
 from botocore.history import get_global_history_recorder
 
 
@@ -77,6 +78,58 @@ class TestHistoryRecorder(unittest.TestCase):
             self.fail('Should not have raised a TerribleError')
         mock_handler.emit.assert_called_with('foo', 'bar', 'BOTOCORE')
 
+    def test_recording(self):
+        recorder = HistoryRecorder()
+        self.assertFalse(recorder.recording)
+        recorder.enable()
+        self.assertFalse(recorder.recording)
+        recorder.add_handler(mock.Mock(spec=BaseHistoryHandler))
+        self.assertTrue(recorder.recording)
+        recorder.disable()
+        self.assertFalse(recorder.recording)
+
+    def test_sample_rate(self):
+        recorder = HistoryRecorder()
+        recorder.enable(sample_rate=0.5)
+        recorder.add_handler(mock.Mock(spec=BaseHistoryHandler))
+        with mock.patch('random.random', side_effect=[0.7, 0.2]):
+            self.assertFalse(recorder.sample())
+            self.assertTrue(recorder.sample())
+
+    def test_sample_when_not_recording(self):
+        recorder = HistoryRecorder()
+        recorder.enable()
+        self.assertFalse(recorder.sample())
+        recorder.add_handler(mock.Mock(spec=BaseHistoryHandler))
+        self.assertTrue(recorder.sample())
+
+    def test_invalid_sample_rate(self):
+        recorder = HistoryRecorder()
+        with self.assertRaises(ValueError):
+            recorder.enable(sample_rate=2)
+
+
+class TestQueuedHistoryHandler(unittest.TestCase):
+    def test_emits_from_background_thread(self):
+        mock_handler = mock.Mock(spec=BaseHistoryHandler)
+        handler = QueuedHistoryHandler(mock_handler)
+        handler.emit('foo', 'bar', 'source')
+        handler.flush()
+        mock_handler.emit.assert_called_with('foo', 'bar', 'source')
+
+    def test_ignores_handler_exceptions(self):
+        handler = QueuedHistoryHandler(ExceptionThrowingHandler())
+        handler.emit('foo', 'bar', 'source')
+        handler.flush()
+
+    def test_drops_records_when_full(self):
+        mock_handler = mock.Mock(spec=BaseHistoryHandler)
+        handler = QueuedHistoryHandler(mock_handler, max_queue_size=1)
+        with mock.patch.object(handler, '_start'):
+            handler.emit('foo', 'first', 'source')
+            handler.emit('foo', 'second', 'source')
+        self.assertEqual(handler.dropped_records, 1)
+
 
 class TestGetHistoryRecorder(unittest.TestCase):
     def test_can_get_history_recorder(self):
@@ -13,11 +13,11 @@
 import copy
 import functools
 
-from tests import unittest
+from tests import mock, unittest
 from functools import partial
 
 from botocore.hooks import HierarchicalEmitter, first_non_none_response
-from botocore.hooks import EventAliaser
+from botocore.hooks import EventAliaser, get_dispatch_table
 
 
 class TestHierarchicalEventEmitter(unittest.TestCase):
@@ -61,6 +61,15 @@ class TestHierarchicalEventEmitter(unittest.TestCase):
         self.emitter.emit('foo.bar.baz')
         self.assertEqual(calls, ['foo.bar.baz', 'foo.bar', 'foo'])
 
+    def test_get_handlers(self):
+        first = lambda **kwargs: None
+        second = lambda **kwargs: None
+        self.emitter.register('foo', first)
+        self.emitter.register('foo.bar', second)
+        self.assertEqual(
+            self.emitter._get_handlers('foo.bar'), (second, first))
+        self.assertEqual(self.emitter._get_handlers('other'), ())
+
 
 class TestAliasedEmitter(unittest.TestCase):
     def setUp(self):
@@ -97,6 +106,13 @@ class TestAliasedEmitter(unittest.TestCase):
         calls = [e['event_name'] for e in self.hook_calls]
         self.assertEqual(calls, ['foo.bear.baz'])
 
+    def test_get_handlers_for_aliased_event(self):
+        aliases = {'bar': 'bear'}
+        emitter = self.get_emitter(event_aliases=aliases)
+        emitter.register('foo.bear.baz', self.hook)
+        self.assertEqual(
+            emitter._get_handlers('foo.bar.baz'), (self.hook,))
+
     def test_aliased_event_registered(self):
         aliases = {'bar': 'bear'}
         emitter = self.get_emitter(event_aliases=aliases)
@@ -159,6 +175,88 @@ class TestAliasedEmitter(unittest.TestCase):
         self.assertEqual(calls, [])
 
 
+class TestEventDispatchTable(unittest.TestCase):
+    def setUp(self):
+        self.emitter = HierarchicalEmitter()
+        self.hook_calls = []
+
+    def hook(self, **kwargs):
+        self.hook_calls.append(kwargs)
+        return kwargs['event_name']
+
+    def test_emit_calls_handlers(self):
+        self.emitter.register('before-send', self.hook)
+        self.emitter.register('before-send.s3.ListBuckets', self.hook)
+        table = get_dispatch_table(self.emitter, 's3', 'ListBuckets')
+        responses = table.emit('before-send', request='request')
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(
+            self.hook_calls[0],
+            {'event_name': 'before-send.s3.ListBuckets',
+             'request': 'request'})
+
+    def test_emit_until_response(self):
+        self.emitter.register('choose-signer', self.hook)
+        self.emitter.register('choose-signer', self.hook)
+        table = get_dispatch_table(self.emitter, 's3', 'ListBuckets')
+        self.assertEqual(
+            table.emit_until_response('choose-signer'),
+            (self.hook, 'choose-signer.s3.ListBuckets'))
+        self.assertEqual(len(self.hook_calls), 1)
+
+    def test_stage_without_handlers(self):
+        table = get_dispatch_table(self.emitter, 's3', 'ListBuckets')
+        self.assertFalse(table.has_handlers('after-call'))
+        self.assertEqual(table.emit('after-call'), [])
+        self.assertEqual(
+            table.emit_until_response('after-call'), (None, None))
+
+    def test_tables_are_cached(self):
+        table = get_dispatch_table(self.emitter, 's3', 'ListBuckets')
+        self.assertIs(
+            get_dispatch_table(self.emitter, 's3', 'ListBuckets'), table)
+        self.assertIsNot(
+            get_dispatch_table(self.emitter, 's3', 'ListObjects'), table)
+
+    def test_register_invalidates_table(self):
+        table = get_dispatch_table(self.emitter, 's3', 'ListBuckets')
+        self.assertFalse(table.has_handlers('after-call'))
+        self.emitter.register('after-call.s3', self.hook)
+        self.assertTrue(table.has_handlers('after-call'))
+        table.emit('after-call')
+        self.assertEqual(len(self.hook_calls), 1)
+        self.emitter.unregister('after-call.s3', self.hook)
+        self.assertFalse(table.has_handlers('after-call'))
+
+    def test_copies_do_not_share_tables(self):
+        table = get_dispatch_table(self.emitter, 's3', 'ListBuckets')
+        copied = copy.copy(self.emitter)
+        copied.register('after-call', self.hook)
+        self.assertFalse(table.has_handlers('after-call'))
+        copied_table = get_dispatch_table(copied, 's3', 'ListBuckets')
+        self.assertIsNot(copied_table, table)
+        self.assertTrue(copied_table.has_handlers('after-call'))
+
+    def test_aliased_event_names(self):
+        emitter = EventAliaser(self.emitter, {'old-name': 'new-name'})
+        emitter.register('before-send.new-name', self.hook)
+        table = get_dispatch_table(emitter, 'old-name', 'Operation')
+        table.emit('before-send')
+        self.assertEqual(
+            self.hook_calls[0]['event_name'], 'before-send.new-name.Operation')
+        emitter.unregister('before-send.new-name', self.hook)
+        self.assertFalse(table.has_handlers('before-send'))
+
+    def test_forwards_to_other_emitters(self):
+        emitter = mock.Mock()
+        emitter.emit.return_value = []
+        table = get_dispatch_table(emitter, 's3', 'ListBuckets')
+        self.assertTrue(table.has_handlers('before-send'))
+        table.emit('before-send', request='request')
+        emitter.emit.assert_called_with(
+            'before-send.s3.ListBuckets', request='request')
+
+
 class TestStopProcessing(unittest.TestCase):
     def setUp(self):
         self.emitter = HierarchicalEmitter()
@@ -649,6 +747,46 @@ class TestWildcardHandlers(unittest.TestCase):
         self.assertEqual(first, ['first-time', 'second-time', 'fourth-time'])
         self.assertEqual(second, ['third-time'])
 
+    def test_copy_shares_handlers_until_modified(self):
+        self.emitter.register('foo.bar', self.hook)
+        copied = copy.copy(self.emitter)
+        self.assertIs(copied._handlers._root, self.emitter._handlers._root)
+        copied.register('foo.baz', self.hook)
+        self.assertIsNot(
+            copied._handlers._root, self.emitter._handlers._root)
+        # Only the nodes on the path to the new handler are copied.
+        self.assertIs(
+            copied._handlers._root['children']['foo']['children']['bar'],
+            self.emitter._handlers._root['children']['foo']['children']['bar'])
+
+    def test_original_changes_are_not_seen_by_copies(self):
+        self.emitter.register('foo.bar', self.hook)
+        copied = copy.copy(self.emitter)
+        copied_again = copy.copy(copied)
+        self.emitter.register('foo.bar', self.hook)
+        self.emitter.unregister('foo.bar', self.hook)
+        self.emitter.unregister('foo.bar', self.hook)
+        self.emitter.emit('foo.bar')
+        self.assertEqual(self.hook_calls, [])
+        copied.emit('foo.bar')
+        copied_again.emit('foo.bar')
+        self.assertEqual(len(self.hook_calls), 2)
+
+    def test_copy_has_own_unique_id_counts(self):
+        self.emitter.register('foo', self.hook, 'bar',
+                              unique_id_uses_count=True)
+        copied = copy.copy(self.emitter)
+        copied.register('foo', self.hook, 'bar', unique_id_uses_count=True)
+        # The original only registered the handler once.
+        self.emitter.unregister('foo', self.hook, 'bar',
+                                unique_id_uses_count=True)
+        self.emitter.emit('foo')
+        self.assertEqual(self.hook_calls, [])
+        # The copy needs to unregister twice.
+        copied.unregister('foo', self.hook, 'bar', unique_id_uses_count=True)
+        copied.emit('foo')
+        self.assertEqual(len(self.hook_calls), 1)
+
     def test_copy_events_with_partials(self):
         # There's a bug in python2.6 where you can't deepcopy
         # a partial object.  We want to ensure that doesn't
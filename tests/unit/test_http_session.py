@@ -1,14 +1,21 @@
 import socket
+import ssl
+import threading
+import time
 
 import pytest
 from urllib3.exceptions import NewConnectionError, ProtocolError
 
-from tests import mock, unittest
+from tests import mock, unittest, LocalHTTPServer
 
 from botocore.awsrequest import AWSRequest
 from botocore.awsrequest import AWSHTTPConnectionPool, AWSHTTPSConnectionPool
-from botocore.httpsession import get_cert_path
+from botocore.httpsession import get_cert_path, create_urllib3_context
+from botocore.httpsession import SSLContext
 from botocore.httpsession import URLLib3Session, ProxyConfiguration
+from botocore.httpsession import _IdleConnectionReaper
+from botocore.httpsession import _SessionResumingSSLContext
+from botocore.httpsession import get_shared_ssl_context
 from botocore.exceptions import ConnectionClosedError, EndpointConnectionError
 
 
@@ -417,8 +424,251 @@ class TestURLLib3Session(unittest.TestCase):
             headers={'Transfer-Encoding': 'chunked'},
         )
 
+    def test_chunked_encoding_is_set_with_encoded_header(self):
+        session = URLLib3Session()
+        self.request.headers['Transfer-Encoding'] = 'chunked'
+        prepared_request = self.request.prepare()
+        prepared_request.headers['Transfer-Encoding'] = b'chunked'
+
+        session.send(prepared_request)
+        self.assert_request_sent(
+            chunked=True,
+            headers={'Transfer-Encoding': b'chunked'},
+        )
+
     def test_chunked_encoding_is_not_set_without_header(self):
         session = URLLib3Session()
 
         session.send(self.request.prepare())
         self.assert_request_sent(chunked=False)
+
+    def test_idle_connection_timeout_is_set_on_pool(self):
+        with mock.patch('botocore.httpsession._IDLE_CONNECTION_REAPER'):
+            session = URLLib3Session(idle_connection_timeout=30)
+        session.send(self.request.prepare())
+        self.assertEqual(self.connection.idle_timeout, 30)
+
+
+class TestSharedSSLContext(unittest.TestCase):
+    def setUp(self):
+        contexts_patch = mock.patch.dict(
+            'botocore.httpsession._SHARED_SSL_CONTEXTS', clear=True)
+        contexts_patch.start()
+        self.addCleanup(contexts_patch.stop)
+        self.ca_bundle = get_cert_path(True)
+
+    def test_contexts_are_shared(self):
+        context = get_shared_ssl_context(self.ca_bundle)
+        self.assertIs(get_shared_ssl_context(self.ca_bundle), context)
+        self.assertIsInstance(context, _SessionResumingSSLContext)
+        self.assertEqual(context.verify_mode, ssl.CERT_REQUIRED)
+        self.assertGreater(context.cert_store_stats()['x509_ca'], 0)
+
+    def test_contexts_are_keyed_by_certificates(self):
+        verified = get_shared_ssl_context(self.ca_bundle)
+        unverified = get_shared_ssl_context()
+        self.assertIsNot(verified, unverified)
+        self.assertEqual(unverified.verify_mode, ssl.CERT_NONE)
+        checks_hostname = get_shared_ssl_context(
+            self.ca_bundle, check_hostname=True)
+        self.assertIsNot(checks_hostname, verified)
+        self.assertTrue(checks_hostname.check_hostname)
+
+    def test_load_error_is_raised_and_not_cached(self):
+        with self.assertRaises(IOError):
+            get_shared_ssl_context('/does/not/exist')
+        with self.assertRaises(IOError):
+            get_shared_ssl_context('/does/not/exist')
+
+    def test_sessions_share_context(self):
+        session = URLLib3Session()
+        other_session = URLLib3Session()
+        self.assertTrue(session._uses_shared_ssl_context)
+        self.assertIs(session._ssl_context, other_session._ssl_context)
+        self.assertIsNot(
+            session._ssl_context, URLLib3Session(verify=False)._ssl_context)
+
+    def test_connections_load_certificates_if_context_fails(self):
+        session = URLLib3Session(client_cert=('/some/cert', '/some/key'))
+        self.assertFalse(session._uses_shared_ssl_context)
+        pool = mock.Mock()
+        session._setup_ssl_cert(pool, 'https://example.com', True)
+        self.assertEqual(pool.ca_certs, self.ca_bundle)
+
+    def test_connections_do_not_load_certificates(self):
+        session = URLLib3Session()
+        pool = mock.Mock()
+        session._setup_ssl_cert(pool, 'https://example.com', True)
+        self.assertEqual(pool.cert_reqs, 'CERT_REQUIRED')
+        self.assertIsNone(pool.ca_certs)
+        self.assertIsNone(pool.cert_file)
+
+    def test_custom_ssl_context_is_not_shared(self):
+        class CustomSession(URLLib3Session):
+            def _get_ssl_context(self):
+                return create_urllib3_context()
+
+        session = CustomSession()
+        self.assertFalse(session._uses_shared_ssl_context)
+        self.assertIsNot(session._ssl_context, URLLib3Session()._ssl_context)
+
+
+class TestSessionResumingSSLContext(unittest.TestCase):
+    def setUp(self):
+        self.context = create_urllib3_context(
+            context_cls=_SessionResumingSSLContext)
+        wrap_patch = mock.patch.object(SSLContext, 'wrap_socket')
+        self.wrap_socket = wrap_patch.start()
+        self.addCleanup(wrap_patch.stop)
+
+    def create_session(self, expires_in=300):
+        session = mock.Mock(has_ticket=True, timeout=expires_in)
+        session.time = time.time()
+        return session
+
+    def connect(self, session=None, hostname='example.com', port=443):
+        sock = mock.Mock()
+        sock.getpeername.return_value = ('10.0.0.1', port)
+        ssl_sock = mock.Mock(session=session)
+        self.wrap_socket.return_value = ssl_sock
+        self.assertIs(
+            self.context.wrap_socket(sock, server_hostname=hostname),
+            ssl_sock)
+        return ssl_sock
+
+    def get_offered_session(self):
+        return self.wrap_socket.call_args[1]['session']
+
+    def test_resumes_saved_session(self):
+        session = self.create_session()
+        ssl_sock = self.connect(session)
+        self.assertIsNone(self.get_offered_session())
+        self.context.save_session(ssl_sock)
+        self.connect()
+        self.assertIs(self.get_offered_session(), session)
+
+    def test_sessions_are_per_host_and_port(self):
+        self.context.save_session(self.connect(self.create_session()))
+        self.connect(hostname='other.example.com')
+        self.assertIsNone(self.get_offered_session())
+        self.connect(port=8443)
+        self.assertIsNone(self.get_offered_session())
+
+    def test_does_not_resume_expired_session(self):
+        self.context.save_session(
+            self.connect(self.create_session(expires_in=0)))
+        self.connect()
+        self.assertIsNone(self.get_offered_session())
+
+    def test_does_not_save_unresumable_session(self):
+        session = self.create_session()
+        session.has_ticket = False
+        session.id = b''
+        self.context.save_session(self.connect(session))
+        self.connect()
+        self.assertIsNone(self.get_offered_session())
+
+    def test_number_of_sessions_is_bounded(self):
+        self.context.MAX_SESSIONS = 2
+        for port in (1, 2, 3):
+            self.context.save_session(
+                self.connect(self.create_session(), port=port))
+        self.connect(port=1)
+        self.assertIsNone(self.get_offered_session())
+        self.connect(port=3)
+        self.assertIsNotNone(self.get_offered_session())
+
+
+class TestURLLib3SessionConnections(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalHTTPServer()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.url = self.server.url
+        self.reaper_patch = mock.patch(
+            'botocore.httpsession._IDLE_CONNECTION_REAPER')
+        self.reaper = self.reaper_patch.start()
+        self.addCleanup(self.reaper_patch.stop)
+
+    def get_pool(self, session):
+        return session._manager.connection_from_url(self.url)
+
+    def get_open_connections(self, session):
+        return [
+            conn for conn in self.get_pool(session).pool.queue
+            if getattr(conn, 'sock', None) is not None
+        ]
+
+    def test_prewarm_opens_connections(self):
+        session = URLLib3Session()
+        self.assertEqual(session.prewarm(self.url, connections=3), 3)
+        self.assertEqual(len(self.get_open_connections(session)), 3)
+        self.assertEqual(len(self.server.connections), 3)
+
+    def test_prewarm_reuses_idle_connections(self):
+        session = URLLib3Session()
+        session.prewarm(self.url, connections=2)
+        self.assertEqual(session.prewarm(self.url, connections=3), 3)
+        self.assertEqual(len(self.get_open_connections(session)), 3)
+        self.assertEqual(len(self.server.connections), 3)
+
+    def test_prewarm_is_limited_to_pool_size(self):
+        session = URLLib3Session(max_pool_connections=2)
+        self.assertEqual(session.prewarm(self.url, connections=5), 2)
+        self.assertEqual(len(self.get_open_connections(session)), 2)
+
+    def test_prewarm_skips_failed_connections(self):
+        session = URLLib3Session()
+        self.server.stop()
+        self.assertEqual(session.prewarm(self.url, connections=2), 0)
+        self.assertEqual(self.get_open_connections(session), [])
+
+    def test_registers_with_reaper_when_idle_timeout_set(self):
+        URLLib3Session()
+        self.assertFalse(self.reaper.register.called)
+        session = URLLib3Session(idle_connection_timeout=30)
+        self.reaper.register.assert_called_once_with(session)
+
+    def test_evict_idle_connections(self):
+        session = URLLib3Session(idle_connection_timeout=30)
+        session.prewarm(self.url, connections=2)
+        self.assertEqual(session.evict_idle_connections(), 0)
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 31):
+            self.assertEqual(session.evict_idle_connections(), 2)
+        self.assertEqual(self.get_open_connections(session), [])
+
+
+class TestIdleConnectionReaper(unittest.TestCase):
+    def test_evicts_registered_sessions_until_collected(self):
+        evicted = threading.Event()
+
+        class FakeSession(object):
+            _idle_connection_timeout = 0.01
+
+            def evict_idle_connections(self):
+                evicted.set()
+
+        reaper = _IdleConnectionReaper()
+        session = FakeSession()
+        reaper.register(session)
+        thread = reaper._thread
+        self.assertTrue(evicted.wait(5))
+        del session
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(reaper._thread)
+
+    def test_checks_sessions_at_most_every_min_interval(self):
+        class FakeSession(object):
+            _idle_connection_timeout = 0
+
+            def evict_idle_connections(self):
+                pass
+
+        reaper = _IdleConnectionReaper()
+        session = FakeSession()
+        sleep = mock.Mock(side_effect=lambda delay: reaper._sessions.clear())
+        reaper._sessions.add(session)
+        with mock.patch('time.sleep', sleep):
+            reaper._run()
+        sleep.assert_called_once_with(reaper.MIN_INTERVAL)
@@ -0,0 +1,90 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+from tests import mock
+from tests import unittest
+
+from botocore.compat import json
+from botocore.jsoncodec import (
+    StandardJSONCodec, JSONCodec, create_json_codec, resolve_json_codec,
+)
+
+try:
+    import orjson  # noqa
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+class TestStandardJSONCodec(unittest.TestCase):
+    def setUp(self):
+        self.codec = StandardJSONCodec()
+
+    def test_dumps_returns_bytes(self):
+        self.assertEqual(self.codec.dumps({'Foo': u'✓'}),
+                         b'{"Foo": "\\u2713"}')
+
+    def test_loads_from_bytes(self):
+        self.assertEqual(self.codec.loads(u'{"Foo": "✓"}'.encode('utf-8')),
+                         {'Foo': u'✓'})
+
+    def test_loads_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.codec.loads(b'{"Foo"')
+
+
+class TestJSONCodec(unittest.TestCase):
+    def test_encodes_str_from_dumps(self):
+        codec = JSONCodec(json.dumps, json.loads)
+        self.assertEqual(codec.dumps({'Foo': 'bar'}), b'{"Foo": "bar"}')
+
+    def test_keeps_bytes_from_dumps(self):
+        dumps = mock.Mock(return_value=b'{}')
+        codec = JSONCodec(dumps, json.loads)
+        self.assertEqual(codec.dumps({}), b'{}')
+
+    def test_decodes_body_for_loads(self):
+        loads = mock.Mock(return_value={})
+        codec = JSONCodec(json.dumps, loads)
+        codec.loads(b'{}')
+        loads.assert_called_with(u'{}')
+
+    def test_passes_bytes_to_loads(self):
+        loads = mock.Mock(return_value={})
+        codec = JSONCodec(json.dumps, loads, loads_bytes=True)
+        body = b'{}'
+        codec.loads(body)
+        self.assertIs(loads.call_args[0][0], body)
+
+
+class TestCreateJSONCodec(unittest.TestCase):
+    def test_create_json(self):
+        self.assertIsInstance(create_json_codec('json'), StandardJSONCodec)
+
+    @unittest.skipIf(not HAS_ORJSON, 'Test requires orjson to be installed')
+    def test_create_orjson(self):
+        codec = create_json_codec('orjson')
+        self.assertEqual(codec.dumps({'Foo': [1, 2]}), b'{"Foo":[1,2]}')
+        self.assertEqual(codec.loads(b'{"Foo": [1, 2]}'), {'Foo': [1, 2]})
+        with self.assertRaises(ValueError):
+            codec.loads(b'{"Foo"')
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            create_json_codec('unknown')
+
+    def test_resolve_name(self):
+        self.assertIsInstance(resolve_json_codec('json'), StandardJSONCodec)
+
+    def test_resolve_codec(self):
+        codec = JSONCodec(json.dumps, json.loads)
+        self.assertIs(resolve_json_codec(codec), codec)
@@ -22,13 +22,20 @@
 import os
 import contextlib
 import copy
+import pickle
+import shutil
+import tempfile
 
 from botocore.exceptions import DataNotFoundError, UnknownServiceError
-from botocore.loaders import JSONFileLoader
-from botocore.loaders import Loader, create_loader
+from botocore.loaders import JSONFileLoader, CachedJSONFileLoader
+from botocore.loaders import Loader, create_loader, warm_data_cache
+from botocore.loaders import LazyModelMap, compact_model
 from botocore.loaders import ExtrasProcessor
 
+from botocore.compat import OrderedDict
+
 from tests import mock
+from tests import unittest
 from tests import BaseEnvVar
 
 
@@ -64,6 +71,157 @@ class TestJSONFileLoader(BaseEnvVar):
             self.fail('Fail to handle data file with non-ascii characters')
 
 
+class TestCachedJSONFileLoader(BaseEnvVar):
+    def setUp(self):
+        super(TestCachedJSONFileLoader, self).setUp()
+        self.tempdir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tempdir, 'cache')
+        self.data_path = os.path.join(self.tempdir, 'data')
+        os.makedirs(self.data_path)
+        self.file_path = os.path.join(self.data_path, 'foo')
+        self.write_json('{"a": 1, "b": 2}')
+        self.file_loader = CachedJSONFileLoader(self.cache_path)
+
+    def tearDown(self):
+        super(TestCachedJSONFileLoader, self).tearDown()
+        shutil.rmtree(self.tempdir)
+
+    def write_json(self, contents, mtime=None):
+        with open(self.file_path + '.json', 'w') as f:
+            f.write(contents)
+        if mtime is not None:
+            os.utime(self.file_path + '.json', (mtime, mtime))
+
+    def test_load_file_populates_cache(self):
+        data = self.file_loader.load_file(self.file_path)
+        self.assertEqual(data, {'a': 1, 'b': 2})
+        self.assertEqual(len(os.listdir(self.cache_path)), 1)
+
+    def test_load_file_reads_from_cache(self):
+        expected = self.file_loader.load_file(self.file_path)
+        with mock.patch('botocore.loaders.json.loads') as json_loads:
+            data = CachedJSONFileLoader(self.cache_path).load_file(
+                self.file_path)
+        self.assertFalse(json_loads.called)
+        self.assertEqual(data, expected)
+        self.assertEqual(list(data), ['a', 'b'])
+
+    def test_modified_file_invalidates_cache(self):
+        self.write_json('{"a": 1}', mtime=1000)
+        self.file_loader.load_file(self.file_path)
+        self.write_json('{"a": 2}', mtime=2000)
+        data = self.file_loader.load_file(self.file_path)
+        self.assertEqual(data, {'a': 2})
+
+    def test_botocore_version_invalidates_cache(self):
+        self.file_loader.load_file(self.file_path)
+        self.write_json('{"c": 3}', mtime=os.stat(
+            self.file_path + '.json').st_mtime)
+        with mock.patch('botocore.loaders.botocore_version', '0.0.0'):
+            data = self.file_loader.load_file(self.file_path)
+        self.assertEqual(data, {'c': 3})
+
+    def test_corrupt_cache_file_falls_back_to_json(self):
+        self.file_loader.load_file(self.file_path)
+        for filename in os.listdir(self.cache_path):
+            with open(os.path.join(self.cache_path, filename), 'wb') as f:
+                f.write(b'not a pickle')
+        data = self.file_loader.load_file(self.file_path)
+        self.assertEqual(data, {'a': 1, 'b': 2})
+
+    def test_unwritable_cache_still_loads(self):
+        with open(self.cache_path, 'w') as f:
+            f.write('not a directory')
+        data = self.file_loader.load_file(self.file_path)
+        self.assertEqual(data, {'a': 1, 'b': 2})
+
+    def test_load_file_does_not_exist_returns_none(self):
+        self.assertIsNone(self.file_loader.load_file(
+            os.path.join(self.data_path, 'does-not-exist')))
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_lazy_models_cached_in_compact_form(self):
+        self.write_json('{"shapes": {"A": {"type": "string"}}}')
+        file_loader = CachedJSONFileLoader(self.cache_path, lazy_models=True)
+        self.assertIsInstance(
+            file_loader.load_file(self.file_path)['shapes'], LazyModelMap)
+        data = CachedJSONFileLoader(
+            self.cache_path, lazy_models=True).load_file(self.file_path)
+        self.assertIsInstance(data['shapes'], LazyModelMap)
+        self.assertEqual(data['shapes']['A'], {'type': 'string'})
+        # A non lazy loader sharing the cache gets plain dicts.
+        data = self.file_loader.load_file(self.file_path)
+        self.assertEqual(data['shapes'], {'A': {'type': 'string'}})
+
+    def test_warm_data_cache(self):
+        service_path = os.path.join(self.data_path, 'myservice', '2020-01-01')
+        os.makedirs(service_path)
+        with open(os.path.join(service_path, 'service-2.json'), 'w') as f:
+            f.write('{"metadata": {}}')
+        with open(os.path.join(self.data_path, 'endpoints.json'), 'w') as f:
+            f.write('{"partitions": []}')
+        cached = warm_data_cache(
+            self.cache_path, ['myservice'], search_path_string=self.data_path)
+        self.assertEqual(cached, ['myservice'])
+        # One entry for the endpoints and one for the service model.
+        self.assertEqual(len(os.listdir(self.cache_path)), 2)
+
+
+class TestLazyModelMap(unittest.TestCase):
+    def setUp(self):
+        self.shapes = OrderedDict([
+            ('B', {'type': 'string'}),
+            ('A', {'type': 'structure', 'exception': True, 'members': {}}),
+        ])
+        self.lazy_map = LazyModelMap.from_mapping(self.shapes)
+
+    def test_acts_as_mapping(self):
+        self.assertEqual(list(self.lazy_map), ['B', 'A'])
+        self.assertEqual(len(self.lazy_map), 2)
+        self.assertIn('A', self.lazy_map)
+        self.assertEqual(dict(self.lazy_map), dict(self.shapes))
+
+    def test_values_deserialized_on_access(self):
+        self.assertEqual(self.lazy_map.loaded_keys, [])
+        self.assertEqual(self.lazy_map['B'], {'type': 'string'})
+        self.assertEqual(self.lazy_map.loaded_keys, ['B'])
+
+    def test_values_are_retained_once_loaded(self):
+        self.lazy_map['B']['min'] = 1
+        self.assertEqual(self.lazy_map['B'], {'type': 'string', 'min': 1})
+
+    def test_missing_key(self):
+        with self.assertRaises(KeyError):
+            self.lazy_map['C']
+
+    def test_set_and_delete(self):
+        self.lazy_map['C'] = {'type': 'structure', 'exception': True}
+        self.assertEqual(list(self.lazy_map), ['B', 'A', 'C'])
+        del self.lazy_map['A']
+        self.assertEqual(list(self.lazy_map), ['B', 'C'])
+        self.assertEqual(self.lazy_map.keys_with_trait('exception'), ['C'])
+
+    def test_keys_with_trait(self):
+        self.assertEqual(self.lazy_map.keys_with_trait('exception'), ['A'])
+        self.assertEqual(self.lazy_map.loaded_keys, [])
+
+    def test_pickle_round_trip_includes_modifications(self):
+        self.lazy_map['B']['min'] = 1
+        loaded = pickle.loads(pickle.dumps(self.lazy_map))
+        self.assertEqual(loaded.loaded_keys, [])
+        self.assertEqual(loaded['B'], {'type': 'string', 'min': 1})
+        self.assertEqual(loaded.keys_with_trait('exception'), ['A'])
+
+    def test_compact_model(self):
+        model = compact_model({
+            'metadata': {}, 'operations': {}, 'shapes': self.shapes})
+        self.assertEqual(model['metadata'], {})
+        self.assertIsInstance(model['operations'], LazyModelMap)
+        self.assertIsInstance(model['shapes'], LazyModelMap)
+        shapes = model['shapes']
+        self.assertIs(compact_model(model)['shapes'], shapes)
+
+
 class TestLoader(BaseEnvVar):
 
     def test_default_search_paths(self):
@@ -183,6 +341,49 @@ class TestLoader(BaseEnvVar):
         self.assertIn('bar', loader.search_paths)
         self.assertIn('baz', loader.search_paths)
 
+    def test_create_loader_with_data_cache_path(self):
+        loader = create_loader(data_cache_path='cachedir')
+        self.assertIsInstance(loader.file_loader, CachedJSONFileLoader)
+        self.assertEqual(loader.file_loader.cache_path, 'cachedir')
+
+    def create_lazy_service_loader(self, file_loader=None):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir)
+        service_path = os.path.join(tempdir, 'myservice', '2020-01-01')
+        os.makedirs(service_path)
+        with open(os.path.join(service_path, 'service-2.json'), 'w') as f:
+            f.write('{"operations": {}, "shapes": {"A": {"type": "string"}}}')
+        return Loader(extra_search_paths=[tempdir], file_loader=file_loader,
+                      include_default_search_paths=False,
+                      lazy_service_models=True)
+
+    def test_lazy_service_models(self):
+        cache_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_path)
+        loader = self.create_lazy_service_loader(
+            CachedJSONFileLoader(cache_path, lazy_models=True))
+        with mock.patch.object(loader, 'load_data',
+                               wraps=loader.load_data) as load_data:
+            model = loader.load_service_model('myservice', 'service-2')
+        self.assertIsInstance(model['shapes'], LazyModelMap)
+        self.assertIsInstance(model['operations'], LazyModelMap)
+        self.assertEqual(model['shapes']['A'], {'type': 'string'})
+        # The fully deserialized model is not retained in the load_data
+        # cache, only the extras are loaded through it.
+        self.assertNotIn(
+            mock.call(os.path.join('myservice', '2020-01-01', 'service-2')),
+            load_data.call_args_list)
+
+    def test_lazy_service_models_without_data_cache_not_compacted(self):
+        loader = self.create_lazy_service_loader()
+        model = loader.load_service_model('myservice', 'service-2')
+        self.assertEqual(model['shapes'], {'A': {'type': 'string'}})
+        self.assertNotIsInstance(model['shapes'], LazyModelMap)
+
+    def test_create_loader_without_data_cache_path(self):
+        loader = create_loader()
+        self.assertNotIsInstance(loader.file_loader, CachedJSONFileLoader)
+
 
 class TestMergeExtras(BaseEnvVar):
     def setUp(self):
@@ -4,6 +4,7 @@ from tests import unittest
 
 from botocore import model
 from botocore.compat import OrderedDict
+from botocore.loaders import LazyModelMap
 
 
 @pytest.mark.parametrize("property_name", ['api_version', 'protocol'])
@@ -126,6 +127,18 @@ class TestServiceModel(unittest.TestCase):
         self.assertIn('ExceptionOne', error_shape_names)
         self.assertIn('ExceptionTwo', error_shape_names)
 
+    def test_error_shapes_with_lazy_shapes(self):
+        self.model['shapes'].update(self.error_shapes)
+        shapes = LazyModelMap.from_mapping(self.model['shapes'])
+        self.model['shapes'] = shapes
+        service_model = model.ServiceModel(self.model)
+        error_shape_names = [
+            shape.name for shape in service_model.error_shapes]
+        self.assertEqual(
+            sorted(error_shape_names), ['ExceptionOne', 'ExceptionTwo'])
+        # Only the exception shapes needed to be deserialized.
+        self.assertNotIn('StringShape', shapes.loaded_keys)
+
 
 class TestOperationModelFromService(unittest.TestCase):
     def setUp(self):
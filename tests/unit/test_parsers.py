@@ -20,6 +20,13 @@ import pytest
 from botocore import parsers
 from botocore import model
 from botocore.compat import json, MutableMapping
+from botocore.jsoncodec import JSONCodec
+
+try:
+    import lxml  # noqa
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
 
 
 # HTTP responses will typically return a custom HTTP
@@ -592,6 +599,216 @@ class TestResponseParserFactory(unittest.TestCase):
         parser = self.factory.create_parser('json')
         self.assertTrue(isinstance(parser, parsers.BaseJSONParser))
 
+    def test_parsers_not_reused_by_default(self):
+        self.assertIsNot(self.factory.create_parser('json'),
+                         self.factory.create_parser('json'))
+
+    def test_compiled_parsers_are_reused(self):
+        self.factory.set_parser_defaults(compile_plans=True)
+        parser = self.factory.create_parser('json')
+        self.assertIs(self.factory.create_parser('json'), parser)
+        self.factory.set_parser_defaults(timestamp_parser=str)
+        self.assertIsNot(self.factory.create_parser('json'), parser)
+
+    def test_copy_has_same_defaults(self):
+        self.factory.set_parser_defaults(compile_plans=True)
+        factory = self.factory.copy()
+        self.assertIs(factory.create_parser('json'),
+                      factory.create_parser('json'))
+        self.assertIsNot(factory.create_parser('json'),
+                         self.factory.create_parser('json'))
+
+
+class TestCompiledPlans(unittest.TestCase):
+    def setUp(self):
+        self.service_model = model.ServiceModel({
+            'metadata': {'protocol': 'json'},
+            'operations': {},
+            'shapes': {
+                'AttributeValue': {
+                    'type': 'structure',
+                    'members': {
+                        'B': {'shape': 'Blob'},
+                        'L': {'shape': 'AttributeValueList'},
+                        'M': {'shape': 'AttributeValueMap'},
+                    },
+                },
+                'AttributeValueList': {
+                    'type': 'list',
+                    'member': {'shape': 'AttributeValue'},
+                },
+                'AttributeValueMap': {
+                    'type': 'map',
+                    'key': {'shape': 'String'},
+                    'value': {'shape': 'AttributeValue'},
+                },
+                'Blob': {'type': 'blob'},
+                'String': {'type': 'string'},
+            },
+        })
+        self.shape = self.service_model.shape_for('AttributeValue')
+        self.body = (
+            b'{"M": {"foo": {"B": "aGVsbG8="}, '
+            b'"bar": {"L": [{"M": {"baz": {"B": "d29ybGQ="}}}]}}}'
+        )
+
+    def parse(self, compile_plans):
+        parser = parsers.JSONParser(compile_plans=compile_plans)
+        return parser.parse(
+            {'body': self.body, 'headers': {}, 'status_code': 200},
+            self.shape)
+
+    def test_recursive_shape_matches_uncompiled(self):
+        parsed = self.parse(compile_plans=True)
+        self.assertEqual(parsed, self.parse(compile_plans=False))
+        self.assertEqual(parsed['M']['foo'], {'B': b'hello'})
+        self.assertEqual(
+            parsed['M']['bar']['L'][0]['M']['baz'], {'B': b'world'})
+
+    def test_plan_is_compiled_once(self):
+        parser = parsers.JSONParser(compile_plans=True)
+        response = {'body': self.body, 'headers': {}, 'status_code': 200}
+        parser.parse(response, self.shape)
+        plan = parser._plan_cache[self.shape]
+        parser.parse(response, self.shape)
+        self.assertIs(parser._plan_cache[self.shape], plan)
+
+
+class TestXMLBackends(unittest.TestCase):
+    def setUp(self):
+        self.output_shape = model.StructureShape(
+            'OutputShape',
+            {
+                'type': 'structure',
+                'resultWrapper': 'OperationNameResult',
+                'members': {
+                    'Str': {'shape': 'StringType'},
+                    'Items': {'shape': 'ItemList'},
+                    'Flat': {'shape': 'FlatList', 'locationName': 'Item'},
+                }
+            },
+            model.ShapeResolver({
+                'StringType': {'type': 'string'},
+                'IntegerType': {'type': 'integer'},
+                'ItemList': {
+                    'type': 'list', 'member': {'shape': 'IntegerType'},
+                },
+                'FlatList': {
+                    'type': 'list', 'member': {'shape': 'StringType'},
+                    'flattened': True,
+                },
+            })
+        )
+        self.body = (
+            b'<OperationNameResponse xmlns="https://example.com/">'
+            b'  <OperationNameResult>'
+            b'    <Str>myname</Str><Unknown><Str>foo</Str></Unknown>'
+            b'    <Items><member>1</member><member>2</member></Items>'
+            b'    <Item>a</Item><Item>b</Item>'
+            b'  </OperationNameResult>'
+            b'  <ResponseMetadata>'
+            b'    <RequestId>request-id</RequestId>'
+            b'  </ResponseMetadata>'
+            b'</OperationNameResponse>'
+        )
+
+    def parse(self, xml_backend, body=None):
+        if body is None:
+            body = self.body
+        parser = parsers.QueryParser(xml_backend=xml_backend)
+        return parser.parse(
+            {'body': body, 'headers': {}, 'status_code': 200},
+            self.output_shape)
+
+    def assert_parsed(self, xml_backend):
+        parsed = self.parse(xml_backend)
+        self.assertEqual(
+            parsed, {'Str': 'myname', 'Items': [1, 2], 'Flat': ['a', 'b'],
+                     'ResponseMetadata': {'RequestId': 'request-id',
+                                          'HTTPStatusCode': 200,
+                                          'HTTPHeaders': {}}})
+
+    def test_etree_backend(self):
+        self.assert_parsed(parsers.ElementTreeXMLBackend())
+
+    def test_streaming_backend(self):
+        self.assert_parsed(parsers.StreamingXMLBackend())
+
+    @pytest.mark.skipif(not HAS_LXML, reason='Test requires lxml')
+    def test_lxml_backend(self):
+        self.assert_parsed(parsers.LxmlXMLBackend())
+
+    @pytest.mark.skipif(not HAS_LXML, reason='Test requires lxml')
+    def test_streaming_backend_with_lxml_events(self):
+        self.assert_parsed(
+            parsers.StreamingXMLBackend(parsers.LxmlXMLBackend()))
+
+    def test_streaming_invalid_xml(self):
+        with self.assertRaisesRegex(parsers.ResponseParserError,
+                                    '<OperationNameResponse'):
+            self.parse(parsers.StreamingXMLBackend(), self.body[:-10])
+
+    def test_missing_result_wrapper(self):
+        body = (
+            b'<OperationNameResponse xmlns="https://example.com/">'
+            b'  <ResponseMetadata>'
+            b'    <RequestId>request-id</RequestId>'
+            b'  </ResponseMetadata>'
+            b'</OperationNameResponse>'
+        )
+        for xml_backend in [parsers.ElementTreeXMLBackend(),
+                            parsers.StreamingXMLBackend()]:
+            with self.assertRaisesRegex(KeyError, 'OperationNameResult'):
+                self.parse(xml_backend, body)
+
+    def test_create_xml_backend(self):
+        self.assertIsInstance(parsers.create_xml_backend('streaming'),
+                              parsers.StreamingXMLBackend)
+
+    def test_create_unknown_xml_backend(self):
+        with self.assertRaises(ValueError):
+            parsers.create_xml_backend('unknown')
+
+
+class TestJSONCodec(unittest.TestCase):
+    def setUp(self):
+        self.output_shape = model.StructureShape(
+            'OutputShape',
+            {
+                'type': 'structure',
+                'members': {'Str': {'shape': 'StringType'}},
+            },
+            model.ShapeResolver({'StringType': {'type': 'string'}})
+        )
+        self.loaded = []
+
+    def loads(self, body):
+        self.loaded.append(body)
+        return json.loads(body)
+
+    def parse(self, parser_cls, body, status_code=200):
+        codec = JSONCodec(json.dumps, self.loads, loads_bytes=True)
+        parser = parser_cls(json_codec=codec)
+        return parser.parse(
+            {'body': body, 'headers': {}, 'status_code': status_code},
+            self.output_shape)
+
+    def test_json_parser_passes_bytes_to_codec(self):
+        body = b'{"Str": "foo"}'
+        parsed = self.parse(parsers.JSONParser, body)
+        self.assertEqual(parsed['Str'], 'foo')
+        self.assertIs(self.loaded[0], body)
+
+    def test_rest_json_parser_passes_bytes_to_codec(self):
+        body = b'{"Str": "foo"}'
+        parsed = self.parse(parsers.RestJSONParser, body)
+        self.assertEqual(parsed['Str'], 'foo')
+        self.assertIs(self.loaded[0], body)
+
+    def test_invalid_body_is_used_as_error_message(self):
+        parsed = self.parse(parsers.RestJSONParser, b'Not JSON', 500)
+        self.assertEqual(parsed['Error']['Message'], 'Not JSON')
+
 
 class TestCanDecorateResponseParsing(unittest.TestCase):
     def setUp(self):
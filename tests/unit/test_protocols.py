@@ -63,12 +63,14 @@ from botocore.awsrequest import HeadersDict
 from botocore.compat import json, OrderedDict, urlsplit
 from botocore.eventstream import EventStream
 from botocore.model import ServiceModel, OperationModel
+from botocore.jsoncodec import create_json_codec
 from botocore.serialize import (
     EC2Serializer, QuerySerializer, JSONSerializer, RestJSONSerializer,
     RestXMLSerializer,
 )
 from botocore.parsers import (
     QueryParser, JSONParser, RestJSONParser, RestXMLParser, EC2QueryParser,
+    create_xml_backend,
 )
 from botocore.utils import parse_timestamp, percent_encode_sequence
 from botocore.awsrequest import prepare_request_dict
@@ -93,6 +95,27 @@ PROTOCOL_PARSERS = {
     'rest-json': RestJSONParser,
     'rest-xml': RestXMLParser,
 }
+try:
+    import lxml  # noqa
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+try:
+    import orjson  # noqa
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+PARSER_OPTIONS = [
+    pytest.param({}, id='default'),
+    pytest.param({'compile_plans': True}, id='compiled'),
+    pytest.param({'xml_backend': 'streaming'}, id='streaming'),
+    pytest.param({'xml_backend': 'lxml'}, id='lxml', marks=pytest.mark.skipif(
+        not HAS_LXML, reason='Test requires lxml to be installed')),
+    pytest.param({'json_codec': 'orjson'}, id='orjson',
+                 marks=pytest.mark.skipif(
+                     not HAS_ORJSON,
+                     reason='Test requires orjson to be installed')),
+]
 PROTOCOL_TEST_BLACKLIST = [
     'Idempotency token auto fill'
 ]
@@ -121,11 +144,12 @@ def _compliance_tests(test_type=None):
                     yield model, case, basename
 
 
+@pytest.mark.parametrize("compile_plans", [False, True])
 @pytest.mark.parametrize(
     "json_description, case, basename",
     _compliance_tests(TestType.INPUT)
 )
-def test_input_compliance(json_description, case, basename):
+def test_input_compliance(json_description, case, basename, compile_plans):
     service_description = copy.deepcopy(json_description)
     service_description['operations'] = {
         case.get('name', 'OperationName'): case,
@@ -136,7 +160,7 @@ def test_input_compliance(json_description, case, basename):
         protocol_serializer = PROTOCOL_SERIALIZERS[protocol_type]
     except KeyError:
         raise RuntimeError("Unknown protocol: %s" % protocol_type)
-    serializer = protocol_serializer()
+    serializer = protocol_serializer(compile_plans=compile_plans)
     serializer.MAP_TYPE = OrderedDict
     operation_model = OperationModel(case['given'], model)
     request = serializer.serialize_to_request(case['params'], operation_model)
@@ -172,12 +196,14 @@ class MockRawResponse(object):
         yield self._data
 
 
+@pytest.mark.parametrize("parser_options", PARSER_OPTIONS)
 @pytest.mark.parametrize(
     "json_description, case, basename",
     _compliance_tests(TestType.OUTPUT)
 )
-def test_output_compliance(json_description, case, basename):
+def test_output_compliance(json_description, case, basename, parser_options):
     service_description = copy.deepcopy(json_description)
+    case = copy.deepcopy(case)
     operation_name = case.get('name', 'OperationName')
     service_description['operations'] = {
         operation_name: case,
@@ -186,8 +212,15 @@ def test_output_compliance(json_description, case, basename):
     try:
         model = ServiceModel(service_description)
         operation_model = OperationModel(case['given'], model)
+        parser_options = dict(parser_options)
+        if 'xml_backend' in parser_options:
+            parser_options['xml_backend'] = create_xml_backend(
+                parser_options['xml_backend'])
+        if 'json_codec' in parser_options:
+            parser_options['json_codec'] = create_json_codec(
+                parser_options['json_codec'])
         parser = PROTOCOL_PARSERS[model.metadata['protocol']](
-            timestamp_parser=_compliance_timestamp_parser)
+            timestamp_parser=_compliance_timestamp_parser, **parser_options)
         # We load the json as utf-8, but the response parser is at the
         # botocore boundary, so it expects to work with bytes.
         body_bytes = case['response']['body'].encode('utf-8')
@@ -511,3 +511,94 @@ class TestRestXMLUnicodeSerialization(unittest.TestCase):
             self.serialize_to_request(params)
         except UnicodeEncodeError:
             self.fail("RestXML serializer failed to serialize unicode text.")
+
+
+class TestCompiledPlans(unittest.TestCase):
+
+    def setUp(self):
+        self.model = {
+            'metadata': {
+                'protocol': 'json', 'apiVersion': '2014-01-01',
+                'jsonVersion': '1.1', 'targetPrefix': 'foo'},
+            'documentation': '',
+            'operations': {
+                'TestOperation': {
+                    'name': 'TestOperation',
+                    'http': {
+                        'method': 'POST',
+                        'requestUri': '/',
+                    },
+                    'input': {'shape': 'InputShape'},
+                }
+            },
+            'shapes': {
+                'InputShape': {
+                    'type': 'structure',
+                    'members': {
+                        'Item': {'shape': 'AttributeValue'},
+                        'Timestamp': {'shape': 'Timestamp'},
+                    }
+                },
+                'AttributeValue': {
+                    'type': 'structure',
+                    'members': {
+                        'S': {'shape': 'StringShape'},
+                        'B': {'shape': 'BlobShape'},
+                        'L': {'shape': 'AttributeValueList'},
+                        'M': {'shape': 'AttributeValueMap'},
+                    }
+                },
+                'AttributeValueList': {
+                    'type': 'list',
+                    'member': {'shape': 'AttributeValue'},
+                },
+                'AttributeValueMap': {
+                    'type': 'map',
+                    'key': {'shape': 'StringShape'},
+                    'value': {'shape': 'AttributeValue'},
+                },
+                'Timestamp': {'type': 'timestamp'},
+                'StringShape': {'type': 'string'},
+                'BlobShape': {'type': 'blob'},
+            }
+        }
+        self.service_model = ServiceModel(self.model)
+        self.operation_model = self.service_model.operation_model(
+            'TestOperation')
+
+    def serialize_to_request(self, input_params, compile_plans):
+        request_serializer = serialize.create_serializer(
+            'json', include_validation=False, compile_plans=compile_plans)
+        return request_serializer.serialize_to_request(
+            input_params, self.operation_model)
+
+    def test_recursive_shape_matches_uncompiled(self):
+        params = {
+            'Item': {'M': {
+                'foo': {'S': 'bar'},
+                'nested': {'L': [{'B': b'\xff'}, {'M': {'a': {'S': 'b'}}}]},
+            }},
+            'Timestamp': datetime.datetime(2014, 1, 1, 12, 12, 12),
+        }
+        compiled = self.serialize_to_request(params, compile_plans=True)
+        uncompiled = self.serialize_to_request(params, compile_plans=False)
+        self.assertEqual(compiled, uncompiled)
+        self.assertEqual(
+            json.loads(compiled['body'].decode('utf-8'))['Timestamp'],
+            1388578332)
+
+    def test_plan_is_compiled_once(self):
+        request_serializer = serialize.create_serializer(
+            'json', include_validation=False, compile_plans=True)
+        params = {'Item': {'S': 'bar'}}
+        request_serializer.serialize_to_request(params, self.operation_model)
+        plan = request_serializer._plan_cache[
+            self.operation_model.input_shape]
+        request_serializer.serialize_to_request(params, self.operation_model)
+        self.assertIs(
+            request_serializer._plan_cache[self.operation_model.input_shape],
+            plan)
+
+    def test_unknown_member_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            self.serialize_to_request({'Unknown': 'foo'}, compile_plans=True)
@@ -583,6 +583,121 @@ class TestCloudfrontSigner(BaseSignerTest):
             '&Signature=c2lnbmVk&Key-Pair-Id=MY_KEY_ID')
         assert_url_equal(signed_url, expected)
 
+    def test_canned_policy_matches_built_policy(self):
+        resource = u'http://test.com/\u2713 "quoted".txt'
+        signer = CloudFrontSigner('MY_KEY_ID', mock.Mock(return_value=b'a'))
+        signer.generate_presigned_url(
+            resource, date_less_than=datetime.datetime(2016, 1, 1))
+        signer.rsa_signer.assert_called_with(signer.build_policy(
+            resource, datetime.datetime(2016, 1, 1)).encode('utf8'))
+
+    def test_custom_policy_signatures_are_cached(self):
+        rsa_signer = mock.Mock(return_value=b'signed')
+        signer = CloudFrontSigner('MY_KEY_ID', rsa_signer)
+        policy = signer.build_policy(
+            'http://test.com/*', datetime.datetime(2016, 1, 1))
+        first = signer.generate_presigned_url(
+            'http://test.com/foo.txt', policy=policy)
+        second = signer.generate_presigned_url(
+            'http://test.com/bar.txt', policy=policy)
+        self.assertEqual(rsa_signer.call_count, 1)
+        self.assertEqual(
+            first.split('?')[1], second.split('?')[1])
+
+    def test_canned_policy_signatures_are_not_cached(self):
+        rsa_signer = mock.Mock(return_value=b'signed')
+        signer = CloudFrontSigner('MY_KEY_ID', rsa_signer)
+        for _ in range(2):
+            signer.generate_presigned_url(
+                'http://test.com/foo.txt',
+                date_less_than=datetime.datetime(2016, 1, 1))
+        self.assertEqual(rsa_signer.call_count, 2)
+
+    def test_expiry_window(self):
+        rsa_signer = mock.Mock(return_value=b'signed')
+        signer = CloudFrontSigner('MY_KEY_ID', rsa_signer)
+        urls = [
+            signer.generate_presigned_url(
+                'http://test.com/foo.txt', expiry_window=3600,
+                date_less_than=datetime.datetime(2016, 1, 1, 0, minute))
+            for minute in (1, 59)
+        ]
+        expected = (
+            'http://test.com/foo.txt?Expires=1451610000&Signature=c2lnbmVk'
+            '&Key-Pair-Id=MY_KEY_ID')
+        self.assertEqual(urls, [expected, expected])
+        self.assertEqual(rsa_signer.call_count, 1)
+
+    def test_signature_cache_is_bounded(self):
+        rsa_signer = mock.Mock(return_value=b'signed')
+        signer = CloudFrontSigner('MY_KEY_ID', rsa_signer)
+        signer.SIGNATURE_CACHE_SIZE = 2
+        for policy in ('a', 'b', 'a', 'c', 'b'):
+            signer.generate_presigned_url('http://test.com/', policy=policy)
+        self.assertEqual(rsa_signer.call_count, 4)
+        self.assertEqual(list(signer._signature_cache), [b'c', b'b'])
+
+    def test_generate_presigned_urls_with_expire_time(self):
+        signed_urls = self.signer.generate_presigned_urls(
+            ['http://test.com/foo.txt', 'http://test.com/bar.txt?a=b'],
+            date_less_than=datetime.datetime(2016, 1, 1))
+        self.assertEqual(signed_urls, [
+            'http://test.com/foo.txt?Expires=1451606400&Signature=c2lnbmVk'
+            '&Key-Pair-Id=MY_KEY_ID',
+            'http://test.com/bar.txt?a=b&Expires=1451606400'
+            '&Signature=c2lnbmVk&Key-Pair-Id=MY_KEY_ID',
+        ])
+
+    def test_generate_presigned_urls_with_custom_policy(self):
+        rsa_signer = mock.Mock(return_value=b'signed')
+        signer = CloudFrontSigner('MY_KEY_ID', rsa_signer)
+        signed_urls = signer.generate_presigned_urls(
+            ['http://test.com/foo.txt', 'http://test.com/bar.txt'],
+            policy='{"Statement":[]}')
+        self.assertEqual(signed_urls, [
+            'http://test.com/foo.txt?Policy=eyJTdGF0ZW1lbnQiOltdfQ__'
+            '&Signature=c2lnbmVk&Key-Pair-Id=MY_KEY_ID',
+            'http://test.com/bar.txt?Policy=eyJTdGF0ZW1lbnQiOltdfQ__'
+            '&Signature=c2lnbmVk&Key-Pair-Id=MY_KEY_ID',
+        ])
+        self.assertEqual(rsa_signer.call_count, 1)
+
+    def test_generate_signed_cookies_with_expire_time(self):
+        cookies = self.signer.generate_signed_cookies(
+            'http://test.com/foo.txt',
+            date_less_than=datetime.datetime(2016, 1, 1))
+        self.assertEqual(cookies, {
+            'CloudFront-Expires': '1451606400',
+            'CloudFront-Signature': 'c2lnbmVk',
+            'CloudFront-Key-Pair-Id': 'MY_KEY_ID',
+        })
+
+    def test_generate_signed_cookies_with_custom_policy(self):
+        cookies = self.signer.generate_signed_cookies(
+            None, policy='{"Statement":[]}')
+        self.assertEqual(cookies, {
+            'CloudFront-Policy': 'eyJTdGF0ZW1lbnQiOltdfQ__',
+            'CloudFront-Signature': 'c2lnbmVk',
+            'CloudFront-Key-Pair-Id': 'MY_KEY_ID',
+        })
+
+    def test_generate_signed_cookies_requires_one_of_expiry_or_policy(self):
+        with self.assertRaises(ValueError):
+            self.signer.generate_signed_cookies('http://test.com/foo.txt')
+
+    def test_sign_with_private_key(self):
+        try:
+            from cryptography.hazmat.primitives import hashes
+            from cryptography.hazmat.primitives.asymmetric import padding, rsa
+        except ImportError:
+            raise unittest.SkipTest('Test requires cryptography')
+        private_key = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048)
+        signer = CloudFrontSigner('MY_KEY_ID', private_key)
+        signature = signer.rsa_signer(b'message')
+        private_key.public_key().verify(
+            signature, b'message', padding.PKCS1v15(), hashes.SHA1())
+
 
 class TestS3PostPresigner(BaseSignerTest):
     def setUp(self):
@@ -66,6 +66,7 @@ from botocore.utils import percent_encode_sequence
 from botocore.utils import percent_encode
 from botocore.utils import switch_host_s3_accelerate
 from botocore.utils import deep_merge
+from botocore.loaders import LazyModelMap
 from botocore.utils import S3RegionRedirector
 from botocore.utils import InvalidArnException
 from botocore.utils import ArnParser
@@ -1303,6 +1304,13 @@ class TestSwitchHostS3Accelerate(unittest.TestCase):
 
 
 class TestDeepMerge(unittest.TestCase):
+    def test_merge_into_mapping(self):
+        a = {'key': LazyModelMap.from_mapping({'inner': {'a': 1}})}
+        b = {'key': {'inner': {'b': 2}}}
+        deep_merge(a, b)
+        self.assertIsInstance(a['key'], LazyModelMap)
+        self.assertEqual(a['key']['inner'], {'a': 1, 'b': 2})
+
     def test_simple_merge(self):
         a = {'key': 'value'}
         b = {'otherkey': 'othervalue'}